@@ -42,6 +42,9 @@
 #include "streaming_aead_impl.h"
 
 ABSL_FLAG(int, port, 23456, "the port");
+ABSL_FLAG(std::string, unix_socket, "",
+          "If set, the server listens on this Unix domain socket instead of "
+          "the port");
 ABSL_FLAG(std::string, gcp_credentials_path, "",
           "Google Cloud KMS credentials path");
 ABSL_FLAG(
@@ -73,8 +76,16 @@ void RunServer() {
     return;
   }
 
-  const int port = absl::GetFlag(FLAGS_port);
-  std::string server_address = absl::StrCat("[::]:", port);
+  const std::string unix_socket = absl::GetFlag(FLAGS_unix_socket);
+  std::string server_address;
+  grpc_local_connect_type connect_type;
+  if (unix_socket.empty()) {
+    server_address = absl::StrCat("[::]:", absl::GetFlag(FLAGS_port));
+    connect_type = LOCAL_TCP;
+  } else {
+    server_address = absl::StrCat("unix:", unix_socket);
+    connect_type = UDS;
+  }
 
   MetadataImpl metadata;
   KeysetImpl keyset;
@@ -90,7 +101,8 @@ void RunServer() {
 
   grpc::ServerBuilder builder;
   builder.AddListeningPort(
-      server_address, ::grpc::experimental::LocalServerCredentials(LOCAL_TCP));
+      server_address,
+      ::grpc::experimental::LocalServerCredentials(connect_type));
 
   builder.RegisterService(&metadata);
   builder.RegisterService(&keyset);
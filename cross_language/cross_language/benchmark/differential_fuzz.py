@@ -0,0 +1,260 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Differential fuzzing of all testing servers.
+
+Runs differential_fuzzer on ciphertexts, MAC tags, signatures, JWTs, JSON
+keysets and serialized keysets, for --fuzz_seconds each. The corpus is kept in
+--corpus_dir, so that consecutive runs continue where the last one stopped.
+Disagreements are written to <corpus_dir>/<target>/disagreements. The number
+of inputs and executions per second and the disagreements of each target are
+written to differential_fuzz.json in the undeclared outputs directory.
+"""
+
+import os
+from typing import Dict, List
+
+from absl import flags
+from absl.testing import absltest
+import tink
+from tink import aead
+from tink import jwt
+from tink import mac
+from tink import secret_key_access
+from tink import signature
+
+from tink.proto import tink_pb2
+from cross_language.util import benchmark_util
+from cross_language.util import differential_fuzzer
+from cross_language.util import testing_servers
+
+_FUZZ_SECONDS = flags.DEFINE_float(
+    'fuzz_seconds', 60.0, 'Duration of the fuzzing of each target.')
+_TARGETS = flags.DEFINE_list(
+    'targets', [], 'If set, only these targets are fuzzed. Defaults to all.')
+_CORPUS_DIR = flags.DEFINE_string(
+    'corpus_dir', '',
+    'Directory of the corpus. Defaults to fuzz_corpus in the undeclared '
+    'outputs directory.')
+_SEED = flags.DEFINE_integer('seed', None, 'Seed of the mutations.')
+_MAX_WORKERS = flags.DEFINE_integer(
+    'max_workers', 32, 'Number of concurrent requests to the servers.')
+
+_ASSOCIATED_DATA = b'differential_fuzz'
+_DATA = b'differential fuzz data'
+_ISSUER = 'differential-fuzz'
+
+
+def setUpModule():
+  aead.register()
+  mac.register()
+  signature.register()
+  jwt.register_jwt_mac()
+  testing_servers.start('differential_fuzz')
+
+
+def tearDownModule():
+  testing_servers.stop()
+
+
+def _new_keyset(template: tink_pb2.KeyTemplate) -> tink.KeysetHandle:
+  return tink.new_keyset_handle(template)
+
+
+def _serialize(handle: tink.KeysetHandle) -> bytes:
+  return tink.proto_keyset_format.serialize(handle, secret_key_access.TOKEN)
+
+
+def _aead_target() -> differential_fuzzer.FuzzTarget:
+  handle = _new_keyset(aead.aead_key_templates.AES128_GCM)
+  local = handle.primitive(aead.Aead)
+  languages = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['aead']
+  remote = {
+      lang: testing_servers.remote_primitive(lang, _serialize(handle),
+                                             aead.Aead)
+      for lang in languages
+  }
+
+  def run(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+    return differential_fuzzer.run_expecting_tink_error(
+        lambda: remote[lang].decrypt(data, _ASSOCIATED_DATA))
+
+  return differential_fuzzer.FuzzTarget(
+      name='aead_decrypt',
+      seeds=[local.encrypt(b'', _ASSOCIATED_DATA),
+             local.encrypt(_DATA, _ASSOCIATED_DATA)],
+      run=run,
+      languages=languages)
+
+
+def _mac_target() -> differential_fuzzer.FuzzTarget:
+  handle = _new_keyset(mac.mac_key_templates.HMAC_SHA256_256BITTAG)
+  languages = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['mac']
+  remote = {
+      lang: testing_servers.remote_primitive(lang, _serialize(handle), mac.Mac)
+      for lang in languages
+  }
+
+  def run(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+    return differential_fuzzer.run_expecting_tink_error(
+        lambda: remote[lang].verify_mac(data, _DATA))
+
+  return differential_fuzzer.FuzzTarget(
+      name='mac_verify',
+      seeds=[handle.primitive(mac.Mac).compute_mac(_DATA)],
+      run=run,
+      languages=languages)
+
+
+def _signature_target() -> differential_fuzzer.FuzzTarget:
+  handle = _new_keyset(signature.signature_key_templates.ECDSA_P256)
+  public_keyset = tink.proto_keyset_format.serialize_without_secret(
+      handle.public_keyset_handle())
+  languages = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['signature']
+  remote = {
+      lang: testing_servers.remote_primitive(lang, public_keyset,
+                                             signature.PublicKeyVerify)
+      for lang in languages
+  }
+
+  def run(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+    return differential_fuzzer.run_expecting_tink_error(
+        lambda: remote[lang].verify(data, _DATA))
+
+  return differential_fuzzer.FuzzTarget(
+      name='signature_verify',
+      seeds=[handle.primitive(signature.PublicKeySign).sign(_DATA)],
+      run=run,
+      languages=languages)
+
+
+def _jwt_target() -> differential_fuzzer.FuzzTarget:
+  handle = _new_keyset(jwt.jwt_hs256_template())
+  languages = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['jwt']
+  remote = {
+      lang: testing_servers.remote_primitive(lang, _serialize(handle),
+                                             jwt.JwtMac)
+      for lang in languages
+  }
+  validator = jwt.new_validator(
+      expected_issuer=_ISSUER, allow_missing_expiration=True)
+
+  def run(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+    try:
+      token = data.decode('utf-8')
+    except UnicodeDecodeError:
+      # The token is a string in the testing API.
+      return differential_fuzzer.Outcome(accepted=False)
+
+    def verify() -> None:
+      remote[lang].verify_mac_and_decode(token, validator)
+
+    return differential_fuzzer.run_expecting_tink_error(verify)
+
+  raw_jwt = jwt.new_raw_jwt(
+      issuer=_ISSUER, subject='subject', without_expiration=True)
+  seed = handle.primitive(jwt.JwtMac).compute_mac_and_encode(raw_jwt)
+  return differential_fuzzer.FuzzTarget(
+      name='jwt_verify',
+      seeds=[seed.encode('utf-8')],
+      run=run,
+      languages=languages)
+
+
+def _normalized_keyset(keyset: bytes) -> bytes:
+  """Makes parsed keysets of different languages comparable."""
+  return tink_pb2.Keyset.FromString(keyset).SerializeToString(
+      deterministic=True)
+
+
+def _json_keyset_target() -> differential_fuzzer.FuzzTarget:
+  handle = _new_keyset(aead.aead_key_templates.AES128_GCM)
+  languages = testing_servers.LANGUAGES
+
+  def run(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+    try:
+      json_keyset = data.decode('utf-8')
+    except UnicodeDecodeError:
+      # The JSON keyset is a string in the testing API.
+      return differential_fuzzer.Outcome(accepted=False)
+    return differential_fuzzer.run_expecting_tink_error(
+        lambda: _normalized_keyset(
+            testing_servers.keyset_from_json(lang, json_keyset)))
+
+  return differential_fuzzer.FuzzTarget(
+      name='json_keyset',
+      seeds=[tink.json_proto_keyset_format.serialize(
+          handle, secret_key_access.TOKEN).encode('utf-8')],
+      run=run,
+      languages=languages)
+
+
+def _serialized_keyset_target() -> differential_fuzzer.FuzzTarget:
+  languages = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['aead']
+
+  def run(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+
+    def create() -> None:
+      testing_servers.remote_primitive(lang, data, aead.Aead)
+
+    return differential_fuzzer.run_expecting_tink_error(create)
+
+  return differential_fuzzer.FuzzTarget(
+      name='serialized_keyset',
+      seeds=[
+          _serialize(_new_keyset(template)) for template in (
+              aead.aead_key_templates.AES128_GCM,
+              aead.aead_key_templates.AES256_CTR_HMAC_SHA256)
+      ],
+      run=run,
+      languages=languages)
+
+
+_TARGET_FACTORIES = {
+    'aead_decrypt': _aead_target,
+    'mac_verify': _mac_target,
+    'signature_verify': _signature_target,
+    'jwt_verify': _jwt_target,
+    'json_keyset': _json_keyset_target,
+    'serialized_keyset': _serialized_keyset_target,
+}
+
+
+def _target_names() -> List[str]:
+  return _TARGETS.value or list(_TARGET_FACTORIES)
+
+
+def _corpus_dir() -> str:
+  return _CORPUS_DIR.value or os.path.join(benchmark_util.output_dir(),
+                                           'fuzz_corpus')
+
+
+class DifferentialFuzz(absltest.TestCase):
+
+  def test_fuzz(self):
+    report = benchmark_util.Report('differential_fuzz')
+    disagreements: Dict[str, List[str]] = {}
+    for name in _target_names():
+      fuzzer = differential_fuzzer.DifferentialFuzzer(
+          _TARGET_FACTORIES[name](), _corpus_dir(), seed=_SEED.value,
+          max_workers=_MAX_WORKERS.value)
+      stats = fuzzer.run(max_seconds=_FUZZ_SECONDS.value)
+      report.add(**stats.as_dict())
+      if stats.disagreements:
+        disagreements[name] = stats.disagreements
+    report.write()
+    self.assertEmpty(disagreements)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,199 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks KMS envelope AEAD encryption and decryption.
+
+KMS envelope AEAD keys are created with create_kms_envelope_aead_key_template
+for each DEK template, and measured in two setups:
+
+  * With fake-kms:// key URIs, which every server handles in-process. This
+    measures the cost of envelope encryption itself, and the ciphertext
+    overhead, split into the encrypted DEK and the overhead of the DEK
+    ciphertext.
+  * With aws-kms:// key URIs served by a local_kms.LocalKmsServer with
+    artificial latency. The server counts the requests, which gives the number
+    of KMS round trips per operation. Only the languages whose AWS client can
+    be pointed at the local server are measured.
+
+The reports are written to envelope_aead_benchmark_fake_kms.json and
+envelope_aead_benchmark_local_kms.json in the undeclared outputs directory.
+"""
+
+from typing import Dict, List
+
+from absl import flags
+from absl.testing import absltest
+from tink import aead
+
+from tink.proto import tink_pb2
+from cross_language.util import benchmark_util
+from cross_language.util import local_kms
+from cross_language.util import testing_servers
+from cross_language.util import utilities
+
+_WARMUP = flags.DEFINE_integer(
+    'warmup', 2,
+    'Minimum number of unrecorded calls before each measurement.')
+_REPETITIONS = flags.DEFINE_integer(
+    'repetitions', 10,
+    'Minimum number of recorded calls for each measurement.')
+_PLAINTEXT_SIZES = flags.DEFINE_list(
+    'plaintext_sizes', ['16', '1024', '65536'],
+    'Sizes in bytes of the encrypted plaintexts.')
+_DEK_TEMPLATE_NAMES = flags.DEFINE_list(
+    'dek_template_names', [
+        'AES128_GCM', 'AES256_GCM', 'AES128_EAX', 'AES256_GCM_SIV',
+        'AES128_CTR_HMAC_SHA256', 'CHACHA20_POLY1305', 'XCHACHA20_POLY1305'
+    ], 'Names of the DEK templates.')
+_KMS_LATENCY_MS = flags.DEFINE_float(
+    'kms_latency_ms', 20.0,
+    'Latency added by the local KMS server to every request.')
+_KMS_LATENCY_JITTER_MS = flags.DEFINE_float(
+    'kms_latency_jitter_ms', 5.0,
+    'Maximal random latency added on top of kms_latency_ms.')
+
+# Fake KMS keys are base64-encoded keysets. Each server registers a fake
+# KmsClient that can handle these keys.
+_FAKE_KMS_KEY_URI = (
+    'fake-kms://CM2b3_MDElQKSAowdHlwZS5nb29nbGVhcGlzLmNvbS9nb29nbGUuY3J5cHRv'
+    'LnRpbmsuQWVzR2NtS2V5EhIaEIK75t5L-adlUwVhWvRuWUwYARABGM2b3_MDIAE')
+
+# The local KMS server accepts any key.
+_LOCAL_KMS_KEY_URI = (
+    'aws-kms://arn:aws:kms:us-east-2:235739564943:key/envelope-benchmark')
+
+# Languages whose AWS KMS client sends its requests to the local KMS server.
+_LOCAL_KMS_LANGUAGES = local_kms.SUPPORTED_LANGUAGES['aws']
+
+_ASSOCIATED_DATA = b'envelope_aead_benchmark'
+
+_local_kms_server: local_kms.LocalKmsServer = None
+
+
+def _sampling() -> benchmark_util.Sampling:
+  return benchmark_util.Sampling(min_warmup=_WARMUP.value,
+                                 min_repetitions=_REPETITIONS.value)
+
+
+def setUpModule():
+  global _local_kms_server
+  aead.register()
+  _local_kms_server = local_kms.LocalKmsServer(
+      local_kms.LocalKmsOptions(
+          latency_ms=_KMS_LATENCY_MS.value,
+          latency_jitter_ms=_KMS_LATENCY_JITTER_MS.value)).start()
+  testing_servers.start('envelope_aead_benchmark', _local_kms_server.url)
+
+
+def tearDownModule():
+  testing_servers.stop()
+  _local_kms_server.stop()
+
+
+def _plaintext_sizes() -> List[int]:
+  return [int(size) for size in _PLAINTEXT_SIZES.value]
+
+
+def _kms_requests() -> int:
+  counts = _local_kms_server.request_counts()
+  return counts.get('aws.Encrypt', 0) + counts.get('aws.Decrypt', 0)
+
+
+def _ciphertext_sizes(ciphertext: bytes, plaintext: bytes) -> Dict[str, int]:
+  """Splits the overhead of an envelope ciphertext without output prefix.
+
+  The ciphertext consists of the 4 byte length of the encrypted DEK, the
+  encrypted DEK and the DEK ciphertext.
+
+  Args:
+    ciphertext: The envelope ciphertext.
+    plaintext: The encrypted plaintext.
+
+  Returns:
+    The ciphertext sizes and overheads in bytes.
+  """
+  encrypted_dek_bytes = int.from_bytes(ciphertext[:4], 'big')
+  return {
+      'ciphertext_bytes': len(ciphertext),
+      'ciphertext_overhead_bytes': len(ciphertext) - len(plaintext),
+      'encrypted_dek_bytes': encrypted_dek_bytes,
+      'dek_ciphertext_overhead_bytes': (
+          len(ciphertext) - 4 - encrypted_dek_bytes - len(plaintext)),
+  }
+
+
+class EnvelopeAeadBenchmark(absltest.TestCase):
+
+  def _measure(self, fn) -> benchmark_util.LatencyStats:
+    return benchmark_util.measure_steady(fn, _sampling())
+
+  def test_fake_kms(self):
+    report = benchmark_util.Report('envelope_aead_benchmark_fake_kms')
+    for dek_template_name in _DEK_TEMPLATE_NAMES.value:
+      template = aead.aead_key_templates.create_kms_envelope_aead_key_template(
+          _FAKE_KMS_KEY_URI, utilities.KEY_TEMPLATE[dek_template_name])
+      self.assertEqual(template.output_prefix_type, tink_pb2.RAW)
+      for lang in utilities.SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME[
+          dek_template_name]:
+        keyset = testing_servers.new_keyset(lang, template)
+        p = testing_servers.remote_primitive(lang, keyset, aead.Aead)
+        for size in _plaintext_sizes():
+          plaintext = b'\x01' * size
+          ciphertext = p.encrypt(plaintext, _ASSOCIATED_DATA)
+          report.add(
+              lang=lang, dek_template=dek_template_name, plaintext_bytes=size,
+              operation='Encrypt',
+              latency=self._measure(
+                  lambda: p.encrypt(plaintext, _ASSOCIATED_DATA)),  # pylint: disable=cell-var-from-loop
+              **_ciphertext_sizes(ciphertext, plaintext))
+          report.add(
+              lang=lang, dek_template=dek_template_name, plaintext_bytes=size,
+              operation='Decrypt',
+              latency=self._measure(
+                  lambda: p.decrypt(ciphertext, _ASSOCIATED_DATA)))  # pylint: disable=cell-var-from-loop
+    report.write(testing_servers.tink_versions())
+
+  def test_local_kms_with_latency(self):
+    report = benchmark_util.Report('envelope_aead_benchmark_local_kms')
+    for dek_template_name in _DEK_TEMPLATE_NAMES.value:
+      template = aead.aead_key_templates.create_kms_envelope_aead_key_template(
+          _LOCAL_KMS_KEY_URI, utilities.KEY_TEMPLATE[dek_template_name])
+      for lang in utilities.SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME[
+          dek_template_name]:
+        if lang not in _LOCAL_KMS_LANGUAGES:
+          continue
+        keyset = testing_servers.new_keyset(lang, template)
+        p = testing_servers.remote_primitive(lang, keyset, aead.Aead)
+        for size in _plaintext_sizes():
+          plaintext = b'\x01' * size
+          ciphertext = p.encrypt(plaintext, _ASSOCIATED_DATA)
+          operations = {
+              'Encrypt': lambda: p.encrypt(plaintext, _ASSOCIATED_DATA),  # pylint: disable=cell-var-from-loop
+              'Decrypt': lambda: p.decrypt(ciphertext, _ASSOCIATED_DATA),  # pylint: disable=cell-var-from-loop
+          }
+          for operation, fn in operations.items():
+            requests_before = _kms_requests()
+            latency = self._measure(fn)
+            report.add(
+                lang=lang, dek_template=dek_template_name,
+                plaintext_bytes=size, operation=operation,
+                kms_latency_ms=_KMS_LATENCY_MS.value,
+                latency=latency,
+                kms_round_trips_per_op=(
+                    (_kms_requests() - requests_before) /
+                    (latency.warmup_calls + latency.samples)))
+    report.write(testing_servers.tink_versions())
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,105 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks key generation and primitive creation in all languages.
+
+For every template in utilities.KEY_TEMPLATE and every language which supports
+it, this measures the latency of the Keyset.Generate RPC, of the Keyset.Public
+RPC (for private keys) and of the Create RPC of the corresponding primitive.
+The results are written to key_generation_benchmark.json in the undeclared
+outputs directory.
+"""
+
+import functools
+
+from absl import flags
+from absl.testing import absltest
+from tink import hybrid
+from tink import jwt
+from tink import signature
+
+from cross_language import tink_config
+from cross_language.util import benchmark_util
+from cross_language.util import testing_servers
+from cross_language.util import utilities
+
+_WARMUP = flags.DEFINE_integer(
+    'warmup', 2,
+    'Minimum number of unrecorded calls before each measurement.')
+_REPETITIONS = flags.DEFINE_integer(
+    'repetitions', 10,
+    'Minimum number of recorded calls for each measurement.')
+_TEMPLATE_NAMES = flags.DEFINE_list(
+    'template_names', [],
+    'If set, only these templates are measured. Defaults to all templates.')
+
+# Primitives for which the keyset contains private keys.
+_PRIVATE_KEY_PRIMITIVES = frozenset(
+    [hybrid.HybridDecrypt, signature.PublicKeySign, jwt.JwtPublicKeySign])
+
+
+def _sampling() -> benchmark_util.Sampling:
+  return benchmark_util.Sampling(min_warmup=_WARMUP.value,
+                                 min_repetitions=_REPETITIONS.value)
+
+
+def setUpModule():
+  testing_servers.start('key_generation_benchmark')
+
+
+def tearDownModule():
+  testing_servers.stop()
+
+
+def _key_type_for_template_name(template_name: str) -> str:
+  for key_type, template_names in utilities.KEY_TEMPLATE_NAMES.items():
+    if template_name in template_names:
+      return key_type
+  raise ValueError('Unknown template name: %s' % template_name)
+
+
+class KeyGenerationBenchmark(absltest.TestCase):
+
+  def test_generate_public_and_create(self):
+    report = benchmark_util.Report('key_generation_benchmark')
+    template_names = _TEMPLATE_NAMES.value or list(utilities.KEY_TEMPLATE)
+    for template_name in template_names:
+      template = utilities.KEY_TEMPLATE[template_name]
+      key_type = _key_type_for_template_name(template_name)
+      primitive = tink_config.primitive_for_keytype(key_type)
+      for lang in utilities.SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME[template_name]:
+        keyset = testing_servers.new_keyset(lang, template)
+        report.add(
+            template=template_name, lang=lang, operation='Generate',
+            latency=benchmark_util.measure_steady(
+                functools.partial(testing_servers.new_keyset, lang, template),
+                _sampling()))
+        if primitive in _PRIVATE_KEY_PRIMITIVES:
+          report.add(
+              template=template_name, lang=lang, operation='Public',
+              latency=benchmark_util.measure_steady(
+                  functools.partial(testing_servers.public_keyset, lang,
+                                    keyset),
+                  _sampling()))
+        report.add(
+            template=template_name, lang=lang, operation='Create',
+            primitive=primitive.__name__,
+            latency=benchmark_util.measure_steady(
+                functools.partial(testing_servers.remote_primitive, lang,
+                                  keyset, primitive),
+                _sampling()))
+    report.write(testing_servers.tink_versions())
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,146 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks keyset serialization and parsing as a function of keyset size.
+
+Keysets with a growing number of keys of mixed key types are converted with
+the ToJson, FromJson, WriteEncrypted and ReadEncrypted RPCs of every language.
+The Keyset service has no RPC which only parses or only serializes a binary
+keyset, so plain binary keysets are covered as the input of ToJson and the
+output of FromJson.
+
+For each keyset size, the report contains the size in bytes of the binary, the
+JSON, the encrypted binary and the encrypted JSON keyset, and for each language
+and operation the latency and the throughput in keys per second.
+"""
+
+import functools
+from typing import List
+
+from absl import flags
+from absl.testing import absltest
+from tink import aead
+from tink import daead
+from tink import mac
+from tink import signature
+
+from tink.testing import keyset_builder
+from cross_language.util import benchmark_util
+from cross_language.util import testing_servers
+
+_WARMUP = flags.DEFINE_integer(
+    'warmup', 1,
+    'Minimum number of unrecorded calls before each measurement.')
+_REPETITIONS = flags.DEFINE_integer(
+    'repetitions', 5,
+    'Minimum number of recorded calls for each measurement.')
+_KEYSET_SIZES = flags.DEFINE_list(
+    'keyset_sizes', ['1', '10', '100', '1000', '10000'],
+    'Number of keys in the measured keysets. Large keysets may exceed the '
+    'default gRPC message size limit of some servers.')
+
+# The key templates used to build the keysets, in round robin order.
+_MIXED_TEMPLATES = [
+    aead.aead_key_templates.AES128_GCM,
+    mac.mac_key_templates.HMAC_SHA256_256BITTAG,
+    daead.deterministic_aead_key_templates.AES256_SIV,
+    signature.signature_key_templates.ED25519,
+    aead.aead_key_templates.AES256_CTR_HMAC_SHA256,
+]
+
+_ASSOCIATED_DATA = b'keyset_serialization_benchmark'
+
+
+def _sampling() -> benchmark_util.Sampling:
+  return benchmark_util.Sampling(min_warmup=_WARMUP.value,
+                                 min_repetitions=_REPETITIONS.value)
+
+
+def setUpModule():
+  aead.register()
+  daead.register()
+  mac.register()
+  signature.register()
+  testing_servers.start('keyset_serialization_benchmark')
+
+
+def tearDownModule():
+  testing_servers.stop()
+
+
+def _mixed_keyset(num_keys: int) -> bytes:
+  """Returns a keyset with num_keys keys of the types in _MIXED_TEMPLATES."""
+  builder = keyset_builder.new_keyset_builder()
+  primary_key_id = None
+  for i in range(num_keys):
+    key_id = builder.add_new_key(_MIXED_TEMPLATES[i % len(_MIXED_TEMPLATES)])
+    if primary_key_id is None:
+      primary_key_id = key_id
+  builder.set_primary_key(primary_key_id)
+  return builder.keyset()
+
+
+def _keyset_sizes() -> List[int]:
+  return [int(size) for size in _KEYSET_SIZES.value]
+
+
+class KeysetSerializationBenchmark(absltest.TestCase):
+
+  def test_serialization(self):
+    report = benchmark_util.Report('keyset_serialization_benchmark')
+    master_builder = keyset_builder.new_keyset_builder()
+    master_builder.set_primary_key(
+        master_builder.add_new_key(aead.aead_key_templates.AES128_GCM))
+    master_keyset = master_builder.keyset()
+    for num_keys in _keyset_sizes():
+      keyset = _mixed_keyset(num_keys)
+      for lang in testing_servers.LANGUAGES:
+        json_keyset = testing_servers.keyset_to_json(lang, keyset)
+        encrypted = {}
+        for reader_type, writer_type in (
+            testing_servers.KEYSET_READER_WRITER_TYPES):
+          encrypted[reader_type] = testing_servers.keyset_write_encrypted(
+              lang, keyset, master_keyset, _ASSOCIATED_DATA, writer_type)
+        report.add(
+            lang=lang, num_keys=num_keys, operation='Sizes',
+            binary_bytes=len(keyset),
+            json_bytes=len(json_keyset.encode('utf-8')),
+            encrypted_binary_bytes=len(encrypted['KEYSET_READER_BINARY']),
+            encrypted_json_bytes=len(encrypted['KEYSET_READER_JSON']))
+
+        operations = {
+            'ToJson': functools.partial(
+                testing_servers.keyset_to_json, lang, keyset),
+            'FromJson': functools.partial(
+                testing_servers.keyset_from_json, lang, json_keyset),
+        }
+        for reader_type, writer_type in (
+            testing_servers.KEYSET_READER_WRITER_TYPES):
+          operations['WriteEncrypted/' + writer_type] = functools.partial(
+              testing_servers.keyset_write_encrypted, lang, keyset,
+              master_keyset, _ASSOCIATED_DATA, writer_type)
+          operations['ReadEncrypted/' + reader_type] = functools.partial(
+              testing_servers.keyset_read_encrypted, lang,
+              encrypted[reader_type], master_keyset, _ASSOCIATED_DATA,
+              reader_type)
+        for operation, fn in operations.items():
+          latency = benchmark_util.measure_steady(fn, _sampling())
+          report.add(
+              lang=lang, num_keys=num_keys, operation=operation,
+              latency=latency,
+              keys_per_second=num_keys / (latency.median_ns / 1e9))
+    report.write(testing_servers.tink_versions())
+
+
+if __name__ == '__main__':
+  absltest.main()
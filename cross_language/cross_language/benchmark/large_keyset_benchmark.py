@@ -0,0 +1,220 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks primitives created from keysets with many rotated keys.
+
+Production keysets accumulate many keys. To decrypt or verify with a key which
+is not the primary key, the primitive wrappers look up the key by its output
+prefix, and have to try every enabled RAW key one by one. This benchmark builds
+AEAD and MAC keysets with a growing number of keys, mixing TINK, LEGACY and RAW
+output prefixes and enabled and disabled keys, and measures per language:
+
+  * the latency of creating the primitive,
+  * the latency of decrypting or verifying with the primary key, with the
+    oldest TINK key, with the oldest and the newest RAW key,
+  * the latency of rejecting an invalid ciphertext or tag, which has to try
+    all RAW keys.
+
+Implementations which scan all keys linearly show a latency which grows with
+the number of keys.
+"""
+
+import functools
+from typing import Any, Callable, Dict, List, Tuple
+
+from absl import flags
+from absl.testing import absltest
+import tink
+from tink import aead
+from tink import mac
+
+from tink.proto import tink_pb2
+from tink.testing import keyset_builder
+from cross_language.util import benchmark_util
+from cross_language.util import testing_servers
+
+_WARMUP = flags.DEFINE_integer(
+    'warmup', 2,
+    'Minimum number of unrecorded calls before each measurement.')
+_REPETITIONS = flags.DEFINE_integer(
+    'repetitions', 10,
+    'Minimum number of recorded calls for each measurement.')
+_KEYSET_SIZES = flags.DEFINE_list(
+    'keyset_sizes', ['1', '10', '100', '1000', '10000'],
+    'Number of keys in the measured keysets.')
+
+# Output prefix types of the keys, in round robin order.
+_OUTPUT_PREFIX_TYPES = [tink_pb2.TINK, tink_pb2.LEGACY, tink_pb2.RAW]
+# Every _DISABLED_KEY_PERIOD-th key is disabled.
+_DISABLED_KEY_PERIOD = 7
+
+_PLAINTEXT = b'large keyset benchmark plaintext'
+_ASSOCIATED_DATA = b'large keyset benchmark associated data'
+
+
+def _sampling() -> benchmark_util.Sampling:
+  return benchmark_util.Sampling(min_warmup=_WARMUP.value,
+                                 min_repetitions=_REPETITIONS.value)
+
+
+def setUpModule():
+  aead.register()
+  mac.register()
+  testing_servers.start('large_keyset_benchmark')
+
+
+def tearDownModule():
+  testing_servers.stop()
+
+
+def _rotated_keyset(template: tink_pb2.KeyTemplate,
+                    num_keys: int) -> Tuple[bytes, Dict[str, int]]:
+  """Builds a keyset with num_keys keys, in the order they were rotated in.
+
+  The newest key is the primary and always enabled and of type TINK.
+
+  Args:
+    template: The template used for all keys. Its output prefix is replaced.
+    num_keys: The number of keys in the keyset.
+
+  Returns:
+    The serialized keyset and a map from target name to the ID of the key
+    that target refers to. Targets which do not exist in small keysets are
+    omitted.
+  """
+  builder = keyset_builder.new_keyset_builder()
+  targets = {}
+  for i in range(num_keys):
+    key_template = tink_pb2.KeyTemplate()
+    key_template.CopyFrom(template)
+    is_primary = i == num_keys - 1
+    if is_primary:
+      key_template.output_prefix_type = tink_pb2.TINK
+    else:
+      key_template.output_prefix_type = _OUTPUT_PREFIX_TYPES[
+          i % len(_OUTPUT_PREFIX_TYPES)]
+    key_id = builder.add_new_key(key_template)
+    if not is_primary and i % _DISABLED_KEY_PERIOD == _DISABLED_KEY_PERIOD - 1:
+      builder.disable_key(key_id)
+      continue
+    if key_template.output_prefix_type == tink_pb2.TINK:
+      targets.setdefault('oldest_tink', key_id)
+    if key_template.output_prefix_type == tink_pb2.RAW:
+      targets.setdefault('oldest_raw', key_id)
+      targets['newest_raw'] = key_id
+    if is_primary:
+      targets['primary'] = key_id
+      builder.set_primary_key(key_id)
+  return builder.keyset(), targets
+
+
+def _single_key_keyset(keyset: bytes, key_id: int) -> bytes:
+  """Returns a keyset which only contains the key with key_id as primary."""
+  keyset_proto = tink_pb2.Keyset.FromString(keyset)
+  single_key_keyset = tink_pb2.Keyset(primary_key_id=key_id)
+  for key in keyset_proto.key:
+    if key.key_id == key_id:
+      single_key_keyset.key.append(key)
+  return single_key_keyset.SerializeToString()
+
+
+def _local_primitive(keyset: bytes, primitive_class: Any) -> Any:
+  return tink.proto_keyset_format.parse(
+      keyset, tink.secret_key_access.TOKEN).primitive(primitive_class)
+
+
+def _expect_failure(fn: Callable[[], Any]) -> None:
+  try:
+    fn()
+  except tink.TinkError:
+    return
+  raise AssertionError('expected a TinkError')
+
+
+def _keyset_sizes() -> List[int]:
+  return [int(size) for size in _KEYSET_SIZES.value]
+
+
+class LargeKeysetBenchmark(absltest.TestCase):
+
+  def _measure(self, fn: Callable[[], Any]) -> benchmark_util.LatencyStats:
+    return benchmark_util.measure_steady(fn, _sampling())
+
+  def test_aead(self):
+    report = benchmark_util.Report('large_keyset_benchmark_aead')
+    for num_keys in _keyset_sizes():
+      keyset, targets = _rotated_keyset(aead.aead_key_templates.AES128_GCM,
+                                        num_keys)
+      ciphertexts = {
+          target: _local_primitive(_single_key_keyset(keyset, key_id),
+                                   aead.Aead).encrypt(_PLAINTEXT,
+                                                      _ASSOCIATED_DATA)
+          for target, key_id in targets.items()
+      }
+      for lang in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['aead']:
+        report.add(
+            lang=lang, num_keys=num_keys, operation='Create',
+            latency=self._measure(functools.partial(
+                testing_servers.remote_primitive, lang, keyset, aead.Aead)))
+        p = testing_servers.remote_primitive(lang, keyset, aead.Aead)
+        for target, ciphertext in ciphertexts.items():
+          self.assertEqual(p.decrypt(ciphertext, _ASSOCIATED_DATA), _PLAINTEXT)
+          report.add(
+              lang=lang, num_keys=num_keys, operation='Decrypt',
+              target=target,
+              latency=self._measure(functools.partial(
+                  p.decrypt, ciphertext, _ASSOCIATED_DATA)))
+        invalid_ciphertext = b'\x00' * len(ciphertexts['primary'])
+        report.add(
+            lang=lang, num_keys=num_keys, operation='Decrypt',
+            target='invalid',
+            latency=self._measure(functools.partial(
+                _expect_failure, functools.partial(
+                    p.decrypt, invalid_ciphertext, _ASSOCIATED_DATA))))
+    report.write(testing_servers.tink_versions())
+
+  def test_mac(self):
+    report = benchmark_util.Report('large_keyset_benchmark_mac')
+    for num_keys in _keyset_sizes():
+      keyset, targets = _rotated_keyset(
+          mac.mac_key_templates.HMAC_SHA256_128BITTAG, num_keys)
+      tags = {
+          target: _local_primitive(_single_key_keyset(keyset, key_id),
+                                   mac.Mac).compute_mac(_PLAINTEXT)
+          for target, key_id in targets.items()
+      }
+      for lang in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['mac']:
+        report.add(
+            lang=lang, num_keys=num_keys, operation='Create',
+            latency=self._measure(functools.partial(
+                testing_servers.remote_primitive, lang, keyset, mac.Mac)))
+        p = testing_servers.remote_primitive(lang, keyset, mac.Mac)
+        for target, tag in tags.items():
+          p.verify_mac(tag, _PLAINTEXT)
+          report.add(
+              lang=lang, num_keys=num_keys, operation='VerifyMac',
+              target=target,
+              latency=self._measure(functools.partial(
+                  p.verify_mac, tag, _PLAINTEXT)))
+        invalid_tag = b'\x00' * len(tags['primary'])
+        report.add(
+            lang=lang, num_keys=num_keys, operation='VerifyMac',
+            target='invalid',
+            latency=self._measure(functools.partial(
+                _expect_failure, functools.partial(
+                    p.verify_mac, invalid_tag, _PLAINTEXT))))
+    report.write(testing_servers.tink_versions())
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,158 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the overhead of monitoring keysets with annotations.
+
+Keysets with annotations are monitored by the servers: the primitive wrappers
+report every use of a key to the monitoring client of the server. Each
+workload is measured once with a keyset without annotations and once with the
+same keyset with annotations, in every language.
+
+The Python server counts key uses in an in-process monitoring client. The
+other servers do not register a monitoring client, so there the overhead is
+that of handling the annotations in the wrappers.
+
+A single operation is much faster than an RPC, so the deterministic AEAD,
+MAC and signature workloads run many operations per RPC on inputs which the
+server generates, see generated_inputs. Servers which do not generate inputs
+get one RPC per operation. AEAD encryption, for which no such RPC exists, is
+measured with one RPC per operation.
+
+For each language and operation, the report contains both latencies, and the
+overhead per operation in nanoseconds and in percent of the median latency.
+"""
+
+import dataclasses
+import time
+
+from absl import flags
+from absl.testing import absltest
+from tink import aead
+from tink import daead
+from tink import mac
+from tink import signature
+
+from tink.testing import keyset_builder
+from cross_language.util import benchmark_util
+from cross_language.util import testing_servers
+
+_WARMUP = flags.DEFINE_integer(
+    'warmup', 5,
+    'Minimum number of unrecorded calls before each measurement.')
+_REPETITIONS = flags.DEFINE_integer(
+    'repetitions', 50, 'Number of recorded calls for each measurement.')
+_OPERATIONS_PER_CALL = flags.DEFINE_integer(
+    'operations_per_call', 1000,
+    'Number of operations per call for the workloads on generated inputs.')
+_INPUT_SIZE = flags.DEFINE_integer(
+    'input_size', 64, 'Size in bytes of each plaintext or message.')
+
+_ANNOTATIONS = {'benchmark': 'monitoring_benchmark'}
+_ASSOCIATED_DATA = b'monitoring_benchmark'
+_SEED = b'monitoring_benchmark'
+
+
+def setUpModule():
+  aead.register()
+  daead.register()
+  mac.register()
+  signature.register()
+  testing_servers.start('monitoring_benchmark')
+
+
+def tearDownModule():
+  testing_servers.stop()
+
+
+def _keyset(template) -> bytes:
+  builder = keyset_builder.new_keyset_builder()
+  builder.set_primary_key(builder.add_new_key(template))
+  return builder.keyset()
+
+
+class MonitoringBenchmark(absltest.TestCase):
+
+  def _measure(self, report, lang, operation, operations_per_call, keyset,
+               primitive_class, call):
+    """Measures call(p) for p without and with annotations.
+
+    The calls with and without annotations alternate, so that both are
+    affected alike by changes in the load of the machine.
+    """
+    primitives = {
+        monitored: testing_servers.remote_primitive(lang, keyset,
+                                                    primitive_class,
+                                                    annotations)
+        for monitored, annotations in ((False, None), (True, _ANNOTATIONS))
+    }
+    # Each warm-up call calls both primitives.
+    warmup_calls, steady = benchmark_util.warm_up(
+        lambda: [call(p) for p in primitives.values()],
+        benchmark_util.Sampling(min_warmup=_WARMUP.value))
+    samples = {False: [], True: []}
+    for _ in range(_REPETITIONS.value):
+      for monitored, p in primitives.items():
+        start = time.perf_counter_ns()
+        call(p)
+        samples[monitored].append(time.perf_counter_ns() - start)
+    latencies = {
+        monitored: dataclasses.replace(
+            benchmark_util.summarize(samples[monitored]),
+            warmup_calls=warmup_calls, steady=steady)
+        for monitored in samples
+    }
+    overhead_ns = latencies[True].median_ns - latencies[False].median_ns
+    report.add(
+        lang=lang,
+        operation=operation,
+        operations_per_call=operations_per_call,
+        latency_without_annotations=latencies[False],
+        latency_with_annotations=latencies[True],
+        overhead_ns_per_operation=overhead_ns / operations_per_call,
+        overhead_percent=100 * overhead_ns / latencies[False].median_ns)
+
+  def test_monitoring_overhead(self):
+    report = benchmark_util.Report('monitoring_benchmark')
+    plaintext = bytes(_INPUT_SIZE.value)
+    n = _OPERATIONS_PER_CALL.value
+    sizes = [_INPUT_SIZE.value] * n
+    # The primitive name, operation, operations per call, keyset, primitive
+    # class and call of each workload.
+    workloads = [
+        ('aead', 'Aead.Encrypt', 1,
+         _keyset(aead.aead_key_templates.AES128_GCM), aead.Aead,
+         lambda p: p.encrypt(plaintext, _ASSOCIATED_DATA)),
+        ('daead', 'DeterministicAead.EncryptDeterministically', n,
+         _keyset(daead.deterministic_aead_key_templates.AES256_SIV),
+         daead.DeterministicAead,
+         lambda p: p.encrypt_deterministically_generated(
+             _SEED, sizes, _ASSOCIATED_DATA)),
+        ('mac', 'Mac.ComputeMac', n,
+         _keyset(mac.mac_key_templates.HMAC_SHA256_256BITTAG), mac.Mac,
+         lambda p: p.compute_mac_generated(_SEED, sizes)),
+        ('signature', 'PublicKeySign.Sign', n,
+         _keyset(signature.signature_key_templates.ED25519),
+         signature.PublicKeySign,
+         lambda p: p.sign_generated(_SEED, sizes)),
+    ]
+    for lang in testing_servers.LANGUAGES:
+      for (primitive, operation, operations_per_call, keyset, primitive_class,
+           call) in workloads:
+        if lang in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE[primitive]:
+          self._measure(report, lang, operation, operations_per_call, keyset,
+                        primitive_class, call)
+    report.write(testing_servers.tink_versions())
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,159 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Soak test which looks for leaks and degradation of long-running servers.
+
+Each server gets a mixed workload of all --primitives with their default
+templates of load_generator, in a closed loop of --concurrency requests, for
+--duration_minutes. Every --sample_seconds, the RSS of each server is sampled,
+and its latencies are summarized in a window of the same length. After
+--warmup_minutes, lines are fitted to the RSS and the p50 and p99 latencies of
+each server, see soak. The test fails if a trend exceeds --thresholds or if a
+request fails.
+
+The report contains one row per server and window, with the throughput, the
+latency percentiles and the RSS, and one row per server with the trends.
+
+The requests to all servers are sent from this process, so the latencies
+include the time the requests wait for the Python interpreter. This affects
+all samples alike and hence not the trends.
+
+Runs longer than the Bazel timeout 'eternal' of one hour need a larger
+--test_timeout, for example
+  bazel test //cross_language/benchmark:soak_benchmark --test_timeout=15000 \\
+      --test_arg=--duration_minutes=240
+"""
+
+import threading
+import time
+
+from absl import flags
+from absl.testing import absltest
+
+from cross_language.util import benchmark_util
+from cross_language.util import load_generator
+from cross_language.util import resource_sampler
+from cross_language.util import soak
+from cross_language.util import testing_servers
+
+_DURATION_MINUTES = flags.DEFINE_float('duration_minutes', 50.0,
+                                       'Duration of the load.')
+_WARMUP_MINUTES = flags.DEFINE_float(
+    'warmup_minutes', 5.0, 'Duration at the start which is not fitted.')
+_SAMPLE_SECONDS = flags.DEFINE_float(
+    'sample_seconds', 30.0, 'Interval between the samples of each server.')
+_CONCURRENCY = flags.DEFINE_integer(
+    'concurrency', 2, 'Number of concurrent requests to each server.')
+_PRIMITIVES = flags.DEFINE_multi_enum(
+    'primitives', list(load_generator.DEFAULT_TEMPLATES),
+    list(load_generator.DEFAULT_TEMPLATES), 'Primitives of the workload.')
+_PAYLOAD_SIZES = flags.DEFINE_list(
+    'payload_sizes', ['64:9', '4096:1'],
+    'Sizes of the payloads with optional weights, see load_generator.')
+_READ_FRACTION = flags.DEFINE_float(
+    'read_fraction', 0.5, 'Fraction of requests which decrypt or verify.')
+_THRESHOLDS = flags.DEFINE_string(
+    'thresholds', 'rss_mb_per_hour=64,latency_drift_percent=50',
+    'Thresholds of the trends, see soak.SoakThresholds.')
+
+
+def setUpModule():
+  testing_servers.start('soak_benchmark')
+
+
+def tearDownModule():
+  testing_servers.stop()
+
+
+def _workload(lang: str) -> load_generator.MixedWorkload:
+  payload_sizes = load_generator.parse_payload_sizes(_PAYLOAD_SIZES.value)
+  workloads = []
+  for primitive in _PRIMITIVES.value:
+    if lang not in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE[primitive]:
+      continue
+    keyset = testing_servers.new_keyset(
+        lang,
+        testing_servers.key_template(
+            lang, load_generator.DEFAULT_TEMPLATES[primitive]))
+    write, read = load_generator.operations(lang,
+                                            testing_servers.channel(lang),
+                                            primitive, keyset)
+    workloads.append(
+        load_generator.Workload(write, read, payload_sizes,
+                                _READ_FRACTION.value))
+  return load_generator.MixedWorkload(workloads)
+
+
+class SoakBenchmark(absltest.TestCase):
+
+  def test_soak(self):
+    thresholds = soak.SoakThresholds.parse(_THRESHOLDS.value)
+    sample_seconds = _SAMPLE_SECONDS.value
+    workloads = {lang: _workload(lang) for lang in testing_servers.LANGUAGES}
+    recorders = {}
+    rss_samples = {lang: [] for lang in testing_servers.LANGUAGES}
+
+    def run(lang):
+      recorders[lang] = load_generator.run_closed_loop(
+          workloads[lang], _CONCURRENCY.value, _DURATION_MINUTES.value * 60,
+          sample_seconds)
+
+    threads = [
+        threading.Thread(target=run, args=(lang,))
+        for lang in testing_servers.LANGUAGES
+    ]
+    start = time.monotonic()
+    for thread in threads:
+      thread.start()
+    samples = 0
+    while any(thread.is_alive() for thread in threads):
+      samples += 1
+      time.sleep(max(0.0, start + samples * sample_seconds - time.monotonic()))
+      elapsed = time.monotonic() - start
+      for lang in testing_servers.LANGUAGES:
+        sample = resource_sampler.read_sample(testing_servers.server_pid(lang))
+        if sample is not None:
+          rss_samples[lang].append((elapsed, sample.rss_bytes))
+    for thread in threads:
+      thread.join()
+
+    report = benchmark_util.Report('soak_benchmark')
+    failures = []
+    for lang in testing_servers.LANGUAGES:
+      windows = recorders[lang].windows()
+      for i, window in enumerate(windows):
+        # The i-th RSS sample is taken at the end of the i-th window.
+        rss_bytes = (
+            rss_samples[lang][i][1] if i < len(rss_samples[lang]) else None)
+        report.add(lang=lang, kind='window', rss_bytes=rss_bytes, **window)
+      server_trends = soak.trends(rss_samples[lang], windows,
+                                  _WARMUP_MINUTES.value * 60)
+      trend_fields = {}
+      for name, trend in server_trends.items():
+        trend_fields[name + '_slope_per_hour'] = trend.slope_per_hour
+        trend_fields[name + '_drift_percent'] = trend.drift_percent
+      report.add(lang=lang, kind='trend', **trend_fields)
+      failures.extend(
+          '%s: %s' % (lang, violation)
+          for violation in thresholds.violations(server_trends))
+      total = recorders[lang].total()
+      if total['errors']:
+        failures.append('%s: %d of %d requests failed' %
+                        (lang, total['errors'], total['requests']))
+    report.write(testing_servers.tink_versions())
+    if failures:
+      self.fail('\n'.join(failures))
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,135 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests whether rejecting tags and signatures leaks timing information.
+
+For AEAD decryption, MAC verification and signature verification, the two
+classes of inputs are a tag or signature which is wrong in its first byte and
+one which is wrong in its last byte. If the comparison of tags stops at the
+first wrong byte, the first class is faster. Valid inputs are not used, because
+they always take a different code path than invalid ones.
+Signature verification only processes public data, so a difference there
+depends on the signature and is not necessarily a vulnerability.
+
+The report contains, for each language and operation, the largest t statistic
+of timing_leakage.measure_leakage, its absolute value and the verdict of
+dudect. benchmark_history compares the absolute value and the verdict.
+
+Only the Python server implements the Timing service so far, so only Python is
+measured, and the compiled implementations in C++, Go and Java are not covered.
+A server in _TIMING_LANGUAGES without the Timing service fails the benchmark.
+"""
+
+import functools
+
+from absl import flags
+from absl.testing import absltest
+from tink import aead
+from tink import mac
+from tink import signature
+
+from tink.testing import keyset_builder
+from protos import testing_api_pb2
+from cross_language.util import benchmark_util
+from cross_language.util import testing_servers
+from cross_language.util import timing_leakage
+
+_SAMPLES = flags.DEFINE_integer(
+    'samples', 1_000_000, 'Number of measurements per language and operation.')
+_BATCH_SIZE = flags.DEFINE_integer(
+    'batch_size', 100_000, 'Number of measurements per Measure RPC.')
+
+_DATA = b'timing_leakage_benchmark'
+
+# The languages whose server implements the Timing service.
+_TIMING_LANGUAGES = ('python',)
+
+
+def setUpModule():
+  aead.register()
+  mac.register()
+  signature.register()
+  testing_servers.start('timing_leakage_benchmark', languages=_TIMING_LANGUAGES)
+
+
+def tearDownModule():
+  testing_servers.stop()
+
+
+def _keyset(template) -> bytes:
+  builder = keyset_builder.new_keyset_builder()
+  builder.set_primary_key(builder.add_new_key(template))
+  return builder.keyset()
+
+
+def _flip(value: bytes, index: int) -> bytes:
+  changed = bytearray(value)
+  changed[index] ^= 1
+  return bytes(changed)
+
+
+def _wrong_first_and_last_byte(value: bytes, start: int):
+  """Returns value with a wrong byte at start, and at its end."""
+  return [_flip(value, start), _flip(value, len(value) - 1)]
+
+
+class TimingLeakageBenchmark(absltest.TestCase):
+
+  def _measure(self, report, lang, operation, keyset, inputs):
+    measure = functools.partial(testing_servers.measure_timing, lang,
+                                operation, keyset, inputs, _DATA)
+    result = timing_leakage.measure_leakage(
+        measure, samples=_SAMPLES.value, batch_size=_BATCH_SIZE.value)
+    report.add(
+        lang=lang,
+        operation=testing_api_pb2.TimingRequest.Operation.Name(operation),
+        samples=result.samples,
+        max_t=result.max_t,
+        abs_max_t=abs(result.max_t),
+        verdict=result.verdict,
+        mean_ns_wrong_first_byte=result.mean_ns[0],
+        mean_ns_wrong_last_byte=result.mean_ns[1])
+
+  def test_timing_leakage(self):
+    report = benchmark_util.Report('timing_leakage_benchmark')
+    aead_keyset = _keyset(aead.aead_key_templates.AES128_GCM)
+    mac_keyset = _keyset(mac.mac_key_templates.HMAC_SHA256_256BITTAG)
+    private_keyset = _keyset(signature.signature_key_templates.ED25519)
+    for lang in _TIMING_LANGUAGES:
+      if lang in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['aead']:
+        ciphertext = testing_servers.remote_primitive(
+            lang, aead_keyset, aead.Aead).encrypt(b'plaintext', _DATA)
+        # The tag is in the last 16 bytes.
+        self._measure(report, lang, testing_api_pb2.TimingRequest.AEAD_DECRYPT,
+                      aead_keyset,
+                      _wrong_first_and_last_byte(ciphertext,
+                                                 len(ciphertext) - 16))
+      if lang in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['mac']:
+        mac_value = testing_servers.remote_primitive(
+            lang, mac_keyset, mac.Mac).compute_mac(_DATA)
+        # The first 5 bytes are the output prefix.
+        self._measure(report, lang, testing_api_pb2.TimingRequest.MAC_VERIFY,
+                      mac_keyset, _wrong_first_and_last_byte(mac_value, 5))
+      if lang in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE[
+          'signature']:
+        signature_value = testing_servers.remote_primitive(
+            lang, private_keyset, signature.PublicKeySign).sign(_DATA)
+        self._measure(report, lang,
+                      testing_api_pb2.TimingRequest.SIGNATURE_VERIFY,
+                      testing_servers.public_keyset(lang, private_keyset),
+                      _wrong_first_and_last_byte(signature_value, 5))
+    report.write(testing_servers.tink_versions())
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,96 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compares the RPC latency of the TCP and the Unix domain socket transports.
+
+For each transport in testing_servers.TRANSPORTS, the servers are started and
+the report contains, for each language, the latency of a ToJson RPC of a small
+keyset, which does almost no work in the server, and of AEAD encryptions of
+plaintexts of growing size.
+"""
+
+import functools
+
+from absl import flags
+from absl.testing import absltest
+from tink import aead
+
+from tink.testing import keyset_builder
+from cross_language.util import benchmark_util
+from cross_language.util import testing_servers
+
+_WARMUP = flags.DEFINE_integer(
+    'warmup', 10,
+    'Minimum number of unrecorded calls before each measurement.')
+_REPETITIONS = flags.DEFINE_integer(
+    'repetitions', 200,
+    'Minimum number of recorded calls for each measurement.')
+_TRANSPORTS = flags.DEFINE_list(
+    'transports', list(testing_servers.TRANSPORTS),
+    'The transports to compare.')
+
+_PLAINTEXT_SIZES = [64, 16 * 1024, 1024 * 1024]
+
+_ASSOCIATED_DATA = b'transport_benchmark'
+
+
+def _sampling() -> benchmark_util.Sampling:
+  return benchmark_util.Sampling(min_warmup=_WARMUP.value,
+                                 min_repetitions=_REPETITIONS.value)
+
+
+def setUpModule():
+  aead.register()
+
+
+class TransportBenchmark(absltest.TestCase):
+
+  def test_transports(self):
+    report = benchmark_util.Report('transport_benchmark')
+    builder = keyset_builder.new_keyset_builder()
+    builder.set_primary_key(
+        builder.add_new_key(aead.aead_key_templates.AES128_GCM))
+    keyset = builder.keyset()
+    tink_versions = {}
+    for transport in _TRANSPORTS.value:
+      testing_servers.start('transport_benchmark_' + transport,
+                            transport=transport)
+      try:
+        tink_versions = testing_servers.tink_versions()
+        for lang in testing_servers.LANGUAGES:
+          latency = benchmark_util.measure_steady(
+              functools.partial(testing_servers.keyset_to_json, lang, keyset),
+              _sampling())
+          report.add(
+              transport=transport, lang=lang, operation='ToJson',
+              latency=latency)
+          if lang not in testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE[
+              'aead']:
+            continue
+          primitive = testing_servers.remote_primitive(lang, keyset, aead.Aead)
+          for size in _PLAINTEXT_SIZES:
+            latency = benchmark_util.measure_steady(
+                functools.partial(primitive.encrypt, bytes(size),
+                                  _ASSOCIATED_DATA),
+                _sampling())
+            report.add(
+                transport=transport, lang=lang, operation='Encrypt',
+                plaintext_bytes=size, latency=latency,
+                megabytes_per_second=size / 1e6 / (latency.median_ns / 1e9))
+      finally:
+        testing_servers.stop()
+    report.write(tink_versions)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -24,6 +24,12 @@ from cross_language.util import utilities
 
 SUPPORTED_LANGUAGES = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['daead']
 
+# The sizes of the plaintexts which the servers generate, see generated_inputs.
+GENERATED_PLAINTEXT_SIZES = list(range(257)) + [1000, 4096, 65536]
+# The sizes used if a server does not generate the plaintexts, in which case
+# each plaintext is encrypted with one RPC.
+FALLBACK_PLAINTEXT_SIZES = [0, 1, 15, 16, 17, 31, 32, 33, 255, 256, 1000]
+
 
 def setUpModule():
   daead.register()
@@ -67,6 +73,30 @@ class DeterministicAeadTest(parameterized.TestCase):
       output = p2.decrypt_deterministically(ciphertext, associated_data)
       self.assertEqual(output, plaintext)
 
+  @parameterized.parameters(
+      utilities.tinkey_template_names_for(daead.DeterministicAead))
+  def test_encrypt_consistent_for_generated_plaintexts(self,
+                                                       key_template_name):
+    supported_langs = utilities.SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME[
+        key_template_name]
+    self.assertNotEmpty(supported_langs)
+    key_template = utilities.KEY_TEMPLATE[key_template_name]
+    keyset = testing_servers.new_keyset(supported_langs[0], key_template)
+    if all(testing_servers.generates_inputs(lang) for lang in supported_langs):
+      sizes = GENERATED_PLAINTEXT_SIZES
+    else:
+      sizes = FALLBACK_PLAINTEXT_SIZES
+    digests = {}
+    for lang in supported_langs:
+      p = testing_servers.remote_primitive(lang, keyset,
+                                           daead.DeterministicAead)
+      digests[lang] = p.encrypt_deterministically_generated(
+          key_template_name.encode('utf8'), sizes, b'associated_data')
+    self.assertLen(
+        set(digests.values()), 1,
+        'The ciphertexts for template %s differ: digests = %s' %
+        (key_template_name, digests))
+
   @parameterized.parameters(
       utilities.tinkey_template_names_for(daead.DeterministicAead))
   def test_encrypt_decrypt_without_associated_data(self, key_template_name):
@@ -13,6 +13,8 @@
 # limitations under the License.
 """Cross-language tests for Hybrid Encryption."""
 
+import functools
+import itertools
 from typing import Iterable, Tuple
 
 from absl.testing import absltest
@@ -26,9 +28,11 @@ from tink import hybrid
 from tink.proto import common_pb2
 from tink.proto import tink_pb2
 from tink.testing import keyset_builder
+from cross_language.util import coverage_planner
 from cross_language.util import test_keys
 from cross_language.util import testing_servers
 from cross_language.util import utilities
+from cross_language.util import work_scheduler
 
 SUPPORTED_LANGUAGES = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['hybrid']
 
@@ -132,11 +136,11 @@ class HybridEncryptionTest(parameterized.TestCase):
     self.assertNotEmpty(supported_langs)
     # Take the first supported language to generate the private keyset.
     private_keyset = test_keys.new_or_stored_keyset(key_template)
-    supported_decs = [
-        testing_servers.remote_primitive(lang, private_keyset,
-                                         hybrid.HybridDecrypt)
+    supported_decs = {
+        lang: testing_servers.remote_primitive(lang, private_keyset,
+                                               hybrid.HybridDecrypt)
         for lang in supported_langs
-    ]
+    }
     public_keyset = testing_servers.public_keyset(supported_langs[0],
                                                   private_keyset)
     supported_encs = {
@@ -152,9 +156,14 @@ class HybridEncryptionTest(parameterized.TestCase):
       context_info = (b'Some context info for %s using %s for encryption.' %
                       (key_template_name.encode('utf8'), lang.encode('utf8')))
       ciphertext = hybrid_encrypt.encrypt(plaintext, context_info)
-      for dec in supported_decs:
-        output = dec.decrypt(ciphertext, context_info)
-        self.assertEqual(output, plaintext)
+      results = work_scheduler.fan_out({
+          lang2: functools.partial(dec.decrypt, ciphertext, context_info)
+          for lang2, dec in supported_decs.items()
+      })
+      for lang2, result in results.items():
+        self.assertEqual(
+            result.get(), plaintext,
+            'While encrypting in %s and decrypting in %s' % (lang, lang2))
 
 
 # If the implementations work fine for keysets with single keys, then key
@@ -169,19 +178,27 @@ KEY_ROTATION_TEMPLATES = [
 ]
 
 
+# The (old_key_tmpl, new_key_tmpl) cases of the key rotation tests.
+KEY_ROTATION_CASES = list(itertools.product(KEY_ROTATION_TEMPLATES, repeat=2))
+
+
 def key_rotation_test_cases(
 ) -> Iterable[Tuple[str, str, tink_pb2.KeyTemplate, tink_pb2.KeyTemplate]]:
+  """Yields all cases, test_key_rotation skips those which are not planned."""
   for enc_lang in SUPPORTED_LANGUAGES:
     for dec_lang in SUPPORTED_LANGUAGES:
-      for old_key_tmpl in KEY_ROTATION_TEMPLATES:
-        for new_key_tmpl in KEY_ROTATION_TEMPLATES:
-          yield (enc_lang, dec_lang, old_key_tmpl, new_key_tmpl)
+      for old_key_tmpl, new_key_tmpl in KEY_ROTATION_CASES:
+        yield (enc_lang, dec_lang, old_key_tmpl, new_key_tmpl)
 
 
 class HybridEncryptionKeyRotationTest(parameterized.TestCase):
 
   @parameterized.parameters(key_rotation_test_cases())
   def test_key_rotation(self, enc_lang, dec_lang, old_key_tmpl, new_key_tmpl):
+    if not coverage_planner.is_planned(SUPPORTED_LANGUAGES, KEY_ROTATION_CASES,
+                                       enc_lang, dec_lang,
+                                       (old_key_tmpl, new_key_tmpl)):
+      self.skipTest('Not planned in this --coverage_mode')
     # Do a key rotation from an old key generated from old_key_tmpl to a new
     # key generated from new_key_tmpl. Encryption and decryption are done
     # in languages enc_lang and dec_lang.
@@ -20,6 +20,7 @@ import tink
 from cross_language import test_key
 from cross_language import tink_config
 from cross_language.jwt import jwt_hmac_keys
+from cross_language.util import coverage_planner
 from cross_language.util import testing_servers
 
 
@@ -46,34 +47,33 @@ class EvaluationConsistencyTest(absltest.TestCase):
   def test_evaluation_consistency(self):
     """Tests that tokens created in lang1 can be decoded in lang2."""
 
-    for key in jwt_mac_keys():
-      for lang1 in tink_config.all_tested_languages():
-        for lang2 in tink_config.all_tested_languages():
-          if key.supported_in(lang1) and key.supported_in(lang2):
-            with self.subTest(f'{lang1} -> {lang2}: {key}'):
-              keyset = key.as_serialized_keyset()
-              jwt_mac1 = testing_servers.remote_primitive(
-                  lang1, keyset, tink.jwt.JwtMac
-              )
-              jwt_mac2 = testing_servers.remote_primitive(
-                  lang1, keyset, tink.jwt.JwtMac
-              )
-              raw_jwt = tink.jwt.new_raw_jwt(
-                  issuer='test_issuer',
-                  custom_claims={'CustomClaim1': 'claimed'},
-                  without_expiration=True,
-              )
-              signed_token = jwt_mac1.compute_mac_and_encode(raw_jwt)
-              validator = tink.jwt.new_validator(
-                  expected_issuer='test_issuer',
-                  allow_missing_expiration=True
-              )
-              verified_jwt = jwt_mac2.verify_mac_and_decode(
-                  signed_token, validator
-              )
-              self.assertEqual(
-                  verified_jwt.custom_claim('CustomClaim1'), 'claimed'
-              )
+    for lang1, lang2, key in coverage_planner.plan(
+        tink_config.all_tested_languages(), list(jwt_mac_keys()),
+        supported=lambda lang, key: key.supported_in(lang)):
+      with self.subTest(f'{lang1} -> {lang2}: {key}'):
+        keyset = key.as_serialized_keyset()
+        jwt_mac1 = testing_servers.remote_primitive(
+            lang1, keyset, tink.jwt.JwtMac
+        )
+        jwt_mac2 = testing_servers.remote_primitive(
+            lang1, keyset, tink.jwt.JwtMac
+        )
+        raw_jwt = tink.jwt.new_raw_jwt(
+            issuer='test_issuer',
+            custom_claims={'CustomClaim1': 'claimed'},
+            without_expiration=True,
+        )
+        signed_token = jwt_mac1.compute_mac_and_encode(raw_jwt)
+        validator = tink.jwt.new_validator(
+            expected_issuer='test_issuer',
+            allow_missing_expiration=True
+        )
+        verified_jwt = jwt_mac2.verify_mac_and_decode(
+            signed_token, validator
+        )
+        self.assertEqual(
+            verified_jwt.custom_claim('CustomClaim1'), 'claimed'
+        )
 
   def test_b315970600_keys(self):
     """Tests behavior of b/315970600 keys.
@@ -22,6 +22,7 @@ from cross_language import tink_config
 from cross_language.jwt import jwt_ecdsa_keys
 from cross_language.jwt import jwt_rsa_ssa_pkcs1_keys
 from cross_language.jwt import jwt_rsa_ssa_pss_keys
+from cross_language.util import coverage_planner
 from cross_language.util import testing_servers
 
 
@@ -52,35 +53,34 @@ class EvaluationConsistencyTest(absltest.TestCase):
   def test_evaluation_consistency(self):
     """Tests that tokens created in lang1 can be decoded in lang2."""
 
-    for key in signature_private_keys():
-      for lang1 in tink_config.all_tested_languages():
-        for lang2 in tink_config.all_tested_languages():
-          if key.supported_in(lang1) and key.supported_in(lang2):
-            with self.subTest(f'{lang1} -> {lang2}: {key}'):
-              keyset = key.as_serialized_keyset()
-              jwt_public_key_sign = testing_servers.remote_primitive(
-                  lang1, keyset, tink.jwt.JwtPublicKeySign
-              )
-              public_keyset = testing_servers.public_keyset(lang2, keyset)
-              jwt_public_key_verify = testing_servers.remote_primitive(
-                  lang2, public_keyset, tink.jwt.JwtPublicKeyVerify
-              )
-              raw_jwt = tink.jwt.new_raw_jwt(
-                  issuer='test_issuer',
-                  custom_claims={'CustomClaim1': 'claimed'},
-                  without_expiration=True,
-              )
-              signed_token = jwt_public_key_sign.sign_and_encode(raw_jwt)
-              validator = tink.jwt.new_validator(
-                  expected_issuer='test_issuer',
-                  allow_missing_expiration=True
-              )
-              verified_jwt = jwt_public_key_verify.verify_and_decode(
-                  signed_token, validator
-              )
-              self.assertEqual(
-                  verified_jwt.custom_claim('CustomClaim1'), 'claimed'
-              )
+    for lang1, lang2, key in coverage_planner.plan(
+        tink_config.all_tested_languages(), list(signature_private_keys()),
+        supported=lambda lang, key: key.supported_in(lang)):
+      with self.subTest(f'{lang1} -> {lang2}: {key}'):
+        keyset = key.as_serialized_keyset()
+        jwt_public_key_sign = testing_servers.remote_primitive(
+            lang1, keyset, tink.jwt.JwtPublicKeySign
+        )
+        public_keyset = testing_servers.public_keyset(lang2, keyset)
+        jwt_public_key_verify = testing_servers.remote_primitive(
+            lang2, public_keyset, tink.jwt.JwtPublicKeyVerify
+        )
+        raw_jwt = tink.jwt.new_raw_jwt(
+            issuer='test_issuer',
+            custom_claims={'CustomClaim1': 'claimed'},
+            without_expiration=True,
+        )
+        signed_token = jwt_public_key_sign.sign_and_encode(raw_jwt)
+        validator = tink.jwt.new_validator(
+            expected_issuer='test_issuer',
+            allow_missing_expiration=True
+        )
+        verified_jwt = jwt_public_key_verify.verify_and_decode(
+            signed_token, validator
+        )
+        self.assertEqual(
+            verified_jwt.custom_claim('CustomClaim1'), 'claimed'
+        )
 
 
 if __name__ == '__main__':
@@ -13,8 +13,10 @@
 # limitations under the License.
 """Tests that keys are consistently accepted or rejected in all languages."""
 
+import collections
+import functools
 import itertools
-from typing import Iterable, Tuple
+from typing import Dict, Iterable, List, Tuple, Union
 
 from absl import logging
 from absl.testing import absltest
@@ -34,6 +36,7 @@ from tink.proto import jwt_hmac_pb2
 from tink.proto import tink_pb2
 from cross_language import tink_config
 from cross_language.util import testing_servers
+from cross_language.util import work_scheduler
 
 # Test cases that succeed in a language but should fail
 SUCCEEDS_BUT_SHOULD_FAIL = [
@@ -356,6 +359,35 @@ def rsa_ssa_pss_test_cases() -> TestCasesType:
                public_exponent))
 
 
+def all_test_cases() -> Iterable[Tuple[str, tink_pb2.KeyTemplate]]:
+  return itertools.chain(aes_eax_test_cases(),
+                         aes_gcm_test_cases(),
+                         aes_gcm_siv_test_cases(),
+                         aes_ctr_hmac_aead_test_cases(),
+                         hmac_test_cases(),
+                         jwt_hmac_test_cases(),
+                         aes_cmac_test_cases(),
+                         aes_cmac_prf_test_cases(),
+                         hmac_prf_test_cases(),
+                         hkdf_prf_test_cases(),
+                         aes_siv_test_cases(),
+                         ecies_aead_hkdf_test_cases(),
+                         ecdsa_test_cases(),
+                         rsa_ssa_pkcs1_test_cases(),
+                         rsa_ssa_pss_test_cases())
+
+
+# The result of the key generation of each (lang, serialized template). These
+# are generated in setUpModule with a few GenerateMany RPCs per language and
+# key type, instead of one Generate RPC per test case and language.
+_generated_keysets: Dict[Tuple[str, bytes], Union[bytes, tink.TinkError]] = {}
+
+
+def _supported_languages(template: tink_pb2.KeyTemplate) -> List[str]:
+  return tink_config.supported_languages_for_key_type(
+      tink_config.key_type_from_type_url(template.type_url))
+
+
 def setUpModule():
   aead.register()
   daead.register()
@@ -364,6 +396,30 @@ def setUpModule():
   signature.register()
   testing_servers.start('key_generation_consistency')
 
+  # One work item per language and key type, so that the slow key types are
+  # generated first and all languages concurrently.
+  templates_by_lang_and_key_type = collections.defaultdict(list)
+  for _, template in all_test_cases():
+    key_type = tink_config.key_type_from_type_url(template.type_url)
+    for lang in _supported_languages(template):
+      templates_by_lang_and_key_type[(lang, key_type)].append(template)
+  items = [
+      work_scheduler.WorkItem(
+          lang=lang,
+          key_type=key_type,
+          operation='Generate',
+          fn=functools.partial(testing_servers.new_keysets, lang, templates),
+          units=len(templates))
+      for (lang, key_type), templates in templates_by_lang_and_key_type.items()
+  ]
+  for item, templates, result in zip(
+      items, templates_by_lang_and_key_type.values(),
+      work_scheduler.run(items)):
+    if result.error is not None:
+      raise result.error
+    for template, keyset in zip(templates, result.value):
+      _generated_keysets[(item.lang, template.SerializeToString())] = keyset
+
 
 def tearDownModule():
   testing_servers.stop()
@@ -371,30 +427,16 @@ def tearDownModule():
 
 class KeyGenerationConsistencyTest(parameterized.TestCase):
 
-  @parameterized.parameters(
-      itertools.chain(aes_eax_test_cases(),
-                      aes_gcm_test_cases(),
-                      aes_gcm_siv_test_cases(),
-                      aes_ctr_hmac_aead_test_cases(),
-                      hmac_test_cases(),
-                      jwt_hmac_test_cases(),
-                      aes_cmac_test_cases(),
-                      aes_cmac_prf_test_cases(),
-                      hmac_prf_test_cases(),
-                      hkdf_prf_test_cases(),
-                      aes_siv_test_cases(),
-                      ecies_aead_hkdf_test_cases(),
-                      ecdsa_test_cases(),
-                      rsa_ssa_pkcs1_test_cases(),
-                      rsa_ssa_pss_test_cases()))
+  @parameterized.parameters(all_test_cases())
   def test_key_generation_consistency(self, name, template):
-    supported_langs = tink_config.supported_languages_for_key_type(
-        tink_config.key_type_from_type_url(template.type_url))
+    supported_langs = _supported_languages(template)
     failures = 0
     results = {}
     for lang in supported_langs:
       try:
-        _ = testing_servers.new_keyset(lang, template)
+        result = _generated_keysets[(lang, template.SerializeToString())]
+        if isinstance(result, tink.TinkError):
+          raise result
         if (name, lang) in SUCCEEDS_BUT_SHOULD_FAIL:
           failures += 1
         if (name, lang) in FAILS_BUT_SHOULD_SUCCEED:
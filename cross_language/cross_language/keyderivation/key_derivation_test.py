@@ -76,7 +76,7 @@ NOT_YET_SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME = {
 
 
 def setUpModule():
-  testing_servers.start('key_derivation')
+  testing_servers.start('key_derivation', languages=SUPPORTED_LANGUAGES)
   aead.register()
 
 
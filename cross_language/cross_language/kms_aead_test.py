@@ -116,7 +116,10 @@ _SUPPORTED_LANGUAGES_FOR_KMS_AEAD = {
 
 def setUpModule():
   aead.register()
-  testing_servers.start('aead')
+  # Other servers are only started if a test uses them.
+  testing_servers.start('aead', languages=sorted(set().union(
+      *_SUPPORTED_LANGUAGES_FOR_KMS_AEAD.values(),
+      *_SUPPORTED_LANGUAGES_FOR_KMS_ENVELOPE_AEAD.values())))
 
 
 def tearDownModule():
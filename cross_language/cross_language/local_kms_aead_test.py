@@ -0,0 +1,111 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cross-language tests of KMS AEADs against a local KMS server.
+
+Unlike kms_aead_test, this test needs no network access and no credentials:
+the servers send their KMS requests to a local_kms.LocalKmsServer.
+"""
+
+from typing import Iterable, Tuple
+
+from absl.testing import absltest
+from absl.testing import parameterized
+import tink
+from tink import aead
+
+from cross_language.util import local_kms
+from cross_language.util import testing_servers
+from cross_language.util import utilities
+
+# The local KMS server accepts any key name.
+_KEY_URI = {
+    'aws': testing_servers.AWS_KEY_URI_PREFIX + 'key/local-kms-aead-test',
+    'gcp': testing_servers.GCP_KEY_URI_PREFIX + 'local-kms-aead-test',
+    'hcvault': (testing_servers.HCVAULT_KEY_URI_PREFIX +
+                'transit/keys/local-kms-aead-test'),
+}
+
+_local_kms_server: local_kms.LocalKmsServer = None
+
+
+def setUpModule():
+  global _local_kms_server
+  aead.register()
+  _local_kms_server = local_kms.LocalKmsServer().start()
+  testing_servers.start(
+      'local_kms_aead', _local_kms_server.url,
+      languages=sorted(set().union(*local_kms.SUPPORTED_LANGUAGES.values())))
+
+
+def tearDownModule():
+  testing_servers.stop()
+  _local_kms_server.stop()
+
+
+def _test_cases() -> Iterable[Tuple[str, str, str]]:
+  """Yields each API with pairs of languages, each encrypting once."""
+  for api, langs in local_kms.SUPPORTED_LANGUAGES.items():
+    for i, encrypt_lang in enumerate(langs):
+      yield (api, encrypt_lang, langs[(i + 1) % len(langs)])
+
+
+def _associated_data(api: str) -> bytes:
+  # HC Vault in Python does not support associated data, see kms_aead_test.
+  return b'' if api == 'hcvault' else b'associated_data'
+
+
+class LocalKmsAeadTest(parameterized.TestCase):
+
+  def _requests(self, api: str) -> int:
+    return sum(count
+               for name, count in _local_kms_server.request_counts().items()
+               if name.startswith(api + '.'))
+
+  @parameterized.parameters(_test_cases())
+  def test_kms_aead_encrypt_decrypt(self, api, encrypt_lang, decrypt_lang):
+    template = aead.aead_key_templates.create_kms_aead_key_template(
+        _KEY_URI[api])
+    keyset = testing_servers.new_keyset(encrypt_lang, template)
+    associated_data = _associated_data(api)
+    requests = self._requests(api)
+    ciphertext = testing_servers.remote_primitive(
+        encrypt_lang, keyset, aead.Aead).encrypt(b'plaintext', associated_data)
+    decrypter = testing_servers.remote_primitive(decrypt_lang, keyset,
+                                                 aead.Aead)
+    self.assertEqual(decrypter.decrypt(ciphertext, associated_data),
+                     b'plaintext')
+    # Both calls went to the local KMS server.
+    self.assertEqual(self._requests(api), requests + 2)
+    with self.assertRaises(tink.TinkError):
+      decrypter.decrypt(ciphertext, associated_data + b'2')
+
+  @parameterized.parameters(_test_cases())
+  def test_kms_envelope_aead_encrypt_decrypt(self, api, encrypt_lang,
+                                             decrypt_lang):
+    template = aead.aead_key_templates.create_kms_envelope_aead_key_template(
+        _KEY_URI[api], utilities.KEY_TEMPLATE['AES128_GCM'])
+    keyset = testing_servers.new_keyset(encrypt_lang, template)
+    ciphertext = testing_servers.remote_primitive(
+        encrypt_lang, keyset, aead.Aead).encrypt(b'plaintext',
+                                                 b'associated_data')
+    decrypter = testing_servers.remote_primitive(decrypt_lang, keyset,
+                                                 aead.Aead)
+    self.assertEqual(decrypter.decrypt(ciphertext, b'associated_data'),
+                     b'plaintext')
+    with self.assertRaises(tink.TinkError):
+      decrypter.decrypt(ciphertext, b'other_associated_data')
+
+
+if __name__ == '__main__':
+  absltest.main()
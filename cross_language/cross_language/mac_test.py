@@ -29,6 +29,12 @@ from cross_language.util import utilities
 
 SUPPORTED_LANGUAGES = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE['mac']
 
+# The sizes of the data which the servers generate, see generated_inputs.
+GENERATED_DATA_SIZES = list(range(257)) + [1000, 4096, 65536]
+# The sizes used if a server does not generate the data, in which case each
+# MAC is computed with one RPC.
+FALLBACK_DATA_SIZES = [0, 1, 15, 16, 17, 31, 32, 33, 255, 256, 1000]
+
 
 def setUpModule():
   mac.register()
@@ -84,6 +90,27 @@ class MacTest(parameterized.TestCase):
       for _, p2 in supported_macs.items():
         self.assertIsNone(p2.verify_mac(mac_value, data))
 
+  @parameterized.parameters(utilities.tinkey_template_names_for(mac.Mac))
+  def test_compute_mac_consistent_for_generated_data(self, key_template_name):
+    supported_langs = utilities.SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME[
+        key_template_name]
+    self.assertNotEmpty(supported_langs)
+    key_template = utilities.KEY_TEMPLATE[key_template_name]
+    keyset = testing_servers.new_keyset(supported_langs[0], key_template)
+    if all(testing_servers.generates_inputs(lang) for lang in supported_langs):
+      sizes = GENERATED_DATA_SIZES
+    else:
+      sizes = FALLBACK_DATA_SIZES
+    digests = {}
+    for lang in supported_langs:
+      p = testing_servers.remote_primitive(lang, keyset, mac.Mac)
+      digests[lang] = p.compute_mac_generated(
+          key_template_name.encode('utf8'), sizes)
+    self.assertLen(
+        set(digests.values()), 1,
+        'The MACs for template %s differ: digests = %s' %
+        (key_template_name, digests))
+
 
 # If the implementations work fine for keysets with single keys, then key
 # rotation should work if the primitive wrapper is implemented correctly.
@@ -29,6 +29,12 @@ OUTPUT_LENGTHS = [
     1, 2, 5, 10, 16, 17, 20, 32, 33, 48, 64, 65, 100, 256, 512, 1024
 ]
 
+# The sizes of the inputs which the servers generate, see generated_inputs.
+GENERATED_INPUT_SIZES = list(range(257)) + [1000, 4096, 65536]
+# The sizes used if a server does not generate the inputs, in which case each
+# output is computed with one RPC.
+FALLBACK_INPUT_SIZES = [0, 1, 15, 16, 17, 31, 32, 33, 255, 256, 1000]
+
 
 def all_prf_key_template_names_with_some_output_length():
   """Yields (prf_key_template_name, output_length) tuples."""
@@ -105,6 +111,26 @@ class PrfSetPythonTest(parameterized.TestCase):
                 'outputs = %s, errors = %s.' %
                 (key_template_name, output_length, outputs, errors))
 
+  @parameterized.parameters(utilities.tinkey_template_names_for(prf.PrfSet))
+  def test_compute_consistent_for_generated_inputs(self, key_template_name):
+    supported_langs = utilities.SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME[
+        key_template_name]
+    self.assertNotEmpty(supported_langs)
+    keyset = gen_keyset(key_template_name)
+    if all(testing_servers.generates_inputs(lang) for lang in supported_langs):
+      sizes = GENERATED_INPUT_SIZES
+    else:
+      sizes = FALLBACK_INPUT_SIZES
+    digests = {}
+    for lang in supported_langs:
+      p = testing_servers.remote_primitive(lang, keyset, prf.PrfSet)
+      digests[lang] = p.primary().compute_generated(
+          key_template_name.encode('utf8'), sizes, 16)
+    self.assertLen(
+        set(digests.values()), 1,
+        'The PRF outputs for template %s differ: digests = %s' %
+        (key_template_name, digests))
+
   @parameterized.parameters(SUPPORTED_LANGUAGES)
   def test_multiple_prfs(self, lang):
     keyset = gen_keyset_with_2_prfs()
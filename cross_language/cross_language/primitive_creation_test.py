@@ -13,7 +13,8 @@
 # limitations under the License.
 """Primitive Creation consistency tests."""
 
-from typing import Any
+import collections
+from typing import Any, Dict, Optional, Tuple
 
 from absl.testing import absltest
 from absl.testing import parameterized
@@ -46,14 +47,52 @@ signature.register()
 streaming_aead.register()
 
 
+# The result of the creation of each (lang, keyset, primitive) of
+# named_testcases, also with key ID 0. These are created in setUpModule with a
+# few CreateMany RPCs per language, instead of one Create RPC per test case.
+# test_create still creates the primitives of the keysets of
+# single_key_keysets_one_per_primitive with a Create RPC, such that the Create
+# RPC of each primitive is tested in each server.
+_creation_errors: Dict[Tuple[str, bytes, Any], Optional[tink.TinkError]] = {}
+
+
 def setUpModule():
   testing_servers.start('primitive_creation')
 
+  entries_by_lang = collections.defaultdict(list)
+  for testcase in _NAMED_TESTCASES:
+    keysets = [_with_key_id_0(testcase['keyset'])]
+    if testcase['keyset'] not in _ONE_PER_PRIMITIVE_KEYSETS:
+      keysets.append(testcase['keyset'])
+    for keyset in keysets:
+      entries_by_lang[testcase['lang']].append((keyset, testcase['primitive']))
+  for lang, entries in entries_by_lang.items():
+    errors = testing_servers.create_many(lang, entries)
+    for (keyset, primitive), error in zip(entries, errors):
+      _creation_errors[(lang, keyset, primitive)] = error
+
 
 def tearDownModule():
   testing_servers.stop()
 
 
+def _with_key_id_0(keyset: bytes) -> bytes:
+  keyset_proto = tink_pb2.Keyset.FromString(keyset)
+  for key in keyset_proto.key:
+    if key.key_id == keyset_proto.primary_key_id:
+      key.key_id = 0
+  keyset_proto.primary_key_id = 0
+  return keyset_proto.SerializeToString()
+
+
+def _create(lang: str, keyset: bytes, primitive: Any) -> None:
+  """Like testing_servers.remote_primitive, with the results of setUpModule."""
+  if (lang, keyset, primitive) not in _creation_errors:
+    testing_servers.remote_primitive(lang, keyset, primitive)
+  elif _creation_errors[(lang, keyset, primitive)] is not None:
+    raise _creation_errors[(lang, keyset, primitive)]
+
+
 def single_key_keysets():
   """Produces single key keysets which can be produced from a template.
 
@@ -113,7 +152,7 @@ def named_testcases():
       case_num += 1
 
   for lang in utilities.ALL_LANGUAGES:
-    for keyset in single_key_keysets_one_per_primitive():
+    for keyset in _ONE_PER_PRIMITIVE_KEYSETS:
       for primitive in tink_config.all_primitives():
         yield {
             'testcase_name':
@@ -129,6 +168,12 @@ def named_testcases():
         case_num += 1
 
 
+# The keysets of named_testcases are generated only once, such that setUpModule
+# can create the primitives of exactly the keysets used by the tests.
+_ONE_PER_PRIMITIVE_KEYSETS = list(single_key_keysets_one_per_primitive())
+_NAMED_TESTCASES = list(named_testcases())
+
+
 class SupportedKeyTypesTest(parameterized.TestCase):
   """Tests if creation of primitives succeeds as described in tink_config.
 
@@ -139,7 +184,7 @@ class SupportedKeyTypesTest(parameterized.TestCase):
   primitive.
   """
 
-  @parameterized.named_parameters(named_testcases())
+  @parameterized.named_parameters(_NAMED_TESTCASES)
   def test_create(self, lang: str, keyset: bytes, primitive: Any):
     """Tests primitive creation (see top level comment).
 
@@ -155,12 +200,12 @@ class SupportedKeyTypesTest(parameterized.TestCase):
     keytype = keytypes[0]
     if (lang in tink_config.supported_languages_for_key_type(keytype) and
         primitive == tink_config.primitive_for_keytype(keytype)):
-      _ = testing_servers.remote_primitive(lang, keyset, primitive)
+      _create(lang, keyset, primitive)
     else:
       with self.assertRaises(tink.TinkError):
-        _ = testing_servers.remote_primitive(lang, keyset, primitive)
+        _create(lang, keyset, primitive)
 
-  @parameterized.named_parameters(named_testcases())
+  @parameterized.named_parameters(_NAMED_TESTCASES)
   def test_create_with_public_keyset(self, lang: str, keyset: bytes,
                                      primitive: Any):
     """Tests primitive creation, after getting a public keyset.
@@ -191,7 +236,7 @@ class SupportedKeyTypesTest(parameterized.TestCase):
       with self.assertRaises(tink.TinkError):
         _ = testing_servers.remote_primitive(lang, public_keyset, primitive)
 
-  @parameterized.named_parameters(named_testcases())
+  @parameterized.named_parameters(_NAMED_TESTCASES)
   def test_create_with_key_id_0(self, lang: str, keyset: bytes, primitive: Any):
     """Tests primitive creation when key ID is 0.
 
@@ -200,22 +245,17 @@ class SupportedKeyTypesTest(parameterized.TestCase):
       keyset: A byte string representing a keyset. The keyset needs to be valid.
       primitive: The primitive to try and instantiate
     """
-    keyset_proto = tink_pb2.Keyset.FromString(keyset)
-    for key in keyset_proto.key:
-      if key.key_id == keyset_proto.primary_key_id:
-        key.key_id = 0
-    keyset_proto.primary_key_id = 0
-    modified_keyset = keyset_proto.SerializeToString()
+    modified_keyset = _with_key_id_0(keyset)
 
     keytypes = utilities.key_types_in_keyset(keyset)
     keytype = keytypes[0]
 
     if (lang in tink_config.supported_languages_for_key_type(keytype) and
         primitive == tink_config.primitive_for_keytype(keytype)):
-      _ = testing_servers.remote_primitive(lang, modified_keyset, primitive)
+      _create(lang, modified_keyset, primitive)
     else:
       with self.assertRaises(tink.TinkError):
-        _ = testing_servers.remote_primitive(lang, modified_keyset, primitive)
+        _create(lang, modified_keyset, primitive)
 
   def test_single_key_keysets_one_per_primitive_complete(self):
     """Checks that single_key_keysets_one_per_primitive is updated if needed.
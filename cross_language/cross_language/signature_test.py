@@ -13,6 +13,7 @@
 # limitations under the License.
 """Cross-language tests for Public-Key Signatures."""
 
+import itertools
 from typing import Iterable, Tuple
 
 from absl.testing import absltest
@@ -22,6 +23,7 @@ from tink import signature
 
 from tink.proto import tink_pb2
 from tink.testing import keyset_builder
+from cross_language.util import coverage_planner
 from cross_language.util import test_keys
 from cross_language.util import testing_servers
 from cross_language.util import utilities
@@ -30,6 +32,12 @@ SUPPORTED_LANGUAGES = testing_servers.SUPPORTED_LANGUAGES_BY_PRIMITIVE[
     'signature'
 ]
 
+# The sizes of the data which the servers generate, see generated_inputs.
+GENERATED_DATA_SIZES = list(range(257)) + [1000, 4096, 65536]
+# The sizes used if a server does not generate the data, in which case each
+# signature is computed with one RPC.
+FALLBACK_DATA_SIZES = [0, 1, 15, 16, 17, 31, 32, 33, 255, 256, 1000]
+
 
 def setUpModule():
   signature.register()
@@ -76,6 +84,30 @@ class SignatureTest(parameterized.TestCase):
       for _, verifier in supported_verifiers.items():
         self.assertIsNone(verifier.verify(sign, message))
 
+  def test_sign_consistent_for_generated_data(self):
+    # Only Ed25519 signatures are deterministic, so only their digests are
+    # equal in all languages.
+    supported_langs = utilities.SUPPORTED_LANGUAGES_BY_TEMPLATE_NAME['ED25519']
+    self.assertNotEmpty(supported_langs)
+    private_keyset = test_keys.new_or_stored_keyset(
+        signature.signature_key_templates.ED25519
+    )
+    if all(testing_servers.generates_inputs(lang) for lang in supported_langs):
+      sizes = GENERATED_DATA_SIZES
+    else:
+      sizes = FALLBACK_DATA_SIZES
+    digests = {}
+    for lang in supported_langs:
+      signer = testing_servers.remote_primitive(
+          lang, private_keyset, signature.PublicKeySign
+      )
+      digests[lang] = signer.sign_generated(b'ED25519', sizes)
+    self.assertLen(
+        set(digests.values()),
+        1,
+        'The Ed25519 signatures differ: digests = %s' % digests,
+    )
+
 
 # If the implementations work fine for keysets with single keys, then key
 # rotation should work if the primitive wrapper is implemented correctly.
@@ -92,20 +124,28 @@ KEY_ROTATION_TEMPLATES = [
 ]
 
 
+# The (old_key_tmpl, new_key_tmpl) cases of the key rotation tests.
+KEY_ROTATION_CASES = list(itertools.product(KEY_ROTATION_TEMPLATES, repeat=2))
+
+
 def key_rotation_test_cases() -> (
     Iterable[Tuple[str, str, tink_pb2.KeyTemplate, tink_pb2.KeyTemplate]]
 ):
+  """Yields all cases, test_key_rotation skips those which are not planned."""
   for enc_lang in SUPPORTED_LANGUAGES:
     for dec_lang in SUPPORTED_LANGUAGES:
-      for old_key_tmpl in KEY_ROTATION_TEMPLATES:
-        for new_key_tmpl in KEY_ROTATION_TEMPLATES:
-          yield (enc_lang, dec_lang, old_key_tmpl, new_key_tmpl)
+      for old_key_tmpl, new_key_tmpl in KEY_ROTATION_CASES:
+        yield (enc_lang, dec_lang, old_key_tmpl, new_key_tmpl)
 
 
 class SignatureKeyRotationTest(parameterized.TestCase):
 
   @parameterized.parameters(key_rotation_test_cases())
   def test_key_rotation(self, enc_lang, dec_lang, old_key_tmpl, new_key_tmpl):
+    if not coverage_planner.is_planned(SUPPORTED_LANGUAGES, KEY_ROTATION_CASES,
+                                       enc_lang, dec_lang,
+                                       (old_key_tmpl, new_key_tmpl)):
+      self.skipTest('Not planned in this --coverage_mode')
     # Do a key rotation from an old key generated from old_key_tmpl to a new
     # key generated from new_key_tmpl. Encryption and decryption are done
     # in languages enc_lang and dec_lang.
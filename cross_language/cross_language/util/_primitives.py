@@ -16,7 +16,8 @@
 import datetime
 import io
 import json
-from typing import BinaryIO, Dict, Mapping, Optional, Tuple
+from typing import (Any, BinaryIO, Dict, List, Mapping, Optional, Sequence,
+                    Tuple, Union)
 
 import tink
 from tink import aead
@@ -32,6 +33,8 @@ from tink import streaming_aead
 from tink.proto import tink_pb2
 from protos import testing_api_pb2
 from protos import testing_api_pb2_grpc
+from cross_language.util import generated_inputs as generated_inputs_lib
+from cross_language.util import shared_memory as shared_memory_lib
 
 
 def key_template(stub: testing_api_pb2_grpc.KeysetStub,
@@ -53,6 +56,72 @@ def new_keyset(stub: testing_api_pb2_grpc.KeysetStub,
   return gen_response.keyset
 
 
+def new_keysets(
+    stub: testing_api_pb2_grpc.KeysetStub,
+    templates: Sequence[tink_pb2.KeyTemplate]
+) -> List[Union[bytes, tink.TinkError]]:
+  """Generates a keyset for each template in a single GenerateMany call."""
+  request = testing_api_pb2.KeysetGenerateManyRequest(
+      templates=[template.SerializeToString() for template in templates])
+  response = stub.GenerateMany(request)
+  if len(response.results) != len(templates):
+    raise ValueError('GenerateMany returned %d results for %d templates' %
+                     (len(response.results), len(templates)))
+  return [
+      tink.TinkError(result.err) if result.err else result.keyset
+      for result in response.results
+  ]
+
+
+# The primitive types of the CreateMany entries.
+PRIMITIVE_TYPE = {
+    aead.Aead: testing_api_pb2.PRIMITIVE_AEAD,
+    daead.DeterministicAead: testing_api_pb2.PRIMITIVE_DETERMINISTIC_AEAD,
+    streaming_aead.StreamingAead: testing_api_pb2.PRIMITIVE_STREAMING_AEAD,
+    mac.Mac: testing_api_pb2.PRIMITIVE_MAC,
+    hybrid.HybridEncrypt: testing_api_pb2.PRIMITIVE_HYBRID_ENCRYPT,
+    hybrid.HybridDecrypt: testing_api_pb2.PRIMITIVE_HYBRID_DECRYPT,
+    tink_signature.PublicKeySign: testing_api_pb2.PRIMITIVE_PUBLIC_KEY_SIGN,
+    tink_signature.PublicKeyVerify: testing_api_pb2.PRIMITIVE_PUBLIC_KEY_VERIFY,
+    prf.PrfSet: testing_api_pb2.PRIMITIVE_PRF_SET,
+    jwt.JwtMac: testing_api_pb2.PRIMITIVE_JWT_MAC,
+    jwt.JwtPublicKeySign: testing_api_pb2.PRIMITIVE_JWT_PUBLIC_KEY_SIGN,
+    jwt.JwtPublicKeyVerify: testing_api_pb2.PRIMITIVE_JWT_PUBLIC_KEY_VERIFY,
+}
+
+
+def create_many(
+    stub: testing_api_pb2_grpc.KeysetStub,
+    entries: Sequence[Tuple[Union[bytes, tink_pb2.KeyTemplate], Any]]
+) -> List[Optional[tink.TinkError]]:
+  """Creates the primitives of the entries in a single CreateMany call.
+
+  Args:
+    stub: The keyset stub.
+    entries: Pairs of a serialized keyset or a key template, and a primitive
+      class such as aead.Aead. For templates, a new keyset is generated.
+
+  Returns:
+    For each entry, None if the primitive was created, and the error
+    otherwise.
+  """
+  request = testing_api_pb2.CreateManyRequest()
+  for keyset_or_template, primitive_class in entries:
+    entry = request.entries.add(primitive=PRIMITIVE_TYPE[primitive_class])
+    if isinstance(keyset_or_template, tink_pb2.KeyTemplate):
+      entry.template = keyset_or_template.SerializeToString()
+    else:
+      entry.annotated_keyset.serialized_keyset = keyset_or_template
+  response = stub.CreateMany(request)
+  if len(response.results) != len(entries):
+    raise ValueError('CreateMany returned %d results for %d entries' %
+                     (len(response.results), len(entries)))
+  return [
+      tink.TinkError(result.err) if result.err else None
+      for result in response.results
+  ]
+
+
 def public_keyset(stub: testing_api_pb2_grpc.KeysetStub,
                   private_keyset: bytes) -> bytes:
   request = testing_api_pb2.KeysetPublicRequest(private_keyset=private_keyset)
@@ -136,15 +205,42 @@ def jwk_set_from_keyset(stub: testing_api_pb2_grpc.JwtStub,
   return response.jwk_set
 
 
+def measure_timing(stub: testing_api_pb2_grpc.TimingStub,
+                   operation: testing_api_pb2.TimingRequest.Operation,
+                   keyset: bytes, inputs: Sequence[bytes], data: bytes,
+                   classes: bytes) -> Sequence[int]:
+  """Returns the durations in nanoseconds of operation on inputs[classes[i]]."""
+  request = testing_api_pb2.TimingRequest(
+      operation=operation,
+      annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+          serialized_keyset=keyset),
+      inputs=inputs,
+      data=data,
+      classes=classes)
+  response = stub.Measure(request)
+  if response.err:
+    raise tink.TinkError(response.err)
+  return response.durations_ns
+
+
 class Aead(aead.Aead):
-  """Wraps AEAD service stub into an Aead primitive."""
+  """Wraps AEAD service stub into an Aead primitive.
 
-  def __init__(self, lang: str, stub: testing_api_pb2_grpc.AeadStub,
-               keyset: bytes, annotations: Optional[Dict[str, str]]) -> None:
+  If shared_memory is set, payloads it accepts are passed in shared memory.
+  """
+
+  def __init__(
+      self,
+      lang: str,
+      stub: testing_api_pb2_grpc.AeadStub,
+      keyset: bytes,
+      annotations: Optional[Dict[str, str]],
+      shared_memory: Optional[shared_memory_lib.SharedMemory] = None) -> None:
     self.lang = lang
     self._stub = stub
     self._keyset = keyset
     self._annotations = annotations
+    self._shared_memory = shared_memory
     creation_response = self._stub.Create(
         testing_api_pb2.CreationRequest(
             annotated_keyset=testing_api_pb2.AnnotatedKeyset(
@@ -154,6 +250,20 @@ class Aead(aead.Aead):
       raise tink.TinkError(creation_response.err)
 
   def encrypt(self, plaintext: bytes, associated_data: bytes) -> bytes:
+    shm = self._shared_memory
+    if shm is not None and shm.accepts(len(plaintext)):
+      with shm.input(plaintext) as region, shm.output() as output_path:
+        enc_response = self._stub.Encrypt(
+            testing_api_pb2.AeadEncryptRequest(
+                annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                    serialized_keyset=self._keyset,
+                    annotations=self._annotations),
+                shared_plaintext=region,
+                associated_data=associated_data,
+                shared_output_path=output_path))
+        if enc_response.err:
+          raise tink.TinkError(enc_response.err)
+        return shm.read(enc_response.shared_ciphertext)
     enc_request = testing_api_pb2.AeadEncryptRequest(
         annotated_keyset=testing_api_pb2.AnnotatedKeyset(
             serialized_keyset=self._keyset, annotations=self._annotations),
@@ -165,6 +275,20 @@ class Aead(aead.Aead):
     return enc_response.ciphertext
 
   def decrypt(self, ciphertext: bytes, associated_data: bytes) -> bytes:
+    shm = self._shared_memory
+    if shm is not None and shm.accepts(len(ciphertext)):
+      with shm.input(ciphertext) as region, shm.output() as output_path:
+        dec_response = self._stub.Decrypt(
+            testing_api_pb2.AeadDecryptRequest(
+                annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                    serialized_keyset=self._keyset,
+                    annotations=self._annotations),
+                shared_ciphertext=region,
+                associated_data=associated_data,
+                shared_output_path=output_path))
+        if dec_response.err:
+          raise tink.TinkError(dec_response.err)
+        return shm.read(dec_response.shared_plaintext)
     dec_request = testing_api_pb2.AeadDecryptRequest(
         annotated_keyset=testing_api_pb2.AnnotatedKeyset(
             serialized_keyset=self._keyset, annotations=self._annotations),
@@ -177,15 +301,23 @@ class Aead(aead.Aead):
 
 
 class DeterministicAead(daead.DeterministicAead):
-  """Wraps DAEAD services stub into an DeterministicAead primitive."""
-
-  def __init__(self, lang: str,
-               stub: testing_api_pb2_grpc.DeterministicAeadStub, keyset: bytes,
-               annotations: Optional[Dict[str, str]]) -> None:
+  """Wraps DAEAD services stub into an DeterministicAead primitive.
+
+  If server_generates_inputs is set, the server generates the inputs of
+  encrypt_deterministically_generated itself.
+  """
+
+  def __init__(self,
+               lang: str,
+               stub: testing_api_pb2_grpc.DeterministicAeadStub,
+               keyset: bytes,
+               annotations: Optional[Dict[str, str]],
+               server_generates_inputs: bool = False) -> None:
     self.lang = lang
     self._stub = stub
     self._keyset = keyset
     self._annotations = annotations
+    self._server_generates_inputs = server_generates_inputs
     creation_response = self._stub.Create(
         testing_api_pb2.CreationRequest(
             annotated_keyset=testing_api_pb2.AnnotatedKeyset(
@@ -206,6 +338,24 @@ class DeterministicAead(daead.DeterministicAead):
       raise tink.TinkError(enc_response.err)
     return enc_response.ciphertext
 
+  def encrypt_deterministically_generated(self, seed: bytes,
+                                          sizes: Sequence[int],
+                                          associated_data: bytes) -> bytes:
+    """Returns the digest of the ciphertexts of the generated plaintexts."""
+    if not self._server_generates_inputs:
+      return generated_inputs_lib.digest(
+          self.encrypt_deterministically(plaintext, associated_data)
+          for plaintext in generated_inputs_lib.generate(seed, sizes))
+    enc_request = testing_api_pb2.DeterministicAeadEncryptRequest(
+        annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+            serialized_keyset=self._keyset, annotations=self._annotations),
+        generated_plaintexts=generated_inputs_lib.inputs(seed, sizes),
+        associated_data=associated_data)
+    enc_response = self._stub.EncryptDeterministically(enc_request)
+    if enc_response.err:
+      raise tink.TinkError(enc_response.err)
+    return enc_response.ciphertexts_digest
+
   def decrypt_deterministically(self, ciphertext: bytes,
                                 associated_data: bytes) -> bytes:
     """Decrypts."""
@@ -221,13 +371,21 @@ class DeterministicAead(daead.DeterministicAead):
 
 
 class StreamingAead(streaming_aead.StreamingAead):
-  """Wraps Streaming AEAD service stub into a StreamingAead primitive."""
+  """Wraps Streaming AEAD service stub into a StreamingAead primitive.
 
-  def __init__(self, lang: str, stub: testing_api_pb2_grpc.StreamingAeadStub,
-               keyset: bytes) -> None:
+  If shared_memory is set, payloads it accepts are passed in shared memory.
+  """
+
+  def __init__(
+      self,
+      lang: str,
+      stub: testing_api_pb2_grpc.StreamingAeadStub,
+      keyset: bytes,
+      shared_memory: Optional[shared_memory_lib.SharedMemory] = None) -> None:
     self.lang = lang
     self._stub = stub
     self._keyset = keyset
+    self._shared_memory = shared_memory
     creation_response = self._stub.Create(
         testing_api_pb2.CreationRequest(
             annotated_keyset=testing_api_pb2.AnnotatedKeyset(
@@ -237,10 +395,24 @@ class StreamingAead(streaming_aead.StreamingAead):
 
   def new_encrypting_stream(self, plaintext: BinaryIO,
                             associated_data: bytes) -> BinaryIO:
+    data = plaintext.read()
+    shm = self._shared_memory
+    if shm is not None and shm.accepts(len(data)):
+      with shm.input(data) as region, shm.output() as output_path:
+        enc_response = self._stub.Encrypt(
+            testing_api_pb2.StreamingAeadEncryptRequest(
+                annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                    serialized_keyset=self._keyset),
+                shared_plaintext=region,
+                associated_data=associated_data,
+                shared_output_path=output_path))
+        if enc_response.err:
+          raise tink.TinkError(enc_response.err)
+        return io.BytesIO(shm.read(enc_response.shared_ciphertext))
     enc_request = testing_api_pb2.StreamingAeadEncryptRequest(
         annotated_keyset=testing_api_pb2.AnnotatedKeyset(
             serialized_keyset=self._keyset),
-        plaintext=plaintext.read(),
+        plaintext=data,
         associated_data=associated_data)
     enc_response = self._stub.Encrypt(enc_request)
     if enc_response.err:
@@ -249,10 +421,24 @@ class StreamingAead(streaming_aead.StreamingAead):
 
   def new_decrypting_stream(self, ciphertext: BinaryIO,
                             associated_data: bytes) -> BinaryIO:
+    data = ciphertext.read()
+    shm = self._shared_memory
+    if shm is not None and shm.accepts(len(data)):
+      with shm.input(data) as region, shm.output() as output_path:
+        dec_response = self._stub.Decrypt(
+            testing_api_pb2.StreamingAeadDecryptRequest(
+                annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                    serialized_keyset=self._keyset),
+                shared_ciphertext=region,
+                associated_data=associated_data,
+                shared_output_path=output_path))
+        if dec_response.err:
+          raise tink.TinkError(dec_response.err)
+        return io.BytesIO(shm.read(dec_response.shared_plaintext))
     dec_request = testing_api_pb2.StreamingAeadDecryptRequest(
         annotated_keyset=testing_api_pb2.AnnotatedKeyset(
             serialized_keyset=self._keyset),
-        ciphertext=ciphertext.read(),
+        ciphertext=data,
         associated_data=associated_data)
     dec_response = self._stub.Decrypt(dec_request)
     if dec_response.err:
@@ -261,14 +447,23 @@ class StreamingAead(streaming_aead.StreamingAead):
 
 
 class Mac(mac.Mac):
-  """Wraps MAC service stub into an Mac primitive."""
-
-  def __init__(self, lang: str, stub: testing_api_pb2_grpc.MacStub,
-               keyset: bytes, annotations: Optional[Dict[str, str]]) -> None:
+  """Wraps MAC service stub into an Mac primitive.
+
+  If server_generates_inputs is set, the server generates the inputs of
+  compute_mac_generated itself.
+  """
+
+  def __init__(self,
+               lang: str,
+               stub: testing_api_pb2_grpc.MacStub,
+               keyset: bytes,
+               annotations: Optional[Dict[str, str]],
+               server_generates_inputs: bool = False) -> None:
     self.lang = lang
     self._stub = stub
     self._keyset = keyset
     self._annotations = annotations
+    self._server_generates_inputs = server_generates_inputs
     creation_response = self._stub.Create(
         testing_api_pb2.CreationRequest(
             annotated_keyset=testing_api_pb2.AnnotatedKeyset(
@@ -286,6 +481,21 @@ class Mac(mac.Mac):
       raise tink.TinkError(response.err)
     return response.mac_value
 
+  def compute_mac_generated(self, seed: bytes, sizes: Sequence[int]) -> bytes:
+    """Returns the digest of the MACs of the generated inputs."""
+    if not self._server_generates_inputs:
+      return generated_inputs_lib.digest(
+          self.compute_mac(data)
+          for data in generated_inputs_lib.generate(seed, sizes))
+    request = testing_api_pb2.ComputeMacRequest(
+        annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+            serialized_keyset=self._keyset, annotations=self._annotations),
+        generated_data=generated_inputs_lib.inputs(seed, sizes))
+    response = self._stub.ComputeMac(request)
+    if response.err:
+      raise tink.TinkError(response.err)
+    return response.mac_values_digest
+
   def verify_mac(self, mac_value: bytes, data: bytes) -> None:
     request = testing_api_pb2.VerifyMacRequest(
         annotated_keyset=testing_api_pb2.AnnotatedKeyset(
@@ -360,15 +570,23 @@ class HybridDecrypt(hybrid.HybridDecrypt):
 
 
 class PublicKeySign(tink_signature.PublicKeySign):
-  """Implements the PublicKeySign primitive using a signature service stub."""
-
-  def __init__(self, lang: str, stub: testing_api_pb2_grpc.SignatureStub,
-               private_handle: bytes, annotations: Optional[Dict[str,
-                                                                 str]]) -> None:
+  """Implements the PublicKeySign primitive using a signature service stub.
+
+  If server_generates_inputs is set, the server generates the inputs of
+  sign_generated itself.
+  """
+
+  def __init__(self,
+               lang: str,
+               stub: testing_api_pb2_grpc.SignatureStub,
+               private_handle: bytes,
+               annotations: Optional[Dict[str, str]],
+               server_generates_inputs: bool = False) -> None:
     self.lang = lang
     self._stub = stub
     self._private_handle = private_handle
     self._annotations = annotations
+    self._server_generates_inputs = server_generates_inputs
     creation_response = self._stub.CreatePublicKeySign(
         testing_api_pb2.CreationRequest(
             annotated_keyset=testing_api_pb2.AnnotatedKeyset(
@@ -388,6 +606,33 @@ class PublicKeySign(tink_signature.PublicKeySign):
       raise tink.TinkError(response.err)
     return response.signature
 
+  def sign_generated(self, seed: bytes, sizes: Sequence[int]) -> bytes:
+    """Returns the digest of the signatures of the generated inputs.
+
+    The digests of different languages are only equal for deterministic
+    signatures, for example Ed25519.
+
+    Args:
+      seed: The seed of the inputs.
+      sizes: The size of each input.
+
+    Returns:
+      The digest of the signatures.
+    """
+    if not self._server_generates_inputs:
+      return generated_inputs_lib.digest(
+          self.sign(data)
+          for data in generated_inputs_lib.generate(seed, sizes))
+    request = testing_api_pb2.SignatureSignRequest(
+        private_annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+            serialized_keyset=self._private_handle,
+            annotations=self._annotations),
+        generated_data=generated_inputs_lib.inputs(seed, sizes))
+    response = self._stub.Sign(request)
+    if response.err:
+      raise tink.TinkError(response.err)
+    return response.signatures_digest
+
 
 class PublicKeyVerify(tink_signature.PublicKeyVerify):
   """Implements the PublicKeyVerify primitive using a signature service stub."""
@@ -422,14 +667,19 @@ class PublicKeyVerify(tink_signature.PublicKeyVerify):
 class _Prf(prf.Prf):
   """Implements a Prf from a PrfSet service stub."""
 
-  def __init__(self, lang: str, stub: testing_api_pb2_grpc.PrfSetStub,
-               keyset: bytes, key_id: int,
-               annotations: Optional[Dict[str, str]]) -> None:
+  def __init__(self,
+               lang: str,
+               stub: testing_api_pb2_grpc.PrfSetStub,
+               keyset: bytes,
+               key_id: int,
+               annotations: Optional[Dict[str, str]],
+               server_generates_inputs: bool = False) -> None:
     self.lang = lang
     self._stub = stub
     self._keyset = keyset
     self._key_id = key_id
     self._annotations = annotations
+    self._server_generates_inputs = server_generates_inputs
 
   def compute(self, input_data: bytes, output_length: int) -> bytes:
     request = testing_api_pb2.PrfSetComputeRequest(
@@ -443,12 +693,38 @@ class _Prf(prf.Prf):
       raise tink.TinkError(response.err)
     return response.output
 
+  def compute_generated(self, seed: bytes, sizes: Sequence[int],
+                        output_length: int) -> bytes:
+    """Returns the digest of the outputs for the generated inputs."""
+    if not self._server_generates_inputs:
+      return generated_inputs_lib.digest(
+          self.compute(input_data, output_length)
+          for input_data in generated_inputs_lib.generate(seed, sizes))
+    request = testing_api_pb2.PrfSetComputeRequest(
+        annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+            serialized_keyset=self._keyset, annotations=self._annotations),
+        key_id=self._key_id,
+        generated_input_data=generated_inputs_lib.inputs(seed, sizes),
+        output_length=output_length)
+    response = self._stub.Compute(request)
+    if response.err:
+      raise tink.TinkError(response.err)
+    return response.outputs_digest
 
-class PrfSet(prf.PrfSet):
-  """Implements a PrfSet from a PrfSet service stub."""
 
-  def __init__(self, lang: str, stub: testing_api_pb2_grpc.PrfSetStub,
-               keyset: bytes, annotations: Optional[Dict[str, str]]) -> None:
+class PrfSet(prf.PrfSet):
+  """Implements a PrfSet from a PrfSet service stub.
+
+  If server_generates_inputs is set, the server generates the inputs of
+  compute_generated of its PRFs itself.
+  """
+
+  def __init__(self,
+               lang: str,
+               stub: testing_api_pb2_grpc.PrfSetStub,
+               keyset: bytes,
+               annotations: Optional[Dict[str, str]],
+               server_generates_inputs: bool = False) -> None:
     self.lang = lang
     self._stub = stub
     self._keyset = keyset
@@ -456,6 +732,7 @@ class PrfSet(prf.PrfSet):
     self._primary_key_id = None
     self._prfs = None
     self._annotations = annotations
+    self._server_generates_inputs = server_generates_inputs
     creation_response = self._stub.Create(
         testing_api_pb2.CreationRequest(
             annotated_keyset=testing_api_pb2.AnnotatedKeyset(
@@ -475,7 +752,8 @@ class PrfSet(prf.PrfSet):
       self._prfs = {}
       for key_id in response.output.key_id:
         self._prfs[key_id] = _Prf(self.lang, self._stub, self._keyset, key_id,
-                                  self._annotations)
+                                  self._annotations,
+                                  self._server_generates_inputs)
       self._key_ids_initialized = True
 
   def primary_id(self) -> int:
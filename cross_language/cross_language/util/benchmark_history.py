@@ -0,0 +1,435 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""History of benchmark results, and comparisons of runs against baselines.
+
+Each result of a benchmark_util.Report becomes one record, a JSON object on
+one line of a JSONL file:
+
+  {"benchmark": "key_generation_benchmark", "run_id": "...",
+   "timestamp": "2026-10-19T12:00:00+00:00", "host": "3f2a9c1b0d4e",
+   "lang": "go", "tink_version": "1.7.0",
+   "key": {"operation": "Generate", "template": "AES128_GCM"},
+   "metrics": {"latency.median_ns": 81234.0, "latency.samples": 100, ...}}
+
+The fields of a result are split into the key, which identifies the result
+across runs, and the metrics:
+
+* Strings, booleans and numbers which are not metrics, such as the number of
+  keys or the payload size, belong to the key.
+* Numbers whose name contains the unit 'ns', or ends with '_percent',
+  '_per_second' or '_per_hour', 'rss_bytes' and 'abs_max_t', are metrics which
+  are compared. Nested dicts such as LatencyStats are flattened with dotted
+  names.
+* The 'verdict' of timing_leakage is a metric too, its severity from 0 for
+  'no leak found' to 2 for 'leak'. Any increase is a regression.
+* Counts such as 'samples' or 'errors', the signed 'max_t', and the standard
+  deviation and the maximum of latencies, are metrics which are only recorded.
+
+A history directory contains one JSONL file per benchmark, to which runs are
+appended, and a compact index.json with one entry per run: its benchmark,
+time, host fingerprint, Tink versions and number of records.
+
+compare matches the records of a run with the records of a baseline by
+benchmark, language and key, and reports a regression if a metric got worse
+by more than its relative threshold and by more than noise_factor times its
+noise. The noise of a metric combines the spread of its values over the runs
+(the scaled median absolute deviation), and, for the mean, the median and
+the 90th percentile of LatencyStats, their standard error within a run. The
+standard error of the median is derived from its bootstrap confidence
+interval if it has one, and the standard error of a t statistic is 1.
+"""
+
+import dataclasses
+import datetime
+import fnmatch
+import hashlib
+import json
+import math
+import os
+import platform
+import statistics
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+INDEX_FILE = 'index.json'
+
+# Metrics which are recorded, but not compared: counts, the spread and the
+# maximum of latencies, which are too noisy, and confidence intervals.
+_INFORMATIONAL_METRICS = ('samples', 'requests', 'errors', 'repetitions',
+                          'warmup', 'warmup_calls', 'max_t', 'stdev_ns',
+                          'max_ns', 'median_ci_low_ns', 'median_ci_high_ns')
+
+# Metrics whose names do not follow the rules of _is_metric.
+_NAMED_METRICS = ('rss_bytes', 'abs_max_t')
+
+# The severity of each verdict of timing_leakage.LeakageResult, which is
+# recorded as the 'verdict' metric.
+_VERDICT_SEVERITY = {'no leak found': 0, 'possible leak': 1, 'leak': 2}
+
+# The quantile of the standard normal distribution at 97.5%, which is half
+# the width of the 95% confidence intervals of benchmark_util.LatencyStats in
+# standard errors.
+_CI_95_HALF_WIDTH = 1.96
+
+# The standard errors of the mean, the median and the 90th percentile of n
+# samples of a normal distribution are these factors times stdev / sqrt(n).
+_STANDARD_ERROR_FACTORS = {
+    'mean_ns': 1.0,
+    'median_ns': math.sqrt(math.pi / 2),
+    'p90_ns': 1.7094,
+}
+
+# Scales the median absolute deviation to the standard deviation of a normal
+# distribution.
+_MAD_SCALE = 1.4826
+
+
+def host_fingerprint() -> Dict[str, Any]:
+  """Describes the host, with an 'id' which is a hash of the description."""
+  cpu_model = ''
+  try:
+    with open('/proc/cpuinfo') as f:
+      for line in f:
+        if line.startswith('model name'):
+          cpu_model = line.partition(':')[2].strip()
+          break
+  except OSError:
+    pass
+  fingerprint = {
+      'system': platform.system(),
+      'release': platform.release(),
+      'machine': platform.machine(),
+      'cpu_model': cpu_model or platform.processor(),
+      'cpu_count': os.cpu_count(),
+      'python': platform.python_version(),
+  }
+  fingerprint['id'] = hashlib.sha256(
+      json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:12]
+  return fingerprint
+
+
+def _is_metric(name: str) -> bool:
+  return ('ns' in name.split('_') or name.endswith('_percent') or
+          name.endswith('_per_second') or name.endswith('_per_hour') or
+          name in _NAMED_METRICS)
+
+
+def higher_is_better(metric: str) -> bool:
+  """Returns True if larger values of metric are improvements."""
+  return metric.endswith('_per_second')
+
+
+def compared(metric: str) -> bool:
+  """Returns True if compare checks metric for regressions."""
+  return metric.rpartition('.')[2] not in _INFORMATIONAL_METRICS
+
+
+def _split(result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+  """Splits the fields of a result other than 'lang' into key and metrics."""
+  key = {}
+  metrics = {}
+  for name, value in result.items():
+    if name == 'lang':
+      continue
+    if name == 'verdict' and value in _VERDICT_SEVERITY:
+      metrics[name] = _VERDICT_SEVERITY[value]
+    elif isinstance(value, dict):
+      for nested_name, nested_value in value.items():
+        if (isinstance(nested_value, (int, float)) and
+            not isinstance(nested_value, bool)):
+          metrics['%s.%s' % (name, nested_name)] = nested_value
+    elif (isinstance(value, (int, float)) and not isinstance(value, bool) and
+          (_is_metric(name) or name in _INFORMATIONAL_METRICS)):
+      metrics[name] = value
+    elif isinstance(value, (str, bool, int, float)):
+      key[name] = value
+  return key, metrics
+
+
+def records(benchmark: str,
+            results: Iterable[Dict[str, Any]],
+            tink_versions: Optional[Dict[str, str]] = None,
+            run_id: Optional[str] = None,
+            host: Optional[str] = None,
+            timestamp: Optional[str] = None) -> List[Dict[str, Any]]:
+  """Converts the results of a benchmark run into records.
+
+  Args:
+    benchmark: The name of the benchmark.
+    results: The results of benchmark_util.Report.
+    tink_versions: The Tink version of the server of each language.
+    run_id: Identifies the run. Defaults to a random ID.
+    host: The id of the host_fingerprint. Defaults to the current host.
+    timestamp: The time of the run. Defaults to now.
+
+  Returns:
+    One record per result.
+  """
+  tink_versions = tink_versions or {}
+  run_id = run_id or uuid.uuid4().hex[:12]
+  host = host or host_fingerprint()['id']
+  timestamp = timestamp or datetime.datetime.now(
+      datetime.timezone.utc).isoformat(timespec='seconds')
+  output = []
+  for result in results:
+    key, metrics = _split(result)
+    lang = result.get('lang')
+    output.append({
+        'benchmark': benchmark,
+        'run_id': run_id,
+        'timestamp': timestamp,
+        'host': host,
+        'lang': lang,
+        'tink_version': tink_versions.get(lang),
+        'key': key,
+        'metrics': metrics,
+    })
+  return output
+
+
+def write_records(path: str, new_records: Sequence[Dict[str, Any]]) -> None:
+  """Appends records to the JSONL file at path."""
+  with open(path, 'a') as f:
+    for record in new_records:
+      f.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+def read_records(paths: Iterable[str]) -> List[Dict[str, Any]]:
+  """Reads the records of JSONL files, and of all JSONL files in directories."""
+  files = []
+  for path in paths:
+    if os.path.isdir(path):
+      files.extend(
+          os.path.join(path, name)
+          for name in sorted(os.listdir(path))
+          if name.endswith('.jsonl'))
+    else:
+      files.append(path)
+  output = []
+  for file in files:
+    with open(file) as f:
+      output.extend(json.loads(line) for line in f if line.strip())
+  return output
+
+
+def append_to_history(history_dir: str, new_records: Sequence[Dict[str, Any]],
+                      fingerprint: Optional[Dict[str, Any]] = None) -> None:
+  """Appends records to the history, and adds their runs to the index.
+
+  Args:
+    history_dir: The history directory, which is created if needed.
+    new_records: The records to append.
+    fingerprint: The host_fingerprint of the records, which is stored in the
+      index. Defaults to the current host if its id matches the records.
+  """
+  os.makedirs(history_dir, exist_ok=True)
+  if fingerprint is None:
+    fingerprint = host_fingerprint()
+  runs = {}
+  for record in new_records:
+    run = runs.setdefault((record['benchmark'], record['run_id']), {
+        'benchmark': record['benchmark'],
+        'run_id': record['run_id'],
+        'timestamp': record['timestamp'],
+        'host': (fingerprint if fingerprint['id'] == record['host'] else {
+            'id': record['host']
+        }),
+        'tink_versions': {},
+        'records': 0,
+    })
+    run['records'] += 1
+    if record['lang'] and record['tink_version']:
+      run['tink_versions'][record['lang']] = record['tink_version']
+  for benchmark in sorted({benchmark for benchmark, _ in runs}):
+    write_records(
+        os.path.join(history_dir, benchmark + '.jsonl'),
+        [r for r in new_records if r['benchmark'] == benchmark])
+  index = read_index(history_dir)
+  index['runs'].extend(runs.values())
+  with open(os.path.join(history_dir, INDEX_FILE), 'w') as f:
+    json.dump(index, f, indent=2, sort_keys=True)
+
+
+def read_index(history_dir: str) -> Dict[str, Any]:
+  """Returns the index of a history directory."""
+  path = os.path.join(history_dir, INDEX_FILE)
+  if not os.path.exists(path):
+    return {'runs': []}
+  with open(path) as f:
+    return json.load(f)
+
+
+@dataclasses.dataclass(frozen=True)
+class Thresholds:
+  """The largest relative regressions of metrics, in percent.
+
+  overrides map fnmatch patterns of metric names, such as 'latency.p90_ns' or
+  '*_per_second', to thresholds. The first matching pattern is used.
+  """
+  default_percent: float = 10.0
+  overrides: Tuple[Tuple[str, float], ...] = ()
+
+  @classmethod
+  def parse(cls, default_percent: float,
+            overrides: Sequence[str]) -> 'Thresholds':
+    """Parses overrides like ['latency.p90_ns=25', '*_per_second=5']."""
+    parsed = []
+    for override in overrides:
+      pattern, sep, value = override.partition('=')
+      if not sep or not pattern:
+        raise ValueError('invalid threshold %r, expected pattern=percent' %
+                         override)
+      parsed.append((pattern, float(value)))
+    return cls(default_percent, tuple(parsed))
+
+  def percent(self, metric: str) -> float:
+    for pattern, percent in self.overrides:
+      if fnmatch.fnmatchcase(metric, pattern):
+        return percent
+    return self.default_percent
+
+
+@dataclasses.dataclass(frozen=True)
+class Comparison:
+  """The comparison of one metric of one result with its baseline."""
+  benchmark: str
+  lang: Optional[str]
+  key: Tuple[Tuple[str, Any], ...]
+  metric: str
+  baseline: float
+  current: float
+  # The relative change, positive if the metric got worse.
+  regression_percent: float
+  # The standard deviation of current - baseline.
+  noise: float
+  threshold_percent: float
+  regression: bool
+
+  def describe(self) -> str:
+    key = ','.join('%s=%s' % item for item in self.key)
+    return ('%s %s %s %s: %.6g -> %.6g (%+.1f%%, noise %.3g, threshold '
+            '%.1f%%)' % (self.benchmark, self.lang or '-', key or '-',
+                         self.metric, self.baseline, self.current,
+                         self.regression_percent, self.noise,
+                         self.threshold_percent))
+
+
+def _noise(values: Sequence[float]) -> float:
+  """Estimates the standard deviation of values robustly."""
+  if len(values) < 2:
+    return 0.0
+  median = statistics.median(values)
+  return _MAD_SCALE * statistics.median(abs(v - median) for v in values)
+
+
+def _standard_error(metric: str, metrics: Dict[str, float]) -> float:
+  """Returns the standard error of a statistic of LatencyStats, or 0."""
+  group, _, name = metric.rpartition('.')
+  if name == 'abs_max_t':
+    # A t statistic is measured in standard errors.
+    return 1.0
+  ci_low = metrics.get(group + '.median_ci_low_ns')
+  ci_high = metrics.get(group + '.median_ci_high_ns')
+  if name == 'median_ns' and ci_low is not None and ci_high is not None:
+    return (ci_high - ci_low) / (2 * _CI_95_HALF_WIDTH)
+  stdev = metrics.get(group + '.stdev_ns')
+  samples = metrics.get(group + '.samples')
+  if not group or not stdev or not samples:
+    return 0.0
+  return _STANDARD_ERROR_FACTORS.get(name, 0.0) * stdev / math.sqrt(samples)
+
+
+def _group(
+    records_to_group: Iterable[Dict[str, Any]]
+) -> Dict[Tuple[Any, ...], List[Dict[str, float]]]:
+  groups = {}
+  for record in records_to_group:
+    identity = (record['benchmark'], record['lang'],
+                tuple(sorted(record['key'].items())))
+    groups.setdefault(identity, []).append(record['metrics'])
+  return groups
+
+
+def _summary(runs: List[Dict[str, float]], metric: str) -> Tuple[float, float]:
+  """Returns the median of metric over runs, and the noise of the median."""
+  values = [run[metric] for run in runs if metric in run]
+  spread = _noise(values)
+  within = statistics.median(_standard_error(metric, run) for run in runs)
+  noise = math.sqrt(spread**2 + within**2) / math.sqrt(len(values))
+  return statistics.median(values), noise
+
+
+def compare(baseline: Iterable[Dict[str, Any]],
+            current: Iterable[Dict[str, Any]],
+            thresholds: Thresholds,
+            noise_factor: float = 3.0
+           ) -> Tuple[List[Comparison], List[str]]:
+  """Compares the records of the current run with the baseline records.
+
+  Several records with the same benchmark, language and key, for example of
+  several runs, are summarized by their median.
+
+  Args:
+    baseline: The baseline records.
+    current: The records to check.
+    thresholds: The largest relative regression of each metric.
+    noise_factor: A regression must also exceed this many standard deviations
+      of the noise.
+
+  Returns:
+    The comparisons of the compared metrics of the current records that have a
+    baseline, and a description of each current result without a baseline.
+  """
+  baseline_groups = _group(baseline)
+  comparisons = []
+  unmatched = []
+  for identity, runs in sorted(_group(current).items(), key=repr):
+    benchmark, lang, key = identity
+    if identity not in baseline_groups:
+      unmatched.append('%s %s %s' % (benchmark, lang or '-', dict(key)))
+      continue
+    baseline_runs = baseline_groups[identity]
+    metrics = sorted({m for run in runs for m in run})
+    for metric in metrics:
+      if not compared(metric) or not any(metric in r for r in baseline_runs):
+        continue
+      baseline_value, baseline_noise = _summary(baseline_runs, metric)
+      current_value, current_noise = _summary(runs, metric)
+      change = current_value - baseline_value
+      if higher_is_better(metric):
+        change = -change
+      regression_percent = (
+          100 * change / abs(baseline_value) if baseline_value else 0.0)
+      noise = math.sqrt(baseline_noise**2 + current_noise**2)
+      threshold = thresholds.percent(metric)
+      if metric == 'verdict':
+        # Verdicts are categories: there is no noise, and any worse verdict
+        # is a regression.
+        regression = change > 0
+      else:
+        regression = (regression_percent > threshold and
+                      change > noise_factor * noise)
+      comparisons.append(
+          Comparison(
+              benchmark=benchmark,
+              lang=lang,
+              key=key,
+              metric=metric,
+              baseline=baseline_value,
+              current=current_value,
+              regression_percent=regression_percent,
+              noise=noise,
+              threshold_percent=threshold,
+              regression=regression))
+  return comparisons, unmatched
@@ -0,0 +1,117 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Checks benchmark results against a baseline, and records their history.
+
+Reads the records of --current, which are the .jsonl files that
+benchmark_util.Report writes into the undeclared outputs of a benchmark, or
+directories containing them. If --baseline is set, they are compared with the
+baseline records, see benchmark_history.compare, and the regressions are
+printed. By default, only baseline records of the hosts of the current records
+are used, since results of different machines are not comparable.
+
+If --history_dir is set, the current records are then appended to the
+history, so that the history directory can serve as the baseline of the next
+run.
+
+Exits with status 1 if a metric regressed.
+
+Example:
+  bazel test //cross_language/benchmark:key_generation_benchmark
+  bazel run //cross_language/util:benchmark_history_main -- \\
+      --current=$PWD/bazel-testlogs/cross_language/benchmark/\\
+key_generation_benchmark/test.outputs \\
+      --baseline=$HOME/tink_benchmarks --history_dir=$HOME/tink_benchmarks
+"""
+
+import sys
+
+from absl import app
+from absl import flags
+from absl import logging
+
+from cross_language.util import benchmark_history
+
+_CURRENT = flags.DEFINE_list(
+    'current', None, 'JSONL files or directories of the records to check.')
+_BASELINE = flags.DEFINE_list(
+    'baseline', [],
+    'JSONL files or history directories of the baseline records.')
+_BASELINE_TINK_VERSION = flags.DEFINE_string(
+    'baseline_tink_version', '',
+    'If set, only baseline records of servers with this Tink version are '
+    'used.')
+_ANY_HOST = flags.DEFINE_bool(
+    'any_host', False,
+    'Also use baseline records of hosts other than those of the current '
+    'records.')
+_MAX_REGRESSION_PERCENT = flags.DEFINE_float(
+    'max_regression_percent', 10.0,
+    'Largest relative regression of a metric which is accepted.')
+_THRESHOLDS = flags.DEFINE_list(
+    'thresholds', [],
+    'Thresholds of metrics matching patterns, overriding '
+    '--max_regression_percent, such as latency.p90_ns=25,*_per_second=5.')
+_NOISE_FACTOR = flags.DEFINE_float(
+    'noise_factor', 3.0,
+    'A regression must exceed this many standard deviations of the noise.')
+_VERBOSE = flags.DEFINE_bool('verbose', False,
+                             'Print all comparisons, not only regressions.')
+_HISTORY_DIR = flags.DEFINE_string(
+    'history_dir', '',
+    'If set, the current records are appended to this history directory.')
+
+flags.mark_flag_as_required('current')
+
+
+def main(argv):
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  thresholds = benchmark_history.Thresholds.parse(
+      _MAX_REGRESSION_PERCENT.value, _THRESHOLDS.value)
+  current = benchmark_history.read_records(_CURRENT.value)
+  if not current:
+    raise app.UsageError('No records in --current.')
+  baseline = benchmark_history.read_records(_BASELINE.value)
+  hosts = {record['host'] for record in current}
+  baseline = [
+      record for record in baseline
+      if (_ANY_HOST.value or record['host'] in hosts) and
+      (not _BASELINE_TINK_VERSION.value or
+       record['tink_version'] == _BASELINE_TINK_VERSION.value)
+  ]
+  regressions = 0
+  if _BASELINE.value:
+    if not baseline:
+      logging.warning('No baseline records match the current records.')
+    comparisons, unmatched = benchmark_history.compare(baseline, current,
+                                                       thresholds,
+                                                       _NOISE_FACTOR.value)
+    for description in unmatched:
+      logging.warning('No baseline for %s', description)
+    for comparison in comparisons:
+      if comparison.regression:
+        regressions += 1
+        print('REGRESSION ' + comparison.describe())
+      elif _VERBOSE.value:
+        print('ok ' + comparison.describe())
+    print('%d of %d metrics regressed.' % (regressions, len(comparisons)))
+  if _HISTORY_DIR.value:
+    benchmark_history.append_to_history(_HISTORY_DIR.value, current)
+    logging.info('Appended %d records to %s', len(current), _HISTORY_DIR.value)
+  if regressions:
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  app.run(main)
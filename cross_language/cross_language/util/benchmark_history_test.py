@@ -0,0 +1,179 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for benchmark_history."""
+
+import os
+
+from absl.testing import absltest
+
+from cross_language.util import benchmark_history
+
+
+def _latency(median_ns, stdev_ns=0.0, samples=100):
+  return {
+      'samples': samples,
+      'min_ns': median_ns,
+      'median_ns': median_ns,
+      'mean_ns': median_ns,
+      'p90_ns': median_ns,
+      'max_ns': median_ns,
+      'stdev_ns': stdev_ns,
+  }
+
+
+def _records(run_id, median_ns, stdev_ns=0.0, megabytes_per_second=100.0):
+  return benchmark_history.records(
+      'my_benchmark', [{
+          'lang': 'go',
+          'operation': 'Encrypt',
+          'plaintext_bytes': 64,
+          'latency': _latency(median_ns, stdev_ns),
+          'megabytes_per_second': megabytes_per_second,
+      }],
+      tink_versions={'go': '1.7.0'},
+      run_id=run_id,
+      host='host',
+      timestamp='2026-10-19T00:00:00+00:00')
+
+
+class RecordsTest(absltest.TestCase):
+
+  def test_splits_key_and_metrics(self):
+    record = _records('run', 1000)[0]
+    self.assertEqual(record['benchmark'], 'my_benchmark')
+    self.assertEqual(record['lang'], 'go')
+    self.assertEqual(record['tink_version'], '1.7.0')
+    self.assertEqual(record['key'], {
+        'operation': 'Encrypt',
+        'plaintext_bytes': 64
+    })
+    self.assertEqual(record['metrics']['latency.median_ns'], 1000)
+    self.assertEqual(record['metrics']['latency.samples'], 100)
+    self.assertEqual(record['metrics']['megabytes_per_second'], 100.0)
+
+  def test_host_fingerprint_is_stable(self):
+    fingerprint = benchmark_history.host_fingerprint()
+    self.assertLen(fingerprint['id'], 12)
+    self.assertEqual(benchmark_history.host_fingerprint(), fingerprint)
+
+  def test_history_and_index(self):
+    history_dir = self.create_tempdir().full_path
+    benchmark_history.append_to_history(history_dir, _records('a', 1000))
+    benchmark_history.append_to_history(history_dir, _records('b', 1100))
+    self.assertEqual(
+        sorted(os.listdir(history_dir)), ['index.json', 'my_benchmark.jsonl'])
+    history = benchmark_history.read_records([history_dir])
+    self.assertEqual([r['run_id'] for r in history], ['a', 'b'])
+    runs = benchmark_history.read_index(history_dir)['runs']
+    self.assertEqual([run['run_id'] for run in runs], ['a', 'b'])
+    self.assertEqual(runs[0]['tink_versions'], {'go': '1.7.0'})
+    self.assertEqual(runs[0]['records'], 1)
+    self.assertEqual(runs[0]['host'], {'id': 'host'})
+
+
+def _leakage_records(run_id, max_t, verdict):
+  return benchmark_history.records(
+      'timing_leakage_benchmark', [{
+          'lang': 'python',
+          'operation': 'MAC_VERIFY',
+          'samples': 1000000,
+          'max_t': max_t,
+          'abs_max_t': abs(max_t),
+          'verdict': verdict,
+      }],
+      run_id=run_id,
+      host='host')
+
+
+class CompareTest(absltest.TestCase):
+
+  def _regressions(self, baseline, current, thresholds=None):
+    comparisons, unmatched = benchmark_history.compare(
+        baseline, current, thresholds or benchmark_history.Thresholds())
+    self.assertEmpty(unmatched)
+    return [c.metric for c in comparisons if c.regression]
+
+  def test_detects_regression(self):
+    baseline = _records('a', 1000) + _records('b', 1010)
+    regressions = self._regressions(baseline,
+                                    _records('c', 1500,
+                                             megabytes_per_second=50.0))
+    self.assertIn('latency.median_ns', regressions)
+    self.assertIn('megabytes_per_second', regressions)
+    self.assertNotIn('latency.samples', regressions)
+
+  def test_improvement_is_no_regression(self):
+    self.assertEmpty(
+        self._regressions(
+            _records('a', 1000),
+            _records('b', 500, megabytes_per_second=200.0)))
+
+  def test_noisy_change_is_no_regression(self):
+    baseline = _records('a', 1000) + _records('b', 1400) + _records('c', 700)
+    self.assertNotIn('latency.median_ns',
+                     self._regressions(baseline, _records('d', 1300)))
+
+  def test_standard_error_within_run(self):
+    baseline = _records('a', 1000, stdev_ns=2000)
+    current = _records('b', 1300, stdev_ns=2000)
+    self.assertNotIn('latency.mean_ns', self._regressions(baseline, current))
+    self.assertNotIn('latency.p90_ns', self._regressions(baseline, current))
+    self.assertIn('latency.min_ns', self._regressions(baseline, current))
+
+  def test_thresholds(self):
+    thresholds = benchmark_history.Thresholds.parse(
+        10.0, ['latency.median_ns=50', 'latency.*=40'])
+    self.assertEqual(thresholds.percent('latency.median_ns'), 50)
+    self.assertEqual(thresholds.percent('latency.p90_ns'), 40)
+    self.assertEqual(thresholds.percent('megabytes_per_second'), 10)
+    regressions = self._regressions(
+        _records('a', 1000), _records('b', 1450), thresholds)
+    self.assertNotIn('latency.median_ns', regressions)
+    self.assertIn('latency.p90_ns', regressions)
+
+  def test_invalid_threshold_fails(self):
+    with self.assertRaises(ValueError):
+      benchmark_history.Thresholds.parse(10.0, ['latency.median_ns'])
+
+  def test_worse_verdict_is_a_regression(self):
+    regressions = self._regressions(
+        _leakage_records('a', 4.4, 'no leak found'),
+        _leakage_records('b', -4.6, 'possible leak'))
+    self.assertEqual(regressions, ['verdict'])
+
+  def test_better_verdict_is_no_regression(self):
+    self.assertEmpty(
+        self._regressions(
+            _leakage_records('a', 12.0, 'leak'),
+            _leakage_records('b', 1.0, 'no leak found')))
+
+  def test_abs_max_t_is_compared(self):
+    baseline = _leakage_records('a', 1.0, 'no leak found')
+    within_noise = _leakage_records('b', -3.0, 'no leak found')
+    self.assertEmpty(self._regressions(baseline, within_noise))
+    larger = _leakage_records('c', -9.0, 'possible leak')
+    self.assertEqual(
+        self._regressions(baseline, larger), ['abs_max_t', 'verdict'])
+
+  def test_unmatched(self):
+    current = _records('b', 1000)
+    current[0]['key']['plaintext_bytes'] = 128
+    comparisons, unmatched = benchmark_history.compare(
+        _records('a', 1000), current, benchmark_history.Thresholds())
+    self.assertEmpty(comparisons)
+    self.assertLen(unmatched, 1)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,321 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers to measure and report latencies of the testing servers.
+
+measure_steady adapts the number of calls to the measured operation: servers
+such as the Java server, which compiles hot code while it runs, or the Go
+server, whose garbage collector adapts its pacing, are slower during their
+first calls. So the operation is first called in batches until the throughput
+of the last batches is stable, and then sampled until the confidence interval
+of the median latency is narrow enough. Both phases are bounded, by a number
+of calls and by a time.
+
+The confidence intervals are percentile bootstrap intervals.
+"""
+
+import dataclasses
+import json
+import math
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from absl import logging
+import numpy as np
+
+from cross_language.util import benchmark_history
+
+# The confidence level of the confidence intervals of LatencyStats.
+CONFIDENCE = 0.95
+
+_BOOTSTRAP_RESAMPLES = 1000
+# Bounds the memory of the resampled latencies in bootstrap_ci.
+_MAX_BOOTSTRAP_ELEMENTS = 1 << 22
+
+
+@dataclasses.dataclass(frozen=True)
+class LatencyStats:
+  """Summary statistics of a list of latency samples, in nanoseconds."""
+  samples: int
+  min_ns: int
+  median_ns: float
+  mean_ns: float
+  p90_ns: float
+  max_ns: int
+  stdev_ns: float
+  # The confidence interval of the median, at the CONFIDENCE level.
+  median_ci_low_ns: float
+  median_ci_high_ns: float
+  # The number of unrecorded calls before the samples, and whether their
+  # throughput became stable, see measure_steady.
+  warmup_calls: int = 0
+  steady: bool = True
+
+  def as_dict(self) -> Dict[str, Any]:
+    return dataclasses.asdict(self)
+
+
+def _percentile(sorted_samples: Sequence[int], fraction: float) -> float:
+  """Returns the linearly interpolated percentile of sorted samples."""
+  position = fraction * (len(sorted_samples) - 1)
+  lower = math.floor(position)
+  upper = math.ceil(position)
+  weight = position - lower
+  return (sorted_samples[lower] * (1 - weight) +
+          sorted_samples[upper] * weight)
+
+
+def bootstrap_ci(samples: Sequence[float],
+                 statistic: Callable[..., np.ndarray] = np.median,
+                 confidence: float = CONFIDENCE,
+                 resamples: int = _BOOTSTRAP_RESAMPLES,
+                 seed: int = 0) -> Tuple[float, float]:
+  """Returns the percentile bootstrap confidence interval of a statistic.
+
+  Args:
+    samples: The non-empty samples.
+    statistic: Computes the statistic of each row of a 2-D array, called with
+      the array and axis=1, such as np.median or np.mean.
+    confidence: The confidence level of the interval.
+    resamples: The number of bootstrap resamples.
+    seed: The seed of the resampling, so that the interval is reproducible.
+
+  Returns:
+    The lower and upper bounds of the interval.
+  """
+  values = np.asarray(samples, dtype=np.float64)
+  if values.size == 0:
+    raise ValueError('samples must not be empty')
+  rng = np.random.default_rng(seed)
+  rows_per_chunk = max(1, _MAX_BOOTSTRAP_ELEMENTS // values.size)
+  estimates = []
+  for start in range(0, resamples, rows_per_chunk):
+    rows = min(rows_per_chunk, resamples - start)
+    indices = rng.integers(0, values.size, size=(rows, values.size))
+    estimates.append(statistic(values[indices], axis=1))
+  alpha = (1 - confidence) / 2
+  low, high = np.quantile(np.concatenate(estimates), [alpha, 1 - alpha])
+  return float(low), float(high)
+
+
+def summarize(samples_ns: Sequence[int]) -> LatencyStats:
+  """Computes LatencyStats from a non-empty list of samples."""
+  if not samples_ns:
+    raise ValueError('samples_ns must not be empty')
+  sorted_samples = sorted(samples_ns)
+  median_ci_low_ns, median_ci_high_ns = bootstrap_ci(sorted_samples)
+  return LatencyStats(
+      samples=len(sorted_samples),
+      min_ns=sorted_samples[0],
+      median_ns=statistics.median(sorted_samples),
+      mean_ns=statistics.fmean(sorted_samples),
+      p90_ns=_percentile(sorted_samples, 0.9),
+      max_ns=sorted_samples[-1],
+      stdev_ns=(statistics.stdev(sorted_samples)
+                if len(sorted_samples) > 1 else 0.0),
+      median_ci_low_ns=median_ci_low_ns,
+      median_ci_high_ns=median_ci_high_ns,
+  )
+
+
+def measure(fn: Callable[[], Any], *, warmup: int,
+            repetitions: int) -> LatencyStats:
+  """Measures the latency of fn().
+
+  fn is first called 'warmup' times without recording anything, and then
+  'repetitions' times, timing each call individually. Exceptions raised by fn
+  are propagated.
+
+  Args:
+    fn: The function to measure.
+    warmup: The number of calls before samples are recorded.
+    repetitions: The number of recorded samples, must be positive.
+
+  Returns:
+    The statistics of the recorded samples.
+  """
+  if repetitions <= 0:
+    raise ValueError('repetitions must be positive')
+  for _ in range(warmup):
+    fn()
+  samples = []
+  for _ in range(repetitions):
+    start = time.perf_counter_ns()
+    fn()
+    samples.append(time.perf_counter_ns() - start)
+  return dataclasses.replace(summarize(samples), warmup_calls=warmup)
+
+
+@dataclasses.dataclass(frozen=True)
+class Sampling:
+  """Bounds of the warm-up and of the sampling of measure_steady.
+
+  Attributes:
+    min_warmup: The smallest number of warm-up calls.
+    max_warmup: The largest number of warm-up calls.
+    warmup_batch: The number of calls per warm-up batch.
+    warmup_batches: The number of last batches whose throughput must be
+      stable.
+    warmup_cv_percent: The throughput is stable if the coefficient of
+      variation of the last batches is at most this.
+    min_repetitions: The smallest number of samples.
+    max_repetitions: The largest number of samples.
+    target_ci_percent: Sampling stops when the half-width of the confidence
+      interval of the median is at most this, relative to the median.
+    max_seconds: The largest duration of each phase, which is only exceeded
+      to finish a warm-up batch or to take min_repetitions samples.
+  """
+  min_warmup: int = 10
+  max_warmup: int = 5000
+  warmup_batch: int = 10
+  warmup_batches: int = 3
+  warmup_cv_percent: float = 5.0
+  min_repetitions: int = 30
+  max_repetitions: int = 5000
+  target_ci_percent: float = 2.0
+  max_seconds: float = 5.0
+
+
+def warm_up(fn: Callable[[], Any], sampling: Sampling) -> Tuple[int, bool]:
+  """Calls fn in batches until its throughput is stable.
+
+  Args:
+    fn: The function to call.
+    sampling: The bounds of the warm-up.
+
+  Returns:
+    The number of calls, and whether the throughput became stable before the
+    bounds were reached.
+  """
+  calls = 0
+  throughputs = []
+  deadline = time.monotonic() + sampling.max_seconds
+  while True:
+    start = time.perf_counter_ns()
+    for _ in range(sampling.warmup_batch):
+      fn()
+    throughputs.append(sampling.warmup_batch /
+                       max(1, time.perf_counter_ns() - start))
+    calls += sampling.warmup_batch
+    last = throughputs[-sampling.warmup_batches:]
+    if (calls >= sampling.min_warmup and
+        len(last) == sampling.warmup_batches and
+        100 * statistics.pstdev(last) <=
+        sampling.warmup_cv_percent * statistics.fmean(last)):
+      return calls, True
+    if calls >= sampling.max_warmup or time.monotonic() >= deadline:
+      return calls, False
+
+
+def measure_steady(fn: Callable[[], Any], sampling: Sampling) -> LatencyStats:
+  """Measures the latency of fn() once its throughput is stable.
+
+  fn is called without recording anything until warm_up finds its throughput
+  stable, and then timed individually until the confidence interval of the
+  median latency reaches sampling.target_ci_percent. The number of samples
+  doubles from sampling.min_repetitions until then, or until a bound of
+  sampling is reached. Exceptions raised by fn are propagated.
+
+  Args:
+    fn: The function to measure.
+    sampling: The bounds of the warm-up and the sampling.
+
+  Returns:
+    The statistics of the recorded samples, including the number of warm-up
+    calls and whether the throughput became stable.
+  """
+  if sampling.min_repetitions <= 0:
+    raise ValueError('min_repetitions must be positive')
+  warmup_calls, steady = warm_up(fn, sampling)
+  if not steady:
+    logging.warning('Throughput not stable after %d warm-up calls.',
+                    warmup_calls)
+  samples = []
+  target = sampling.min_repetitions
+  deadline = time.monotonic() + sampling.max_seconds
+  while True:
+    while len(samples) < target and (len(samples) < sampling.min_repetitions
+                                     or time.monotonic() < deadline):
+      start = time.perf_counter_ns()
+      fn()
+      samples.append(time.perf_counter_ns() - start)
+    stats = summarize(samples)
+    half_width = (stats.median_ci_high_ns - stats.median_ci_low_ns) / 2
+    if (100 * half_width <= sampling.target_ci_percent * stats.median_ns or
+        len(samples) >= sampling.max_repetitions or
+        time.monotonic() >= deadline):
+      return dataclasses.replace(
+          stats, warmup_calls=warmup_calls, steady=steady)
+    target = min(2 * len(samples), sampling.max_repetitions)
+
+
+def output_dir() -> str:
+  """Returns the directory into which benchmark reports are written."""
+  if 'TEST_UNDECLARED_OUTPUTS_DIR' in os.environ:
+    return os.environ['TEST_UNDECLARED_OUTPUTS_DIR']
+  raise RuntimeError(
+      'TEST_UNDECLARED_OUTPUTS_DIR environment variable must be set')
+
+
+class Report:
+  """Collects benchmark results and writes them to a JSON file.
+
+  The results are also written as records of benchmark_history, which tag
+  each result with the Tink version of its language and the host.
+  """
+
+  def __init__(self, name: str) -> None:
+    self._name = name
+    self._results: List[Dict[str, Any]] = []
+
+  def add(self, **fields: Any) -> None:
+    """Adds one result. LatencyStats values are expanded into dicts."""
+    result = {}
+    for key, value in fields.items():
+      if isinstance(value, LatencyStats):
+        value = value.as_dict()
+      result[key] = value
+    self._results.append(result)
+
+  def results(self) -> List[Dict[str, Any]]:
+    return list(self._results)
+
+  def write(self, tink_versions: Optional[Dict[str, str]] = None) -> str:
+    """Writes the report and returns the path of the JSON file.
+
+    The records of benchmark_history are written next to it, into a file
+    with the extension .jsonl.
+
+    Args:
+      tink_versions: The Tink version of the server of each language, see
+        testing_servers.tink_versions.
+
+    Returns:
+      The path of the JSON file.
+    """
+    path = os.path.join(output_dir(), '%s.json' % self._name)
+    with open(path, 'w') as f:
+      json.dump({'benchmark': self._name, 'results': self._results}, f,
+                indent=2, sort_keys=True)
+    history_path = os.path.join(output_dir(), '%s.jsonl' % self._name)
+    if os.path.exists(history_path):
+      os.remove(history_path)
+    benchmark_history.write_records(
+        history_path,
+        benchmark_history.records(self._name, self._results,
+                                  tink_versions))
+    logging.info('Wrote %d results of %s to %s', len(self._results),
+                 self._name, path)
+    return path
@@ -0,0 +1,166 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for benchmark_util."""
+
+import json
+import os
+import random
+import time
+from unittest import mock
+
+from absl.testing import absltest
+import numpy as np
+
+from cross_language.util import benchmark_history
+from cross_language.util import benchmark_util
+
+
+class BenchmarkUtilTest(absltest.TestCase):
+
+  def test_summarize(self):
+    stats = benchmark_util.summarize([5, 1, 3, 2, 4])
+    self.assertEqual(stats.samples, 5)
+    self.assertEqual(stats.min_ns, 1)
+    self.assertEqual(stats.max_ns, 5)
+    self.assertEqual(stats.median_ns, 3)
+    self.assertAlmostEqual(stats.mean_ns, 3.0)
+    self.assertAlmostEqual(stats.p90_ns, 4.6)
+
+  def test_summarize_single_sample(self):
+    stats = benchmark_util.summarize([7])
+    self.assertEqual(stats.p90_ns, 7)
+    self.assertEqual(stats.stdev_ns, 0.0)
+
+  def test_summarize_empty_fails(self):
+    with self.assertRaises(ValueError):
+      benchmark_util.summarize([])
+
+  def test_measure_calls_warmup_and_repetitions(self):
+    calls = []
+    stats = benchmark_util.measure(
+        lambda: calls.append(1), warmup=3, repetitions=5)
+    self.assertLen(calls, 8)
+    self.assertEqual(stats.samples, 5)
+
+  def test_measure_propagates_exceptions(self):
+    def fail():
+      raise ValueError('failed')
+
+    with self.assertRaises(ValueError):
+      benchmark_util.measure(fail, warmup=0, repetitions=1)
+
+  def test_summarize_median_ci(self):
+    stats = benchmark_util.summarize(list(range(1000, 2001)))
+    self.assertLess(stats.median_ci_low_ns, stats.median_ns)
+    self.assertGreater(stats.median_ci_high_ns, stats.median_ns)
+    self.assertBetween(stats.median_ci_high_ns - stats.median_ci_low_ns, 40,
+                       120)
+    single = benchmark_util.summarize([7])
+    self.assertEqual((single.median_ci_low_ns, single.median_ci_high_ns),
+                     (7, 7))
+
+  def test_bootstrap_ci_of_mean(self):
+    low, high = benchmark_util.bootstrap_ci(
+        [0.0, 10.0] * 200, statistic=np.mean, resamples=200)
+    self.assertBetween(low, 4.0, 5.0)
+    self.assertBetween(high, 5.0, 6.0)
+
+  def test_bootstrap_ci_empty_fails(self):
+    with self.assertRaises(ValueError):
+      benchmark_util.bootstrap_ci([])
+
+  def test_measure_records_warmup_calls(self):
+    stats = benchmark_util.measure(lambda: None, warmup=3, repetitions=5)
+    self.assertEqual(stats.warmup_calls, 3)
+
+  def test_warm_up_until_stable(self):
+    calls = []
+
+    def fn():
+      calls.append(1)
+      # The first 50 calls are slower, and each one less than the previous.
+      time.sleep(max(1, 50 - len(calls)) * 1e-4)
+
+    sampling = benchmark_util.Sampling(warmup_batch=10, warmup_cv_percent=20)
+    warmup_calls, steady = benchmark_util.warm_up(fn, sampling)
+    self.assertTrue(steady)
+    self.assertGreaterEqual(warmup_calls, 50)
+    self.assertLen(calls, warmup_calls)
+
+  def test_warm_up_bounded(self):
+    # Each call is slower than the previous one.
+    durations = (i * 2e-5 for i in range(1000))
+    sampling = benchmark_util.Sampling(max_warmup=40, warmup_batch=10,
+                                       warmup_cv_percent=1)
+    warmup_calls, steady = benchmark_util.warm_up(
+        lambda: time.sleep(next(durations)), sampling)
+    self.assertFalse(steady)
+    self.assertEqual(warmup_calls, 40)
+
+  def test_measure_steady_samples_until_ci(self):
+    rng = random.Random(0)
+    sampling = benchmark_util.Sampling(
+        min_warmup=0, warmup_cv_percent=100, min_repetitions=10,
+        max_repetitions=10000, target_ci_percent=5, max_seconds=60)
+    stats = benchmark_util.measure_steady(
+        lambda: time.sleep(rng.uniform(0, 2e-4)), sampling)
+    self.assertTrue(stats.steady)
+    self.assertGreater(stats.samples, 10)
+    self.assertLess(stats.samples, 10000)
+    self.assertLessEqual(
+        stats.median_ci_high_ns - stats.median_ci_low_ns,
+        2 * 0.05 * stats.median_ns)
+
+  def test_measure_steady_bounded(self):
+    sampling = benchmark_util.Sampling(
+        min_warmup=0, max_warmup=10, warmup_cv_percent=0, min_repetitions=5,
+        max_repetitions=20, target_ci_percent=0)
+    rng = random.Random(0)
+    stats = benchmark_util.measure_steady(
+        lambda: time.sleep(rng.uniform(0, 1e-4)), sampling)
+    self.assertEqual(stats.samples, 20)
+    self.assertEqual(stats.warmup_calls, 10)
+    self.assertFalse(stats.steady)
+
+  def test_report_write(self):
+    output_dir = self.create_tempdir().full_path
+    report = benchmark_util.Report('my_benchmark')
+    report.add(lang='go', latency=benchmark_util.summarize([1, 2, 3]))
+    with mock.patch.dict(os.environ,
+                         {'TEST_UNDECLARED_OUTPUTS_DIR': output_dir}):
+      path = report.write()
+    self.assertEqual(path, os.path.join(output_dir, 'my_benchmark.json'))
+    with open(path) as f:
+      content = json.load(f)
+    self.assertEqual(content['benchmark'], 'my_benchmark')
+    self.assertEqual(content['results'][0]['lang'], 'go')
+    self.assertEqual(content['results'][0]['latency']['samples'], 3)
+
+  def test_report_write_history_records(self):
+    output_dir = self.create_tempdir().full_path
+    report = benchmark_util.Report('my_benchmark')
+    report.add(lang='go', latency=benchmark_util.summarize([1, 2, 3]))
+    with mock.patch.dict(os.environ,
+                         {'TEST_UNDECLARED_OUTPUTS_DIR': output_dir}):
+      report.write({'go': '1.7.0'})
+      report.write({'go': '1.7.0'})
+    records = benchmark_history.read_records(
+        [os.path.join(output_dir, 'my_benchmark.jsonl')])
+    self.assertLen(records, 1)
+    self.assertEqual(records[0]['tink_version'], '1.7.0')
+    self.assertEqual(records[0]['metrics']['latency.median_ns'], 2)
+
+
+if __name__ == '__main__':
+  absltest.main()
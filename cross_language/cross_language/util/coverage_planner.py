@@ -0,0 +1,142 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Plans which language pairs a cross-language test runs.
+
+Tests in which one language produces an output (a ciphertext, a signature, a
+MAC) which another language consumes would need len(languages)**2 runs per
+test case to try all pairs. This is rarely necessary: if one implementation
+behaves differently, any pair which contains it fails. plan() returns
+(producer, consumer, case) tuples for one of these coverage modes:
+
+  fast: for each case, every language produces once and consumes once. The
+    pairs are rotated between cases, so that different cases use different
+    pairs. Any len(languages) consecutive cases use all pairs, including a
+    language with itself.
+  pairwise: as fast, and additionally every (producer, consumer) pair,
+    including a language with itself, is used for at least one case.
+  exhaustive: all pairs for all cases.
+
+The mode is set with --coverage_mode, which defaults to fast. Since the flags
+are parsed after the parameterized test cases are created, parameterized tests
+are created for all pairs, and is_planned() skips those which are not planned.
+"""
+
+from typing import Callable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from absl import flags
+
+COVERAGE_MODES = ('fast', 'pairwise', 'exhaustive')
+
+_COVERAGE_MODE = flags.DEFINE_enum(
+    'coverage_mode', 'fast', COVERAGE_MODES,
+    'Which language pairs cross-language tests run: fast uses every language '
+    'once as producer and once as consumer per test case, pairwise '
+    'additionally uses every language pair at least once, and exhaustive uses '
+    'all language pairs for all test cases.')
+
+T = TypeVar('T')
+
+
+def coverage_mode() -> str:
+  """Returns the value of --coverage_mode, once the flags are parsed."""
+  return _COVERAGE_MODE.value
+
+
+def plan(
+    languages: Sequence[str],
+    cases: Sequence[T],
+    mode: Optional[str] = None,
+    supported: Optional[Callable[[str, T], bool]] = None
+) -> List[Tuple[str, str, T]]:
+  """Returns the (producer, consumer, case) tuples to test.
+
+  Args:
+    languages: The languages, in the order in which they are paired.
+    cases: The test cases, for example key templates.
+    mode: One of COVERAGE_MODES. Defaults to coverage_mode().
+    supported: Returns whether a language supports a case. By default, all
+      languages support all cases.
+
+  Returns:
+    The tuples, ordered by case.
+  """
+  mode = mode or coverage_mode()
+  if mode not in COVERAGE_MODES:
+    raise ValueError('Unknown coverage mode %s, expected one of %s' %
+                     (mode, COVERAGE_MODES))
+  supported_languages = [
+      [lang for lang in languages if supported is None or supported(lang, case)]
+      for case in cases
+  ]
+  if mode == 'exhaustive':
+    return [(producer, consumer, case)
+            for case, langs in zip(cases, supported_languages)
+            for producer in langs
+            for consumer in langs]
+
+  uncovered: Set[Tuple[str, str]] = set()
+  if mode == 'pairwise':
+    for langs in supported_languages:
+      uncovered.update((p, c) for p in langs for c in langs)
+  tuples = []
+  for k, (case, langs) in enumerate(zip(cases, supported_languages)):
+    if not langs:
+      continue
+    n = len(langs)
+    # Pairing each language with the one `offset` positions later uses every
+    # language once as producer and once as consumer. Offset 0 pairs each
+    # language with itself.
+    offset = (k + 1) % n
+    if uncovered:
+      offset = max(
+          range(n),
+          key=lambda o: (sum((langs[i], langs[(i + o) % n]) in uncovered
+                             for i in range(n)), o == offset))
+    for i in range(n):
+      pair = (langs[i], langs[(i + offset) % n])
+      uncovered.discard(pair)
+      tuples.append((k, pair))
+  # Pairs which are still uncovered are added to the first case which
+  # supports them.
+  for k, langs in enumerate(supported_languages):
+    for producer in langs:
+      for consumer in langs:
+        if (producer, consumer) in uncovered:
+          uncovered.discard((producer, consumer))
+          tuples.append((k, (producer, consumer)))
+  tuples.sort(key=lambda t: t[0])
+  return [(producer, consumer, cases[k]) for k, (producer, consumer) in tuples]
+
+
+def is_planned(
+    languages: Sequence[str],
+    cases: Sequence[T],
+    producer: str,
+    consumer: str,
+    case: T,
+    supported: Optional[Callable[[str, T], bool]] = None) -> bool:
+  """Returns whether plan() contains (producer, consumer, case).
+
+  This is meant to be called in the test methods, after the flags are parsed.
+
+  Args:
+    languages: The languages, as passed to plan().
+    cases: The test cases, as passed to plan().
+    producer: The producing language.
+    consumer: The consuming language.
+    case: One of cases.
+    supported: Returns whether a language supports a case, as passed to plan().
+  """
+  return (producer, consumer, case) in plan(
+      languages, cases, supported=supported)
@@ -0,0 +1,104 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for coverage_planner."""
+
+import collections
+import itertools
+
+from absl.testing import absltest
+from absl.testing import flagsaver
+from absl.testing import parameterized
+from cross_language.util import coverage_planner
+
+_LANGUAGES = ['cc', 'go', 'java', 'python']
+_CASES = ['AES128_GCM', 'AES256_GCM', 'AES128_EAX']
+
+
+class CoveragePlannerTest(parameterized.TestCase):
+
+  def test_fast_single_case_is_a_ring(self):
+    self.assertEqual(
+        coverage_planner.plan(_LANGUAGES, ['AES128_GCM'], 'fast'),
+        [('cc', 'go', 'AES128_GCM'), ('go', 'java', 'AES128_GCM'),
+         ('java', 'python', 'AES128_GCM'), ('python', 'cc', 'AES128_GCM')])
+
+  @parameterized.parameters(*coverage_planner.COVERAGE_MODES)
+  def test_every_language_produces_and_consumes_every_case(self, mode):
+    tuples = coverage_planner.plan(_LANGUAGES, _CASES, mode)
+    for case in _CASES:
+      self.assertCountEqual({p for p, _, c in tuples if c == case}, _LANGUAGES)
+      self.assertCountEqual({c for _, c, t in tuples if t == case}, _LANGUAGES)
+
+  def test_fast_rotates_pairs(self):
+    tuples = coverage_planner.plan(_LANGUAGES, _CASES, 'fast')
+    self.assertLen(tuples, len(_LANGUAGES) * len(_CASES))
+    pairs = {(p, c) for p, c, _ in tuples}
+    # All pairs of different languages.
+    self.assertLen(pairs, len(_LANGUAGES) * (len(_LANGUAGES) - 1))
+
+  def test_fast_uses_all_pairs_over_as_many_cases_as_languages(self):
+    cases = list(range(len(_LANGUAGES)))
+    tuples = coverage_planner.plan(_LANGUAGES, cases, 'fast')
+    self.assertLen(tuples, len(_LANGUAGES) * len(cases))
+    self.assertEqual({(p, c) for p, c, _ in tuples},
+                     set(itertools.product(_LANGUAGES, _LANGUAGES)))
+
+  def test_pairwise_covers_all_pairs(self):
+    tuples = coverage_planner.plan(_LANGUAGES, _CASES, 'pairwise')
+    self.assertEqual({(p, c) for p, c, _ in tuples},
+                     set(itertools.product(_LANGUAGES, _LANGUAGES)))
+    self.assertLess(len(tuples), len(_LANGUAGES)**2 * len(_CASES))
+    # The tuples are ordered by case.
+    self.assertEqual([c for _, _, c in tuples],
+                     sorted((c for _, _, c in tuples), key=_CASES.index))
+
+  def test_exhaustive(self):
+    tuples = coverage_planner.plan(_LANGUAGES, _CASES, 'exhaustive')
+    self.assertCountEqual(
+        tuples,
+        [(p, c, t) for t in _CASES for p in _LANGUAGES for c in _LANGUAGES])
+
+  @parameterized.parameters(*coverage_planner.COVERAGE_MODES)
+  def test_supported(self, mode):
+    supported = {
+        'AES128_GCM': ['cc', 'go', 'java', 'python'],
+        'AES256_GCM': ['java'],
+        'AES128_EAX': [],
+    }
+    tuples = coverage_planner.plan(
+        _LANGUAGES, _CASES, mode, lambda lang, case: lang in supported[case])
+    counts = collections.Counter(c for _, _, c in tuples)
+    self.assertEqual(counts['AES256_GCM'], 1)
+    self.assertNotIn('AES128_EAX', counts)
+    for producer, consumer, case in tuples:
+      self.assertIn(producer, supported[case])
+      self.assertIn(consumer, supported[case])
+
+  @flagsaver.flagsaver(coverage_mode='fast')
+  def test_is_planned(self):
+    tuples = coverage_planner.plan(_LANGUAGES, _CASES, 'fast')
+    for producer, consumer, case in itertools.product(_LANGUAGES, _LANGUAGES,
+                                                      _CASES):
+      self.assertEqual(
+          coverage_planner.is_planned(_LANGUAGES, _CASES, producer, consumer,
+                                      case),
+          (producer, consumer, case) in tuples)
+
+  def test_unknown_mode_fails(self):
+    with self.assertRaises(ValueError):
+      coverage_planner.plan(_LANGUAGES, _CASES, 'all')
+
+
+if __name__ == '__main__':
+  absltest.main()
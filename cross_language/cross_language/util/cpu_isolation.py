@@ -0,0 +1,278 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Restricts the CPUs, the priority and the CPU time of processes.
+
+An Isolation of a process may set:
+
+* cpus: the CPUs on which it runs, set with taskset or sched_setaffinity.
+* nice: its niceness, set with nice or setpriority.
+* cpu_quota: the number of CPUs worth of CPU time it may use, set in the
+  cpu.max of a cgroup v2 for the process.
+
+command_prefix returns a taskset and nice prefix of the command of a process,
+so that all its threads inherit the CPUs and the niceness from the start. apply
+sets them on all threads of a running process, and moves the process into a
+cgroup for its quota. The cgroups are created below a given parent cgroup,
+which must not contain processes itself: cgroup v2 only allows processes in
+the leaves of a subtree in which the cpu controller is enabled. In particular,
+the cgroup of the calling process cannot be the parent. For a process started
+with command_prefix, apply without_prefix(isolation), which leaves out what the
+prefix already sets, since nice is relative to the niceness at the time it
+runs. Settings which cannot be applied, for example because the cgroup v2 CPU
+controller is not delegated to the user, are logged and skipped.
+"""
+
+import dataclasses
+import os
+import shutil
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+from absl import logging
+
+_PROC_ROOT = '/proc'
+_SYS_CPU_ROOT = '/sys/devices/system/cpu'
+_CPU_MAX_PERIOD_US = 100000
+
+
+def parse_cpu_list(cpu_list: str) -> FrozenSet[int]:
+  """Parses a CPU list such as '0-3,8', as used by taskset and cpusets."""
+  cpus = set()
+  for part in cpu_list.split(','):
+    first, sep, last = part.partition('-')
+    try:
+      first, last = int(first), int(last if sep else first)
+    except ValueError as e:
+      raise ValueError('invalid CPU list %r' % cpu_list) from e
+    if first < 0 or last < first:
+      raise ValueError('invalid CPU list %r' % cpu_list)
+    cpus.update(range(first, last + 1))
+  if not cpus:
+    raise ValueError('invalid CPU list %r' % cpu_list)
+  return frozenset(cpus)
+
+
+def format_cpu_list(cpus: Iterable[int]) -> str:
+  """Formats CPUs as a CPU list such as '0-3,8'."""
+  ranges = []
+  for cpu in sorted(cpus):
+    if ranges and ranges[-1][1] == cpu - 1:
+      ranges[-1][1] = cpu
+    else:
+      ranges.append([cpu, cpu])
+  return ','.join(
+      str(first) if first == last else '%d-%d' % (first, last)
+      for first, last in ranges)
+
+
+@dataclasses.dataclass(frozen=True)
+class Isolation:
+  """How a process is isolated. None means not restricted."""
+  cpus: Optional[FrozenSet[int]] = None
+  nice: Optional[int] = None
+  cpu_quota: Optional[float] = None
+
+
+def _entries(spec: str, separator: str,
+             names: Sequence[str]) -> Dict[str, str]:
+  entries = {}
+  for entry in spec.split(separator):
+    if not entry:
+      continue
+    name, sep, value = entry.partition('=')
+    if not sep or name not in names:
+      raise ValueError('invalid entry %r, expected <name>=<value> with a name '
+                       'in %s' % (entry, list(names)))
+    entries[name] = value
+  return entries
+
+
+def parse(cpus: str, nice: str, cpu_quota: str,
+          names: Sequence[str]) -> Dict[str, Isolation]:
+  """Parses the isolation of named processes.
+
+  Args:
+    cpus: CPU lists separated by semicolons, such as 'harness=0;java=1-2,5'.
+    nice: Niceness values separated by commas, such as 'java=5,go=5'.
+    cpu_quota: CPU quotas separated by commas, such as 'java=1.5,go=1'.
+    names: The valid names of processes.
+
+  Returns:
+    The isolation of each process with a setting.
+  """
+  cpus_entries = _entries(cpus, ';', names)
+  nice_entries = _entries(nice, ',', names)
+  quota_entries = _entries(cpu_quota, ',', names)
+  isolations = {}
+  for name in names:
+    if (name not in cpus_entries and name not in nice_entries and
+        name not in quota_entries):
+      continue
+    quota = (float(quota_entries[name]) if name in quota_entries else None)
+    if quota is not None and quota <= 0:
+      raise ValueError('CPU quota of %s must be positive' % name)
+    isolations[name] = Isolation(
+        cpus=(parse_cpu_list(cpus_entries[name])
+              if name in cpus_entries else None),
+        nice=int(nice_entries[name]) if name in nice_entries else None,
+        cpu_quota=quota)
+  return isolations
+
+
+def command_prefix(isolation: Isolation) -> List[str]:
+  """Returns a prefix of a command which applies cpus and nice, if possible."""
+  prefix = []
+  if isolation.cpus is not None and shutil.which('taskset'):
+    prefix.extend(['taskset', '--cpu-list', format_cpu_list(isolation.cpus)])
+  if isolation.nice is not None and shutil.which('nice'):
+    # nice adds to the niceness of this process.
+    increment = isolation.nice - os.getpriority(os.PRIO_PROCESS, 0)
+    prefix.extend(['nice', '-n', str(increment)])
+  return prefix
+
+
+def without_prefix(isolation: Isolation) -> Isolation:
+  """Returns the part of isolation which command_prefix does not apply."""
+  return dataclasses.replace(
+      isolation,
+      cpus=None if shutil.which('taskset') else isolation.cpus,
+      nice=None if shutil.which('nice') else isolation.nice)
+
+
+def _threads(pid: int, proc_root: str = _PROC_ROOT) -> List[int]:
+  try:
+    return [int(tid) for tid in os.listdir(
+        os.path.join(proc_root, str(pid), 'task'))]
+  except OSError:
+    return [pid]
+
+
+def _create_cgroup(parent: str, name: str, cpu_quota: float) -> str:
+  """Creates a cgroup with a CPU quota below parent, and returns its path."""
+  with open(os.path.join(parent, 'cgroup.controllers')) as f:
+    if 'cpu' not in f.read().split():
+      raise OSError('the cpu controller is not available in %s' % parent)
+  with open(os.path.join(parent, 'cgroup.procs')) as f:
+    if f.read().strip():
+      # Enabling the cpu controller for the children would fail with EBUSY.
+      raise OSError('%s contains processes, so the cpu controller cannot be '
+                    'enabled for its children' % parent)
+  with open(os.path.join(parent, 'cgroup.subtree_control')) as f:
+    enabled = 'cpu' in f.read().split()
+  if not enabled:
+    with open(os.path.join(parent, 'cgroup.subtree_control'), 'w') as f:
+      f.write('+cpu')
+  path = os.path.join(parent, name)
+  os.makedirs(path, exist_ok=True)
+  with open(os.path.join(path, 'cpu.max'), 'w') as f:
+    f.write('%d %d' % (round(cpu_quota * _CPU_MAX_PERIOD_US),
+                       _CPU_MAX_PERIOD_US))
+  return path
+
+
+def apply(name: str,
+          pid: int,
+          isolation: Isolation,
+          cgroup_parent: Optional[str] = None) -> Optional[str]:
+  """Applies isolation to all threads of a running process.
+
+  Args:
+    name: The name of the process, used in the name of its cgroup.
+    pid: The process ID.
+    isolation: The isolation of the process.
+    cgroup_parent: The cgroup v2 directory without processes in which the
+      cgroup for the CPU quota is created. Required for a CPU quota.
+
+  Returns:
+    The path of the cgroup that the process was moved into, if any.
+
+  Raises:
+    ValueError: If isolation has a CPU quota, but cgroup_parent is not set.
+  """
+  if isolation.cpu_quota is not None and cgroup_parent is None:
+    raise ValueError('the CPU quota of %s needs a cgroup parent' % name)
+  for tid in _threads(pid):
+    try:
+      if isolation.cpus is not None:
+        os.sched_setaffinity(tid, isolation.cpus)
+      if isolation.nice is not None:
+        os.setpriority(os.PRIO_PROCESS, tid, isolation.nice)
+    except ProcessLookupError:
+      # The thread exited.
+      continue
+    except (AttributeError, OSError) as e:
+      # sched_setaffinity is not available on all systems.
+      logging.warning('Could not set the CPUs or niceness of %s: %s', name, e)
+      break
+  if isolation.cpu_quota is None:
+    return None
+  try:
+    path = _create_cgroup(cgroup_parent, 'tink-%s-%d' % (name, pid),
+                          isolation.cpu_quota)
+    with open(os.path.join(path, 'cgroup.procs'), 'w') as f:
+      f.write(str(pid))
+    return path
+  except OSError as e:
+    logging.warning('The CPU quota of %s is not applied: %s', name, e)
+    return None
+
+
+def remove_cgroup(path: str) -> None:
+  """Removes a cgroup created by apply, after its processes exited."""
+  try:
+    os.rmdir(path)
+  except OSError as e:
+    logging.warning('Could not remove cgroup %s: %s', path, e)
+
+
+def state(pid: int, cgroup: Optional[str] = None) -> Dict[str, Any]:
+  """Returns the CPUs, the niceness and the CPU quota of a process."""
+  result = {}
+  try:
+    result['nice'] = os.getpriority(os.PRIO_PROCESS, pid)
+    result['cpus'] = format_cpu_list(os.sched_getaffinity(pid))
+  except (AttributeError, OSError):
+    # sched_getaffinity is not available on all systems.
+    pass
+  if cgroup is not None:
+    result['cgroup'] = cgroup
+    try:
+      with open(os.path.join(cgroup, 'cpu.max')) as f:
+        result['cpu_max'] = f.read().strip()
+    except OSError:
+      pass
+  return result
+
+
+def topology(sys_cpu_root: str = _SYS_CPU_ROOT) -> Dict[str, Any]:
+  """Returns the online CPUs, and the core and package of each."""
+  result = {'cpu_count': os.cpu_count()}
+  try:
+    with open(os.path.join(sys_cpu_root, 'online')) as f:
+      online = parse_cpu_list(f.read().strip())
+  except (OSError, ValueError):
+    return result
+  result['online'] = format_cpu_list(online)
+  cpus = {}
+  for cpu in sorted(online):
+    cpu_topology = {}
+    for field in ('core_id', 'physical_package_id'):
+      try:
+        with open(os.path.join(sys_cpu_root, 'cpu%d' % cpu, 'topology',
+                               field)) as f:
+          cpu_topology[field] = int(f.read())
+      except (OSError, ValueError):
+        pass
+    cpus[str(cpu)] = cpu_topology
+  result['cpus'] = cpus
+  return result
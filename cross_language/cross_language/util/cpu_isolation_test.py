@@ -0,0 +1,151 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for cpu_isolation."""
+
+import os
+from unittest import mock
+
+from absl.testing import absltest
+
+from cross_language.util import cpu_isolation
+
+_NAMES = ['harness', 'java', 'go']
+
+
+class CpuListTest(absltest.TestCase):
+
+  def test_parse_and_format(self):
+    cpus = cpu_isolation.parse_cpu_list('0-3,8,10-11')
+    self.assertEqual(cpus, frozenset([0, 1, 2, 3, 8, 10, 11]))
+    self.assertEqual(cpu_isolation.format_cpu_list(cpus), '0-3,8,10-11')
+    self.assertEqual(cpu_isolation.format_cpu_list([5]), '5')
+
+  def test_parse_invalid_fails(self):
+    for cpu_list in ('', 'a', '1-', '3-1', '-1'):
+      with self.assertRaises(ValueError):
+        cpu_isolation.parse_cpu_list(cpu_list)
+
+
+class ParseTest(absltest.TestCase):
+
+  def test_parse(self):
+    isolations = cpu_isolation.parse('harness=0;java=1-2,5', 'java=5,go=10',
+                                     'go=1.5', _NAMES)
+    self.assertEqual(
+        isolations, {
+            'harness': cpu_isolation.Isolation(cpus=frozenset([0])),
+            'java': cpu_isolation.Isolation(cpus=frozenset([1, 2, 5]),
+                                            nice=5),
+            'go': cpu_isolation.Isolation(nice=10, cpu_quota=1.5),
+        })
+    self.assertEqual(cpu_isolation.parse('', '', '', _NAMES), {})
+
+  def test_parse_invalid_fails(self):
+    for cpus, nice, cpu_quota in (('cc=1', '', ''), ('java', '', ''),
+                                  ('', 'java=x', ''), ('', '', 'go=0')):
+      with self.assertRaises(ValueError):
+        cpu_isolation.parse(cpus, nice, cpu_quota, _NAMES)
+
+
+class ApplyTest(absltest.TestCase):
+
+  def test_command_prefix(self):
+    isolation = cpu_isolation.Isolation(
+        cpus=frozenset([1, 2]), nice=os.getpriority(os.PRIO_PROCESS, 0) + 5)
+    with mock.patch.object(cpu_isolation.shutil, 'which', return_value='/bin'):
+      self.assertEqual(
+          cpu_isolation.command_prefix(isolation),
+          ['taskset', '--cpu-list', '1-2', 'nice', '-n', '5'])
+    with mock.patch.object(cpu_isolation.shutil, 'which', return_value=None):
+      self.assertEmpty(cpu_isolation.command_prefix(isolation))
+    self.assertEmpty(
+        cpu_isolation.command_prefix(cpu_isolation.Isolation()))
+
+  def test_without_prefix(self):
+    isolation = cpu_isolation.Isolation(cpus=frozenset([1]), nice=5,
+                                        cpu_quota=1)
+    with mock.patch.object(cpu_isolation.shutil, 'which', return_value='/bin'):
+      self.assertEqual(
+          cpu_isolation.without_prefix(isolation),
+          cpu_isolation.Isolation(cpu_quota=1))
+    with mock.patch.object(cpu_isolation.shutil, 'which', return_value=None):
+      self.assertEqual(cpu_isolation.without_prefix(isolation), isolation)
+
+  def test_apply_affinity_to_own_process(self):
+    cpus = frozenset(os.sched_getaffinity(0))
+    self.assertIsNone(
+        cpu_isolation.apply('harness', os.getpid(),
+                            cpu_isolation.Isolation(cpus=cpus)))
+    self.assertEqual(os.sched_getaffinity(0), cpus)
+    self.assertEqual(
+        cpu_isolation.state(os.getpid())['cpus'],
+        cpu_isolation.format_cpu_list(cpus))
+
+  def test_apply_cpu_quota_in_cgroup(self):
+    parent = self.create_tempdir()
+    parent.create_file('cgroup.controllers', 'cpuset cpu memory')
+    parent.create_file('cgroup.subtree_control', '')
+    parent.create_file('cgroup.procs', '')
+    cgroup = cpu_isolation.apply('go', 1234,
+                                 cpu_isolation.Isolation(cpu_quota=1.5),
+                                 parent.full_path)
+    self.assertEqual(cgroup, os.path.join(parent.full_path, 'tink-go-1234'))
+    with open(os.path.join(parent.full_path, 'cgroup.subtree_control')) as f:
+      self.assertEqual(f.read(), '+cpu')
+    with open(os.path.join(cgroup, 'cgroup.procs')) as f:
+      self.assertEqual(f.read(), '1234')
+    self.assertEqual(cpu_isolation.state(os.getpid(), cgroup)['cpu_max'],
+                     '150000 100000')
+
+  def test_cpu_quota_without_controller_is_skipped(self):
+    parent = self.create_tempdir()
+    parent.create_file('cgroup.controllers', 'memory')
+    self.assertIsNone(
+        cpu_isolation.apply('go', 1234, cpu_isolation.Isolation(cpu_quota=1),
+                            parent.full_path))
+
+  def test_cpu_quota_in_cgroup_with_processes_is_skipped(self):
+    parent = self.create_tempdir()
+    parent.create_file('cgroup.controllers', 'cpu')
+    parent.create_file('cgroup.subtree_control', '')
+    parent.create_file('cgroup.procs', '42\n')
+    self.assertIsNone(
+        cpu_isolation.apply('go', 1234, cpu_isolation.Isolation(cpu_quota=1),
+                            parent.full_path))
+    with open(os.path.join(parent.full_path, 'cgroup.subtree_control')) as f:
+      self.assertEmpty(f.read())
+
+  def test_cpu_quota_without_cgroup_parent_fails(self):
+    with self.assertRaises(ValueError):
+      cpu_isolation.apply('go', 1234, cpu_isolation.Isolation(cpu_quota=1))
+
+
+class TopologyTest(absltest.TestCase):
+
+  def test_topology(self):
+    root = self.create_tempdir()
+    root.create_file('online', '0-1\n')
+    for cpu, core_id in ((0, 0), (1, 0)):
+      root.create_file('cpu%d/topology/core_id' % cpu, '%d\n' % core_id)
+      root.create_file('cpu%d/topology/physical_package_id' % cpu, '0\n')
+    topology = cpu_isolation.topology(root.full_path)
+    self.assertEqual(topology['online'], '0-1')
+    self.assertEqual(topology['cpus']['1'], {
+        'core_id': 0,
+        'physical_package_id': 0
+    })
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,441 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A mutation-based differential fuzzer for the testing servers.
+
+A FuzzTarget describes one kind of input, for example ciphertexts of a fixed
+AEAD keyset, together with seed inputs and a function which runs an input in a
+given language. The DifferentialFuzzer mutates inputs from its corpus, runs
+each mutant in all languages concurrently and flags a disagreement whenever
+the languages do not all accept or all reject the mutant, or when they accept
+it with different outputs.
+
+Since the servers report no coverage, a mutant is added to the corpus when the
+combination of the outcomes in all languages has not been seen before for
+inputs of about its length. It is first minimized, keeping that combination
+and length class. Disagreeing mutants are minimized and written to disk,
+unless a disagreement with the same outcomes was found before.
+"""
+
+import base64
+import concurrent.futures
+import dataclasses
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from absl import logging
+import tink
+
+# Inputs which often hit edge cases of length and integer handling.
+_INTERESTING_BYTES = (0x00, 0x01, 0x7F, 0x80, 0xFF)
+
+_MAX_INPUT_SIZE = 1 << 16
+
+# Predicate calls spent on minimizing an input before adding it to the corpus.
+# Disagreements get the default of minimize, since they are rare.
+_MAX_CORPUS_MINIMIZATION_ATTEMPTS = 100
+
+
+class Outcome(NamedTuple):
+  """The result of running an input in one language.
+
+  Attributes:
+    accepted: Whether the input was accepted.
+    output: The output for accepted inputs, for example the plaintext. It is
+      compared across languages. None if the target has no output.
+  """
+  accepted: bool
+  output: Optional[bytes] = None
+
+
+# Runs an input in the given language.
+RunFn = Callable[[str, bytes], Outcome]
+
+
+@dataclasses.dataclass(frozen=True)
+class FuzzTarget:
+  """An input format and the way to run it in each language.
+
+  Attributes:
+    name: Used in reports and as directory name of the corpus.
+    seeds: Valid inputs the mutations start from.
+    run: Runs an input in a language.
+    languages: The languages which are compared.
+  """
+  name: str
+  seeds: Sequence[bytes]
+  run: RunFn
+  languages: Sequence[str]
+
+
+def run_expecting_tink_error(fn: Callable[[], Optional[bytes]]) -> Outcome:
+  """Runs fn and maps a tink.TinkError to a rejected Outcome."""
+  try:
+    return Outcome(accepted=True, output=fn())
+  except tink.TinkError:
+    return Outcome(accepted=False)
+
+
+def _flip_bit(rand: random.Random, data: bytes) -> bytes:
+  if not data:
+    return bytes([rand.randrange(256)])
+  position = rand.randrange(len(data) * 8)
+  mutated = bytearray(data)
+  mutated[position // 8] ^= 1 << (position % 8)
+  return bytes(mutated)
+
+
+def _set_interesting_byte(rand: random.Random, data: bytes) -> bytes:
+  if not data:
+    return bytes([rand.choice(_INTERESTING_BYTES)])
+  mutated = bytearray(data)
+  mutated[rand.randrange(len(data))] = rand.choice(_INTERESTING_BYTES)
+  return bytes(mutated)
+
+
+def _truncate(rand: random.Random, data: bytes) -> bytes:
+  return data[:rand.randrange(len(data) + 1)]
+
+
+def _insert_random_bytes(rand: random.Random, data: bytes) -> bytes:
+  position = rand.randrange(len(data) + 1)
+  inserted = bytes(rand.randrange(256) for _ in range(rand.randint(1, 8)))
+  return data[:position] + inserted + data[position:]
+
+
+def _delete_range(rand: random.Random, data: bytes) -> bytes:
+  if not data:
+    return data
+  start = rand.randrange(len(data))
+  end = rand.randint(start + 1, min(len(data), start + 16))
+  return data[:start] + data[end:]
+
+
+def _duplicate_range(rand: random.Random, data: bytes) -> bytes:
+  if not data:
+    return data
+  start = rand.randrange(len(data))
+  end = rand.randint(start + 1, min(len(data), start + 16))
+  return data[:end] + data[start:end] + data[end:]
+
+
+def _mutate_base64url_segment(rand: random.Random, data: bytes) -> bytes:
+  """Mutates the decoded content of one '.'-separated base64url segment.
+
+  This reaches the payloads of compact JWTs, which byte-level mutations of the
+  encoding mostly turn into invalid base64.
+
+  Args:
+    rand: The random number generator.
+    data: The input.
+
+  Returns:
+    The mutated input, or data itself if the segment is not base64url.
+  """
+  segments = data.split(b'.')
+  index = rand.randrange(len(segments))
+  try:
+    decoded = base64.urlsafe_b64decode(segments[index] + b'==')
+  except ValueError:
+    return data
+  mutated = _BYTE_MUTATORS[rand.randrange(len(_BYTE_MUTATORS))](rand, decoded)
+  segments[index] = base64.urlsafe_b64encode(mutated).rstrip(b'=')
+  return b'.'.join(segments)
+
+
+_BYTE_MUTATORS = (
+    _flip_bit,
+    _set_interesting_byte,
+    _truncate,
+    _insert_random_bytes,
+    _delete_range,
+    _duplicate_range,
+)
+
+MUTATORS = _BYTE_MUTATORS + (_mutate_base64url_segment,)
+
+
+def mutate(rand: random.Random, data: bytes,
+           corpus: Sequence[bytes] = ()) -> bytes:
+  """Applies between one and four random mutations to data.
+
+  Args:
+    rand: The random number generator.
+    data: The input to mutate.
+    corpus: Other inputs. With a small probability, the mutant is spliced
+      together with one of them.
+
+  Returns:
+    The mutant, at most _MAX_INPUT_SIZE bytes long.
+  """
+  if corpus and rand.random() < 0.1:
+    other = rand.choice(corpus)
+    data = (data[:rand.randrange(len(data) + 1)] +
+            other[rand.randrange(len(other) + 1):])
+  for _ in range(rand.randint(1, 4)):
+    data = MUTATORS[rand.randrange(len(MUTATORS))](rand, data)
+  return data[:_MAX_INPUT_SIZE]
+
+
+def minimize(data: bytes, predicate: Callable[[bytes], bool],
+             max_attempts: int = 1000) -> bytes:
+  """Returns a small input for which predicate still holds.
+
+  First removes chunks of halving size, then replaces single bytes with 0, in
+  the spirit of delta debugging.
+
+  Args:
+    data: An input for which predicate(data) is True.
+    predicate: The property to preserve, for example a disagreement.
+    max_attempts: The maximal number of predicate calls.
+
+  Returns:
+    The minimized input.
+  """
+  attempts = 0
+  chunk_size = max(len(data) // 2, 1)
+  while chunk_size >= 1 and attempts < max_attempts:
+    position = 0
+    while position < len(data) and attempts < max_attempts:
+      candidate = data[:position] + data[position + chunk_size:]
+      attempts += 1
+      if predicate(candidate):
+        data = candidate
+      else:
+        position += chunk_size
+    if chunk_size == 1:
+      break
+    chunk_size //= 2
+  for position in range(len(data)):
+    if attempts >= max_attempts:
+      break
+    if data[position] == 0:
+      continue
+    candidate = data[:position] + b'\x00' + data[position + 1:]
+    attempts += 1
+    if predicate(candidate):
+      data = candidate
+  return data
+
+
+def is_disagreement(outcomes: Dict[str, Outcome]) -> bool:
+  """Returns true if the languages did not all behave the same way."""
+  accepted = {outcome.accepted for outcome in outcomes.values()}
+  if len(accepted) > 1:
+    return True
+  outputs = {outcome.output for outcome in outcomes.values()
+             if outcome.accepted}
+  return len(outputs) > 1
+
+
+@dataclasses.dataclass
+class FuzzStats:
+  """Statistics of a fuzzing run.
+
+  Attributes:
+    target: The name of the target.
+    inputs: The number of inputs run in all languages.
+    executions: The number of single-language executions of the mutants,
+      without those of the minimization.
+    seconds: The duration of the run.
+    corpus_size: The number of inputs in the corpus at the end of the run.
+    disagreements: The paths of the written disagreements.
+  """
+  target: str
+  inputs: int = 0
+  executions: int = 0
+  seconds: float = 0.0
+  corpus_size: int = 0
+  disagreements: List[str] = dataclasses.field(default_factory=list)
+
+  @property
+  def inputs_per_second(self) -> float:
+    return self.inputs / self.seconds if self.seconds else 0.0
+
+  @property
+  def executions_per_second(self) -> float:
+    return self.executions / self.seconds if self.seconds else 0.0
+
+  def as_dict(self) -> Dict[str, object]:
+    result = dataclasses.asdict(self)
+    result['inputs_per_second'] = self.inputs_per_second
+    result['executions_per_second'] = self.executions_per_second
+    return result
+
+
+def _outcome_signature(outcomes: Dict[str, Outcome]) -> Tuple[object, ...]:
+  """Summarizes outcomes so that equal behaviour has an equal signature."""
+  return tuple(
+      (lang, outcome.accepted, outcome.output is not None)
+      for lang, outcome in sorted(outcomes.items()))
+
+
+def _corpus_signature(data: bytes,
+                      outcomes: Dict[str, Outcome]) -> Tuple[object, ...]:
+  """The outcomes and the length class which make an input new to a corpus."""
+  return (_outcome_signature(outcomes), len(data).bit_length())
+
+
+def _file_name(data: bytes) -> str:
+  return hashlib.sha256(data).hexdigest()[:32]
+
+
+class DifferentialFuzzer:
+  """Runs mutants of a FuzzTarget in all its languages and compares them."""
+
+  def __init__(self,
+               target: FuzzTarget,
+               corpus_dir: str,
+               seed: Optional[int] = None,
+               max_workers: int = 16) -> None:
+    """Creates a fuzzer and loads the corpus of the target from disk.
+
+    Args:
+      target: The target to fuzz.
+      corpus_dir: The corpus is kept in corpus_dir/<target name>, and the
+        disagreements in corpus_dir/<target name>/disagreements.
+      seed: The seed of the random number generator.
+      max_workers: The number of concurrent executions. Mutants are run in
+        batches of max_workers // len(target.languages) inputs.
+    """
+    self._target = target
+    self._rand = random.Random(seed)
+    self._max_workers = max_workers
+    self._corpus_dir = os.path.join(corpus_dir, target.name)
+    self._disagreements_dir = os.path.join(self._corpus_dir, 'disagreements')
+    os.makedirs(self._disagreements_dir, exist_ok=True)
+    self._corpus: List[bytes] = list(target.seeds)
+    self._signatures = set()
+    self._known_disagreements = set()
+    for file_name in sorted(os.listdir(self._corpus_dir)):
+      path = os.path.join(self._corpus_dir, file_name)
+      if os.path.isfile(path):
+        with open(path, 'rb') as f:
+          self._corpus.append(f.read())
+    if not self._corpus:
+      raise ValueError('target %s has no seeds' % target.name)
+
+  def corpus(self) -> List[bytes]:
+    return list(self._corpus)
+
+  def _run_all(self, executor: concurrent.futures.Executor,
+               inputs: Sequence[bytes]) -> List[Dict[str, Outcome]]:
+    """Runs each input in all languages, all concurrently."""
+    futures = [{
+        lang: executor.submit(self._target.run, lang, data)
+        for lang in self._target.languages
+    } for data in inputs]
+    return [{lang: future.result() for lang, future in by_lang.items()}
+            for by_lang in futures]
+
+  def _run_one(self, executor: concurrent.futures.Executor,
+               data: bytes) -> Dict[str, Outcome]:
+    return self._run_all(executor, [data])[0]
+
+  def _write_disagreement(self, executor: concurrent.futures.Executor,
+                          data: bytes,
+                          outcomes: Dict[str, Outcome]) -> Optional[str]:
+    """Minimizes and writes a disagreement, unless it is already known."""
+    signature = _outcome_signature(outcomes)
+    # Checked before minimizing, which costs up to 1000 runs of the input.
+    if signature in self._known_disagreements:
+      return None
+    self._known_disagreements.add(signature)
+    # The minimized input keeps the outcomes, so it is the same disagreement.
+    minimized = minimize(
+        data, lambda candidate: _outcome_signature(
+            self._run_one(executor, candidate)) == signature)
+    outcomes = self._run_one(executor, minimized)
+    path = os.path.join(self._disagreements_dir, _file_name(minimized))
+    with open(path, 'wb') as f:
+      f.write(minimized)
+    with open(path + '.json', 'w') as f:
+      json.dump({
+          'target': self._target.name,
+          'input_hex': minimized.hex(),
+          'outcomes': {
+              lang: {
+                  'accepted': outcome.accepted,
+                  'output_hex': (outcome.output.hex()
+                                 if outcome.output is not None else None),
+              } for lang, outcome in outcomes.items()
+          },
+      }, f, indent=2, sort_keys=True)
+    logging.warning('Disagreement in %s: %s', self._target.name, path)
+    return path
+
+  def _add_to_corpus(self, executor: concurrent.futures.Executor, data: bytes,
+                     signature: Tuple[object, ...]) -> None:
+    """Minimizes data, keeping its corpus signature, and adds it."""
+    data = minimize(
+        data, lambda candidate: _corpus_signature(
+            candidate, self._run_one(executor, candidate)) == signature,
+        _MAX_CORPUS_MINIMIZATION_ATTEMPTS)
+    self._corpus.append(data)
+    with open(os.path.join(self._corpus_dir, _file_name(data)), 'wb') as f:
+      f.write(data)
+
+  def run(self,
+          max_inputs: Optional[int] = None,
+          max_seconds: Optional[float] = None) -> FuzzStats:
+    """Fuzzes until max_inputs inputs were run or max_seconds passed.
+
+    Args:
+      max_inputs: The maximal number of inputs to run.
+      max_seconds: The maximal duration of the run.
+
+    Returns:
+      The statistics of the run.
+    """
+    if max_inputs is None and max_seconds is None:
+      raise ValueError('max_inputs or max_seconds must be set')
+    stats = FuzzStats(target=self._target.name)
+    batch_size = max(self._max_workers // len(self._target.languages), 1)
+    start = time.monotonic()
+    with concurrent.futures.ThreadPoolExecutor(self._max_workers) as executor:
+      while True:
+        if max_inputs is not None and stats.inputs >= max_inputs:
+          break
+        if (max_seconds is not None and
+            time.monotonic() - start >= max_seconds):
+          break
+        count = batch_size
+        if max_inputs is not None:
+          count = min(count, max_inputs - stats.inputs)
+        mutants = [
+            mutate(self._rand, self._rand.choice(self._corpus), self._corpus)
+            for _ in range(count)
+        ]
+        for mutant, outcomes in zip(mutants,
+                                    self._run_all(executor, mutants)):
+          stats.inputs += 1
+          stats.executions += len(outcomes)
+          if is_disagreement(outcomes):
+            path = self._write_disagreement(executor, mutant, outcomes)
+            if path is not None:
+              stats.disagreements.append(path)
+            continue
+          signature = _corpus_signature(mutant, outcomes)
+          if signature not in self._signatures:
+            self._signatures.add(signature)
+            self._add_to_corpus(executor, mutant, signature)
+    stats.seconds = time.monotonic() - start
+    stats.corpus_size = len(self._corpus)
+    logging.info('Fuzzed %s: %d inputs, %.1f inputs/s, %d disagreements',
+                 stats.target, stats.inputs, stats.inputs_per_second,
+                 len(stats.disagreements))
+    return stats
@@ -0,0 +1,178 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for differential_fuzzer."""
+
+import json
+import os
+from unittest import mock
+import random
+
+from absl.testing import absltest
+from absl.testing import parameterized
+import tink
+from cross_language.util import differential_fuzzer
+
+
+def _accept_all(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+  del lang
+  return differential_fuzzer.Outcome(accepted=True, output=data)
+
+
+def _disagree_on_x(lang: str, data: bytes) -> differential_fuzzer.Outcome:
+  # 'b' wrongly accepts every input which contains an 'x'.
+  accepted = data.startswith(b'valid') or (lang == 'b' and b'x' in data)
+  return differential_fuzzer.Outcome(accepted=accepted)
+
+
+class DifferentialFuzzerTest(parameterized.TestCase):
+
+  @parameterized.parameters(
+      (mutator,) for mutator in differential_fuzzer.MUTATORS)
+  def test_mutators_are_deterministic(self, mutator):
+    data = b'abc.ZGVm.ghi'
+    self.assertEqual(
+        mutator(random.Random(1), data), mutator(random.Random(1), data))
+
+  @parameterized.parameters(
+      (mutator,) for mutator in differential_fuzzer.MUTATORS)
+  def test_mutators_handle_empty_input(self, mutator):
+    self.assertIsInstance(mutator(random.Random(1), b''), bytes)
+
+  def test_mutate_changes_input(self):
+    rand = random.Random(0)
+    data = b'0123456789abcdef'
+    mutants = {differential_fuzzer.mutate(rand, data) for _ in range(100)}
+    self.assertGreater(len(mutants), 50)
+
+  def test_mutate_base64url_segment_keeps_other_segments(self):
+    rand = random.Random(3)
+    mutant = differential_fuzzer._mutate_base64url_segment(rand, b'YWJj')
+    self.assertNotIn(b'.', mutant)
+
+  def test_minimize(self):
+    data = b'aaaa x bbbbbbbbbbbbbbbbbbbb'
+    minimized = differential_fuzzer.minimize(data, lambda d: b'x' in d)
+    self.assertEqual(minimized, b'x')
+
+  def test_minimize_respects_max_attempts(self):
+    calls = []
+
+    def predicate(data):
+      calls.append(data)
+      return False
+
+    differential_fuzzer.minimize(b'a' * 100, predicate, max_attempts=5)
+    self.assertLen(calls, 5)
+
+  def test_is_disagreement(self):
+    outcome = differential_fuzzer.Outcome
+    self.assertFalse(differential_fuzzer.is_disagreement(
+        {'a': outcome(False), 'b': outcome(False)}))
+    self.assertFalse(differential_fuzzer.is_disagreement(
+        {'a': outcome(True, b'1'), 'b': outcome(True, b'1')}))
+    self.assertTrue(differential_fuzzer.is_disagreement(
+        {'a': outcome(True), 'b': outcome(False)}))
+    self.assertTrue(differential_fuzzer.is_disagreement(
+        {'a': outcome(True, b'1'), 'b': outcome(True, b'2')}))
+
+  def test_run_expecting_tink_error(self):
+    def fail():
+      raise tink.TinkError('invalid')
+
+    self.assertEqual(
+        differential_fuzzer.run_expecting_tink_error(lambda: b'out'),
+        differential_fuzzer.Outcome(True, b'out'))
+    self.assertEqual(
+        differential_fuzzer.run_expecting_tink_error(fail),
+        differential_fuzzer.Outcome(False))
+
+  def test_run_without_disagreements(self):
+    target = differential_fuzzer.FuzzTarget(
+        name='accept_all', seeds=[b'seed'], run=_accept_all,
+        languages=['a', 'b'])
+    fuzzer = differential_fuzzer.DifferentialFuzzer(
+        target, self.create_tempdir().full_path, seed=0, max_workers=4)
+    stats = fuzzer.run(max_inputs=50)
+    self.assertEqual(stats.inputs, 50)
+    self.assertEqual(stats.executions, 100)
+    self.assertEmpty(stats.disagreements)
+    self.assertGreater(stats.executions_per_second, 0)
+
+  def test_run_finds_and_minimizes_disagreement(self):
+    corpus_dir = self.create_tempdir().full_path
+    target = differential_fuzzer.FuzzTarget(
+        name='disagree', seeds=[b'valid input with x'], run=_disagree_on_x,
+        languages=['a', 'b'])
+    fuzzer = differential_fuzzer.DifferentialFuzzer(
+        target, corpus_dir, seed=0, max_workers=4)
+    stats = fuzzer.run(max_inputs=200)
+    self.assertNotEmpty(stats.disagreements)
+    with open(stats.disagreements[0], 'rb') as f:
+      self.assertEqual(f.read(), b'x')
+    with open(stats.disagreements[0] + '.json') as f:
+      report = json.load(f)
+    self.assertEqual(report['outcomes']['b']['accepted'], True)
+    self.assertEqual(report['outcomes']['a']['accepted'], False)
+
+  def test_known_disagreement_is_not_minimized_again(self):
+    target = differential_fuzzer.FuzzTarget(
+        name='disagree', seeds=[b'x' * 64], run=_disagree_on_x,
+        languages=['a', 'b'])
+    fuzzer = differential_fuzzer.DifferentialFuzzer(
+        target, self.create_tempdir().full_path, seed=0, max_workers=4)
+    with mock.patch.object(
+        differential_fuzzer, 'minimize',
+        wraps=differential_fuzzer.minimize) as minimize:
+      stats = fuzzer.run(max_inputs=100)
+    self.assertLen(stats.disagreements, 1)
+    # Once for the disagreement, and once for each new corpus entry.
+    self.assertEqual(minimize.call_count, len(fuzzer.corpus()))
+
+  def test_corpus_entries_are_minimized(self):
+    target = differential_fuzzer.FuzzTarget(
+        name='accept_all', seeds=[b'seed' * 16], run=_accept_all,
+        languages=['a', 'b'])
+    fuzzer = differential_fuzzer.DifferentialFuzzer(
+        target, self.create_tempdir().full_path, seed=0)
+    fuzzer.run(max_inputs=50)
+    for data in fuzzer.corpus()[1:]:
+      # The smallest length of its length class: zero or a power of two.
+      self.assertEqual(len(data) & (len(data) - 1), 0)
+
+  def test_corpus_is_loaded_from_disk(self):
+    corpus_dir = self.create_tempdir().full_path
+    target = differential_fuzzer.FuzzTarget(
+        name='accept_all', seeds=[b'seed'], run=_accept_all,
+        languages=['a', 'b'])
+    differential_fuzzer.DifferentialFuzzer(
+        target, corpus_dir, seed=0).run(max_inputs=20)
+    stored = [
+        name for name in os.listdir(os.path.join(corpus_dir, 'accept_all'))
+        if name != 'disagreements'
+    ]
+    self.assertNotEmpty(stored)
+    fuzzer = differential_fuzzer.DifferentialFuzzer(target, corpus_dir)
+    self.assertLen(fuzzer.corpus(), 1 + len(stored))
+
+  def test_run_needs_a_limit(self):
+    target = differential_fuzzer.FuzzTarget(
+        name='accept_all', seeds=[b'seed'], run=_accept_all, languages=['a'])
+    fuzzer = differential_fuzzer.DifferentialFuzzer(
+        target, self.create_tempdir().full_path)
+    with self.assertRaises(ValueError):
+      fuzzer.run()
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,58 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Inputs which the testing servers generate from a seed.
+
+Instead of sending many inputs to a server and receiving all outputs, a
+request can contain a GeneratedInputs message with a seed and the sizes of the
+inputs. The server generates the inputs itself, and returns only the SHA-256
+digest of the outputs. See GeneratedInputs in testing_api.proto for the
+specification.
+
+For servers which do not support this, the wrappers in _primitives generate
+the inputs and compute the digest here, so that the digests of all languages
+can be compared.
+"""
+
+import hashlib
+import struct
+from typing import Iterable, Iterator, Sequence
+
+from protos import testing_api_pb2
+
+_SHA256_BYTES = 32
+
+
+def inputs(seed: bytes,
+           sizes: Sequence[int]) -> testing_api_pb2.GeneratedInputs:
+  """Returns the GeneratedInputs message for seed and sizes."""
+  return testing_api_pb2.GeneratedInputs(seed=seed, sizes=sizes)
+
+
+def generate(seed: bytes, sizes: Sequence[int]) -> Iterator[bytes]:
+  """Yields the inputs which a server generates from seed, one per size."""
+  for i, size in enumerate(sizes):
+    blocks = [
+        hashlib.sha256(seed + struct.pack('>QQ', i, j)).digest()
+        for j in range((size + _SHA256_BYTES - 1) // _SHA256_BYTES)
+    ]
+    yield b''.join(blocks)[:size]
+
+
+def digest(outputs: Iterable[bytes]) -> bytes:
+  """Returns the SHA-256 digest of the length-prefixed outputs."""
+  h = hashlib.sha256()
+  for output in outputs:
+    h.update(struct.pack('>Q', len(output)))
+    h.update(output)
+  return h.digest()
@@ -0,0 +1,53 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for generated_inputs."""
+
+import hashlib
+
+from absl.testing import absltest
+from cross_language.util import generated_inputs
+
+
+class GeneratedInputsTest(absltest.TestCase):
+
+  def test_generate(self):
+    first_block = hashlib.sha256(b'seed' + bytes(7) + b'\x01' +
+                                 bytes(8)).digest()
+    second_block = hashlib.sha256(b'seed' + bytes(7) + b'\x01' + bytes(7) +
+                                  b'\x01').digest()
+    self.assertEqual(
+        list(generated_inputs.generate(b'seed', [0, 40])),
+        [b'', (first_block + second_block)[:40]])
+
+  def test_inputs_differ(self):
+    inputs = list(generated_inputs.generate(b'seed', [32, 32]))
+    self.assertNotEqual(inputs[0], inputs[1])
+    self.assertNotEqual(
+        inputs, list(generated_inputs.generate(b'other seed', [32, 32])))
+
+  def test_digest_is_length_prefixed(self):
+    self.assertEqual(
+        generated_inputs.digest([b'', b'ab']),
+        hashlib.sha256(bytes(8) + bytes(7) + b'\x02' + b'ab').digest())
+    self.assertNotEqual(
+        generated_inputs.digest([b'a', b'b']), generated_inputs.digest([b'ab']))
+
+  def test_inputs(self):
+    inputs = generated_inputs.inputs(b'seed', [1, 2])
+    self.assertEqual(inputs.seed, b'seed')
+    self.assertEqual(list(inputs.sizes), [1, 2])
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,393 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Generates load on the testing servers, like wrk for Tink.
+
+A Workload chooses requests which write (encrypt, compute a MAC or sign) a
+payload, or with a given probability read it (decrypt or verify). The sizes of
+the payloads are drawn from a weighted distribution, and the outputs which are
+read are computed before the load starts. operations returns the write and
+read operation of a primitive on a server.
+
+The requests are sent in one of two ways:
+
+* run_closed_loop: a fixed number of workers each send the next request as
+  soon as their previous one completed.
+* run_open_loop: requests arrive at exponentially distributed intervals, that
+  is as a Poisson process with a target rate, and are sent by a fixed number
+  of workers. The latency of a request is measured from its arrival, so it
+  includes the time it waited for a worker, and a slow server does not reduce
+  its own load.
+
+A Recorder counts the latencies of each time window in a LatencyHistogram, so
+long runs need little memory. load_generator_main is the command line tool.
+"""
+
+import collections
+import dataclasses
+import functools
+import os
+import random
+import threading
+import time
+from concurrent import futures
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from absl import logging
+import grpc
+import tink
+
+from protos import testing_api_pb2_grpc
+from cross_language.util import _primitives
+
+# The template of each primitive which is used if no other is given.
+DEFAULT_TEMPLATES = {
+    'aead': 'AES128_GCM',
+    'daead': 'AES256_SIV',
+    'mac': 'HMAC_SHA256_256BITTAG',
+    'signature': 'ED25519',
+    'hybrid': 'ECIES_P256_HKDF_HMAC_SHA256_AES128_GCM',
+}
+
+_ASSOCIATED_DATA = b'load_generator'
+
+# The percentiles of the reports.
+PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p999', 0.999))
+
+
+class LatencyHistogram:
+  """A histogram of latencies in nanoseconds, like HdrHistogram.
+
+  Values below 256 are counted exactly. Larger values are counted in buckets
+  whose width is at most 1/128 of their values, so percentiles have a relative
+  error below 1%, and the memory does not grow with the number of values.
+  """
+
+  _SUB_BUCKET_BITS = 7
+
+  def __init__(self) -> None:
+    self._counts = collections.Counter()
+    self.count = 0
+    self.max_ns = 0
+
+  def _bucket(self, value: int) -> int:
+    shift = max(0, value.bit_length() - self._SUB_BUCKET_BITS - 1)
+    return (shift << self._SUB_BUCKET_BITS) + (value >> shift)
+
+  def _bucket_range(self, bucket: int) -> Tuple[int, int]:
+    """Returns the lowest value and the width of bucket."""
+    sub_buckets = 1 << self._SUB_BUCKET_BITS
+    if bucket < 2 * sub_buckets:
+      return bucket, 1
+    shift = bucket // sub_buckets - 1
+    return (bucket - shift * sub_buckets) << shift, 1 << shift
+
+  def record(self, value_ns: int) -> None:
+    value_ns = max(0, int(value_ns))
+    self._counts[self._bucket(value_ns)] += 1
+    self.count += 1
+    self.max_ns = max(self.max_ns, value_ns)
+
+  def merge(self, other: 'LatencyHistogram') -> None:
+    self._counts.update(other._counts)  # pylint: disable=protected-access
+    self.count += other.count
+    self.max_ns = max(self.max_ns, other.max_ns)
+
+  def percentile(self, fraction: float) -> int:
+    """Returns the value below which fraction of the values are, or 0."""
+    if not self.count:
+      return 0
+    rank = max(1, round(fraction * self.count))
+    if rank >= self.count:
+      return self.max_ns
+    seen = 0
+    for bucket in sorted(self._counts):
+      seen += self._counts[bucket]
+      if seen >= rank:
+        low, width = self._bucket_range(bucket)
+        return min(low + width // 2, self.max_ns)
+    return self.max_ns
+
+  def percentiles(self) -> Dict[str, int]:
+    """Returns the percentiles of the reports and the maximum."""
+    result = {
+        name + '_ns': self.percentile(fraction)
+        for name, fraction in PERCENTILES
+    }
+    result['max_ns'] = self.max_ns
+    return result
+
+
+@dataclasses.dataclass
+class _Window:
+  latencies: LatencyHistogram = dataclasses.field(
+      default_factory=LatencyHistogram)
+  errors: int = 0
+
+
+class Recorder:
+  """Records the latencies and errors of requests per time window.
+
+  Requests which complete after duration_seconds, because they were sent
+  before, are counted in the last window.
+  """
+
+  def __init__(self, window_seconds: float, duration_seconds: float) -> None:
+    self._window_ns = max(1, int(window_seconds * 1e9))
+    self._duration_ns = int(duration_seconds * 1e9)
+    self._last_window = max(0, (self._duration_ns - 1) // self._window_ns)
+    self._windows = collections.defaultdict(_Window)
+    self._lock = threading.Lock()
+    self.start_ns = time.perf_counter_ns()
+    self.end_ns = self.start_ns
+
+  def record(self, end_ns: int, latency_ns: int, ok: bool) -> None:
+    """Records a request which completed at end_ns."""
+    with self._lock:
+      window = self._windows[min((end_ns - self.start_ns) // self._window_ns,
+                                 self._last_window)]
+      if ok:
+        window.latencies.record(latency_ns)
+      else:
+        window.errors += 1
+      self.end_ns = max(self.end_ns, end_ns)
+
+  def _summary(self, window: _Window, seconds: float) -> Dict[str, Any]:
+    requests = window.latencies.count + window.errors
+    summary = {
+        'requests': requests,
+        'errors': window.errors,
+        'requests_per_second': requests / seconds if seconds > 0 else 0.0,
+    }
+    summary.update(window.latencies.percentiles())
+    return summary
+
+  def windows(self) -> List[Dict[str, Any]]:
+    """Returns the summary of each window, in order."""
+    with self._lock:
+      if not self._windows:
+        return []
+      summaries = []
+      for i in range(max(self._windows) + 1):
+        start_ns = i * self._window_ns
+        seconds = min(self._window_ns, self._duration_ns - start_ns) / 1e9
+        summary = {'start_seconds': start_ns / 1e9}
+        summary.update(self._summary(self._windows.get(i, _Window()), seconds))
+        summaries.append(summary)
+      return summaries
+
+  def total(self) -> Dict[str, Any]:
+    """Returns the summary of all requests."""
+    with self._lock:
+      total = _Window()
+      for window in self._windows.values():
+        total.latencies.merge(window.latencies)
+        total.errors += window.errors
+      return self._summary(total, (self.end_ns - self.start_ns) / 1e9)
+
+
+def parse_payload_sizes(values: Sequence[str]) -> List[Tuple[int, float]]:
+  """Parses sizes with optional weights, such as ['64:9', '65536:1']."""
+  sizes = []
+  for value in values:
+    size, _, weight = value.partition(':')
+    try:
+      parsed = (int(size), float(weight) if weight else 1.0)
+    except ValueError as e:
+      raise ValueError('invalid payload size %r' % value) from e
+    if parsed[0] < 0 or parsed[1] <= 0:
+      raise ValueError('invalid payload size %r' % value)
+    sizes.append(parsed)
+  if not sizes:
+    raise ValueError('no payload sizes')
+  return sizes
+
+
+class Workload:
+  """Chooses the requests of a mix of reads and writes.
+
+  Args:
+    write: Writes a payload, and returns the output.
+    read: Reads the output of write for a payload, called with the payload and
+      the output.
+    payload_sizes: The sizes of the payloads and their relative weights.
+    read_fraction: The probability that a request is a read.
+  """
+
+  def __init__(self, write: Callable[[bytes], bytes],
+               read: Callable[[bytes, bytes], Any],
+               payload_sizes: Sequence[Tuple[int, float]],
+               read_fraction: float) -> None:
+    if not 0.0 <= read_fraction <= 1.0:
+      raise ValueError('read_fraction must be between 0 and 1')
+    self._write = write
+    self._read = read
+    self._sizes = [size for size, _ in payload_sizes]
+    self._weights = [weight for _, weight in payload_sizes]
+    self._read_fraction = read_fraction
+    self._payloads = {size: os.urandom(size) for size in self._sizes}
+    self._outputs = {}
+    if read_fraction > 0:
+      self._outputs = {
+          size: write(payload) for size, payload in self._payloads.items()
+      }
+
+  def next_request(self, rng: random.Random) -> Callable[[], Any]:
+    """Returns the next request, which is sent by calling it."""
+    size = rng.choices(self._sizes, self._weights)[0]
+    if rng.random() < self._read_fraction:
+      return functools.partial(self._read, self._payloads[size],
+                               self._outputs[size])
+    return functools.partial(self._write, self._payloads[size])
+
+
+class MixedWorkload:
+  """Chooses each request from one of several workloads, uniformly."""
+
+  def __init__(self, workloads: Sequence[Workload]) -> None:
+    if not workloads:
+      raise ValueError('no workloads')
+    self._workloads = list(workloads)
+
+  def next_request(self, rng: random.Random) -> Callable[[], Any]:
+    """Returns the next request of a randomly chosen workload."""
+    return rng.choice(self._workloads).next_request(rng)
+
+
+def _send(request: Callable[[], Any], arrival_ns: int,
+          recorder: Recorder) -> None:
+  try:
+    request()
+    ok = True
+  except (tink.TinkError, grpc.RpcError) as e:
+    logging.log_every_n(logging.WARNING, 'request failed: %s', 1000, e)
+    ok = False
+  end_ns = time.perf_counter_ns()
+  recorder.record(end_ns, end_ns - arrival_ns, ok)
+
+
+def run_closed_loop(workload: Union[Workload, MixedWorkload],
+                    concurrency: int,
+                    duration_seconds: float,
+                    window_seconds: float,
+                    seed: Optional[int] = None) -> Recorder:
+  """Sends requests from concurrency workers, each waiting for its last one."""
+  recorder = Recorder(window_seconds, duration_seconds)
+  deadline_ns = recorder.start_ns + int(duration_seconds * 1e9)
+
+  def worker(index: int) -> None:
+    rng = random.Random(None if seed is None else seed + index)
+    while True:
+      request = workload.next_request(rng)
+      start_ns = time.perf_counter_ns()
+      if start_ns >= deadline_ns:
+        return
+      _send(request, start_ns, recorder)
+
+  threads = [
+      threading.Thread(target=worker, args=(i,)) for i in range(concurrency)
+  ]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  return recorder
+
+
+def run_open_loop(workload: Union[Workload, MixedWorkload],
+                  qps: float,
+                  concurrency: int,
+                  duration_seconds: float,
+                  window_seconds: float,
+                  seed: Optional[int] = None) -> Recorder:
+  """Sends requests arriving as a Poisson process with rate qps.
+
+  Requests which arrive while all workers are busy wait for a worker. The
+  requests which arrived before the end of the duration are all sent.
+
+  Args:
+    workload: The workload.
+    qps: The mean number of arrivals per second.
+    concurrency: The number of workers.
+    duration_seconds: The duration of the arrivals.
+    window_seconds: The duration of the windows of the recorder.
+    seed: The seed of the arrivals and of the choice of the requests.
+
+  Returns:
+    The recorder of the requests.
+  """
+  if qps <= 0:
+    raise ValueError('qps must be positive')
+  rng = random.Random(seed)
+  with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+    recorder = Recorder(window_seconds, duration_seconds)
+    deadline_ns = recorder.start_ns + int(duration_seconds * 1e9)
+    arrival_ns = recorder.start_ns
+    while True:
+      arrival_ns += int(rng.expovariate(qps) * 1e9)
+      if arrival_ns >= deadline_ns:
+        break
+      request = workload.next_request(rng)
+      delay_ns = arrival_ns - time.perf_counter_ns()
+      if delay_ns > 0:
+        time.sleep(delay_ns / 1e9)
+      executor.submit(_send, request, arrival_ns, recorder)
+  return recorder
+
+
+def operations(
+    lang: str, channel: grpc.Channel, primitive: str, keyset: bytes
+) -> Tuple[Callable[[bytes], bytes], Callable[[bytes, bytes], Any]]:
+  """Returns the write and read operation of primitive on the server.
+
+  Args:
+    lang: The language of the server.
+    channel: The channel to the server.
+    primitive: A key of DEFAULT_TEMPLATES.
+    keyset: The keyset, which is private for signatures and hybrid encryption.
+
+  Returns:
+    The write and read operations for Workload.
+  """
+  keyset_stub = testing_api_pb2_grpc.KeysetStub(channel)
+  if primitive == 'aead':
+    p = _primitives.Aead(lang, testing_api_pb2_grpc.AeadStub(channel), keyset,
+                         None)
+    return (lambda data: p.encrypt(data, _ASSOCIATED_DATA),
+            lambda data, ciphertext: p.decrypt(ciphertext, _ASSOCIATED_DATA))
+  if primitive == 'daead':
+    d = _primitives.DeterministicAead(
+        lang, testing_api_pb2_grpc.DeterministicAeadStub(channel), keyset, None)
+    return (lambda data: d.encrypt_deterministically(data, _ASSOCIATED_DATA),
+            lambda data, ciphertext: d.decrypt_deterministically(
+                ciphertext, _ASSOCIATED_DATA))
+  if primitive == 'mac':
+    m = _primitives.Mac(lang, testing_api_pb2_grpc.MacStub(channel), keyset,
+                        None)
+    return m.compute_mac, lambda data, mac_value: m.verify_mac(mac_value, data)
+  if primitive == 'signature':
+    stub = testing_api_pb2_grpc.SignatureStub(channel)
+    signer = _primitives.PublicKeySign(lang, stub, keyset, None)
+    verifier = _primitives.PublicKeyVerify(
+        lang, stub, _primitives.public_keyset(keyset_stub, keyset), None)
+    return (signer.sign,
+            lambda data, signature: verifier.verify(signature, data))
+  if primitive == 'hybrid':
+    stub = testing_api_pb2_grpc.HybridStub(channel)
+    encrypter = _primitives.HybridEncrypt(
+        lang, stub, _primitives.public_keyset(keyset_stub, keyset), None)
+    decrypter = _primitives.HybridDecrypt(lang, stub, keyset, None)
+    return (lambda data: encrypter.encrypt(data, _ASSOCIATED_DATA),
+            lambda data, ciphertext: decrypter.decrypt(ciphertext,
+                                                        _ASSOCIATED_DATA))
+  raise ValueError('unknown primitive %s' % primitive)
@@ -0,0 +1,183 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Generates load on the testing server of one language, like wrk for Tink.
+
+Starts the server of --lang, or attaches to a running server at --address,
+generates a keyset of --template on the server, and sends requests to it for
+--duration_seconds, see load_generator: in a closed loop of --concurrency
+requests, or if --qps is set, in an open loop with Poisson arrivals.
+
+For each window of --window_seconds and for the whole run, the throughput and
+the latency percentiles are printed, and written as JSON to --output if set.
+
+Example:
+  bazel run //cross_language/util:load_generator_main -- --lang=go \\
+      --primitive=aead --qps=1000 --payload_sizes=64:9,65536:1
+"""
+
+import contextlib
+import json
+import tempfile
+from typing import Any, Dict, Iterator
+
+from absl import app
+from absl import flags
+from absl import logging
+import grpc
+import portpicker
+
+from protos import testing_api_pb2
+from protos import testing_api_pb2_grpc
+from cross_language.util import _primitives
+from cross_language.util import load_generator
+from cross_language.util import testing_servers
+
+_LANG = flags.DEFINE_enum('lang', None, testing_servers.LANGUAGES,
+                          'Language of the server.')
+_ADDRESS = flags.DEFINE_string(
+    'address', '',
+    'Address of a running server, either <host>:<port> or unix:<path>. If '
+    'empty, the server of --lang is started.')
+_PRIMITIVE = flags.DEFINE_enum('primitive', 'aead',
+                               list(load_generator.DEFAULT_TEMPLATES),
+                               'Primitive to call.')
+_TEMPLATE = flags.DEFINE_string(
+    'template', '',
+    'Name of the key template. Defaults to a template of --primitive.')
+_PAYLOAD_SIZES = flags.DEFINE_list(
+    'payload_sizes', ['64'],
+    'Sizes in bytes of the payloads, each optionally followed by ":" and its '
+    'relative weight, for example 64:9,65536:1.')
+_READ_FRACTION = flags.DEFINE_float(
+    'read_fraction', 0.0,
+    'Fraction of requests which decrypt or verify instead of encrypting, '
+    'computing a MAC or signing.')
+_CONCURRENCY = flags.DEFINE_integer(
+    'concurrency', 8, 'Number of requests sent at the same time at most.')
+_QPS = flags.DEFINE_float(
+    'qps', 0.0,
+    'Target requests per second of the open loop. If 0, the load generator '
+    'runs a closed loop.')
+_DURATION_SECONDS = flags.DEFINE_float('duration_seconds', 10.0,
+                                       'Duration of the load.')
+_WINDOW_SECONDS = flags.DEFINE_float(
+    'window_seconds', 1.0, 'Duration of the windows of the report.')
+_SEED = flags.DEFINE_integer(
+    'seed', None, 'Seed of the random choices of requests and arrivals.')
+_OUTPUT = flags.DEFINE_string('output', '',
+                              'Path of the JSON report. Not written if empty.')
+
+
+@contextlib.contextmanager
+def _connect(lang: str, address: str) -> Iterator[grpc.Channel]:
+  """Yields a channel to the server at address, or to a new server."""
+  server = None
+  if not address:
+    address = '[::]:%d' % portpicker.pick_unused_port()
+    output_file = tempfile.NamedTemporaryFile(
+        'w+', prefix='load_generator_%s_' % lang, suffix='.log', delete=False)
+    server = testing_servers.start_server(lang, address, output_file)
+    logging.info('%s server started on %s, log output: %s', lang, address,
+                 output_file.name)
+  if address.startswith('unix:'):
+    credentials = grpc.local_channel_credentials(grpc.LocalConnectionType.UDS)
+  else:
+    credentials = grpc.local_channel_credentials()
+  channel = grpc.secure_channel(address, credentials)
+  try:
+    grpc.channel_ready_future(channel).result(timeout=30)
+    response = testing_api_pb2_grpc.MetadataStub(channel).GetServerInfo(
+        testing_api_pb2.ServerInfoRequest())
+    if response.language != lang:
+      raise ValueError('lang = %s != response.language = %s' %
+                       (lang, response.language))
+    yield channel
+  finally:
+    channel.close()
+    if server is not None:
+      server.terminate()
+      server.wait()
+      output_file.close()
+
+
+def _format_ms(value_ns: int) -> str:
+  return '%10.3f' % (value_ns / 1e6)
+
+
+def _print_summary(label: str, summary: Dict[str, Any]) -> None:
+  print('%-10s %10.1f %8d' %
+        (label, summary['requests_per_second'], summary['errors']) +
+        ''.join(_format_ms(summary[name + '_ns'])
+                for name, _ in load_generator.PERCENTILES) +
+        _format_ms(summary['max_ns']))
+
+
+def main(argv):
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  lang = _LANG.value
+  template_name = (
+      _TEMPLATE.value or load_generator.DEFAULT_TEMPLATES[_PRIMITIVE.value])
+  payload_sizes = load_generator.parse_payload_sizes(_PAYLOAD_SIZES.value)
+  with _connect(lang, _ADDRESS.value) as channel:
+    keyset_stub = testing_api_pb2_grpc.KeysetStub(channel)
+    keyset = _primitives.new_keyset(
+        keyset_stub, _primitives.key_template(keyset_stub, template_name))
+    write, read = load_generator.operations(lang, channel, _PRIMITIVE.value,
+                                            keyset)
+    workload = load_generator.Workload(write, read, payload_sizes,
+                                       _READ_FRACTION.value)
+    if _QPS.value > 0:
+      recorder = load_generator.run_open_loop(workload, _QPS.value,
+                                              _CONCURRENCY.value,
+                                              _DURATION_SECONDS.value,
+                                              _WINDOW_SECONDS.value,
+                                              _SEED.value)
+    else:
+      recorder = load_generator.run_closed_loop(workload, _CONCURRENCY.value,
+                                                _DURATION_SECONDS.value,
+                                                _WINDOW_SECONDS.value,
+                                                _SEED.value)
+  windows = recorder.windows()
+  total = recorder.total()
+  print('%-10s %10s %8s' % ('start_s', 'requests/s', 'errors') +
+        ''.join('%10s' % (name + '_ms')
+                for name, _ in load_generator.PERCENTILES) +
+        '%10s' % 'max_ms')
+  for window in windows:
+    _print_summary('%.1f' % window['start_seconds'], window)
+  _print_summary('total', total)
+  if _OUTPUT.value:
+    with open(_OUTPUT.value, 'w') as f:
+      json.dump(
+          {
+              'lang': lang,
+              'primitive': _PRIMITIVE.value,
+              'template': template_name,
+              'payload_sizes': payload_sizes,
+              'read_fraction': _READ_FRACTION.value,
+              'concurrency': _CONCURRENCY.value,
+              'qps': _QPS.value,
+              'duration_seconds': _DURATION_SECONDS.value,
+              'windows': windows,
+              'total': total,
+          },
+          f,
+          indent=2,
+          sort_keys=True)
+
+
+if __name__ == '__main__':
+  flags.mark_flag_as_required('lang')
+  app.run(main)
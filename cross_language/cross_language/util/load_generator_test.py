@@ -0,0 +1,173 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for load_generator."""
+
+import random
+import threading
+import time
+
+from absl.testing import absltest
+import tink
+
+from cross_language.util import load_generator
+
+
+class _FakeServer:
+  """Counts writes and reads, each of which takes sleep_seconds."""
+
+  def __init__(self, sleep_seconds=0.0, fail=False):
+    self.writes = 0
+    self.reads = 0
+    self._sleep_seconds = sleep_seconds
+    self._fail = fail
+    self._lock = threading.Lock()
+
+  def write(self, data):
+    time.sleep(self._sleep_seconds)
+    with self._lock:
+      self.writes += 1
+    if self._fail:
+      raise tink.TinkError('write failed')
+    return b'output' + data
+
+  def read(self, data, output):
+    time.sleep(self._sleep_seconds)
+    with self._lock:
+      self.reads += 1
+    if output != b'output' + data:
+      raise tink.TinkError('wrong output')
+
+
+class LatencyHistogramTest(absltest.TestCase):
+
+  def test_small_values_are_exact(self):
+    histogram = load_generator.LatencyHistogram()
+    for value in range(1, 101):
+      histogram.record(value)
+    self.assertEqual(histogram.count, 100)
+    self.assertEqual(histogram.percentile(0.5), 50)
+    self.assertEqual(histogram.percentile(0.99), 99)
+    self.assertEqual(histogram.max_ns, 100)
+
+  def test_large_values_within_one_percent(self):
+    histogram = load_generator.LatencyHistogram()
+    for value in range(1_000, 10_000_001, 1_000):
+      histogram.record(value)
+    for fraction in (0.5, 0.9, 0.99, 0.999):
+      expected = fraction * 10_000_000
+      self.assertBetween(histogram.percentile(fraction), 0.99 * expected,
+                         1.01 * expected)
+    self.assertEqual(histogram.percentile(1.0), 10_000_000)
+
+  def test_merge(self):
+    a = load_generator.LatencyHistogram()
+    b = load_generator.LatencyHistogram()
+    for value in range(100):
+      a.record(value)
+      b.record(100 + value)
+    a.merge(b)
+    self.assertEqual(a.count, 200)
+    self.assertEqual(a.max_ns, 199)
+    self.assertEqual(a.percentile(0.5), 99)
+
+  def test_empty(self):
+    self.assertEqual(load_generator.LatencyHistogram().percentile(0.5), 0)
+
+
+class PayloadSizesTest(absltest.TestCase):
+
+  def test_parse(self):
+    self.assertEqual(
+        load_generator.parse_payload_sizes(['64:9', '65536:1', '10']),
+        [(64, 9.0), (65536, 1.0), (10, 1.0)])
+
+  def test_parse_invalid_fails(self):
+    for values in (['abc'], ['64:x'], ['-1'], ['64:0'], []):
+      with self.assertRaises(ValueError):
+        load_generator.parse_payload_sizes(values)
+
+
+class WorkloadTest(absltest.TestCase):
+
+  def test_read_fraction(self):
+    server = _FakeServer()
+    workload = load_generator.Workload(server.write, server.read,
+                                       [(16, 1.0), (1024, 1.0)], 0.25)
+    server.writes = 0
+    rng = random.Random(0)
+    for _ in range(4000):
+      workload.next_request(rng)()
+    self.assertEqual(server.writes + server.reads, 4000)
+    self.assertBetween(server.reads, 800, 1200)
+
+  def test_mixed_workload(self):
+    first = _FakeServer()
+    second = _FakeServer()
+    workload = load_generator.MixedWorkload([
+        load_generator.Workload(first.write, first.read, [(16, 1.0)], 0.0),
+        load_generator.Workload(second.write, second.read, [(16, 1.0)], 0.0),
+    ])
+    rng = random.Random(0)
+    for _ in range(1000):
+      workload.next_request(rng)()
+    self.assertEqual(first.writes + second.writes, 1000)
+    self.assertBetween(first.writes, 400, 600)
+
+  def test_invalid_read_fraction_fails(self):
+    server = _FakeServer()
+    with self.assertRaises(ValueError):
+      load_generator.Workload(server.write, server.read, [(16, 1.0)], 1.5)
+
+
+class RunTest(absltest.TestCase):
+
+  def test_closed_loop(self):
+    server = _FakeServer(sleep_seconds=0.001)
+    workload = load_generator.Workload(server.write, server.read, [(16, 1.0)],
+                                       0.5)
+    recorder = load_generator.run_closed_loop(
+        workload, concurrency=4, duration_seconds=0.5, window_seconds=0.1,
+        seed=0)
+    total = recorder.total()
+    self.assertEqual(total['errors'], 0)
+    self.assertEqual(total['requests'], server.writes + server.reads - 1)
+    self.assertGreater(total['requests'], 100)
+    self.assertGreaterEqual(total['p50_ns'], 1_000_000)
+    windows = recorder.windows()
+    self.assertLen(windows, 5)
+    self.assertEqual(sum(w['requests'] for w in windows), total['requests'])
+
+  def test_open_loop_rate(self):
+    server = _FakeServer()
+    workload = load_generator.Workload(server.write, server.read, [(16, 1.0)],
+                                       0.0)
+    recorder = load_generator.run_open_loop(
+        workload, qps=500, concurrency=2, duration_seconds=1.0,
+        window_seconds=0.5, seed=0)
+    self.assertBetween(recorder.total()['requests'], 400, 600)
+
+  def test_errors_are_counted(self):
+    server = _FakeServer(fail=True)
+    workload = load_generator.Workload(server.write, server.read, [(16, 1.0)],
+                                       0.0)
+    recorder = load_generator.run_closed_loop(
+        workload, concurrency=2, duration_seconds=0.1, window_seconds=1.0)
+    total = recorder.total()
+    self.assertGreater(total['errors'], 0)
+    self.assertEqual(total['errors'], total['requests'])
+    self.assertEqual(total['p50_ns'], 0)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,414 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A local stand-in for AWS KMS, Google Cloud KMS and HashiCorp Vault.
+
+LocalKmsServer is a plain HTTP server which implements the encrypt and decrypt
+calls of:
+
+  * the AWS KMS JSON API (TrentService.Encrypt and TrentService.Decrypt),
+  * the Google Cloud KMS REST API (cryptoKeys.encrypt and cryptoKeys.decrypt),
+  * the HashiCorp Vault transit secrets engine (encrypt and decrypt).
+
+Keys are created on first use, for any key name. The ciphertexts are
+AES256-GCM ciphertexts of a key held in memory by the server, so they are only
+valid for the lifetime of the server.
+
+The server can inject latency, errors and throttling, see LocalKmsOptions.
+
+To point the testing servers at a LocalKmsServer, pass its URL to
+testing_servers.start. Not every KMS client allows to change its endpoint, so
+SUPPORTED_LANGUAGES lists the servers which use it for each API:
+
+  * AWS: the servers get the AWS_ENDPOINT_URL_KMS environment variable, which
+    is used by the Python and Go AWS SDKs. The Java server uses the AWS SDK
+    for Java v1, which ignores it.
+  * GCP: the Go and Python servers have a --gcp_endpoint flag. The Python
+    server then uses the REST transport. The Java client does not allow to
+    change its endpoint.
+  * HashiCorp Vault: the Python, Go and Java servers have a --hcvault_address
+    flag.
+
+The C++ server only registers a Cloud KMS client, which uses gRPC, which this
+server does not implement. It is not supported.
+"""
+
+import base64
+import dataclasses
+import http.server
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from absl import logging
+import tink
+from tink import aead
+
+_AWS_TARGET_HEADER = 'X-Amz-Target'
+_GCP_PATH = re.compile(r'^/v1/(projects/[^:]+):(encrypt|decrypt)$')
+_HCVAULT_PATH = re.compile(r'^/v1/([^/]+)/(encrypt|decrypt)/([^/]+)$')
+_HCVAULT_CIPHERTEXT_PREFIX = 'vault:v1:'
+
+# The languages of the testing servers which send the requests of each API to
+# a LocalKmsServer, see above.
+SUPPORTED_LANGUAGES = {
+    'aws': ('go', 'python'),
+    'gcp': ('go', 'python'),
+    'hcvault': ('go', 'java', 'python'),
+}
+
+
+def _crc32c_table():
+  table = []
+  for i in range(256):
+    crc = i
+    for _ in range(8):
+      crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+    table.append(crc)
+  return table
+
+
+_CRC32C_TABLE = _crc32c_table()
+
+
+def crc32c(data: bytes) -> int:
+  """Returns the CRC32C checksum of data, as used by Google Cloud KMS."""
+  crc = 0xFFFFFFFF
+  for b in data:
+    crc = _CRC32C_TABLE[(crc ^ b) & 0xFF] ^ (crc >> 8)
+  return crc ^ 0xFFFFFFFF
+
+
+@dataclasses.dataclass(frozen=True)
+class LocalKmsOptions:
+  """Failure and latency injection of a LocalKmsServer.
+
+  Attributes:
+    latency_ms: Delay added to every request.
+    latency_jitter_ms: Maximal uniformly distributed delay added on top of
+      latency_ms.
+    error_rate: Fraction of requests which fail with an internal error.
+    max_requests_per_second: If positive, requests above this rate fail with a
+      throttling error.
+    seed: Seed of the random number generator used for jitter and errors.
+  """
+  latency_ms: float = 0.0
+  latency_jitter_ms: float = 0.0
+  error_rate: float = 0.0
+  max_requests_per_second: float = 0.0
+  seed: Optional[int] = None
+
+
+class _KmsError(Exception):
+  """A failed request, rendered by the handler in the format of each API."""
+
+  def __init__(self, status: int, code: str, message: str) -> None:
+    super().__init__(message)
+    self.status = status
+    self.code = code
+
+
+class _Backend:
+  """The keys, counters and failure injection shared by all handler threads."""
+
+  def __init__(self, options: LocalKmsOptions) -> None:
+    self.options = options
+    self._lock = threading.Lock()
+    self._random = random.Random(options.seed)
+    self._aeads: Dict[str, aead.Aead] = {}
+    self._counts: Dict[str, int] = {}
+    self._tokens = options.max_requests_per_second
+    self._last_refill = time.monotonic()
+
+  def _aead(self, key_name: str) -> aead.Aead:
+    with self._lock:
+      if key_name not in self._aeads:
+        handle = tink.new_keyset_handle(aead.aead_key_templates.AES256_GCM)
+        self._aeads[key_name] = handle.primitive(aead.Aead)
+      return self._aeads[key_name]
+
+  def encrypt(self, key_name: str, plaintext: bytes,
+              associated_data: bytes) -> bytes:
+    return self._aead(key_name).encrypt(plaintext, associated_data)
+
+  def decrypt(self, key_name: str, ciphertext: bytes,
+              associated_data: bytes) -> bytes:
+    try:
+      return self._aead(key_name).decrypt(ciphertext, associated_data)
+    except tink.TinkError as e:
+      raise _KmsError(400, 'InvalidCiphertext', 'decryption failed') from e
+
+  def admit(self, api: str, operation: str) -> None:
+    """Counts the request, and injects latency, errors and throttling."""
+    with self._lock:
+      name = '%s.%s' % (api, operation)
+      self._counts[name] = self._counts.get(name, 0) + 1
+      delay_ms = self.options.latency_ms
+      if self.options.latency_jitter_ms:
+        delay_ms += self._random.uniform(0, self.options.latency_jitter_ms)
+      fail = self._random.random() < self.options.error_rate
+      throttled = False
+      rate = self.options.max_requests_per_second
+      if rate > 0:
+        now = time.monotonic()
+        self._tokens = min(rate,
+                           self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+        if self._tokens < 1:
+          throttled = True
+        else:
+          self._tokens -= 1
+    if delay_ms:
+      time.sleep(delay_ms / 1000)
+    if throttled:
+      raise _KmsError(429, 'Throttling', 'rate exceeded')
+    if fail:
+      raise _KmsError(500, 'Internal', 'injected error')
+
+  def request_counts(self) -> Dict[str, int]:
+    with self._lock:
+      return dict(self._counts)
+
+
+def _b64decode(value: str) -> bytes:
+  try:
+    return base64.b64decode(value, validate=True)
+  except ValueError as e:
+    raise _KmsError(400, 'Validation', 'invalid base64') from e
+
+
+def _b64encode(value: bytes) -> str:
+  return base64.b64encode(value).decode('ascii')
+
+
+def _aws_encryption_context(request: Dict[str, Any]) -> bytes:
+  return json.dumps(
+      request.get('EncryptionContext') or {}, sort_keys=True).encode('utf-8')
+
+
+def _handle_aws(backend: _Backend, target: str,
+                request: Dict[str, Any]) -> Dict[str, Any]:
+  """Handles a call of the AWS KMS JSON API."""
+  if target == 'TrentService.Encrypt':
+    backend.admit('aws', 'Encrypt')
+    key_id = request.get('KeyId', '')
+    if not key_id:
+      raise _KmsError(400, 'Validation', 'KeyId is required')
+    ciphertext = backend.encrypt(key_id, _b64decode(request['Plaintext']),
+                                 _aws_encryption_context(request))
+    encoded_key_id = key_id.encode('utf-8')
+    # Like in AWS KMS, the ciphertext blob identifies the key.
+    blob = (len(encoded_key_id).to_bytes(2, 'big') + encoded_key_id +
+            ciphertext)
+    return {
+        'CiphertextBlob': _b64encode(blob),
+        'KeyId': key_id,
+        'EncryptionAlgorithm': 'SYMMETRIC_DEFAULT',
+    }
+  if target == 'TrentService.Decrypt':
+    backend.admit('aws', 'Decrypt')
+    blob = _b64decode(request.get('CiphertextBlob', ''))
+    key_id_length = int.from_bytes(blob[:2], 'big')
+    key_id = blob[2:2 + key_id_length].decode('utf-8', errors='replace')
+    if request.get('KeyId') and request['KeyId'] != key_id:
+      raise _KmsError(400, 'IncorrectKey', 'ciphertext of a different key')
+    plaintext = backend.decrypt(key_id, blob[2 + key_id_length:],
+                                _aws_encryption_context(request))
+    return {
+        'Plaintext': _b64encode(plaintext),
+        'KeyId': key_id,
+        'EncryptionAlgorithm': 'SYMMETRIC_DEFAULT',
+    }
+  raise _KmsError(400, 'UnknownOperation', 'unsupported target %s' % target)
+
+
+def _handle_gcp(backend: _Backend, key_name: str, operation: str,
+                request: Dict[str, Any]) -> Dict[str, Any]:
+  """Handles a call of the Google Cloud KMS REST API."""
+  backend.admit('gcp', operation)
+  associated_data = _b64decode(request.get('additionalAuthenticatedData', ''))
+  if operation == 'encrypt':
+    ciphertext = backend.encrypt(key_name, _b64decode(request['plaintext']),
+                                 associated_data)
+    return {
+        'name': key_name,
+        'ciphertext': _b64encode(ciphertext),
+        # int64 values are encoded as strings in the JSON mapping.
+        'ciphertextCrc32c': str(crc32c(ciphertext)),
+        'verifiedPlaintextCrc32c': 'plaintextCrc32c' in request,
+        'verifiedAdditionalAuthenticatedDataCrc32c':
+            'additionalAuthenticatedDataCrc32c' in request,
+        'protectionLevel': 'SOFTWARE',
+    }
+  plaintext = backend.decrypt(key_name, _b64decode(request['ciphertext']),
+                              associated_data)
+  return {
+      'plaintext': _b64encode(plaintext),
+      'plaintextCrc32c': str(crc32c(plaintext)),
+      'usedPrimary': True,
+      'protectionLevel': 'SOFTWARE',
+  }
+
+
+def _handle_hcvault(backend: _Backend, mount: str, operation: str,
+                    key_name: str, request: Dict[str, Any]) -> Dict[str, Any]:
+  """Handles a call of the HashiCorp Vault transit secrets engine."""
+  backend.admit('hcvault', operation)
+  full_key_name = '%s/%s' % (mount, key_name)
+  context = _b64decode(request.get('context') or '')
+  if operation == 'encrypt':
+    ciphertext = backend.encrypt(full_key_name,
+                                 _b64decode(request['plaintext']), context)
+    return {'data': {'ciphertext': _HCVAULT_CIPHERTEXT_PREFIX +
+                                   _b64encode(ciphertext),
+                     'key_version': 1}}
+  ciphertext = request.get('ciphertext', '')
+  if not ciphertext.startswith(_HCVAULT_CIPHERTEXT_PREFIX):
+    raise _KmsError(400, 'InvalidCiphertext', 'invalid ciphertext')
+  plaintext = backend.decrypt(
+      full_key_name,
+      _b64decode(ciphertext[len(_HCVAULT_CIPHERTEXT_PREFIX):]), context)
+  return {'data': {'plaintext': _b64encode(plaintext)}}
+
+
+def _error_body(api: str, error: _KmsError) -> Dict[str, Any]:
+  """Renders an error the way the client libraries of each API expect it."""
+  if api == 'aws':
+    aws_types = {
+        'Throttling': 'ThrottlingException',
+        'Internal': 'KMSInternalException',
+        'InvalidCiphertext': 'InvalidCiphertextException',
+        'IncorrectKey': 'IncorrectKeyException',
+    }
+    return {'__type': aws_types.get(error.code, 'ValidationException'),
+            'message': str(error)}
+  if api == 'gcp':
+    gcp_status = {
+        429: 'RESOURCE_EXHAUSTED',
+        500: 'INTERNAL',
+    }
+    return {'error': {'code': error.status, 'message': str(error),
+                      'status': gcp_status.get(error.status,
+                                               'INVALID_ARGUMENT')}}
+  return {'errors': [str(error)]}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+  """Dispatches requests to the handler of the API they belong to."""
+
+  # Keep connections open, like the real services do. Headers and body are
+  # written separately, so Nagle's algorithm would delay every response.
+  protocol_version = 'HTTP/1.1'
+  disable_nagle_algorithm = True
+  server: '_HttpServer'
+
+  def _respond(self, status: int, body: Dict[str, Any],
+               content_type: str) -> None:
+    encoded = json.dumps(body).encode('utf-8')
+    self.send_response(status)
+    self.send_header('Content-Type', content_type)
+    self.send_header('Content-Length', str(len(encoded)))
+    self.end_headers()
+    self.wfile.write(encoded)
+
+  def _dispatch(self) -> None:
+    length = int(self.headers.get('Content-Length', 0))
+    raw_body = self.rfile.read(length) if length else b''
+    path = self.path.split('?', 1)[0]
+    backend = self.server.backend
+    target = self.headers.get(_AWS_TARGET_HEADER)
+    gcp_match = _GCP_PATH.match(path)
+    hcvault_match = _HCVAULT_PATH.match(path)
+    if target:
+      api, content_type = 'aws', 'application/x-amz-json-1.1'
+    elif gcp_match:
+      api, content_type = 'gcp', 'application/json'
+    elif hcvault_match:
+      api, content_type = 'hcvault', 'application/json'
+    else:
+      self._respond(404, {'errors': ['unknown path %s' % path]},
+                    'application/json')
+      return
+    try:
+      try:
+        request = json.loads(raw_body or b'{}')
+      except ValueError as e:
+        raise _KmsError(400, 'Validation', 'invalid JSON') from e
+      if api == 'aws':
+        response = _handle_aws(backend, target, request)
+      elif api == 'gcp':
+        response = _handle_gcp(backend, gcp_match.group(1),
+                               gcp_match.group(2), request)
+      else:
+        response = _handle_hcvault(backend, hcvault_match.group(1),
+                                   hcvault_match.group(2),
+                                   hcvault_match.group(3), request)
+    except (_KmsError, KeyError) as e:
+      if isinstance(e, KeyError):
+        e = _KmsError(400, 'Validation', 'missing field %s' % e)
+      self._respond(e.status, _error_body(api, e), content_type)
+      return
+    self._respond(200, response, content_type)
+
+  do_POST = _dispatch
+  do_PUT = _dispatch
+
+  # pylint: disable-next=redefined-builtin
+  def log_message(self, format: str, *args: Any) -> None:
+    logging.debug('local_kms: ' + format, *args)
+
+
+class _HttpServer(http.server.ThreadingHTTPServer):
+  daemon_threads = True
+
+  def __init__(self, address: Tuple[str, int], backend: _Backend) -> None:
+    super().__init__(address, _Handler)
+    self.backend = backend
+
+
+class LocalKmsServer:
+  """Serves the AWS KMS, Google Cloud KMS and Vault transit stand-ins."""
+
+  def __init__(self, options: Optional[LocalKmsOptions] = None) -> None:
+    self._backend = _Backend(options or LocalKmsOptions())
+    self._server = _HttpServer(('127.0.0.1', 0), self._backend)
+    self._thread = threading.Thread(
+        target=self._server.serve_forever, daemon=True)
+
+  @property
+  def url(self) -> str:
+    """The base URL of all three APIs, for example http://127.0.0.1:1234."""
+    return 'http://127.0.0.1:%d' % self._server.server_address[1]
+
+  def start(self) -> 'LocalKmsServer':
+    self._thread.start()
+    logging.info('Local KMS server listening on %s', self.url)
+    return self
+
+  def stop(self) -> None:
+    self._server.shutdown()
+    self._server.server_close()
+    self._thread.join()
+
+  def request_counts(self) -> Dict[str, int]:
+    """Returns the number of requests, keyed by '<api>.<operation>'."""
+    return self._backend.request_counts()
+
+  def __enter__(self) -> 'LocalKmsServer':
+    return self.start()
+
+  def __exit__(self, *args: Any) -> None:
+    self.stop()
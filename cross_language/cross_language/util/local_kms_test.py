@@ -0,0 +1,195 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for local_kms."""
+
+import base64
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+import urllib.error
+import urllib.request
+
+from absl.testing import absltest
+from tink import aead
+from cross_language.util import local_kms
+
+_AWS_KEY_ARN = 'arn:aws:kms:us-east-2:235739564943:key/local-key'
+_GCP_KEY_NAME = ('projects/p/locations/global/keyRings/r/cryptoKeys/local-key')
+
+
+def setUpModule():
+  aead.register()
+
+
+def _post(url: str, body: Dict[str, Any],
+          headers: Optional[Dict[str, str]] = None
+          ) -> Tuple[int, Dict[str, Any]]:
+  request = urllib.request.Request(
+      url, data=json.dumps(body).encode('utf-8'), headers=headers or {},
+      method='POST')
+  try:
+    with urllib.request.urlopen(request) as response:
+      return response.status, json.loads(response.read())
+  except urllib.error.HTTPError as e:
+    return e.code, json.loads(e.read())
+
+
+def _b64(data: bytes) -> str:
+  return base64.b64encode(data).decode('ascii')
+
+
+class LocalKmsTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.server = self.enter_context(local_kms.LocalKmsServer())
+
+  def _aws(self, operation: str, body: Dict[str, Any]):
+    return _post(self.server.url + '/', body,
+                 {'X-Amz-Target': 'TrentService.' + operation})
+
+  def test_crc32c(self):
+    # Test vector from RFC 3720, B.4.
+    self.assertEqual(local_kms.crc32c(b'\x00' * 32), 0x8A9136AA)
+
+  def test_aws_encrypt_decrypt(self):
+    status, encrypted = self._aws('Encrypt', {
+        'KeyId': _AWS_KEY_ARN,
+        'Plaintext': _b64(b'plaintext'),
+        'EncryptionContext': {'a': 'b'},
+    })
+    self.assertEqual(status, 200)
+    self.assertEqual(encrypted['KeyId'], _AWS_KEY_ARN)
+    status, decrypted = self._aws('Decrypt', {
+        'CiphertextBlob': encrypted['CiphertextBlob'],
+        'EncryptionContext': {'a': 'b'},
+    })
+    self.assertEqual(status, 200)
+    self.assertEqual(decrypted['KeyId'], _AWS_KEY_ARN)
+    self.assertEqual(base64.b64decode(decrypted['Plaintext']), b'plaintext')
+
+  def test_aws_decrypt_with_wrong_context_fails(self):
+    _, encrypted = self._aws('Encrypt', {
+        'KeyId': _AWS_KEY_ARN,
+        'Plaintext': _b64(b'plaintext'),
+        'EncryptionContext': {'a': 'b'},
+    })
+    status, error = self._aws('Decrypt', {
+        'CiphertextBlob': encrypted['CiphertextBlob'],
+        'EncryptionContext': {'a': 'c'},
+    })
+    self.assertEqual(status, 400)
+    self.assertEqual(error['__type'], 'InvalidCiphertextException')
+
+  def test_aws_decrypt_with_other_key_fails(self):
+    _, encrypted = self._aws('Encrypt', {
+        'KeyId': _AWS_KEY_ARN,
+        'Plaintext': _b64(b'plaintext'),
+    })
+    status, error = self._aws('Decrypt', {
+        'CiphertextBlob': encrypted['CiphertextBlob'],
+        'KeyId': _AWS_KEY_ARN + '-other',
+    })
+    self.assertEqual(status, 400)
+    self.assertEqual(error['__type'], 'IncorrectKeyException')
+
+  def test_gcp_encrypt_decrypt(self):
+    url = '%s/v1/%s' % (self.server.url, _GCP_KEY_NAME)
+    status, encrypted = _post(url + ':encrypt', {
+        'plaintext': _b64(b'plaintext'),
+        'additionalAuthenticatedData': _b64(b'ad'),
+    })
+    self.assertEqual(status, 200)
+    self.assertEqual(encrypted['name'], _GCP_KEY_NAME)
+    self.assertEqual(
+        int(encrypted['ciphertextCrc32c']),
+        local_kms.crc32c(base64.b64decode(encrypted['ciphertext'])))
+    status, decrypted = _post(url + ':decrypt', {
+        'ciphertext': encrypted['ciphertext'],
+        'additionalAuthenticatedData': _b64(b'ad'),
+    })
+    self.assertEqual(status, 200)
+    self.assertEqual(base64.b64decode(decrypted['plaintext']), b'plaintext')
+    status, error = _post(url + ':decrypt', {
+        'ciphertext': encrypted['ciphertext'],
+        'additionalAuthenticatedData': _b64(b'other'),
+    })
+    self.assertEqual(status, 400)
+    self.assertEqual(error['error']['status'], 'INVALID_ARGUMENT')
+
+  def test_hcvault_encrypt_decrypt(self):
+    status, encrypted = _post(self.server.url + '/v1/transit/encrypt/testkey',
+                              {'plaintext': _b64(b'plaintext')})
+    self.assertEqual(status, 200)
+    ciphertext = encrypted['data']['ciphertext']
+    self.assertStartsWith(ciphertext, 'vault:v1:')
+    status, decrypted = _post(self.server.url + '/v1/transit/decrypt/testkey',
+                              {'ciphertext': ciphertext})
+    self.assertEqual(status, 200)
+    self.assertEqual(
+        base64.b64decode(decrypted['data']['plaintext']), b'plaintext')
+    status, _ = _post(self.server.url + '/v1/transit/decrypt/otherkey',
+                      {'ciphertext': ciphertext})
+    self.assertEqual(status, 400)
+
+  def test_unknown_path_fails(self):
+    status, _ = _post(self.server.url + '/v1/unknown', {})
+    self.assertEqual(status, 404)
+
+  def test_request_counts(self):
+    _post(self.server.url + '/v1/transit/encrypt/testkey',
+          {'plaintext': _b64(b'plaintext')})
+    self._aws('Encrypt', {'KeyId': _AWS_KEY_ARN, 'Plaintext': _b64(b'p')})
+    self._aws('Encrypt', {'KeyId': _AWS_KEY_ARN, 'Plaintext': _b64(b'p')})
+    self.assertEqual(self.server.request_counts(), {
+        'hcvault.encrypt': 1,
+        'aws.Encrypt': 2,
+    })
+
+
+class LocalKmsFailureInjectionTest(absltest.TestCase):
+
+  def test_error_rate(self):
+    with local_kms.LocalKmsServer(
+        local_kms.LocalKmsOptions(error_rate=1.0)) as server:
+      status, error = _post(server.url + '/', {
+          'KeyId': _AWS_KEY_ARN,
+          'Plaintext': _b64(b'plaintext'),
+      }, {'X-Amz-Target': 'TrentService.Encrypt'})
+    self.assertEqual(status, 500)
+    self.assertEqual(error['__type'], 'KMSInternalException')
+
+  def test_throttling(self):
+    with local_kms.LocalKmsServer(
+        local_kms.LocalKmsOptions(max_requests_per_second=2)) as server:
+      statuses = [
+          _post(server.url + '/v1/transit/encrypt/testkey',
+                {'plaintext': _b64(b'plaintext')})[0] for _ in range(5)
+      ]
+    self.assertIn(429, statuses)
+    self.assertEqual(statuses[0], 200)
+
+  def test_latency(self):
+    with local_kms.LocalKmsServer(
+        local_kms.LocalKmsOptions(latency_ms=50)) as server:
+      start = time.monotonic()
+      status, _ = _post(server.url + '/v1/transit/encrypt/testkey',
+                        {'plaintext': _b64(b'plaintext')})
+      elapsed = time.monotonic() - start
+    self.assertEqual(status, 200)
+    self.assertGreaterEqual(elapsed, 0.05)
+
+
+if __name__ == '__main__':
+  absltest.main()
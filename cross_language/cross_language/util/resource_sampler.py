@@ -0,0 +1,193 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Samples the resource usage of processes from /proc.
+
+ResourceSampler reads /proc/<pid>/stat, /proc/<pid>/status and /proc/<pid>/fd
+of a set of processes in a background thread, and records their CPU time,
+resident set size, number of threads and number of open file descriptors. Only
+the processes themselves are sampled, not their children.
+
+On systems without /proc, no samples are recorded.
+"""
+
+import dataclasses
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+_PROC_ROOT = '/proc'
+
+
+@dataclasses.dataclass(frozen=True)
+class ProcessSample:
+  """The resource usage of a process at one point in time."""
+  timestamp: float
+  cpu_seconds: float
+  rss_bytes: int
+  rss_high_water_mark_bytes: int
+  threads: int
+  open_fds: int
+
+
+def _status_fields(status: str) -> Dict[str, str]:
+  fields = {}
+  for line in status.splitlines():
+    key, _, value = line.partition(':')
+    fields[key] = value.strip()
+  return fields
+
+
+def _kilobytes(value: str) -> int:
+  # The sizes in /proc/<pid>/status are given as '<n> kB'.
+  return int(value.split()[0]) * 1024 if value else 0
+
+
+def read_sample(pid: int,
+                proc_root: str = _PROC_ROOT) -> Optional[ProcessSample]:
+  """Returns the current resource usage of pid, or None if it has exited."""
+  process_dir = os.path.join(proc_root, str(pid))
+  try:
+    with open(os.path.join(process_dir, 'stat')) as f:
+      stat = f.read()
+    with open(os.path.join(process_dir, 'status')) as f:
+      status = _status_fields(f.read())
+    open_fds = len(os.listdir(os.path.join(process_dir, 'fd')))
+  except (FileNotFoundError, ProcessLookupError):
+    return None
+  # The second field is the executable name in parentheses, which may contain
+  # spaces. The fields after it start with the state, the third field.
+  fields = stat[stat.rindex(')') + 2:].split()
+  ticks_per_second = os.sysconf('SC_CLK_TCK')
+  return ProcessSample(
+      timestamp=time.monotonic(),
+      cpu_seconds=(int(fields[11]) + int(fields[12])) / ticks_per_second,
+      rss_bytes=_kilobytes(status.get('VmRSS', '')),
+      rss_high_water_mark_bytes=_kilobytes(status.get('VmHWM', '')),
+      threads=int(status.get('Threads', fields[17])),
+      open_fds=open_fds)
+
+
+@dataclasses.dataclass
+class ResourceUsage:
+  """The resource usage of a process over all its samples."""
+  samples: int = 0
+  cpu_seconds: float = 0.0
+  max_rss_bytes: int = 0
+  max_threads: int = 0
+  max_open_fds: int = 0
+
+  def add(self, sample: ProcessSample) -> None:
+    self.samples += 1
+    self.cpu_seconds = sample.cpu_seconds
+    self.max_rss_bytes = max(self.max_rss_bytes, sample.rss_bytes,
+                             sample.rss_high_water_mark_bytes)
+    self.max_threads = max(self.max_threads, sample.threads)
+    self.max_open_fds = max(self.max_open_fds, sample.open_fds)
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceLimits:
+  """Limits on the resource usage of a process. None means no limit."""
+  max_rss_bytes: Optional[int] = None
+  max_threads: Optional[int] = None
+  max_open_fds: Optional[int] = None
+
+  @classmethod
+  def parse(cls, limits: str) -> 'ResourceLimits':
+    """Parses limits such as 'rss_mb=2048,threads=200,fds=1000'."""
+    values = {}
+    for limit in limits.split(','):
+      if not limit:
+        continue
+      name, _, value = limit.partition('=')
+      if name == 'rss_mb':
+        values['max_rss_bytes'] = int(value) * 1024 * 1024
+      elif name == 'threads':
+        values['max_threads'] = int(value)
+      elif name == 'fds':
+        values['max_open_fds'] = int(value)
+      else:
+        raise ValueError('Unknown resource limit %r, expected rss_mb, threads '
+                         'or fds' % name)
+    return cls(**values)
+
+  def violations(self, usage: ResourceUsage) -> List[str]:
+    """Returns a description of each limit that usage exceeds."""
+    violations = []
+    for name in ('max_rss_bytes', 'max_threads', 'max_open_fds'):
+      limit = getattr(self, name)
+      if limit is not None and getattr(usage, name) > limit:
+        violations.append('%s = %d > %d' % (name, getattr(usage, name), limit))
+    return violations
+
+
+class ResourceSampler:
+  """Samples a set of processes in a background thread.
+
+  Usage:
+    sampler = ResourceSampler({'java': pid}, interval_seconds=1.0)
+    sampler.start()
+    ...
+    sampler.stop()
+    usage = sampler.usage()
+  """
+
+  def __init__(self, pids: Dict[str, int], interval_seconds: float,
+               proc_root: str = _PROC_ROOT):
+    self._pids = dict(pids)
+    self._interval_seconds = interval_seconds
+    self._proc_root = proc_root
+    self._usage = {name: ResourceUsage() for name in pids}
+    self._lock = threading.Lock()
+    self._stopped = threading.Event()
+    self._thread = threading.Thread(target=self._run, daemon=True)
+
+  def start(self) -> 'ResourceSampler':
+    self._thread.start()
+    return self
+
+  def add(self, name: str, pid: int) -> None:
+    """Starts sampling another process."""
+    with self._lock:
+      self._pids[name] = pid
+      self._usage[name] = ResourceUsage()
+
+  def stop(self) -> None:
+    """Takes a last sample of each process and stops sampling."""
+    self._stopped.set()
+    self._thread.join()
+    self.sample()
+
+  def sample(self) -> None:
+    """Takes one sample of each process."""
+    with self._lock:
+      pids = list(self._pids.items())
+    for name, pid in pids:
+      sample = read_sample(pid, self._proc_root)
+      if sample is not None:
+        with self._lock:
+          self._usage[name].add(sample)
+
+  def usage(self) -> Dict[str, ResourceUsage]:
+    with self._lock:
+      return {
+          name: dataclasses.replace(usage)
+          for name, usage in self._usage.items()
+      }
+
+  def _run(self) -> None:
+    self.sample()
+    while not self._stopped.wait(self._interval_seconds):
+      self.sample()
@@ -0,0 +1,112 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for resource_sampler."""
+
+import os
+
+from absl.testing import absltest
+from cross_language.util import resource_sampler
+
+_STATUS = """Name:\tjava
+VmHWM:\t  204800 kB
+VmRSS:\t  102400 kB
+Threads:\t42
+"""
+
+
+def _write_process(proc_root: str, pid: int, utime: int, stime: int,
+                   fds: int) -> None:
+  process_dir = os.path.join(proc_root, str(pid))
+  os.makedirs(os.path.join(process_dir, 'fd'))
+  # The executable name may contain spaces and parentheses.
+  fields = ['S'] + ['0'] * 10 + [str(utime), str(stime)] + ['0'] * 5
+  with open(os.path.join(process_dir, 'stat'), 'w') as f:
+    f.write('%d (a (b) c) %s\n' % (pid, ' '.join(fields)))
+  with open(os.path.join(process_dir, 'status'), 'w') as f:
+    f.write(_STATUS)
+  for i in range(fds):
+    with open(os.path.join(process_dir, 'fd', str(i)), 'w'):
+      pass
+
+
+class ResourceSamplerTest(absltest.TestCase):
+
+  def test_read_sample(self):
+    proc_root = self.create_tempdir().full_path
+    _write_process(proc_root, 7, utime=300, stime=100, fds=3)
+    sample = resource_sampler.read_sample(7, proc_root)
+    self.assertAlmostEqual(sample.cpu_seconds,
+                           400 / os.sysconf('SC_CLK_TCK'))
+    self.assertEqual(sample.rss_bytes, 100 * 1024 * 1024)
+    self.assertEqual(sample.rss_high_water_mark_bytes, 200 * 1024 * 1024)
+    self.assertEqual(sample.threads, 42)
+    self.assertEqual(sample.open_fds, 3)
+
+  def test_read_sample_of_exited_process(self):
+    proc_root = self.create_tempdir().full_path
+    self.assertIsNone(resource_sampler.read_sample(7, proc_root))
+
+  def test_read_sample_of_own_process(self):
+    if not os.path.exists('/proc/self/stat'):
+      self.skipTest('no /proc')
+    sample = resource_sampler.read_sample(os.getpid())
+    self.assertGreater(sample.rss_bytes, 0)
+    self.assertGreater(sample.threads, 0)
+    self.assertGreater(sample.open_fds, 0)
+
+  def test_sampler(self):
+    proc_root = self.create_tempdir().full_path
+    _write_process(proc_root, 7, utime=300, stime=100, fds=3)
+    sampler = resource_sampler.ResourceSampler(
+        {'java': 7, 'exited': 8}, interval_seconds=0.01, proc_root=proc_root)
+    sampler.start()
+    sampler.stop()
+    usage = sampler.usage()
+    self.assertGreaterEqual(usage['java'].samples, 2)
+    self.assertEqual(usage['java'].max_rss_bytes, 200 * 1024 * 1024)
+    self.assertEqual(usage['java'].max_threads, 42)
+    self.assertEqual(usage['java'].max_open_fds, 3)
+    self.assertEqual(usage['exited'].samples, 0)
+
+  def test_add_process(self):
+    proc_root = self.create_tempdir().full_path
+    _write_process(proc_root, 7, utime=300, stime=100, fds=3)
+    sampler = resource_sampler.ResourceSampler(
+        {}, interval_seconds=0.01, proc_root=proc_root).start()
+    sampler.add('java', 7)
+    sampler.stop()
+    self.assertGreaterEqual(sampler.usage()['java'].samples, 1)
+    self.assertEqual(sampler.usage()['java'].max_open_fds, 3)
+
+  def test_limits(self):
+    limits = resource_sampler.ResourceLimits.parse('rss_mb=100,threads=10')
+    self.assertEqual(limits.max_rss_bytes, 100 * 1024 * 1024)
+    self.assertEqual(limits.max_threads, 10)
+    self.assertIsNone(limits.max_open_fds)
+    usage = resource_sampler.ResourceUsage(
+        samples=1, max_rss_bytes=1024, max_threads=11, max_open_fds=1000)
+    self.assertEqual(limits.violations(usage), ['max_threads = 11 > 10'])
+
+  def test_empty_limits(self):
+    limits = resource_sampler.ResourceLimits.parse('')
+    self.assertEmpty(limits.violations(
+        resource_sampler.ResourceUsage(max_threads=1000)))
+
+  def test_unknown_limit_fails(self):
+    with self.assertRaises(ValueError):
+      resource_sampler.ResourceLimits.parse('cpu=1')
+
+
+if __name__ == '__main__':
+  absltest.main()
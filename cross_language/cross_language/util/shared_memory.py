@@ -0,0 +1,96 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Passes large payloads to the testing servers in shared memory.
+
+Payloads are written to files in a private directory in /dev/shm, and the
+requests only contain a SharedMemoryRegion with the path of the file. This
+avoids copying them through gRPC, and is not limited by the maximal size of
+gRPC messages. Where /dev/shm does not exist, the files are in the default
+temporary directory.
+"""
+
+import contextlib
+import itertools
+import os
+import shutil
+import tempfile
+from typing import Iterator
+
+from protos import testing_api_pb2
+
+_SHM_ROOT = '/dev/shm'
+
+
+class SharedMemory:
+  """A directory in shared memory for the payloads of the servers.
+
+  Usage:
+    shm = SharedMemory(min_payload_bytes=1024 * 1024)
+    with shm.input(plaintext) as region, shm.output() as output_path:
+      response = stub.Encrypt(...)
+      ciphertext = shm.read(response.shared_ciphertext)
+    shm.close()
+  """
+
+  def __init__(self, min_payload_bytes: int):
+    self.min_payload_bytes = min_payload_bytes
+    self._dir = tempfile.mkdtemp(
+        prefix='tink_payloads_',
+        dir=_SHM_ROOT if os.path.isdir(_SHM_ROOT) else None)
+    self._counter = itertools.count()
+
+  def accepts(self, payload_bytes: int) -> bool:
+    """Returns True if a payload of this size should be in shared memory."""
+    return payload_bytes >= self.min_payload_bytes
+
+  def _new_path(self) -> str:
+    return os.path.join(self._dir, '%d' % next(self._counter))
+
+  @contextlib.contextmanager
+  def input(self, data: bytes) -> Iterator[testing_api_pb2.SharedMemoryRegion]:
+    """Writes data to shared memory, and removes it on exit."""
+    path = self._new_path()
+    with open(path, 'xb') as f:
+      f.write(data)
+    try:
+      yield testing_api_pb2.SharedMemoryRegion(
+          path=path, offset=0, length=len(data))
+    finally:
+      os.remove(path)
+
+  @contextlib.contextmanager
+  def output(self) -> Iterator[str]:
+    """Yields a path for the output of a server, and removes it on exit."""
+    path = self._new_path()
+    try:
+      yield path
+    finally:
+      with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+  def read(self, region: testing_api_pb2.SharedMemoryRegion) -> bytes:
+    """Returns the payload in a region which a server has written."""
+    if os.path.dirname(region.path) != self._dir:
+      raise ValueError('region %s is not in %s' % (region.path, self._dir))
+    with open(region.path, 'rb') as f:
+      f.seek(region.offset)
+      data = f.read(region.length)
+    if len(data) != region.length:
+      raise ValueError('region [%d, %d) exceeds the size of %s' %
+                       (region.offset, region.offset + region.length,
+                        region.path))
+    return data
+
+  def close(self) -> None:
+    shutil.rmtree(self._dir, ignore_errors=True)
@@ -0,0 +1,65 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for shared_memory."""
+
+import os
+
+from absl.testing import absltest
+from cross_language.util import shared_memory
+from protos import testing_api_pb2
+
+
+class SharedMemoryTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._shm = shared_memory.SharedMemory(min_payload_bytes=10)
+    self.addCleanup(self._shm.close)
+
+  def test_accepts(self):
+    self.assertFalse(self._shm.accepts(9))
+    self.assertTrue(self._shm.accepts(10))
+
+  def test_input_is_removed_on_exit(self):
+    with self._shm.input(b'payload') as region:
+      with open(region.path, 'rb') as f:
+        self.assertEqual(f.read(), b'payload')
+      self.assertEqual(region.length, 7)
+    self.assertFalse(os.path.exists(region.path))
+
+  def test_read_output(self):
+    with self._shm.output() as path:
+      with open(path, 'wb') as f:
+        f.write(b'0123456789')
+      region = testing_api_pb2.SharedMemoryRegion(path=path, offset=2, length=5)
+      self.assertEqual(self._shm.read(region), b'23456')
+      region.length = 9
+      with self.assertRaises(ValueError):
+        self._shm.read(region)
+    self.assertFalse(os.path.exists(path))
+
+  def test_output_which_was_not_written(self):
+    with self._shm.output() as path:
+      pass
+    self.assertFalse(os.path.exists(path))
+
+  def test_read_outside_of_directory_fails(self):
+    path = self.create_tempfile(content='payload').full_path
+    with self.assertRaises(ValueError):
+      self._shm.read(
+          testing_api_pb2.SharedMemoryRegion(path=path, offset=0, length=7))
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,142 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Detects leaks and degradation in time series of long-running servers.
+
+A soak run samples the resident set size and the latency percentiles of each
+server periodically. trends fits a line to each series by least squares, and
+SoakThresholds.violations compares the fitted lines with the thresholds:
+
+* rss_mb_per_hour: the largest growth of the RSS.
+* latency_drift_percent: the largest change of the fitted p50 and p99
+  latencies from the first to the last sample, relative to the first.
+
+Samples taken during a warm-up period are not fitted, because the servers fill
+caches and compile code early in their life.
+"""
+
+import dataclasses
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_MB = 1024 * 1024
+
+
+@dataclasses.dataclass(frozen=True)
+class Trend:
+  """A line fitted to a time series."""
+  slope_per_second: float
+  # The fitted values at the first and the last sample.
+  start_value: float
+  end_value: float
+
+  @property
+  def slope_per_hour(self) -> float:
+    return self.slope_per_second * 3600
+
+  @property
+  def drift_percent(self) -> float:
+    """The change from start_value to end_value, relative to start_value."""
+    if self.start_value <= 0:
+      return 0.0
+    return 100 * (self.end_value - self.start_value) / self.start_value
+
+
+def fit_trend(times: Sequence[float],
+              values: Sequence[float]) -> Optional[Trend]:
+  """Fits a line to values at times, or returns None for a single time."""
+  n = len(times)
+  if n != len(values):
+    raise ValueError('times and values must have the same length')
+  if n < 2:
+    return None
+  mean_time = sum(times) / n
+  mean_value = sum(values) / n
+  variance = sum((t - mean_time)**2 for t in times)
+  if variance == 0:
+    return None
+  slope = sum((t - mean_time) * (v - mean_value)
+              for t, v in zip(times, values)) / variance
+  intercept = mean_value - slope * mean_time
+  return Trend(
+      slope_per_second=slope,
+      start_value=intercept + slope * min(times),
+      end_value=intercept + slope * max(times))
+
+
+def trends(rss_samples: Sequence[Tuple[float, int]],
+           windows: Sequence[Dict[str, Any]],
+           warmup_seconds: float) -> Dict[str, Trend]:
+  """Fits the RSS and the latencies of one server after the warm-up.
+
+  Args:
+    rss_samples: The elapsed seconds and the RSS in bytes of each sample.
+    windows: The windows of a load_generator.Recorder.
+    warmup_seconds: The samples before this are ignored.
+
+  Returns:
+    The trends of 'rss_bytes', 'p50_ns' and 'p99_ns' which have at least two
+    samples after the warm-up. Windows without successful requests are
+    ignored.
+  """
+  series = {'rss_bytes': [(t, rss) for t, rss in rss_samples
+                          if t >= warmup_seconds]}
+  served = [
+      w for w in windows
+      if w['start_seconds'] >= warmup_seconds and w['requests'] > w['errors']
+  ]
+  for name in ('p50_ns', 'p99_ns'):
+    series[name] = [(w['start_seconds'], w[name]) for w in served]
+  result = {}
+  for name, points in series.items():
+    trend = fit_trend([t for t, _ in points], [v for _, v in points])
+    if trend is not None:
+      result[name] = trend
+  return result
+
+
+@dataclasses.dataclass(frozen=True)
+class SoakThresholds:
+  """Thresholds on the trends of a soak run. None means no threshold."""
+  rss_mb_per_hour: Optional[float] = None
+  latency_drift_percent: Optional[float] = None
+
+  @classmethod
+  def parse(cls, thresholds: str) -> 'SoakThresholds':
+    """Parses thresholds like 'rss_mb_per_hour=64,latency_drift_percent=50'."""
+    values = {}
+    for threshold in thresholds.split(','):
+      if not threshold:
+        continue
+      name, _, value = threshold.partition('=')
+      if name not in ('rss_mb_per_hour', 'latency_drift_percent'):
+        raise ValueError('Unknown soak threshold %r, expected rss_mb_per_hour '
+                         'or latency_drift_percent' % name)
+      values[name] = float(value)
+    return cls(**values)
+
+  def violations(self, server_trends: Dict[str, Trend]) -> List[str]:
+    """Returns a description of each threshold that server_trends exceed."""
+    violations = []
+    rss = server_trends.get('rss_bytes')
+    if (self.rss_mb_per_hour is not None and rss is not None and
+        rss.slope_per_hour / _MB > self.rss_mb_per_hour):
+      violations.append('RSS grows by %.1f MB per hour > %.1f' %
+                        (rss.slope_per_hour / _MB, self.rss_mb_per_hour))
+    for name in ('p50_ns', 'p99_ns'):
+      latency = server_trends.get(name)
+      if (self.latency_drift_percent is not None and latency is not None and
+          latency.drift_percent > self.latency_drift_percent):
+        violations.append('%s drifts by %.1f%% > %.1f%%' %
+                          (name[:-len('_ns')], latency.drift_percent,
+                           self.latency_drift_percent))
+    return violations
@@ -0,0 +1,102 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for soak."""
+
+from absl.testing import absltest
+
+from cross_language.util import soak
+
+_MB = 1024 * 1024
+
+
+def _window(start_seconds, p50_ns, p99_ns, requests=100, errors=0):
+  return {
+      'start_seconds': start_seconds,
+      'requests': requests,
+      'errors': errors,
+      'p50_ns': p50_ns,
+      'p99_ns': p99_ns,
+  }
+
+
+class FitTrendTest(absltest.TestCase):
+
+  def test_fits_line(self):
+    trend = soak.fit_trend([0, 10, 20, 30], [5, 7, 9, 11])
+    self.assertAlmostEqual(trend.slope_per_second, 0.2)
+    self.assertAlmostEqual(trend.start_value, 5)
+    self.assertAlmostEqual(trend.end_value, 11)
+    self.assertAlmostEqual(trend.slope_per_hour, 720)
+    self.assertAlmostEqual(trend.drift_percent, 120)
+
+  def test_single_time_has_no_trend(self):
+    self.assertIsNone(soak.fit_trend([1], [2]))
+    self.assertIsNone(soak.fit_trend([1, 1], [2, 3]))
+
+  def test_different_lengths_fail(self):
+    with self.assertRaises(ValueError):
+      soak.fit_trend([1, 2], [3])
+
+
+class TrendsTest(absltest.TestCase):
+
+  def test_ignores_warmup_and_failed_windows(self):
+    rss_samples = [(0, 500 * _MB), (60, 100 * _MB), (120, 100 * _MB),
+                   (180, 100 * _MB)]
+    windows = [
+        _window(0, 1_000_000, 9_000_000),
+        _window(60, 100, 200),
+        _window(120, 100, 200),
+        _window(150, 0, 0, requests=5, errors=5),
+        _window(180, 100, 200),
+    ]
+    trends = soak.trends(rss_samples, windows, warmup_seconds=30)
+    self.assertAlmostEqual(trends['rss_bytes'].slope_per_second, 0)
+    self.assertAlmostEqual(trends['p50_ns'].drift_percent, 0)
+    self.assertAlmostEqual(trends['p99_ns'].start_value, 200)
+
+  def test_too_few_samples_have_no_trends(self):
+    self.assertEqual(soak.trends([(0, 1)], [_window(0, 1, 2)], 0), {})
+
+
+class SoakThresholdsTest(absltest.TestCase):
+
+  def test_parse(self):
+    self.assertEqual(
+        soak.SoakThresholds.parse(
+            'rss_mb_per_hour=64,latency_drift_percent=50'),
+        soak.SoakThresholds(rss_mb_per_hour=64, latency_drift_percent=50))
+    self.assertEqual(soak.SoakThresholds.parse(''), soak.SoakThresholds())
+
+  def test_parse_unknown_fails(self):
+    with self.assertRaises(ValueError):
+      soak.SoakThresholds.parse('rss=1')
+
+  def test_violations(self):
+    hour = 3600
+    trends = soak.trends(
+        [(0, 100 * _MB), (hour, 200 * _MB)],
+        [_window(0, 1000, 2000), _window(hour, 1100, 4000)],
+        warmup_seconds=0)
+    thresholds = soak.SoakThresholds(rss_mb_per_hour=64,
+                                     latency_drift_percent=50)
+    violations = thresholds.violations(trends)
+    self.assertLen(violations, 2)
+    self.assertIn('RSS grows by 100.0 MB per hour', violations[0])
+    self.assertIn('p99 drifts by 100.0%', violations[1])
+    self.assertEmpty(soak.SoakThresholds().violations(trends))
+
+
+if __name__ == '__main__':
+  absltest.main()
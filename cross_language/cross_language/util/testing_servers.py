@@ -13,10 +13,18 @@
 # limitations under the License.
 """testing_server starts up testing gRPC servers in different languages."""
 
+import dataclasses
+import json
 import os
+import re
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
 import time
-from typing import List, Optional, Type, TypeVar
+from typing import (Any, Dict, IO, Iterable, List, Optional, Sequence, Tuple,
+                    Type, TypeVar, Union)
 
 from absl import logging
 import grpc
@@ -26,6 +34,9 @@ import tink
 from runfiles import Runfiles
 from tink.proto import tink_pb2
 from cross_language.util import _primitives
+from cross_language.util import cpu_isolation
+from cross_language.util import resource_sampler
+from cross_language.util import shared_memory as shared_memory_lib
 from protos import testing_api_pb2
 from protos import testing_api_pb2_grpc
 
@@ -78,6 +89,75 @@ HCVAULT_TOKEN = os.environ['VAULT_TOKEN'] if 'VAULT_TOKEN' in os.environ else ''
 _TESTDATA_ROOT_PATH = 'cross_language_test/testdata'
 _TESTING_SERVERS_ROOT = 'tink_base/testing'
 
+# The transport between the harness and the servers:
+#   tcp: the servers listen on a loopback TCP port (default),
+#   uds: the servers listen on a Unix domain socket in a temporary directory.
+# start() can also set it.
+_TRANSPORT_ENV = 'TINK_CROSS_LANG_TRANSPORT'
+TRANSPORTS = ('tcp', 'uds')
+# Unix domain socket paths are limited to 107 bytes on Linux.
+_MAX_UNIX_SOCKET_DIR_LENGTH = 80
+
+# If set, AEAD and streaming AEAD payloads of at least this many bytes are
+# passed in shared memory instead of gRPC messages to the servers which support
+# it, for example
+#   --test_env TINK_CROSS_LANG_SHARED_MEMORY_BYTES=1048576
+_SHARED_MEMORY_ENV = 'TINK_CROSS_LANG_SHARED_MEMORY_BYTES'
+
+# Comma-separated profilers which are run in the servers from start() to
+# stop(), for example:
+#   bazel test aead_test --test_env TINK_CROSS_LANG_PROFILE=cpu,sampling,heap
+# The profiles are written to TEST_UNDECLARED_OUTPUTS_DIR. Only servers which
+# implement the Profiling service are profiled.
+_PROFILE_ENV = 'TINK_CROSS_LANG_PROFILE'
+_PROFILERS = ('cpu', 'sampling', 'heap')
+
+# The interval in seconds at which the CPU time, memory, threads and open file
+# descriptors of the servers are sampled. 0 disables sampling. The usage is
+# written to <test name>-resource_usage.json in TEST_UNDECLARED_OUTPUTS_DIR.
+_RESOURCE_SAMPLING_ENV = 'TINK_CROSS_LANG_RESOURCE_SAMPLING_SECONDS'
+_DEFAULT_RESOURCE_SAMPLING_SECONDS = 1.0
+# If set, stop() fails if a server exceeds these limits, for example
+#   --test_env TINK_CROSS_LANG_RESOURCE_LIMITS=rss_mb=2048,threads=200,fds=1000
+_RESOURCE_LIMITS_ENV = 'TINK_CROSS_LANG_RESOURCE_LIMITS'
+
+# Restrict the CPUs, the niceness and the CPU time of the servers, and of the
+# harness named 'harness', see cpu_isolation. For example
+#   --test_env TINK_CROSS_LANG_CPUS='harness=0;java=1-2;go=3;cc=4;python=5'
+#   --test_env TINK_CROSS_LANG_NICE=java=5,go=5
+#   --test_env TINK_CROSS_LANG_CPU_QUOTA=java=1.5,go=1
+# The CPUs are separated by semicolons, since CPU lists contain commas. The
+# quota is in CPUs and needs the cgroup v2 CPU controller. The cgroups of the
+# servers are created in TINK_CROSS_LANG_CGROUP_DIR, which is required for a
+# quota. It must be a cgroup writable by the user which contains no processes,
+# since cgroup v2 only allows processes in leaf cgroups once the cpu controller
+# is enabled for the children. So it cannot be the cgroup of the harness, but
+# it can be an empty child of a cgroup delegated to the user, for example by
+# systemd-run --user -p Delegate=yes. If any is set, the CPU topology and the
+# isolation of each process are written to <test name>-cpu_isolation.json in
+# TEST_UNDECLARED_OUTPUTS_DIR.
+_CPUS_ENV = 'TINK_CROSS_LANG_CPUS'
+_NICE_ENV = 'TINK_CROSS_LANG_NICE'
+_CPU_QUOTA_ENV = 'TINK_CROSS_LANG_CPU_QUOTA'
+_CGROUP_DIR_ENV = 'TINK_CROSS_LANG_CGROUP_DIR'
+_HARNESS = 'harness'
+
+# What stop() prints of the server logs:
+#   errors: the error lines (default),
+#   tail: the error lines and the last lines,
+#   full: the complete logs.
+# The last lines are always printed for servers that exited before stop().
+# The complete logs are in TEST_UNDECLARED_OUTPUTS_DIR.
+_SERVER_LOGS_ENV = 'TINK_CROSS_LANG_SERVER_LOGS'
+_SERVER_LOGS_MODES = ('errors', 'tail', 'full')
+_LOG_TAIL_LINES = 50
+# At most this many bytes are read from the end of a log for its tail.
+_LOG_TAIL_BYTES = 64 * 1024
+_LOG_ERROR_LINES = 20
+# Error lines of the servers, also in the glog format of absl and C++.
+_LOG_ERROR_PATTERN = re.compile(
+    r'\b(ERROR|SEVERE|FATAL)\b|^[EF]\d{4} |^panic:|^Traceback ')
+
 
 def _get_resource_path(path: str) -> str:
   return Runfiles.Create().Rlocation(path)
@@ -126,8 +206,18 @@ def _server_path(lang: str) -> str:
   raise RuntimeError('Executable for lang %s not found' % lang)
 
 
-def _server_cmd(lang: str, port: int) -> List[str]:
-  """Returns the server command."""
+def _server_cmd(lang: str, address: str,
+                local_kms_url: Optional[str] = None) -> List[str]:
+  """Returns the server command.
+
+  Args:
+    lang: The language of the server.
+    address: The address the server listens on, either '[::]:<port>' or
+      'unix:<path>'.
+    local_kms_url: If set, the URL of a local_kms.LocalKmsServer which the
+      server should use instead of the real KMS services, where the server
+      supports this.
+  """
   aws_credentials_path = _get_resource_path(
       os.path.join(_TESTDATA_ROOT_PATH, AWS_CREDENTIALS_PATH)
   )
@@ -142,9 +232,11 @@ def _server_cmd(lang: str, port: int) -> List[str]:
 
   server_path = _server_path(lang)
   # TODO(b/249015767): Refactor KMS integration to pass credentials via gRPC.
-  server_args = [
-      '--port',
-      '%d' % port,
+  if address.startswith('unix:'):
+    address_args = ['--unix_socket', address[len('unix:'):]]
+  else:
+    address_args = ['--port', address.rsplit(':', 1)[1]]
+  server_args = address_args + [
       '--gcp_credentials_path',
       gcp_credentials_path,
       '--aws_credentials_path',
@@ -160,6 +252,16 @@ def _server_cmd(lang: str, port: int) -> List[str]:
         '--hcvault_token', HCVAULT_TOKEN])
   if lang == 'java' or lang == 'python':
     server_args.extend(['--hcvault_token', HCVAULT_TOKEN])
+  if local_kms_url is not None:
+    if lang in ('go', 'java', 'python'):
+      server_args.extend(['--hcvault_address', local_kms_url])
+    if lang == 'go':
+      server_args.extend(['--gcp_endpoint', local_kms_url + '/'])
+    if lang == 'python':
+      server_args.extend(['--gcp_endpoint', local_kms_url])
+  if lang == 'python' and 'cpu' in _profilers():
+    # The Python server only intercepts the RPCs for the CPU profiler if asked.
+    server_args.append('--cpu_profiling')
 
   if lang == 'java' and server_path.endswith('.jar'):
     return ['java', '-jar', server_path] + server_args
@@ -167,15 +269,113 @@ def _server_cmd(lang: str, port: int) -> List[str]:
     return [server_path] + server_args
 
 
-def _get_file_content(filename: str) -> str:
-  with open(filename, 'r') as f:
-    return f.read()
+def _server_env(local_kms_url: Optional[str] = None) -> Dict[str, str]:
+  """Returns the environment of the server processes."""
+  env = os.environ.copy()
+  # Remove PYTHONPATH to prevent the parent test's python path from
+  # overriding the child server's own runfiles.
+  env.pop('PYTHONPATH', None)
+  if local_kms_url is not None:
+    # Used by the AWS SDKs of Python and Go.
+    env['AWS_ENDPOINT_URL_KMS'] = local_kms_url
+  return env
+
+
+def start_server(
+    lang: str,
+    address: str,
+    output_file: IO[str],
+    local_kms_url: Optional[str] = None,
+    isolation: Optional[cpu_isolation.Isolation] = None) -> subprocess.Popen:
+  """Starts the server of lang without waiting until it accepts connections.
+
+  Args:
+    lang: The language of the server.
+    address: The address the server listens on, either '[::]:<port>' or
+      'unix:<path>'.
+    output_file: The file to which stdout and stderr of the server are written.
+    local_kms_url: See _server_cmd.
+    isolation: If set, the server is started with cpu_isolation.command_prefix.
+      The caller should also cpu_isolation.apply the
+      cpu_isolation.without_prefix of it to the started server.
+
+  Returns:
+    The server process.
+  """
+  cmd = _server_cmd(lang, address, local_kms_url)
+  if isolation is not None:
+    cmd = cpu_isolation.command_prefix(isolation) + cmd
+  logging.info('cmd = %s', cmd)
+  return subprocess.Popen(
+      cmd, stdout=output_file, stderr=subprocess.STDOUT,
+      env=_server_env(local_kms_url))
+
+
+def _profilers() -> List[str]:
+  """Returns the profilers set in the TINK_CROSS_LANG_PROFILE variable."""
+  profilers = [p for p in os.environ.get(_PROFILE_ENV, '').split(',') if p]
+  for profiler in profilers:
+    if profiler not in _PROFILERS:
+      raise ValueError('Unknown profiler %s in %s, expected one of %s' %
+                       (profiler, _PROFILE_ENV, _PROFILERS))
+  return profilers
+
+
+def _unix_socket_dir() -> str:
+  socket_dir = tempfile.mkdtemp(prefix='tink_servers_')
+  if len(socket_dir) > _MAX_UNIX_SOCKET_DIR_LENGTH:
+    os.rmdir(socket_dir)
+    socket_dir = tempfile.mkdtemp(prefix='tink_servers_', dir='/tmp')
+  return socket_dir
+
+
+def _log_tail(path: str, max_lines: int = _LOG_TAIL_LINES) -> List[str]:
+  """Returns the last lines of a log, without reading all of it."""
+  with open(path, 'rb') as f:
+    size = f.seek(0, os.SEEK_END)
+    f.seek(max(0, size - _LOG_TAIL_BYTES))
+    lines = f.read().decode('utf-8', errors='replace').splitlines()
+  if size > _LOG_TAIL_BYTES:
+    # The first line is most likely incomplete.
+    lines = lines[1:]
+  return lines[-max_lines:]
+
+
+def _log_errors(path: str,
+                max_lines: int = _LOG_ERROR_LINES) -> Tuple[List[str], int]:
+  """Streams a log and returns the first error lines, and their number."""
+  errors = []
+  count = 0
+  with open(path, 'r', errors='replace') as f:
+    for line in f:
+      if _LOG_ERROR_PATTERN.search(line):
+        count += 1
+        if len(errors) < max_lines:
+          errors.append(line.rstrip('\n'))
+  return errors, count
 
 
 class _TestingServers():
-  """TestingServers starts up testing gRPC servers and returns service stubs."""
+  """TestingServers starts up testing gRPC servers and returns service stubs.
+
+  The servers of the given languages are started in the constructor, those of
+  the other languages the first time that one of their stubs is requested.
+  """
 
-  def __init__(self, test_name: str):
+  def __init__(self, test_name: str, local_kms_url: Optional[str] = None,
+               transport: Optional[str] = None,
+               languages: Optional[Iterable[str]] = None):
+    transport = transport or os.environ.get(_TRANSPORT_ENV, 'tcp')
+    if transport not in TRANSPORTS:
+      raise ValueError('Unknown transport %s, expected one of %s' %
+                       (transport, TRANSPORTS))
+    self._local_kms_url = local_kms_url
+    self._socket_dir = _unix_socket_dir() if transport == 'uds' else None
+    min_shared_memory_bytes = int(os.environ.get(_SHARED_MEMORY_ENV, '0'))
+    self._shared_memory = (
+        shared_memory_lib.SharedMemory(min_shared_memory_bytes)
+        if min_shared_memory_bytes > 0 else None)
+    self._server_info = {}
     self._server = {}
     self._output_file = {}
     self._channel = {}
@@ -190,12 +390,66 @@ class _TestingServers():
     self._prf_stub = {}
     self._jwt_stub = {}
     self._keyset_deriver_stub = {}
+    self._profiling_stub = {}
+    self._timing_stub = {}
+    # The languages whose servers are ready, in the order they were started.
+    self._languages = []
+    self._start_lock = threading.Lock()
     self._test_name = test_name
-
-    for lang in LANGUAGES:
-      port = portpicker.pick_unused_port()
-      cmd = _server_cmd(lang, port)
-      logging.info('cmd = %s', cmd)
+    self._profilers = _profilers()
+    self._profiled_languages = []
+    self._isolation = cpu_isolation.parse(
+        os.environ.get(_CPUS_ENV, ''), os.environ.get(_NICE_ENV, ''),
+        os.environ.get(_CPU_QUOTA_ENV, ''), LANGUAGES + [_HARNESS])
+    harness_isolation = self._isolation.get(_HARNESS,
+                                            cpu_isolation.Isolation())
+    if harness_isolation.cpu_quota:
+      raise ValueError('%s cannot limit the CPU time of the harness' %
+                       _CPU_QUOTA_ENV)
+    if (any(i.cpu_quota for i in self._isolation.values()) and
+        not os.environ.get(_CGROUP_DIR_ENV)):
+      raise ValueError('%s needs %s, a cgroup without processes' %
+                       (_CPU_QUOTA_ENV, _CGROUP_DIR_ENV))
+    # The CPUs of the harness before it is pinned.
+    self._harness_cpus = None
+    if harness_isolation.cpus is not None:
+      self._harness_cpus = frozenset(os.sched_getaffinity(0))
+    self._cgroups = {}
+    self._resource_sampler = None
+    sampling_seconds = float(
+        os.environ.get(_RESOURCE_SAMPLING_ENV,
+                       _DEFAULT_RESOURCE_SAMPLING_SECONDS))
+    if sampling_seconds > 0:
+      self._resource_sampler = resource_sampler.ResourceSampler(
+          {}, sampling_seconds).start()
+
+    self._start_servers(LANGUAGES if languages is None else languages)
+    if _HARNESS in self._isolation:
+      # After the first servers are started, so that they do not inherit it.
+      # Servers started later get their CPUs from _server_isolation, but
+      # inherit the niceness of the harness.
+      cpu_isolation.apply(_HARNESS, os.getpid(), self._isolation[_HARNESS])
+      self._write_cpu_isolation()
+
+  def _start_servers(self, languages: Iterable[str]) -> None:
+    """Starts the servers of languages and waits until they are ready."""
+    languages = [
+        lang for lang in dict.fromkeys(languages)
+        if lang not in self._languages
+    ]
+    for lang in languages:
+      if lang not in LANGUAGES:
+        raise ValueError('Unknown language %s, expected one of %s' %
+                         (lang, LANGUAGES))
+    start_time = {}
+    for lang in languages:
+      if self._socket_dir is not None:
+        address = 'unix:%s' % os.path.join(self._socket_dir, lang + '.sock')
+        credentials = grpc.local_channel_credentials(
+            grpc.LocalConnectionType.UDS)
+      else:
+        address = '[::]:%d' % portpicker.pick_unused_port()
+        credentials = grpc.local_channel_credentials()
       output_path = self._get_output_path(lang)
       logging.info('writing server output to %s', output_path)
       try:
@@ -203,19 +457,24 @@ class _TestingServers():
       except IOError as e:
         logging.info('unable to open server output file %s', output_path)
         raise RuntimeError('Could not start %s server' % lang) from e
-      env = os.environ.copy()
-      # Remove PYTHONPATH to prevent the parent test's python path from
-      # overriding the child server's own runfiles.
-      env.pop('PYTHONPATH', None)
-      self._server[lang] = subprocess.Popen(
-          cmd, stdout=self._output_file[lang], stderr=subprocess.STDOUT, env=env
-      )
-      logging.info('%s server started on port %d with pid: %d. Log output: %s',
-                   lang, port, self._server[lang].pid,
+      isolation = self._server_isolation(lang)
+      start_time[lang] = time.monotonic()
+      self._server[lang] = start_server(lang, address,
+                                        self._output_file[lang],
+                                        self._local_kms_url, isolation)
+      if isolation is not None:
+        cgroup = cpu_isolation.apply(lang, self._server[lang].pid,
+                                     cpu_isolation.without_prefix(isolation),
+                                     os.environ.get(_CGROUP_DIR_ENV))
+        if cgroup is not None:
+          self._cgroups[lang] = cgroup
+      logging.info('%s server started on %s with pid: %d. Log output: %s',
+                   lang, address, self._server[lang].pid,
                    self._output_file[lang].name)
-      self._channel[lang] = grpc.secure_channel(
-          '[::]:%d' % port, grpc.local_channel_credentials())
-    for lang in LANGUAGES:
+      self._channel[lang] = grpc.secure_channel(address, credentials)
+      if self._resource_sampler is not None:
+        self._resource_sampler.add(lang, self._server[lang].pid)
+    for lang in languages:
       try:
         grpc.channel_ready_future(self._channel[lang]).result(timeout=30)
       except Exception as e:
@@ -223,8 +482,13 @@ class _TestingServers():
         self._server[lang].kill()
         _, _ = self._server[lang].communicate()
         raise RuntimeError(
-            'Could not start %s server, output=%s' %
-            (lang, _get_file_content(self._output_file[lang].name))) from e
+            'Could not start %s server, last lines of %s:\n%s' %
+            (lang, self._output_file[lang].name,
+             '\n'.join(_log_tail(self._output_file[lang].name)))) from e
+      # The servers start in parallel, so this is an upper bound of the
+      # startup time of all but the first.
+      logging.info('%s server ready after %.2f s', lang,
+                   time.monotonic() - start_time[lang])
       self._metadata_stub[lang] = testing_api_pb2_grpc.MetadataStub(
           self._channel[lang])
       self._keyset_stub[lang] = testing_api_pb2_grpc.KeysetStub(
@@ -246,6 +510,193 @@ class _TestingServers():
       self._keyset_deriver_stub[lang] = testing_api_pb2_grpc.KeysetDeriverStub(
           self._channel[lang]
       )
+      self._profiling_stub[lang] = testing_api_pb2_grpc.ProfilingStub(
+          self._channel[lang])
+      self._timing_stub[lang] = testing_api_pb2_grpc.TimingStub(
+          self._channel[lang])
+      response = self._metadata_stub[lang].GetServerInfo(
+          testing_api_pb2.ServerInfoRequest())
+      if lang != response.language:
+        raise ValueError(
+            'lang = %s != response.language = %s' % (lang, response.language))
+      if not response.tink_version:
+        logging.warning('server in lang %s has no tink version.', lang)
+      self._server_info[lang] = response
+    if self._profilers:
+      self._start_profiling(languages)
+    if self._isolation:
+      self._write_cpu_isolation()
+    # Only now, since _started reads the stubs without holding the lock.
+    self._languages.extend(languages)
+
+  def _started(self, lang: str) -> str:
+    """Starts the server of lang if it is not started yet, and returns lang."""
+    if lang not in self._languages:
+      with self._start_lock:
+        if lang not in self._languages:
+          logging.info('Starting %s server on demand.', lang)
+          self._start_servers([lang])
+    return lang
+
+  def languages(self) -> List[str]:
+    """Returns the languages whose servers are started."""
+    return list(self._languages)
+
+  def _server_isolation(self, lang: str) -> Optional[cpu_isolation.Isolation]:
+    """Returns the isolation of the server of lang, if any."""
+    isolation = self._isolation.get(lang)
+    if self._harness_cpus is not None:
+      # Servers without CPUs keep those of the harness before it is pinned.
+      isolation = isolation or cpu_isolation.Isolation()
+      if isolation.cpus is None:
+        isolation = dataclasses.replace(isolation, cpus=self._harness_cpus)
+    return isolation
+
+  def _write_cpu_isolation(self) -> None:
+    """Writes the CPU topology and the isolation of the processes."""
+    processes = {
+        lang: cpu_isolation.state(self._server[lang].pid,
+                                  self._cgroups.get(lang))
+        for lang in self._server
+    }
+    processes[_HARNESS] = cpu_isolation.state(os.getpid())
+    path = os.path.join(os.environ['TEST_UNDECLARED_OUTPUTS_DIR'],
+                        '%s-cpu_isolation.json' % self._test_name)
+    with open(path, 'w') as f:
+      json.dump({'topology': cpu_isolation.topology(),
+                 'processes': processes}, f, indent=2, sort_keys=True)
+    logging.info('CPU isolation: %s', processes)
+
+  def _profile_name(self, lang: str, suffix: str) -> str:
+    return '%s-%s-%s' % (self._test_name, lang, suffix)
+
+  def _profiling_call(self, lang: str, rpc_name: str, request) -> bool:
+    """Calls a Profiling RPC, and copies the written files to the outputs.
+
+    Profiling never fails the test, errors are only logged.
+
+    Args:
+      lang: The language of the server.
+      rpc_name: The name of the RPC of the Profiling service.
+      request: The request.
+
+    Returns:
+      False if the server does not implement the Profiling service.
+    """
+    try:
+      response = getattr(self._profiling_stub[lang], rpc_name)(request)
+    except grpc.RpcError as e:
+      if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+        return False
+      logging.warning('%s failed in %s server: %s', rpc_name, lang, e)
+      return True
+    if response.err:
+      logging.warning('%s failed in %s server: %s', rpc_name, lang,
+                      response.err)
+    output_dir = os.environ['TEST_UNDECLARED_OUTPUTS_DIR']
+    for path in response.output_paths:
+      if os.path.dirname(os.path.abspath(path)) != os.path.abspath(output_dir):
+        shutil.copy(path, output_dir)
+      logging.info('%s server profile: %s', lang, os.path.basename(path))
+    return True
+
+  def _start_profiling(self, languages: Sequence[str]) -> None:
+    """Starts the profilers in the servers of languages which support them."""
+    for lang in languages:
+      supported = True
+      if 'heap' in self._profilers:
+        supported = self._profiling_call(
+            lang, 'TakeHeapSnapshot',
+            testing_api_pb2.TakeHeapSnapshotRequest(name='start'))
+      if supported and 'cpu' in self._profilers:
+        supported = self._profiling_call(
+            lang, 'StartCpuProfiler',
+            testing_api_pb2.StartCpuProfilerRequest())
+      if supported and 'sampling' in self._profilers:
+        supported = self._profiling_call(
+            lang, 'StartSamplingProfiler',
+            testing_api_pb2.StartSamplingProfilerRequest())
+      if supported:
+        self._profiled_languages.append(lang)
+      else:
+        logging.info('%s server does not support profiling.', lang)
+
+  def _stop_profiling(self) -> None:
+    """Stops the profilers and collects the profiles."""
+    for lang in self._profiled_languages:
+      # The heap snapshot is taken first, such that it does not contain the
+      # allocations of the other profilers.
+      if 'heap' in self._profilers:
+        self._profiling_call(
+            lang, 'TakeHeapSnapshot',
+            testing_api_pb2.TakeHeapSnapshotRequest(name='stop'))
+        self._profiling_call(
+            lang, 'DiffHeapSnapshots',
+            testing_api_pb2.DiffHeapSnapshotsRequest(
+                old_name='start', new_name='stop',
+                output_name=self._profile_name(lang, 'heap_diff'),
+                limit=100))
+      if 'cpu' in self._profilers:
+        self._profiling_call(
+            lang, 'StopCpuProfiler',
+            testing_api_pb2.StopProfilerRequest(
+                output_name=self._profile_name(lang, 'cpu_profile')))
+      if 'sampling' in self._profilers:
+        self._profiling_call(
+            lang, 'StopSamplingProfiler',
+            testing_api_pb2.StopProfilerRequest(
+                output_name=self._profile_name(lang, 'sampling_profile')))
+
+  def _write_resource_usage(self) -> List[str]:
+    """Writes the resource usage of the servers and checks the limits.
+
+    Returns:
+      The exceeded limits.
+    """
+    self._resource_sampler.stop()
+    usage = self._resource_sampler.usage()
+    for lang, lang_usage in usage.items():
+      logging.info('%s server resource usage: %s', lang, lang_usage)
+    path = os.path.join(os.environ['TEST_UNDECLARED_OUTPUTS_DIR'],
+                        '%s-resource_usage.json' % self._test_name)
+    with open(path, 'w') as f:
+      json.dump({lang: dataclasses.asdict(lang_usage)
+                 for lang, lang_usage in usage.items()}, f, indent=2)
+    limits = resource_sampler.ResourceLimits.parse(
+        os.environ.get(_RESOURCE_LIMITS_ENV, ''))
+    return [
+        '%s server: %s' % (lang, violation)
+        for lang, lang_usage in usage.items()
+        for violation in limits.violations(lang_usage)
+    ]
+
+  def _print_log(self, lang: str, mode: str) -> None:
+    """Prints the log of a server, see _SERVER_LOGS_ENV."""
+    path = self._get_output_path(lang)
+    errors, error_count = _log_errors(path)
+    if mode == 'errors' and not errors:
+      return
+    total_reps = 1 + 100 // len(lang + ' ')
+    length = total_reps * len(lang + ' ') - 1
+    print()
+    print('=' * length)
+    print((lang + ' ') * total_reps)
+    print('v' * length)
+    if mode == 'full':
+      with open(path, 'r', errors='replace') as f:
+        shutil.copyfileobj(f, sys.stdout)
+    else:
+      if errors:
+        print('%d error lines, the first %d:' % (error_count, len(errors)))
+        print('\n'.join(errors))
+      if mode == 'tail':
+        print('Last lines:')
+        print('\n'.join(_log_tail(path)))
+      print('Complete log: %s' % os.path.basename(path))
+    print('^' * length)
+    print((lang + ' ') * total_reps)
+    print('=' * length)
+    print()
 
   def _get_output_path(self, lang) -> str:
     try:
@@ -257,98 +708,171 @@ class _TestingServers():
     output_file = '%s-%s-%s' % (self._test_name, lang, 'server.log')
     return os.path.join(output_dir, output_file)
 
+  def channel(self, lang) -> grpc.Channel:
+    return self._channel[self._started(lang)]
+
+  def pid(self, lang) -> int:
+    return self._server[self._started(lang)].pid
+
   def keyset_stub(self, lang) -> testing_api_pb2_grpc.KeysetStub:
-    return self._keyset_stub[lang]
+    return self._keyset_stub[self._started(lang)]
 
   def aead_stub(self, lang) -> testing_api_pb2_grpc.AeadStub:
-    return self._aead_stub[lang]
+    return self._aead_stub[self._started(lang)]
 
   def daead_stub(self, lang) -> testing_api_pb2_grpc.DeterministicAeadStub:
-    return self._daead_stub[lang]
+    return self._daead_stub[self._started(lang)]
 
   def streaming_aead_stub(self, lang) -> testing_api_pb2_grpc.StreamingAeadStub:
-    return self._streaming_aead_stub[lang]
+    return self._streaming_aead_stub[self._started(lang)]
 
   def hybrid_stub(self, lang) -> testing_api_pb2_grpc.HybridStub:
-    return self._hybrid_stub[lang]
+    return self._hybrid_stub[self._started(lang)]
 
   def mac_stub(self, lang) -> testing_api_pb2_grpc.MacStub:
-    return self._mac_stub[lang]
+    return self._mac_stub[self._started(lang)]
 
   def signature_stub(self, lang) -> testing_api_pb2_grpc.SignatureStub:
-    return self._signature_stub[lang]
+    return self._signature_stub[self._started(lang)]
 
   def prf_stub(self, lang) -> testing_api_pb2_grpc.PrfSetStub:
-    return self._prf_stub[lang]
+    return self._prf_stub[self._started(lang)]
 
   def jwt_stub(self, lang) -> testing_api_pb2_grpc.JwtStub:
-    return self._jwt_stub[lang]
+    return self._jwt_stub[self._started(lang)]
 
   def keyset_deriver_stub(self, lang) -> testing_api_pb2_grpc.KeysetDeriverStub:
-    return self._keyset_deriver_stub[lang]
+    return self._keyset_deriver_stub[self._started(lang)]
 
   def metadata_stub(self, lang) -> testing_api_pb2_grpc.MetadataStub:
-    return self._metadata_stub[lang]
+    return self._metadata_stub[self._started(lang)]
+
+  def timing_stub(self, lang) -> testing_api_pb2_grpc.TimingStub:
+    return self._timing_stub[self._started(lang)]
+
+  def server_info(self, lang) -> testing_api_pb2.ServerInfoResponse:
+    """Returns the ServerInfoResponse of lang, queried when it started."""
+    return self._server_info[self._started(lang)]
+
+  def shared_memory(self, lang) -> Optional[shared_memory_lib.SharedMemory]:
+    """Returns the shared memory for payloads of lang, if it is used."""
+    if self._shared_memory is None:
+      return None
+    if not self.server_info(lang).shared_memory_payloads:
+      return None
+    return self._shared_memory
+
+  def generates_inputs(self, lang) -> bool:
+    """Returns True if the server of lang accepts GeneratedInputs."""
+    return self.server_info(lang).generated_inputs
 
   def stop(self):
-    """Stops all servers."""
+    """Stops all started servers."""
     logging.info('Stopping servers...')
-    for lang in LANGUAGES:
-      self._channel[lang].close()
-    for lang in LANGUAGES:
-      self._server[lang].terminate()
-    time.sleep(2)
-    for lang in LANGUAGES:
-      if self._server[lang].poll() is None:
+    if self._profilers:
+      self._stop_profiling()
+    resource_limit_violations = []
+    if self._resource_sampler is not None:
+      resource_limit_violations = self._write_resource_usage()
+    for channel in self._channel.values():
+      channel.close()
+    # Servers which exited before stop() most likely crashed.
+    exited = [
+        lang for lang in self._server if self._server[lang].poll() is not None
+    ]
+    for server in self._server.values():
+      server.terminate()
+    deadline = time.monotonic() + 2
+    for lang in self._server:
+      try:
+        self._server[lang].wait(timeout=max(0, deadline - time.monotonic()))
+      except subprocess.TimeoutExpired:
         logging.info('Killing server %s.', lang)
         self._server[lang].kill()
-    for lang in LANGUAGES:
-      self._output_file[lang].close()
+    for output_file in self._output_file.values():
+      output_file.close()
+    for cgroup in self._cgroups.values():
+      cpu_isolation.remove_cgroup(cgroup)
+    if self._harness_cpus is not None:
+      cpu_isolation.apply(_HARNESS, os.getpid(),
+                          cpu_isolation.Isolation(cpus=self._harness_cpus))
+    if self._socket_dir is not None:
+      shutil.rmtree(self._socket_dir, ignore_errors=True)
+    if self._shared_memory is not None:
+      self._shared_memory.close()
     logging.info('All servers stopped.')
 
-    print()
-    print()
-    for lang in LANGUAGES:
-      total_reps = 1 + 100 // len(lang + ' ')
-      length = total_reps * len(lang + ' ') - 1
-      print('=' * length)
-      print((lang + ' ') * total_reps)
-      print('v' * length)
-      with open(self._get_output_path(lang)) as f:
-        print(f.read())
-      print('^' * length)
-      print((lang + ' ') * total_reps)
-      print('=' * length)
-      print()
+    mode = os.environ.get(_SERVER_LOGS_ENV, 'errors')
+    if mode not in _SERVER_LOGS_MODES:
+      raise ValueError('Unknown %s=%s, expected one of %s' %
+                       (_SERVER_LOGS_ENV, mode, _SERVER_LOGS_MODES))
+    for lang in self._server:
+      self._print_log(lang, 'tail' if lang in exited else mode)
+    if resource_limit_violations:
+      raise RuntimeError('Servers exceeded the resource limits: %s' %
+                         resource_limit_violations)
 
 _ts: _TestingServers = None
 
+# The default number of entries of GenerateMany and CreateMany RPCs.
+_BATCH_SIZE = 256
+
 
-def start(output_files_prefix: str) -> None:
-  """Starts all servers."""
+def start(output_files_prefix: str,
+          local_kms_url: Optional[str] = None,
+          transport: Optional[str] = None,
+          languages: Optional[Iterable[str]] = None) -> None:
+  """Starts the servers.
+
+  Args:
+    output_files_prefix: The prefix of the server log files.
+    local_kms_url: If set, the servers send their KMS requests to the
+      local_kms.LocalKmsServer at this URL where they support it.
+    transport: 'tcp' or 'uds', see _TRANSPORT_ENV. Defaults to the
+      TINK_CROSS_LANG_TRANSPORT environment variable, or 'tcp'.
+    languages: The languages whose servers are started now, all of LANGUAGES
+      by default. The server of any other language is started the first time
+      it is used, so tests which only use some languages should list them.
+  """
   global _ts
-  _ts = _TestingServers(output_files_prefix)
-
-  versions = {}
-  for lang in LANGUAGES:
-    response = _ts.metadata_stub(lang).GetServerInfo(
-        testing_api_pb2.ServerInfoRequest())
-    if lang != response.language:
-      raise ValueError(
-          'lang = %s != response.language = %s' % (lang, response.language))
-    if response.tink_version:
-      versions[lang] = response.tink_version
-    else:
-      logging.warning('server in lang %s has no tink version.', lang)
-  unique_versions = list(set(versions.values()))
-  logging.info('Tink version: %s', unique_versions[0])
+  _ts = _TestingServers(output_files_prefix, local_kms_url, transport,
+                        languages)
+  unique_versions = sorted(set(tink_versions().values()))
+  if unique_versions:
+    logging.info('Tink version: %s', ', '.join(unique_versions))
+  else:
+    logging.info('No started server has a Tink version.')
 
 
 def stop() -> None:
-  """Stops all servers."""
+  """Stops all started servers."""
   _ts.stop()
 
 
+def channel(lang: str) -> grpc.Channel:
+  """Returns the channel to the server of lang."""
+  return _ts.channel(lang)
+
+
+def server_pid(lang: str) -> int:
+  """Returns the process ID of the server of lang."""
+  return _ts.pid(lang)
+
+
+def generates_inputs(lang: str) -> bool:
+  """Returns True if the server of lang accepts GeneratedInputs."""
+  return _ts.generates_inputs(lang)
+
+
+def tink_versions() -> Dict[str, str]:
+  """Returns the Tink version of each started server which has one."""
+  return {
+      lang: _ts.server_info(lang).tink_version
+      for lang in _ts.languages()
+      if _ts.server_info(lang).tink_version
+  }
+
+
 def key_template(lang: str, template_name: str) -> tink_pb2.KeyTemplate:
   """Returns the key template of template_name, implemented in lang."""
   return _primitives.key_template(_ts.keyset_stub(lang), template_name)
@@ -359,6 +883,84 @@ def new_keyset(lang: str, template: tink_pb2.KeyTemplate) -> bytes:
   return _primitives.new_keyset(_ts.keyset_stub(lang), template)
 
 
+def new_keysets(
+    lang: str,
+    templates: Sequence[tink_pb2.KeyTemplate],
+    batch_size: int = _BATCH_SIZE) -> List[Union[bytes, tink.TinkError]]:
+  """Generates a keyset for each template, implemented in lang.
+
+  This uses one GenerateMany RPC per batch_size templates. Servers which do
+  not implement GenerateMany get one Generate RPC per template.
+
+  Args:
+    lang: The language of the server.
+    templates: The key templates.
+    batch_size: The maximal number of templates per GenerateMany RPC.
+
+  Returns:
+    For each template, the serialized keyset, or the TinkError of the
+    generation.
+  """
+  stub = _ts.keyset_stub(lang)
+  results = []
+  try:
+    for i in range(0, len(templates), batch_size):
+      results.extend(
+          _primitives.new_keysets(stub, templates[i:i + batch_size]))
+    return results
+  except grpc.RpcError as e:
+    if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+      raise
+  for template in templates[len(results):]:
+    try:
+      results.append(_primitives.new_keyset(stub, template))
+    except tink.TinkError as e:
+      results.append(e)
+  return results
+
+
+def create_many(
+    lang: str,
+    entries: Sequence[Tuple[Union[bytes, tink_pb2.KeyTemplate], Any]],
+    batch_size: int = _BATCH_SIZE) -> List[Optional[tink.TinkError]]:
+  """Creates the primitive of each entry, implemented in lang.
+
+  This uses one CreateMany RPC per batch_size entries. Servers which do not
+  implement CreateMany get one Create RPC per entry, as in remote_primitive.
+
+  Args:
+    lang: The language of the server.
+    entries: Pairs of a serialized keyset or a key template, and a primitive
+      class supported by remote_primitive. For templates, a new keyset is
+      generated.
+    batch_size: The maximal number of entries per CreateMany RPC.
+
+  Returns:
+    For each entry, None if the primitive was created, and the TinkError of
+    the creation otherwise.
+  """
+  stub = _ts.keyset_stub(lang)
+  results = []
+  try:
+    for i in range(0, len(entries), batch_size):
+      results.extend(_primitives.create_many(stub, entries[i:i + batch_size]))
+    return results
+  except grpc.RpcError as e:
+    if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+      raise
+  for keyset_or_template, primitive_class in entries[len(results):]:
+    try:
+      if isinstance(keyset_or_template, tink_pb2.KeyTemplate):
+        keyset = new_keyset(lang, keyset_or_template)
+      else:
+        keyset = keyset_or_template
+      remote_primitive(lang, keyset, primitive_class)
+      results.append(None)
+    except tink.TinkError as e:
+      results.append(e)
+  return results
+
+
 def public_keyset(lang: str, private_keyset: bytes) -> bytes:
   """Returns a public keyset handle, implemented in lang."""
   return _primitives.public_keyset(_ts.keyset_stub(lang), private_keyset)
@@ -402,7 +1004,34 @@ def keyset_deriver(lang: str, keyset: bytes) -> _primitives.KeysetDeriver:
   return _primitives.KeysetDeriver(lang, _ts.keyset_deriver_stub(lang), keyset)
 
 
-def remote_primitive(lang: str, keyset: bytes, primitive_class: Type[P]) -> P:
+def measure_timing(lang: str,
+                   operation: testing_api_pb2.TimingRequest.Operation,
+                   keyset: bytes, inputs: Sequence[bytes], data: bytes,
+                   classes: bytes) -> Sequence[int]:
+  """Returns the durations of operation on inputs[classes[i]] in lang.
+
+  The durations are measured in nanoseconds by the server. Servers without
+  the Timing service raise a grpc.RpcError with code UNIMPLEMENTED.
+
+  Args:
+    lang: The language of the server.
+    operation: The operation, for example TimingRequest.MAC_VERIFY.
+    keyset: The serialized keyset, the public keyset for SIGNATURE_VERIFY.
+    inputs: The input of each class.
+    data: The associated data or the signed or MACed data.
+    classes: The class of each measurement, one byte each.
+
+  Returns:
+    The duration of each measurement.
+  """
+  return _primitives.measure_timing(_ts.timing_stub(lang), operation, keyset,
+                                    inputs, data, classes)
+
+
+def remote_primitive(lang: str,
+                     keyset: bytes,
+                     primitive_class: Type[P],
+                     annotations: Optional[Dict[str, str]] = None) -> P:
   """Creates a primitive from a keyset backed by the given language.
 
   Internally, this does an RPC to the server specified by 'lang' in order to
@@ -414,6 +1043,8 @@ def remote_primitive(lang: str, keyset: bytes, primitive_class: Type[P]) -> P:
     lang: specification of the language to use
     keyset: the serialized keyset
     primitive_class: the type of the primitive
+    annotations: the monitoring annotations of the keyset. They are ignored
+      for streaming AEAD and JWT primitives.
 
   Returns:
     A primitive to be used.
@@ -423,27 +1054,33 @@ def remote_primitive(lang: str, keyset: bytes, primitive_class: Type[P]) -> P:
   """
 
   if primitive_class == tink.aead.Aead:
-    return _primitives.Aead(lang, _ts.aead_stub(lang), keyset, None)
+    return _primitives.Aead(lang, _ts.aead_stub(lang), keyset, annotations,
+                            _ts.shared_memory(lang))
   if primitive_class == tink.daead.DeterministicAead:
     return _primitives.DeterministicAead(lang, _ts.daead_stub(lang), keyset,
-                                         None)
+                                         annotations,
+                                         _ts.generates_inputs(lang))
   if primitive_class == tink.streaming_aead.StreamingAead:
     return _primitives.StreamingAead(lang, _ts.streaming_aead_stub(lang),
-                                     keyset)
+                                     keyset, _ts.shared_memory(lang))
   if primitive_class == tink.hybrid.HybridDecrypt:
-    return _primitives.HybridDecrypt(lang, _ts.hybrid_stub(lang), keyset, None)
+    return _primitives.HybridDecrypt(lang, _ts.hybrid_stub(lang), keyset,
+                                     annotations)
   if primitive_class == tink.hybrid.HybridEncrypt:
-    return _primitives.HybridEncrypt(lang, _ts.hybrid_stub(lang), keyset, None)
+    return _primitives.HybridEncrypt(lang, _ts.hybrid_stub(lang), keyset,
+                                     annotations)
   if primitive_class == tink.mac.Mac:
-    return _primitives.Mac(lang, _ts.mac_stub(lang), keyset, None)
+    return _primitives.Mac(lang, _ts.mac_stub(lang), keyset, annotations,
+                           _ts.generates_inputs(lang))
   if primitive_class == tink.signature.PublicKeySign:
     return _primitives.PublicKeySign(lang, _ts.signature_stub(lang), keyset,
-                                     None)
+                                     annotations, _ts.generates_inputs(lang))
   if primitive_class == tink.signature.PublicKeyVerify:
     return _primitives.PublicKeyVerify(lang, _ts.signature_stub(lang), keyset,
-                                       None)
+                                       annotations)
   if primitive_class == tink.prf.PrfSet:
-    return _primitives.PrfSet(lang, _ts.prf_stub(lang), keyset, None)
+    return _primitives.PrfSet(lang, _ts.prf_stub(lang), keyset, annotations,
+                              _ts.generates_inputs(lang))
   if primitive_class == tink.jwt.JwtMac:
     return _primitives.JwtMac(lang, _ts.jwt_stub(lang), keyset)
   if primitive_class == tink.jwt.JwtPublicKeySign:
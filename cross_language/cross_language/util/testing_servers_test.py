@@ -15,8 +15,10 @@
 
 import datetime
 import io
+import os
 import textwrap
 from typing import Iterable, Tuple
+from unittest import mock
 
 from absl import flags
 from absl.testing import absltest
@@ -85,6 +87,46 @@ class TestingServersConfigTest(absltest.TestCase):
           'of the languages specified in testing_servers.LANGUAGES.'
       ))
 
+  def test_cpu_quota_without_cgroup_dir_fails(self):
+    with mock.patch.dict(os.environ, {'TINK_CROSS_LANG_CPU_QUOTA': 'go=1'}):
+      os.environ.pop('TINK_CROSS_LANG_CGROUP_DIR', None)
+      with self.assertRaises(ValueError):
+        testing_servers.start('cpu_quota', languages=[])
+
+
+class ServerLogTest(absltest.TestCase):
+
+  def test_log_tail_of_short_log(self):
+    log = self.create_tempfile(content='first\nsecond\nthird\n')
+    self.assertEqual(
+        testing_servers._log_tail(log.full_path, max_lines=2),
+        ['second', 'third'])
+
+  def test_log_tail_of_long_log_skips_incomplete_line(self):
+    lines = ['line %d' % i for i in range(100000)]
+    log = self.create_tempfile(content='\n'.join(lines) + '\n')
+    tail = testing_servers._log_tail(log.full_path, max_lines=100000)
+    self.assertLess(len(tail), len(lines))
+    self.assertEqual(tail, lines[-len(tail):])
+
+  def test_log_errors(self):
+    log = self.create_tempfile(content='\n'.join([
+        'Server started on port 1234',
+        'E1019 00:07:25.574004 1 server.cc:12] first',
+        'INFO: no error',
+        'Oct 19, 2026 SEVERE: second',
+        'panic: third',
+        'ERROR fourth',
+        'TERRORS are not errors',
+    ]))
+    errors, count = testing_servers._log_errors(log.full_path, max_lines=3)
+    self.assertEqual(count, 4)
+    self.assertEqual(errors, [
+        'E1019 00:07:25.574004 1 server.cc:12] first',
+        'Oct 19, 2026 SEVERE: second',
+        'panic: third',
+    ])
+
 
 def encrypted_keyset_test_cases() -> Iterable[Tuple[str, str, str]]:
   for lang in testing_servers.LANGUAGES:
@@ -418,5 +460,25 @@ class TestingServersTest(parameterized.TestCase):
       keyset_deriver.derive_keyset(b'salt')
 
 
+class LazyStartTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    testing_servers.start('lazy_start', languages=[])
+    self.addCleanup(testing_servers.stop)
+
+  def test_server_is_started_when_used(self):
+    lang = testing_servers.LANGUAGES[0]
+    self.assertEmpty(testing_servers.tink_versions())
+    template = testing_servers.key_template(lang, 'AES128_GCM')
+    self.assertEqual(template.type_url,
+                     'type.googleapis.com/google.crypto.tink.AesGcmKey')
+    self.assertEqual(testing_servers._ts.languages(), [lang])
+
+  def test_unknown_language_fails(self):
+    with self.assertRaises(ValueError):
+      testing_servers.key_template('unknown', 'AES128_GCM')
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -0,0 +1,162 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests whether the duration of an operation depends on its input.
+
+This follows dudect (Reparaz, Balasch and Verbauwhede, "Dude, is my code
+constant time?"): an operation is run on inputs of two classes, for example a
+valid and an invalid MAC, in random order, and Welch's t-test compares the
+durations of the two classes. Besides all durations, the test is repeated on
+the durations below several percentiles, because a difference is often hidden
+by the long tail of the slow runs. The percentiles are fixed by the first
+batch, which is not used otherwise.
+
+The durations are measured by the servers with the Timing service, in batches
+of many measurements per RPC, so that the overhead per measurement is small.
+"""
+
+import dataclasses
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+# The number of percentiles below which the test is repeated. As in dudect,
+# the k-th percentile is 1 - 0.5**k, from 0.5 to 0.999.
+_NUM_CROPS = 10
+
+# Thresholds of dudect: above _LEAK_T, the durations of the classes are
+# considered to be different. Above _POSSIBLE_LEAK_T, they probably are.
+_LEAK_T = 10.0
+_POSSIBLE_LEAK_T = 4.5
+
+
+class WelchTTest:
+  """Welch's t-test between the durations of two classes.
+
+  The statistics are updated in batches, so that millions of durations do not
+  have to be kept in memory.
+  """
+
+  def __init__(self, num_crops: int = _NUM_CROPS):
+    self._num_crops = num_crops
+    self._thresholds: Optional[np.ndarray] = None
+    # The count, mean and sum of squared deviations per test and class.
+    self._n = np.zeros((num_crops + 1, 2))
+    self._mean = np.zeros((num_crops + 1, 2))
+    self._m2 = np.zeros((num_crops + 1, 2))
+
+  @property
+  def samples(self) -> int:
+    """The number of durations in the test of all durations."""
+    return int(self._n[0].sum())
+
+  def set_thresholds(self, durations: np.ndarray) -> None:
+    """Sets the percentiles of the cropped tests to those of durations."""
+    fractions = 1 - 0.5**np.arange(1, self._num_crops + 1)
+    self._thresholds = np.concatenate(
+        [[np.inf], np.quantile(durations, fractions)])
+
+  def update(self, durations: np.ndarray, classes: np.ndarray) -> None:
+    """Adds durations, where classes[i] is the class 0 or 1 of durations[i]."""
+    if self._thresholds is None:
+      self.set_thresholds(durations)
+    durations = np.asarray(durations, dtype=np.float64)
+    in_crop = durations[np.newaxis, :] <= self._thresholds[:, np.newaxis]
+    for c in range(2):
+      weights = (in_crop & (classes == c)[np.newaxis, :]).astype(np.float64)
+      n = weights.sum(axis=1)
+      mean = np.divide(weights @ durations, n, out=np.zeros_like(n),
+                       where=n > 0)
+      m2 = (weights * (durations[np.newaxis, :] - mean[:, np.newaxis])**2).sum(
+          axis=1)
+      # Combines the statistics of the batch with the previous ones (Chan et
+      # al.).
+      total = self._n[:, c] + n
+      delta = mean - self._mean[:, c]
+      safe_total = np.where(total > 0, total, 1)
+      self._mean[:, c] += delta * n / safe_total
+      self._m2[:, c] += m2 + delta**2 * self._n[:, c] * n / safe_total
+      self._n[:, c] = total
+
+  def means(self) -> np.ndarray:
+    """Returns the mean of all durations of each class."""
+    return self._mean[0].copy()
+
+  def t_statistics(self) -> np.ndarray:
+    """Returns the t statistic of all durations, then of each crop.
+
+    The statistic is 0 for tests with fewer than 2 durations of a class.
+    """
+    n = self._n
+    enough = (n >= 2).all(axis=1)
+    var = self._m2 / np.where(n >= 2, n - 1, 1)
+    se = np.sqrt((var / np.where(n > 0, n, 1)).sum(axis=1))
+    diff = self._mean[:, 0] - self._mean[:, 1]
+    return np.where(enough & (se > 0), diff / np.where(se > 0, se, 1), 0.0)
+
+
+@dataclasses.dataclass(frozen=True)
+class LeakageResult:
+  """The result of measure_leakage."""
+  samples: int
+  # The t statistic with the largest absolute value.
+  max_t: float
+  # The mean duration of each class in nanoseconds.
+  mean_ns: Sequence[float]
+
+  @property
+  def verdict(self) -> str:
+    """'leak', 'possible leak' or 'no leak found', as in dudect."""
+    if abs(self.max_t) > _LEAK_T:
+      return 'leak'
+    if abs(self.max_t) > _POSSIBLE_LEAK_T:
+      return 'possible leak'
+    return 'no leak found'
+
+
+def measure_leakage(measure: Callable[[bytes], Sequence[int]],
+                    samples: int,
+                    batch_size: int = 100_000,
+                    seed: Optional[int] = None) -> LeakageResult:
+  """Measures durations of two classes, and runs Welch's t-test on them.
+
+  Args:
+    measure: Runs the operation once per byte of its argument, on the input of
+      the class 0 or 1 in that byte, and returns the durations in nanoseconds,
+      for example a call of testing_servers.measure_timing.
+    samples: The number of durations in the t-test.
+    batch_size: The number of durations per call of measure. An additional
+      first batch is used to fix the percentiles.
+    seed: The seed of the random order of the classes.
+
+  Returns:
+    The result of the t-test.
+  """
+  rng = np.random.default_rng(seed)
+  test = WelchTTest()
+  first = True
+  while test.samples < samples:
+    size = batch_size if first else min(batch_size, samples - test.samples)
+    classes = rng.integers(0, 2, size, dtype=np.uint8)
+    durations = np.fromiter(measure(classes.tobytes()), dtype=np.float64,
+                            count=size)
+    if first:
+      test.set_thresholds(durations)
+      first = False
+      continue
+    test.update(durations, classes)
+  t = test.t_statistics()
+  return LeakageResult(
+      samples=test.samples,
+      max_t=float(t[np.argmax(np.abs(t))]),
+      mean_ns=tuple(float(m) for m in test.means()))
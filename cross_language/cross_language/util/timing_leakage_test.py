@@ -0,0 +1,81 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for timing_leakage."""
+
+from absl.testing import absltest
+import numpy as np
+
+from cross_language.util import timing_leakage
+
+
+def _fake_measure(slowdown_ns, seed=0):
+  rng = np.random.default_rng(seed)
+
+  def measure(classes):
+    classes = np.frombuffer(classes, dtype=np.uint8)
+    return (1000 + rng.exponential(100, len(classes)) +
+            slowdown_ns * classes).astype(np.uint64).tolist()
+
+  return measure
+
+
+class WelchTTestTest(absltest.TestCase):
+
+  def test_batches_equal_one_update(self):
+    rng = np.random.default_rng(1)
+    durations = rng.normal(1000, 50, 10_000)
+    classes = rng.integers(0, 2, 10_000)
+    whole = timing_leakage.WelchTTest()
+    whole.update(durations, classes)
+    batched = timing_leakage.WelchTTest()
+    batched.set_thresholds(durations)
+    for i in range(0, 10_000, 3_000):
+      batched.update(durations[i:i + 3_000], classes[i:i + 3_000])
+    np.testing.assert_allclose(whole.t_statistics(), batched.t_statistics())
+    self.assertEqual(batched.samples, 10_000)
+
+  def test_t_statistic_of_all_durations(self):
+    durations = np.array([1.0, 2.0, 3.0, 5.0, 7.0, 9.0])
+    classes = np.array([0, 0, 0, 1, 1, 1])
+    test = timing_leakage.WelchTTest(num_crops=0)
+    test.update(durations, classes)
+    # Means 2 and 7, variances 1 and 4.
+    self.assertAlmostEqual(test.t_statistics()[0], -5 / np.sqrt(5 / 3))
+    np.testing.assert_allclose(test.means(), [2.0, 7.0])
+
+  def test_too_few_durations(self):
+    test = timing_leakage.WelchTTest()
+    test.update(np.array([1.0, 2.0]), np.array([0, 0]))
+    self.assertTrue((test.t_statistics() == 0).all())
+
+
+class MeasureLeakageTest(absltest.TestCase):
+
+  def test_detects_leak(self):
+    result = timing_leakage.measure_leakage(
+        _fake_measure(slowdown_ns=20), samples=200_000, batch_size=50_000,
+        seed=0)
+    self.assertEqual(result.samples, 200_000)
+    self.assertEqual(result.verdict, 'leak')
+    self.assertLess(result.max_t, 0)
+
+  def test_no_leak(self):
+    result = timing_leakage.measure_leakage(
+        _fake_measure(slowdown_ns=0), samples=200_000, batch_size=50_000,
+        seed=0)
+    self.assertEqual(result.verdict, 'no leak found')
+
+
+if __name__ == '__main__':
+  absltest.main()
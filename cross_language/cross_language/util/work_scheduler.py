@@ -0,0 +1,289 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Runs work items on the testing servers, longest first.
+
+The cost of a work item varies a lot with its language, key type and
+operation: generating an RSA 4096 key in Python takes much longer than
+generating an AES-GCM key in C++. run() keeps one queue per language, which
+are processed concurrently, and orders each queue by the estimated duration of
+its items, longest first (LPT). This keeps all servers busy until the end,
+instead of leaving them idle behind one slow item.
+
+The estimates are taken from a TimingDatabase, a JSON file with the mean
+duration of each (language, key type, operation), which run() updates with
+the measured durations.
+
+fan_out() runs one call per language concurrently, for example the decryption
+of one ciphertext in all languages.
+"""
+
+import collections
+import concurrent.futures
+import dataclasses
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from absl import logging
+
+# The path of the timing database. Bazel runs each test in a fresh sandbox, so
+# the timings only persist between runs if this is set to a path outside of it,
+# for example
+#   --test_env TINK_CROSS_LANG_TIMING_DB=/tmp/tink_cross_lang_timings.json
+# If it is not set, the timings are written to TEST_UNDECLARED_OUTPUTS_DIR, and
+# are not written at all outside of Bazel.
+_TIMING_DB_ENV = 'TINK_CROSS_LANG_TIMING_DB'
+_TIMING_DB_OUTPUT_NAME = 'timings.json'
+
+# The weight of a new measurement in the mean duration.
+_SMOOTHING = 0.3
+
+# The maximal number of concurrent calls of fan_out().
+_FAN_OUT_WORKERS = 16
+
+_TimingKey = Tuple[str, str, str]
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkItem:
+  """A function which runs operation on keys of key_type in lang.
+
+  An item may process several units of work, for example a batch of key
+  templates. Timings are recorded per unit.
+  """
+  lang: str
+  key_type: str
+  operation: str
+  fn: Callable[[], Any]
+  units: int = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkResult:
+  """The return value or the exception of a WorkItem."""
+  value: Any = None
+  error: Optional[Exception] = None
+  seconds: float = 0.0
+
+  def get(self) -> Any:
+    """Returns the value, or raises the exception of the item."""
+    if self.error is not None:
+      raise self.error
+    return self.value
+
+
+class TimingDatabase:
+  """The mean duration of operations, per language and key type."""
+
+  def __init__(self, path: Optional[str] = None):
+    self._path = path
+    self._lock = threading.Lock()
+    self._seconds: Dict[_TimingKey, float] = {}
+    self._updated: Dict[_TimingKey, float] = {}
+    if path is not None:
+      self._seconds = _read(path)
+
+  @classmethod
+  def default(cls) -> 'TimingDatabase':
+    """Returns the database at TINK_CROSS_LANG_TIMING_DB or in the outputs.
+
+    Without either variable, the database is only kept in memory.
+    """
+    if _TIMING_DB_ENV in os.environ:
+      return cls(os.path.expanduser(os.environ[_TIMING_DB_ENV]))
+    if 'TEST_UNDECLARED_OUTPUTS_DIR' in os.environ:
+      return cls(
+          os.path.join(os.environ['TEST_UNDECLARED_OUTPUTS_DIR'],
+                       _TIMING_DB_OUTPUT_NAME))
+    return cls()
+
+  def estimate(self, lang: str, key_type: str,
+               operation: str) -> Optional[float]:
+    """Returns the mean duration of one unit in seconds, None if unknown."""
+    with self._lock:
+      return self._seconds.get((lang, key_type, operation))
+
+  def record(self, lang: str, key_type: str, operation: str,
+             seconds: float) -> None:
+    """Adds a measured duration of one unit."""
+    key = (lang, key_type, operation)
+    with self._lock:
+      if key in self._seconds:
+        seconds = (1 - _SMOOTHING) * self._seconds[key] + _SMOOTHING * seconds
+      self._seconds[key] = seconds
+      self._updated[key] = seconds
+
+  def save(self) -> None:
+    """Merges the recorded durations into the file.
+
+    Timings which were recorded by concurrent runs since this database was
+    read are kept, unless they were recorded here too. Failures to write the
+    file are only logged.
+    """
+    if self._path is None:
+      return
+    with self._lock:
+      updated = dict(self._updated)
+    try:
+      seconds = _read(self._path)
+      seconds.update(updated)
+      os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+      fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self._path) or '.')
+      with os.fdopen(fd, 'w') as f:
+        json.dump([{
+            'lang': lang,
+            'key_type': key_type,
+            'operation': operation,
+            'seconds': value
+        } for (lang, key_type, operation), value in sorted(seconds.items())],
+                  f, indent=1)
+      os.replace(tmp_path, self._path)
+    except OSError as e:
+      logging.warning('Could not write the timing database %s: %s',
+                      self._path, e)
+
+
+def _read(path: str) -> Dict[_TimingKey, float]:
+  try:
+    with open(path) as f:
+      entries = json.load(f)
+    return {(e['lang'], e['key_type'], e['operation']): float(e['seconds'])
+            for e in entries}
+  except FileNotFoundError:
+    return {}
+  except (OSError, ValueError, KeyError, TypeError) as e:
+    logging.warning('Ignoring the timing database %s: %s', path, e)
+    return {}
+
+
+def lpt_order(items: Sequence[WorkItem],
+              timings: TimingDatabase) -> Dict[str, List[int]]:
+  """Returns the indices of the items of each language, longest first.
+
+  Items without an estimate are assumed to be as long as the longest item of
+  their language, so that new slow items do not end up last. The order of
+  items with equal estimates is kept.
+  """
+  estimates = []
+  for item in items:
+    estimate = timings.estimate(item.lang, item.key_type, item.operation)
+    estimates.append(None if estimate is None else estimate * item.units)
+  longest = collections.defaultdict(float)
+  for item, estimate in zip(items, estimates):
+    if estimate is not None:
+      longest[item.lang] = max(longest[item.lang], estimate)
+  queues = collections.defaultdict(list)
+  for i, item in enumerate(items):
+    queues[item.lang].append(i)
+  for indices in queues.values():
+    indices.sort(key=lambda i: -(estimates[i] if estimates[i] is not None
+                                 else longest[items[i].lang]))
+  return dict(queues)
+
+
+def _timed(fn: Callable[[], Any]) -> WorkResult:
+  start_time = time.monotonic()
+  try:
+    value, error = fn(), None
+  except Exception as e:  # pylint: disable=broad-except
+    value, error = None, e
+  return WorkResult(
+      value=value, error=error, seconds=time.monotonic() - start_time)
+
+
+def run(items: Sequence[WorkItem],
+        timings: Optional[TimingDatabase] = None,
+        workers_per_language: int = 2) -> List[WorkResult]:
+  """Runs all items, and returns their results in the order of items.
+
+  The languages are processed concurrently, each by workers_per_language
+  threads which take the items of their language in lpt_order. Exceptions of
+  the items are returned in their WorkResult. The measured durations are
+  recorded in timings, which is saved at the end.
+
+  Args:
+    items: The work items.
+    timings: The database of the estimated durations. Defaults to
+      TimingDatabase.default().
+    workers_per_language: The number of concurrent items per language.
+
+  Returns:
+    The result of each item.
+  """
+  if timings is None:
+    timings = TimingDatabase.default()
+  queues = {
+      lang: collections.deque(indices)
+      for lang, indices in lpt_order(items, timings).items()
+  }
+  lock = threading.Lock()
+  results: List[Optional[WorkResult]] = [None] * len(items)
+
+  def worker(lang: str) -> None:
+    while True:
+      with lock:
+        if not queues[lang]:
+          return
+        i = queues[lang].popleft()
+      item = items[i]
+      results[i] = _timed(item.fn)
+      timings.record(item.lang, item.key_type, item.operation,
+                     results[i].seconds / max(item.units, 1))
+
+  with concurrent.futures.ThreadPoolExecutor(
+      max_workers=max(1, len(queues) * workers_per_language)) as executor:
+    futures = [
+        executor.submit(worker, lang)
+        for lang in queues
+        for _ in range(workers_per_language)
+    ]
+    for future in futures:
+      future.result()
+  timings.save()
+  return results
+
+
+_fan_out_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_fan_out_lock = threading.Lock()
+
+
+def fan_out(calls: Mapping[str, Callable[[], Any]]) -> Dict[str, WorkResult]:
+  """Runs all calls concurrently, and returns their results by language.
+
+  Usage:
+    results = fan_out({
+        lang: functools.partial(aead.decrypt, ciphertext, associated_data)
+        for lang, aead in aeads.items()
+    })
+    for lang, result in results.items():
+      self.assertEqual(result.get(), plaintext)
+
+  Args:
+    calls: The call of each language.
+
+  Returns:
+    The result of each call, with its duration.
+  """
+  global _fan_out_executor
+  with _fan_out_lock:
+    if _fan_out_executor is None:
+      _fan_out_executor = concurrent.futures.ThreadPoolExecutor(
+          max_workers=_FAN_OUT_WORKERS, thread_name_prefix='fan_out')
+  futures = {
+      lang: _fan_out_executor.submit(_timed, fn) for lang, fn in calls.items()
+  }
+  return {lang: future.result() for lang, future in futures.items()}
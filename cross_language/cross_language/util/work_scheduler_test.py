@@ -0,0 +1,142 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for work_scheduler."""
+
+import os
+import threading
+from unittest import mock
+
+from absl.testing import absltest
+from cross_language.util import work_scheduler
+
+
+def _item(lang, key_type, fn=lambda: None, units=1):
+  return work_scheduler.WorkItem(
+      lang=lang, key_type=key_type, operation='Generate', fn=fn, units=units)
+
+
+class TimingDatabaseTest(absltest.TestCase):
+
+  def test_record_and_estimate(self):
+    timings = work_scheduler.TimingDatabase()
+    self.assertIsNone(timings.estimate('java', 'AesGcmKey', 'Generate'))
+    timings.record('java', 'AesGcmKey', 'Generate', 1.0)
+    self.assertEqual(timings.estimate('java', 'AesGcmKey', 'Generate'), 1.0)
+    timings.record('java', 'AesGcmKey', 'Generate', 2.0)
+    self.assertAlmostEqual(
+        timings.estimate('java', 'AesGcmKey', 'Generate'), 1.3)
+
+  def test_save_merges_concurrent_updates(self):
+    path = os.path.join(self.create_tempdir().full_path, 'db', 'timings.json')
+    first = work_scheduler.TimingDatabase(path)
+    second = work_scheduler.TimingDatabase(path)
+    first.record('java', 'AesGcmKey', 'Generate', 1.0)
+    first.save()
+    second.record('go', 'RsaSsaPssPrivateKey', 'Generate', 2.0)
+    second.save()
+
+    loaded = work_scheduler.TimingDatabase(path)
+    self.assertEqual(loaded.estimate('java', 'AesGcmKey', 'Generate'), 1.0)
+    self.assertEqual(
+        loaded.estimate('go', 'RsaSsaPssPrivateKey', 'Generate'), 2.0)
+
+  def test_invalid_file_is_ignored(self):
+    path = self.create_tempfile(content='not json').full_path
+    timings = work_scheduler.TimingDatabase(path)
+    self.assertIsNone(timings.estimate('java', 'AesGcmKey', 'Generate'))
+
+  def test_default_path(self):
+    path = self.create_tempfile().full_path
+    with mock.patch.dict(os.environ, {'TINK_CROSS_LANG_TIMING_DB': path}):
+      self.assertEqual(work_scheduler.TimingDatabase.default()._path, path)
+
+  def test_default_path_in_outputs(self):
+    output_dir = self.create_tempdir().full_path
+    with mock.patch.dict(os.environ,
+                         {'TEST_UNDECLARED_OUTPUTS_DIR': output_dir}):
+      os.environ.pop('TINK_CROSS_LANG_TIMING_DB', None)
+      self.assertEqual(work_scheduler.TimingDatabase.default()._path,
+                       os.path.join(output_dir, 'timings.json'))
+
+  def test_default_without_path(self):
+    with mock.patch.dict(os.environ):
+      os.environ.pop('TINK_CROSS_LANG_TIMING_DB', None)
+      os.environ.pop('TEST_UNDECLARED_OUTPUTS_DIR', None)
+      self.assertIsNone(work_scheduler.TimingDatabase.default()._path)
+
+
+class WorkSchedulerTest(absltest.TestCase):
+
+  def test_lpt_order(self):
+    timings = work_scheduler.TimingDatabase()
+    timings.record('python', 'AesGcmKey', 'Generate', 0.001)
+    timings.record('python', 'RsaSsaPssPrivateKey', 'Generate', 1.0)
+    timings.record('python', 'HmacKey', 'Generate', 0.01)
+    items = [
+        _item('python', 'AesGcmKey', units=100),
+        _item('cc', 'AesGcmKey'),
+        _item('python', 'HmacKey'),
+        _item('python', 'RsaSsaPssPrivateKey'),
+        _item('python', 'SlhDsaPrivateKey'),
+    ]
+    # The unknown SlhDsaPrivateKey is assumed to be as long as the longest.
+    self.assertEqual(
+        work_scheduler.lpt_order(items, timings),
+        {'python': [3, 4, 0, 2], 'cc': [1]})
+
+  def test_run(self):
+    def fail():
+      raise ValueError('failed')
+
+    timings = work_scheduler.TimingDatabase()
+    results = work_scheduler.run([
+        _item('python', 'AesGcmKey', fn=lambda: 1),
+        _item('python', 'HmacKey', fn=fail),
+        _item('cc', 'AesGcmKey', fn=lambda: 3, units=2),
+    ], timings)
+
+    self.assertEqual([r.value for r in results], [1, None, 3])
+    self.assertIsInstance(results[1].error, ValueError)
+    self.assertIsNotNone(timings.estimate('python', 'HmacKey', 'Generate'))
+    self.assertIsNotNone(timings.estimate('cc', 'AesGcmKey', 'Generate'))
+
+  def test_languages_run_concurrently(self):
+    barrier = threading.Barrier(2, timeout=10)
+    results = work_scheduler.run(
+        [_item('python', 'AesGcmKey', fn=barrier.wait),
+         _item('cc', 'AesGcmKey', fn=barrier.wait)],
+        work_scheduler.TimingDatabase(),
+        workers_per_language=1)
+    self.assertEqual([r.error for r in results], [None, None])
+
+  def test_fan_out(self):
+    barrier = threading.Barrier(2, timeout=10)
+
+    def succeed():
+      barrier.wait()
+      return 1
+
+    def fail():
+      barrier.wait()
+      raise ValueError('failed')
+
+    results = work_scheduler.fan_out({'python': succeed, 'cc': fail})
+    self.assertEqual(results['python'].get(), 1)
+    self.assertIsInstance(results['cc'].error, ValueError)
+    with self.assertRaises(ValueError):
+      results['cc'].get()
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -40,6 +40,8 @@ var (
 	awsKeyURI           = flag.String("aws_key_uri", "", "AWS KMS key URI of the form: aws-kms://arn:aws:kms:<region>:<account-id>:key/<key-id>.")
 	hcvaultKeyURIPrefix = flag.String("hcvault_key_uri_prefix", "", "HC Vault key URI prefix of the form: hcvault://example.com:8200/key/path")
 	hcvaultToken        = flag.String("hcvault_token", "", "HC Vault token")
+	hcvaultAddress      = flag.String("hcvault_address", "", "HC Vault address. If empty, https:// followed by the host of hcvault_key_uri_prefix is used.")
+	gcpEndpoint         = flag.String("gcp_endpoint", "", "If set, Google Cloud KMS requests are sent to this endpoint without authentication. Used to test against a local stand-in.")
 )
 
 // RegisterAll registers all KMS clients.
@@ -50,7 +52,11 @@ func RegisterAll() {
 	}
 	registry.RegisterKMSClient(client)
 
-	gcpClient, err := gcpkms.NewClientWithOptions(context.Background(), *gcpKeyURI, option.WithCredentialsFile(*gcpCredFilePath))
+	gcpOptions := []option.ClientOption{option.WithCredentialsFile(*gcpCredFilePath)}
+	if *gcpEndpoint != "" {
+		gcpOptions = []option.ClientOption{option.WithEndpoint(*gcpEndpoint), option.WithoutAuthentication()}
+	}
+	gcpClient, err := gcpkms.NewClientWithOptions(context.Background(), *gcpKeyURI, gcpOptions...)
 	if err != nil {
 		log.Fatalf("gcpkms.NewClientWithOptions failed: %v", err)
 	}
@@ -64,6 +70,7 @@ func RegisterAll() {
 
 	vaultClient, err := newVaultClient(
 		*hcvaultKeyURIPrefix,
+		*hcvaultAddress,
 		// Using InsecureSkipVerify is fine here, since this is just a test running locally.
 		&tls.Config{InsecureSkipVerify: true}, // NOLINT
 		*hcvaultToken)
@@ -73,7 +80,7 @@ func RegisterAll() {
 	registry.RegisterKMSClient(vaultClient)
 }
 
-func newVaultClient(uriPrefix string, tlsCfg *tls.Config, token string) (registry.KMSClient, error) {
+func newVaultClient(uriPrefix, address string, tlsCfg *tls.Config, token string) (registry.KMSClient, error) {
 	httpClient := api.DefaultConfig().HttpClient
 	transport := httpClient.Transport.(*http.Transport)
 	if tlsCfg == nil {
@@ -83,12 +90,15 @@ func newVaultClient(uriPrefix string, tlsCfg *tls.Config, token string) (registr
 	}
 	transport.TLSClientConfig = tlsCfg
 
-	vURL, err := url.Parse(uriPrefix)
-	if err != nil {
-		return nil, err
+	if address == "" {
+		vURL, err := url.Parse(uriPrefix)
+		if err != nil {
+			return nil, err
+		}
+		address = "https://" + vURL.Host
 	}
 	cfg := &api.Config{
-		Address:    "https://" + vURL.Host,
+		Address:    address,
 		HttpClient: httpClient,
 	}
 	client, err := api.NewClient(cfg)
@@ -29,7 +29,8 @@ import (
 )
 
 var (
-	port = flag.Int("port", 10000, "The server port")
+	port       = flag.Int("port", 10000, "The server port")
+	unixSocket = flag.String("unix_socket", "", "If set, the server listens on this Unix domain socket instead of the port")
 )
 
 func main() {
@@ -37,11 +38,17 @@ func main() {
 
 	kms.RegisterAll()
 
-	lis, err := net.Listen("tcp", fmt.Sprintf(":%d", *port))
+	var lis net.Listener
+	var err error
+	if *unixSocket != "" {
+		lis, err = net.Listen("unix", *unixSocket)
+	} else {
+		lis, err = net.Listen("tcp", fmt.Sprintf(":%d", *port))
+	}
 	if err != nil {
 		log.Fatalf("Server failed to listen: %v", err)
 	}
-	log.Printf("Server is now listening on port: %d", *port)
+	log.Printf("Server is now listening on: %s", lis.Addr())
 	server := grpc.NewServer()
 	if err != nil {
 		log.Fatalf("Failed to create new grpcprod server: %v", err)
@@ -55,14 +55,18 @@ final class Kms {
     return client;
   }
 
-  private static KmsClient getHcVaultKmsClient(String authToken) throws GeneralSecurityException {
+  private static KmsClient getHcVaultKmsClient(String authToken, String address)
+      throws GeneralSecurityException {
     if (authToken == null) {
       authToken = "";
     }
+    if (address == null) {
+      address = "https://127.0.0.1:8200";
+    }
     try {
       VaultConfig config =
           new VaultConfig()
-              .address("https://127.0.0.1:8200")
+              .address(address)
               .token(authToken)
               .readTimeout(30)
               .openTimeout(30)
@@ -81,7 +85,8 @@ final class Kms {
       String gcpCredentialsPath,
       String awsKeyUri,
       String awsCredentialsPath,
-      String hcvaultToken)
+      String hcvaultToken,
+      String hcvaultAddress)
       throws GeneralSecurityException {
     System.out.println("Registering GCP KMS client");
     KmsClients.add(getGcpKmsClient(gcpKeyUri, gcpCredentialsPath));
@@ -90,7 +95,7 @@ final class Kms {
     KmsClients.add(getAwsKmsClient(awsKeyUri, awsCredentialsPath));
 
     System.out.println("Registering HC Vault KMS client");
-    KmsClients.add(getHcVaultKmsClient(hcvaultToken));
+    KmsClients.add(getHcVaultKmsClient(hcvaultToken, hcvaultAddress));
 
     System.out.println("Registering Fake KMS client");
     KmsClients.add(new FakeKmsClient());
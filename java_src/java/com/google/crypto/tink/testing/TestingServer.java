@@ -30,6 +30,10 @@ import com.google.crypto.tink.signature.SignatureConfig;
 import com.google.crypto.tink.signature.SlhDsaSignKeyManager;
 import com.google.crypto.tink.streamingaead.StreamingAeadConfig;
 import io.grpc.ServerBuilder;
+import io.grpc.netty.shaded.io.grpc.netty.NettyServerBuilder;
+import io.grpc.netty.shaded.io.netty.channel.epoll.EpollEventLoopGroup;
+import io.grpc.netty.shaded.io.netty.channel.epoll.EpollServerDomainSocketChannel;
+import io.grpc.netty.shaded.io.netty.channel.unix.DomainSocketAddress;
 import java.io.IOException;
 import java.security.GeneralSecurityException;
 import java.security.Security;
@@ -44,6 +48,11 @@ public final class TestingServer {
   @Option(name = "--port", usage = "The service port")
   private int port;
 
+  @Option(
+      name = "--unix_socket",
+      usage = "If set, the server listens on this Unix domain socket instead of the port.")
+  private String unixSocket;
+
   @Option(name = "--gcp_credentials_path", usage = "Google Cloud KMS credentials path")
   private String gcpCredentialsPath;
 
@@ -66,6 +75,11 @@ public final class TestingServer {
   @Option(name = "--hcvault_token", usage = "HC Vault access token")
   private String hcvaultToken;
 
+  @Option(
+      name = "--hcvault_address",
+      usage = "HC Vault address. Defaults to https://127.0.0.1:8200.")
+  private String hcvaultAddress;
+
   public void run() throws InterruptedException, GeneralSecurityException, IOException {
     // This should be removed once validateKeysetsOnParsing = true is the default.
     GlobalTinkFlags.validateKeysetsOnParsing.setValue(true);
@@ -82,10 +96,27 @@ public final class TestingServer {
     MlDsaSignKeyManager.registerPair();
     SlhDsaSignKeyManager.registerPair();
     StreamingAeadConfig.register();
-    Kms.register(gcpKeyUri, gcpCredentialsPath, awsKeyUri, awsCredentialsPath, hcvaultToken);
+    Kms.register(
+        gcpKeyUri,
+        gcpCredentialsPath,
+        awsKeyUri,
+        awsCredentialsPath,
+        hcvaultToken,
+        hcvaultAddress);
 
-    System.out.println("Start server on port " + port);
-    ServerBuilder.forPort(port)
+    ServerBuilder<?> builder;
+    if (unixSocket == null || unixSocket.isEmpty()) {
+      System.out.println("Start server on port " + port);
+      builder = ServerBuilder.forPort(port);
+    } else {
+      System.out.println("Start server on unix socket " + unixSocket);
+      builder =
+          NettyServerBuilder.forAddress(new DomainSocketAddress(unixSocket))
+              .channelType(EpollServerDomainSocketChannel.class)
+              .bossEventLoopGroup(new EpollEventLoopGroup(1))
+              .workerEventLoopGroup(new EpollEventLoopGroup());
+    }
+    builder
         .addService(new MetadataServiceImpl())
         .addService(new KeysetServiceImpl())
         .addService(new AeadServiceImpl())
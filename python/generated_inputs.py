@@ -0,0 +1,44 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Generates the inputs of GeneratedInputs, and digests their outputs.
+
+See the GeneratedInputs message in testing_api.proto for the specification.
+"""
+
+import hashlib
+import struct
+from typing import Iterable, Iterator
+
+from protos import testing_api_pb2
+
+_SHA256_BYTES = 32
+
+
+def generate(inputs: testing_api_pb2.GeneratedInputs) -> Iterator[bytes]:
+  """Yields the inputs generated from inputs.seed, one per size."""
+  for i, size in enumerate(inputs.sizes):
+    blocks = [
+        hashlib.sha256(inputs.seed + struct.pack('>QQ', i, j)).digest()
+        for j in range((size + _SHA256_BYTES - 1) // _SHA256_BYTES)
+    ]
+    yield b''.join(blocks)[:size]
+
+
+def digest(outputs: Iterable[bytes]) -> bytes:
+  """Returns the SHA-256 digest of the length-prefixed outputs."""
+  h = hashlib.sha256()
+  for output in outputs:
+    h.update(struct.pack('>Q', len(output)))
+    h.update(output)
+  return h.digest()
@@ -13,9 +13,17 @@
 # limitations under the License.
 """KMS client registrations."""
 
+import collections
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
 from absl import flags
 
+from google.auth import credentials as ga_credentials
+from google.cloud import kms_v1
 import hvac
+import requests
 
 import tink
 from tink import aead
@@ -30,6 +38,12 @@ GCP_KEY_URI = flags.DEFINE_string(
     'gcp_key_uri', '', 'Google Cloud KMS key URL of the form: '
     'gcp-kms://projects/*/locations/*/keyRings/*/cryptoKeys/*.')
 
+GCP_ENDPOINT = flags.DEFINE_string(
+    'gcp_endpoint', '',
+    'If set, Google Cloud KMS requests are sent to this endpoint with the REST '
+    'transport and without authentication. Used to test against a local '
+    'stand-in.')
+
 AWS_CREDENTIALS_PATH = flags.DEFINE_string('aws_credentials_path', '',
                                            'AWS KMS credentials path.')
 AWS_KEY_URI = flags.DEFINE_string(
@@ -37,16 +51,113 @@ AWS_KEY_URI = flags.DEFINE_string(
     'aws-kms://arn:aws:kms:<region>:<account-id>:key/<key-id>.')
 HCVAULT_TOKEN = flags.DEFINE_string(
     'hcvault_token', '', 'HC Vault access token.')
+HCVAULT_ADDRESS = flags.DEFINE_string(
+    'hcvault_address', 'https://127.0.0.1:8200',
+    'Address of the HC Vault server which serves the keys of '
+    'hcvault://127.0.0.1:8200/ key URIs.')
+KMS_AEAD_CACHE_SIZE = flags.DEFINE_integer(
+    'kms_aead_cache_size', 100,
+    'Maximal number of KMS AEADs cached per KMS client. 0 disables caching.')
+KMS_AEAD_CACHE_TTL_SECONDS = flags.DEFINE_float(
+    'kms_aead_cache_ttl_seconds', 600.0,
+    'Time after which a cached KMS AEAD is created again.')
+
+# Number of connections kept open to the HC Vault server.
+_HCVAULT_POOL_SIZE = 10
+
+_remote_calls = collections.Counter()
+_remote_calls_lock = threading.Lock()
+
+
+def _count_remote_call(name: str) -> None:
+  with _remote_calls_lock:
+    _remote_calls[name] += 1
+
+
+def remote_call_counts() -> Dict[str, int]:
+  """Returns the number of calls made to remote KMS, keyed by operation."""
+  with _remote_calls_lock:
+    return dict(_remote_calls)
+
+
+class _CountingAead(aead.Aead):
+  """Counts the calls of a KMS AEAD, all of which go to the remote KMS."""
+
+  def __init__(self, name: str, kms_aead: aead.Aead) -> None:
+    self._name = name
+    self._aead = kms_aead
+
+  def encrypt(self, plaintext: bytes, associated_data: bytes) -> bytes:
+    _count_remote_call(self._name + '.encrypt')
+    return self._aead.encrypt(plaintext, associated_data)
+
+  def decrypt(self, ciphertext: bytes, associated_data: bytes) -> bytes:
+    _count_remote_call(self._name + '.decrypt')
+    return self._aead.decrypt(ciphertext, associated_data)
+
+
+class CachingKmsClient(tink.KmsClient):
+  """Wraps a KmsClient and caches its AEADs by key URI.
+
+  Tink looks up the KMS AEAD every time a KMS AEAD or KMS envelope AEAD
+  primitive is created, and the services create the primitive on every request.
+  Some KmsClients create a new remote client, and with it new connections, in
+  every get_aead call. The cache holds at most max_size AEADs, evicting the
+  least recently used one, and creates an AEAD again after ttl_seconds.
+  """
+
+  def __init__(self,
+               name: str,
+               client: tink.KmsClient,
+               max_size: int,
+               ttl_seconds: float,
+               clock: Callable[[], float] = time.monotonic) -> None:
+    self._name = name
+    self._client = client
+    self._max_size = max_size
+    self._ttl_seconds = ttl_seconds
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._cache: collections.OrderedDict[str, Tuple[float, aead.Aead]] = (
+        collections.OrderedDict())
+
+  def does_support(self, key_uri: str) -> bool:
+    return self._client.does_support(key_uri)
+
+  def get_aead(self, key_uri: str) -> aead.Aead:
+    now = self._clock()
+    with self._lock:
+      entry = self._cache.get(key_uri)
+      if entry is not None and now - entry[0] < self._ttl_seconds:
+        self._cache.move_to_end(key_uri)
+        return entry[1]
+    _count_remote_call(self._name + '.new_aead')
+    kms_aead = _CountingAead(self._name, self._client.get_aead(key_uri))
+    if self._max_size <= 0:
+      return kms_aead
+    with self._lock:
+      self._cache[key_uri] = (now, kms_aead)
+      self._cache.move_to_end(key_uri)
+      while len(self._cache) > self._max_size:
+        self._cache.popitem(last=False)
+    return kms_aead
 
 
 class HcVaultKmsClient(tink.KmsClient):
   """KmsClient for HC Vault."""
 
-  def __init__(self, token: str) -> None:
+  def __init__(self, token: str, address: str) -> None:
+    # All AEADs share one session, so that connections to Vault are reused.
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=_HCVAULT_POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
     self._client = hvac.Client(
-        url='https://127.0.0.1:8200',
+        url=address,
         token=token,
-        verify=False)
+        verify=False,
+        session=session)
     self._prefix = 'hcvault://127.0.0.1:8200/'
 
   def does_support(self, key_uri: str) -> bool:
@@ -59,14 +170,35 @@ class HcVaultKmsClient(tink.KmsClient):
     return hcvault.new_aead(key_path, self._client)
 
 
+def _register_caching_client(name: str, client: tink.KmsClient) -> None:
+  tink.register_kms_client(
+      CachingKmsClient(name, client, KMS_AEAD_CACHE_SIZE.value,
+                       KMS_AEAD_CACHE_TTL_SECONDS.value))
+
+
+def _gcp_kms_client() -> tink.KmsClient:
+  if not GCP_ENDPOINT.value:
+    return gcpkms.GcpKmsClient(
+        key_uri=GCP_KEY_URI.value,
+        credentials_path=GCP_CREDENTIALS_PATH.value)
+  # The default gRPC transport cannot be pointed at a plain HTTP server.
+  return gcpkms.new_client(
+      kms_v1_client=kms_v1.KeyManagementServiceClient(
+          credentials=ga_credentials.AnonymousCredentials(),
+          transport='rest',
+          client_options={'api_endpoint': GCP_ENDPOINT.value}),
+      key_uri=GCP_KEY_URI.value or None)
+
+
 def init() -> None:
   """Registers some KMS clients."""
-  gcpkms.GcpKmsClient.register_client(
-      key_uri=GCP_KEY_URI.value,
-      credentials_path=GCP_CREDENTIALS_PATH.value
-  )
-  awskms.AwsKmsClient.register_client(
-      key_uri=AWS_KEY_URI.value,
-      credentials_path=AWS_CREDENTIALS_PATH.value
-  )
-  tink.register_kms_client(HcVaultKmsClient(HCVAULT_TOKEN.value))
+  _register_caching_client('gcp', _gcp_kms_client())
+  # AwsKmsClient creates a new boto3 client in every get_aead call, so the
+  # cache also keeps the boto3 clients and their connection pools.
+  _register_caching_client(
+      'aws',
+      awskms.AwsKmsClient(
+          key_uri=AWS_KEY_URI.value,
+          credentials_path=AWS_CREDENTIALS_PATH.value))
+  _register_caching_client(
+      'hcvault', HcVaultKmsClient(HCVAULT_TOKEN.value, HCVAULT_ADDRESS.value))
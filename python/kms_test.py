@@ -0,0 +1,126 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for kms."""
+
+import base64
+
+from absl.testing import absltest
+
+import tink
+from tink import aead
+from tink import secret_key_access
+
+from tink.testing import fake_kms
+import kms
+
+
+def setUpModule():
+  aead.register()
+
+
+def _new_fake_kms_key_uri() -> str:
+  handle = tink.new_keyset_handle(aead.aead_key_templates.AES128_GCM)
+  serialized_keyset = tink.proto_keyset_format.serialize(
+      handle, secret_key_access.TOKEN)
+  return fake_kms.FAKE_KMS_PREFIX + base64.urlsafe_b64encode(
+      serialized_keyset).decode('utf-8').rstrip('=')
+
+
+class _CountingFakeKmsClient(tink.KmsClient):
+
+  def __init__(self):
+    self._client = fake_kms.FakeKmsClient()
+    self.get_aead_calls = 0
+
+  def does_support(self, key_uri: str) -> bool:
+    return self._client.does_support(key_uri)
+
+  def get_aead(self, key_uri: str) -> aead.Aead:
+    self.get_aead_calls += 1
+    return self._client.get_aead(key_uri)
+
+
+class _FakeClock:
+
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self) -> float:
+    return self.now
+
+
+class CachingKmsClientTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._key_uri = _new_fake_kms_key_uri()
+    self._key_uri_2 = _new_fake_kms_key_uri()
+
+  def test_caches_aead(self):
+    client = _CountingFakeKmsClient()
+    caching_client = kms.CachingKmsClient(
+        'cache_test', client, max_size=10, ttl_seconds=60)
+    kms_aead = caching_client.get_aead(self._key_uri)
+    ciphertext = kms_aead.encrypt(b'plaintext', b'ad')
+    self.assertEqual(
+        caching_client.get_aead(self._key_uri).decrypt(ciphertext, b'ad'),
+        b'plaintext')
+    self.assertEqual(client.get_aead_calls, 1)
+    self.assertTrue(caching_client.does_support(self._key_uri))
+
+  def test_expires_after_ttl(self):
+    client = _CountingFakeKmsClient()
+    clock = _FakeClock()
+    caching_client = kms.CachingKmsClient(
+        'ttl_test', client, max_size=10, ttl_seconds=60, clock=clock)
+    caching_client.get_aead(self._key_uri)
+    clock.now = 59.0
+    caching_client.get_aead(self._key_uri)
+    self.assertEqual(client.get_aead_calls, 1)
+    clock.now = 60.0
+    caching_client.get_aead(self._key_uri)
+    self.assertEqual(client.get_aead_calls, 2)
+
+  def test_evicts_least_recently_used(self):
+    client = _CountingFakeKmsClient()
+    caching_client = kms.CachingKmsClient(
+        'lru_test', client, max_size=1, ttl_seconds=60)
+    caching_client.get_aead(self._key_uri)
+    caching_client.get_aead(self._key_uri_2)
+    caching_client.get_aead(self._key_uri)
+    self.assertEqual(client.get_aead_calls, 3)
+
+  def test_size_zero_disables_caching(self):
+    client = _CountingFakeKmsClient()
+    caching_client = kms.CachingKmsClient(
+        'disabled_test', client, max_size=0, ttl_seconds=60)
+    caching_client.get_aead(self._key_uri)
+    caching_client.get_aead(self._key_uri)
+    self.assertEqual(client.get_aead_calls, 2)
+
+  def test_counts_remote_calls(self):
+    caching_client = kms.CachingKmsClient(
+        'count_test', _CountingFakeKmsClient(), max_size=10, ttl_seconds=60)
+    kms_aead = caching_client.get_aead(self._key_uri)
+    ciphertext = kms_aead.encrypt(b'plaintext', b'ad')
+    kms_aead.decrypt(ciphertext, b'ad')
+    kms_aead.decrypt(ciphertext, b'ad')
+    counts = kms.remote_call_counts()
+    self.assertEqual(counts['count_test.new_aead'], 1)
+    self.assertEqual(counts['count_test.encrypt'], 1)
+    self.assertEqual(counts['count_test.decrypt'], 2)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,96 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-process monitoring client of the Python testing server.
+
+Keysets with annotations are monitored, as with a monitoring client in
+production: each use of a key and each failure is counted, per primitive and
+API function. Keysets without annotations are not monitored.
+"""
+
+import collections
+import threading
+from typing import Dict, Optional, Tuple
+
+import tink
+from tink import _monitoring
+from tink import secret_key_access
+from tink.proto import tink_pb2
+from google.protobuf import message
+from protos import testing_api_pb2
+
+_key_uses = collections.Counter()
+_input_bytes = collections.Counter()
+_failures = collections.Counter()
+_counts_lock = threading.Lock()
+
+
+class _CountingMonitor(_monitoring.KeyUsageMonitor):
+  """Counts the key uses and failures of one API function of a primitive."""
+
+  def __init__(self, primitive: str, api_function: str) -> None:
+    self._name = '%s.%s' % (primitive, api_function)
+
+  def log(self, key_id: int, num_bytes_as_input: int) -> None:
+    with _counts_lock:
+      _key_uses[(self._name, key_id)] += 1
+      _input_bytes[(self._name, key_id)] += num_bytes_as_input
+
+  def log_failure(self) -> None:
+    with _counts_lock:
+      _failures[self._name] += 1
+
+
+def _new_monitor(
+    context: _monitoring.MonitoringContext
+) -> Optional[_monitoring.KeyUsageMonitor]:
+  if not context.get_keyset_info().get_annotations():
+    return None
+  return _CountingMonitor(context.get_primitive(), context.get_api_function())
+
+
+def init() -> None:
+  """Registers the monitoring client."""
+  _monitoring.register_key_usage_monitor_factory(_new_monitor)
+
+
+def key_use_counts() -> Dict[Tuple[str, int], int]:
+  """Returns the number of key uses, keyed by API function and key ID."""
+  with _counts_lock:
+    return dict(_key_uses)
+
+
+def input_byte_counts() -> Dict[Tuple[str, int], int]:
+  """Returns the number of input bytes, keyed by API function and key ID."""
+  with _counts_lock:
+    return dict(_input_bytes)
+
+
+def failure_counts() -> Dict[str, int]:
+  """Returns the number of failures, keyed by API function."""
+  with _counts_lock:
+    return dict(_failures)
+
+
+def parse_keyset(
+    annotated_keyset: testing_api_pb2.AnnotatedKeyset) -> tink.KeysetHandle:
+  """Parses the keyset, which is monitored if it has annotations."""
+  if not annotated_keyset.annotations:
+    return tink.proto_keyset_format.parse(annotated_keyset.serialized_keyset,
+                                          secret_key_access.TOKEN)
+  try:
+    keyset = tink_pb2.Keyset.FromString(annotated_keyset.serialized_keyset)
+  except message.DecodeError as e:
+    raise tink.TinkError(e) from e
+  return tink.KeysetHandle._create(  # pylint: disable=protected-access
+      keyset, dict(annotated_keyset.annotations))
@@ -0,0 +1,86 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for monitoring."""
+
+from absl.testing import absltest
+
+import tink
+from tink import aead
+from tink import mac
+from tink import secret_key_access
+
+from protos import testing_api_pb2
+import monitoring
+
+
+def setUpModule():
+  aead.register()
+  mac.register()
+  monitoring.init()
+
+
+def _annotated_keyset(keyset_handle, annotations):
+  return testing_api_pb2.AnnotatedKeyset(
+      serialized_keyset=tink.proto_keyset_format.serialize(
+          keyset_handle, secret_key_access.TOKEN),
+      annotations=annotations)
+
+
+class MonitoringTest(absltest.TestCase):
+
+  def test_counts_uses_and_failures_of_annotated_keysets(self):
+    keyset_handle = tink.new_keyset_handle(
+        aead.aead_key_templates.AES128_GCM)
+    key_id = keyset_handle.keyset_info().primary_key_id
+    p = monitoring.parse_keyset(
+        _annotated_keyset(keyset_handle, {'name': 'value'})).primitive(
+            aead.Aead)
+    uses = monitoring.key_use_counts()
+    input_bytes = monitoring.input_byte_counts()
+    failures = monitoring.failure_counts()
+
+    ciphertext = p.encrypt(b'plaintext', b'ad')
+    p.decrypt(ciphertext, b'ad')
+    with self.assertRaises(tink.TinkError):
+      p.decrypt(b'invalid', b'ad')
+
+    encrypt = ('aead.encrypt', key_id)
+    decrypt = ('aead.decrypt', key_id)
+    self.assertEqual(monitoring.key_use_counts()[encrypt],
+                     uses.get(encrypt, 0) + 1)
+    self.assertEqual(monitoring.input_byte_counts()[encrypt],
+                     input_bytes.get(encrypt, 0) + len(b'plaintext'))
+    self.assertEqual(monitoring.key_use_counts()[decrypt],
+                     uses.get(decrypt, 0) + 1)
+    self.assertEqual(monitoring.failure_counts()['aead.decrypt'],
+                     failures.get('aead.decrypt', 0) + 1)
+
+  def test_does_not_count_keysets_without_annotations(self):
+    keyset_handle = tink.new_keyset_handle(
+        mac.mac_key_templates.HMAC_SHA256_128BITTAG)
+    key_id = keyset_handle.keyset_info().primary_key_id
+    m = monitoring.parse_keyset(_annotated_keyset(keyset_handle,
+                                                  {})).primitive(mac.Mac)
+    m.compute_mac(b'data')
+    self.assertNotIn(('mac.compute', key_id), monitoring.key_use_counts())
+
+  def test_parse_invalid_annotated_keyset_fails(self):
+    with self.assertRaises(tink.TinkError):
+      monitoring.parse_keyset(
+          testing_api_pb2.AnnotatedKeyset(
+              serialized_keyset=b'invalid', annotations={'name': 'value'}))
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,286 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Profiling service for the Python testing server.
+
+The CPU profiler is cProfile. Before Python 3.12, cProfile only profiles the
+thread that enables it, so CpuProfilerInterceptor profiles each RPC in the
+thread that handles it, with one profile per thread. The interceptor is only
+installed in servers started with --cpu_profiling, and the CPU profiler cannot
+be started in other servers. The sampling profiler records the stacks of all
+threads in a background thread, and writes them in the collapsed format of
+flame graphs. Heap snapshots are taken with tracemalloc, and only the last
+_MAX_HEAP_SNAPSHOTS are kept.
+"""
+
+import collections
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import grpc
+
+from protos import testing_api_pb2
+from protos import testing_api_pb2_grpc
+
+# Since Python 3.12, cProfile profiles all threads.
+_PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+_DEFAULT_SAMPLING_INTERVAL_SECONDS = 0.005
+
+_MAX_HEAP_SNAPSHOTS = 8
+
+
+def _output_path(name: str, extension: str) -> str:
+  if not name or os.path.basename(name) != name:
+    raise ValueError('invalid output name %r' % name)
+  output_dir = os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR',
+                              tempfile.gettempdir())
+  return os.path.join(output_dir, name + extension)
+
+
+class CpuProfiler:
+  """Profiles RPCs with cProfile."""
+
+  def __init__(self, enabled: bool = True):
+    self._enabled = enabled
+    self._lock = threading.Lock()
+    self._active = False
+    self._profiles: List[cProfile.Profile] = []
+    self._local = threading.local()
+
+  def start(self) -> None:
+    if not self._enabled:
+      raise ValueError(
+          'the CPU profiler is disabled, start the server with --cpu_profiling')
+    with self._lock:
+      if self._active:
+        raise ValueError('the CPU profiler is already running')
+      self._active = True
+      self._profiles = []
+      if _PROFILES_ALL_THREADS:
+        self._profiles.append(cProfile.Profile())
+        self._profiles[0].enable()
+
+  def stop(self) -> Optional[pstats.Stats]:
+    """Stops profiling and returns the stats, or None if nothing was run."""
+    with self._lock:
+      if not self._active:
+        raise ValueError('the CPU profiler is not running')
+      self._active = False
+      if _PROFILES_ALL_THREADS:
+        self._profiles[0].disable()
+      profiles = self._profiles
+      self._profiles = []
+      # Profiles created in other threads are not used anymore.
+      self._local = threading.local()
+    stats = None
+    for profile in profiles:
+      try:
+        if stats is None:
+          stats = pstats.Stats(profile)
+        else:
+          stats.add(profile)
+      except TypeError:
+        # pstats raises a TypeError for profiles without any call.
+        pass
+    return stats
+
+  def run(self, fn: Callable[[], Any]) -> Any:
+    """Runs fn, profiled if the profiler is running."""
+    if _PROFILES_ALL_THREADS or not self._active:
+      return fn()
+    profile = getattr(self._local, 'profile', None)
+    if profile is None:
+      profile = cProfile.Profile()
+      with self._lock:
+        if not self._active:
+          return fn()
+        self._profiles.append(profile)
+      self._local.profile = profile
+    profile.enable()
+    try:
+      return fn()
+    finally:
+      profile.disable()
+
+
+class CpuProfilerInterceptor(grpc.ServerInterceptor):
+  """Runs all unary RPCs with CpuProfiler.run."""
+
+  def __init__(self, profiler: CpuProfiler):
+    self._profiler = profiler
+
+  def intercept_service(self, continuation, handler_call_details):
+    handler = continuation(handler_call_details)
+    if handler is None or handler.unary_unary is None:
+      return handler
+    behavior = handler.unary_unary
+
+    def profiled(request, context):
+      return self._profiler.run(lambda: behavior(request, context))
+
+    return handler._replace(unary_unary=profiled)
+
+
+def _frame_name(frame) -> str:
+  code = frame.f_code
+  return '%s:%s' % (os.path.basename(code.co_filename), code.co_name)
+
+
+class SamplingProfiler:
+  """Periodically records the stacks of all threads."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._thread: Optional[threading.Thread] = None
+    self._stop = threading.Event()
+    self._stacks: Dict[str, int] = collections.Counter()
+
+  def start(self, interval_seconds: float) -> None:
+    with self._lock:
+      if self._thread is not None:
+        raise ValueError('the sampling profiler is already running')
+      self._stop.clear()
+      self._stacks = collections.Counter()
+      self._thread = threading.Thread(
+          target=self._sample, args=(interval_seconds,), daemon=True)
+      self._thread.start()
+
+  def stop(self) -> Dict[str, int]:
+    """Stops sampling and returns the number of samples of each stack."""
+    with self._lock:
+      if self._thread is None:
+        raise ValueError('the sampling profiler is not running')
+      self._stop.set()
+      self._thread.join()
+      self._thread = None
+      return dict(self._stacks)
+
+  def _sample(self, interval_seconds: float) -> None:
+    own_id = threading.get_ident()
+    while not self._stop.wait(interval_seconds):
+      # pylint: disable-next=protected-access
+      for thread_id, frame in sys._current_frames().items():
+        if thread_id == own_id:
+          continue
+        names = []
+        while frame is not None:
+          names.append(_frame_name(frame))
+          frame = frame.f_back
+        self._stacks[';'.join(reversed(names))] += 1
+
+
+class ProfilingServicer(testing_api_pb2_grpc.ProfilingServicer):
+  """A service for profiling the server."""
+
+  def __init__(self, cpu_profiler: CpuProfiler):
+    self._cpu_profiler = cpu_profiler
+    self._sampling_profiler = SamplingProfiler()
+    # The snapshots by name, the oldest first.
+    self._snapshots: Dict[str, tracemalloc.Snapshot] = {}
+
+  def StartCpuProfiler(
+      self, request: testing_api_pb2.StartCpuProfilerRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.ProfilingResponse:
+    """Starts cProfile."""
+    try:
+      self._cpu_profiler.start()
+      return testing_api_pb2.ProfilingResponse()
+    except ValueError as e:
+      return testing_api_pb2.ProfilingResponse(err=str(e))
+
+  def StopCpuProfiler(
+      self, request: testing_api_pb2.StopProfilerRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.ProfilingResponse:
+    """Stops cProfile, and writes the profile and the top functions."""
+    try:
+      profile_path = _output_path(request.output_name, '.prof')
+      text_path = _output_path(request.output_name, '.txt')
+      stats = self._cpu_profiler.stop()
+      if stats is None:
+        return testing_api_pb2.ProfilingResponse()
+      stats.dump_stats(profile_path)
+      text = io.StringIO()
+      stats.stream = text
+      stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(100)
+      with open(text_path, 'w') as f:
+        f.write(text.getvalue())
+      return testing_api_pb2.ProfilingResponse(
+          output_paths=[profile_path, text_path])
+    except (ValueError, OSError) as e:
+      return testing_api_pb2.ProfilingResponse(err=str(e))
+
+  def StartSamplingProfiler(
+      self, request: testing_api_pb2.StartSamplingProfilerRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.ProfilingResponse:
+    """Starts the sampling profiler."""
+    try:
+      self._sampling_profiler.start(
+          request.interval_seconds or _DEFAULT_SAMPLING_INTERVAL_SECONDS)
+      return testing_api_pb2.ProfilingResponse()
+    except ValueError as e:
+      return testing_api_pb2.ProfilingResponse(err=str(e))
+
+  def StopSamplingProfiler(
+      self, request: testing_api_pb2.StopProfilerRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.ProfilingResponse:
+    """Stops the sampling profiler and writes the collapsed stacks."""
+    try:
+      path = _output_path(request.output_name, '.collapsed')
+      stacks = self._sampling_profiler.stop()
+      with open(path, 'w') as f:
+        for stack, count in sorted(stacks.items()):
+          f.write('%s %d\n' % (stack, count))
+      return testing_api_pb2.ProfilingResponse(output_paths=[path])
+    except (ValueError, OSError) as e:
+      return testing_api_pb2.ProfilingResponse(err=str(e))
+
+  def TakeHeapSnapshot(
+      self, request: testing_api_pb2.TakeHeapSnapshotRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.ProfilingResponse:
+    """Takes a tracemalloc snapshot, and drops the oldest if too many."""
+    if not tracemalloc.is_tracing():
+      tracemalloc.start()
+    self._snapshots.pop(request.name, None)
+    self._snapshots[request.name] = tracemalloc.take_snapshot()
+    while len(self._snapshots) > _MAX_HEAP_SNAPSHOTS:
+      del self._snapshots[next(iter(self._snapshots))]
+    return testing_api_pb2.ProfilingResponse()
+
+  def DiffHeapSnapshots(
+      self, request: testing_api_pb2.DiffHeapSnapshotsRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.ProfilingResponse:
+    """Writes the allocation sites which differ most between two snapshots."""
+    for name in (request.old_name, request.new_name):
+      if name not in self._snapshots:
+        return testing_api_pb2.ProfilingResponse(
+            err='unknown snapshot %r' % name)
+    try:
+      path = _output_path(request.output_name, '.txt')
+      diff = self._snapshots[request.new_name].compare_to(
+          self._snapshots[request.old_name], 'lineno')
+      if request.limit:
+        diff = diff[:request.limit]
+      with open(path, 'w') as f:
+        for statistic in diff:
+          f.write('%s\n' % statistic)
+      return testing_api_pb2.ProfilingResponse(output_paths=[path])
+    except (ValueError, OSError) as e:
+      return testing_api_pb2.ProfilingResponse(err=str(e))
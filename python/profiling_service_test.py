@@ -0,0 +1,174 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for profiling_service."""
+
+import os
+import threading
+import time
+import tracemalloc
+from unittest import mock
+
+from absl.testing import absltest
+import grpc
+
+from protos import testing_api_pb2
+import profiling_service
+
+
+def _busy_function(seconds: float) -> int:
+  end = time.monotonic() + seconds
+  count = 0
+  while time.monotonic() < end:
+    count += 1
+  return count
+
+
+class ProfilingServiceTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._output_dir = self.create_tempdir().full_path
+    self.enter_context(
+        mock.patch.dict(os.environ,
+                        {'TEST_UNDECLARED_OUTPUTS_DIR': self._output_dir}))
+    self._cpu_profiler = profiling_service.CpuProfiler()
+    self._servicer = profiling_service.ProfilingServicer(self._cpu_profiler)
+
+  def _stop_request(self, name):
+    return testing_api_pb2.StopProfilerRequest(output_name=name)
+
+  def test_cpu_profiler_profiles_intercepted_rpcs(self):
+    interceptor = profiling_service.CpuProfilerInterceptor(self._cpu_profiler)
+    handler = interceptor.intercept_service(
+        lambda _: grpc.unary_unary_rpc_method_handler(
+            lambda request, context: _busy_function(0.01)),
+        None)
+
+    response = self._servicer.StartCpuProfiler(
+        testing_api_pb2.StartCpuProfilerRequest(), None)
+    self.assertEmpty(response.err)
+    # RPCs are handled in the threads of the server.
+    thread = threading.Thread(target=handler.unary_unary, args=(None, None))
+    thread.start()
+    thread.join()
+    response = self._servicer.StopCpuProfiler(self._stop_request('cpu'), None)
+
+    self.assertEmpty(response.err)
+    self.assertCountEqual(response.output_paths, [
+        os.path.join(self._output_dir, 'cpu.prof'),
+        os.path.join(self._output_dir, 'cpu.txt')
+    ])
+    with open(os.path.join(self._output_dir, 'cpu.txt')) as f:
+      self.assertIn('_busy_function', f.read())
+
+  def test_cpu_profiler_without_rpcs(self):
+    self._servicer.StartCpuProfiler(
+        testing_api_pb2.StartCpuProfilerRequest(), None)
+    response = self._servicer.StopCpuProfiler(self._stop_request('cpu'), None)
+    self.assertEmpty(response.err)
+
+  def test_cpu_profiler_start_twice_fails(self):
+    request = testing_api_pb2.StartCpuProfilerRequest()
+    self.assertEmpty(self._servicer.StartCpuProfiler(request, None).err)
+    self.assertNotEmpty(self._servicer.StartCpuProfiler(request, None).err)
+    self._cpu_profiler.stop()
+
+  def test_disabled_cpu_profiler_start_fails(self):
+    servicer = profiling_service.ProfilingServicer(
+        profiling_service.CpuProfiler(enabled=False))
+    response = servicer.StartCpuProfiler(
+        testing_api_pb2.StartCpuProfilerRequest(), None)
+    self.assertIn('--cpu_profiling', response.err)
+
+  def test_cpu_profiler_stop_without_start_fails(self):
+    response = self._servicer.StopCpuProfiler(self._stop_request('cpu'), None)
+    self.assertNotEmpty(response.err)
+
+  def test_invalid_output_name_fails(self):
+    self._servicer.StartCpuProfiler(
+        testing_api_pb2.StartCpuProfilerRequest(), None)
+    response = self._servicer.StopCpuProfiler(
+        self._stop_request('../cpu'), None)
+    self.assertNotEmpty(response.err)
+
+  def test_sampling_profiler_writes_collapsed_stacks(self):
+    response = self._servicer.StartSamplingProfiler(
+        testing_api_pb2.StartSamplingProfilerRequest(interval_seconds=0.001),
+        None)
+    self.assertEmpty(response.err)
+    _busy_function(0.1)
+    response = self._servicer.StopSamplingProfiler(
+        self._stop_request('samples'), None)
+
+    self.assertEmpty(response.err)
+    self.assertEqual(list(response.output_paths),
+                     [os.path.join(self._output_dir, 'samples.collapsed')])
+    with open(response.output_paths[0]) as f:
+      lines = f.read().splitlines()
+    busy_samples = 0
+    for line in lines:
+      stack, count = line.rsplit(' ', 1)
+      if stack.endswith('profiling_service_test.py:_busy_function'):
+        busy_samples += int(count)
+    self.assertGreater(busy_samples, 0)
+
+  def test_sampling_profiler_stop_without_start_fails(self):
+    response = self._servicer.StopSamplingProfiler(
+        self._stop_request('samples'), None)
+    self.assertNotEmpty(response.err)
+
+  def test_diff_heap_snapshots(self):
+    self.addCleanup(tracemalloc.stop)
+    self._servicer.TakeHeapSnapshot(
+        testing_api_pb2.TakeHeapSnapshotRequest(name='before'), None)
+    allocated = [bytes(1000) for _ in range(1000)]
+    self._servicer.TakeHeapSnapshot(
+        testing_api_pb2.TakeHeapSnapshotRequest(name='after'), None)
+    response = self._servicer.DiffHeapSnapshots(
+        testing_api_pb2.DiffHeapSnapshotsRequest(
+            old_name='before', new_name='after', output_name='heap', limit=5),
+        None)
+    del allocated
+
+    self.assertEmpty(response.err)
+    with open(response.output_paths[0]) as f:
+      lines = f.read().splitlines()
+    self.assertLen(lines, 5)
+    self.assertIn('profiling_service_test.py', lines[0])
+
+  def test_oldest_heap_snapshots_are_dropped(self):
+    self.addCleanup(tracemalloc.stop)
+    for i in range(profiling_service._MAX_HEAP_SNAPSHOTS + 1):
+      self._servicer.TakeHeapSnapshot(
+          testing_api_pb2.TakeHeapSnapshotRequest(name=str(i)), None)
+
+    response = self._servicer.DiffHeapSnapshots(
+        testing_api_pb2.DiffHeapSnapshotsRequest(
+            old_name='0', new_name='1', output_name='heap'), None)
+    self.assertIn('unknown snapshot', response.err)
+    response = self._servicer.DiffHeapSnapshots(
+        testing_api_pb2.DiffHeapSnapshotsRequest(
+            old_name='1', new_name=str(profiling_service._MAX_HEAP_SNAPSHOTS),
+            output_name='heap'), None)
+    self.assertEmpty(response.err)
+
+  def test_diff_unknown_heap_snapshot_fails(self):
+    response = self._servicer.DiffHeapSnapshots(
+        testing_api_pb2.DiffHeapSnapshotsRequest(
+            old_name='unknown', new_name='unknown', output_name='heap'), None)
+    self.assertNotEmpty(response.err)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -13,7 +13,9 @@
 # limitations under the License.
 """Testing service API implementations in Python."""
 
+import contextlib
 import io
+import shutil
 
 import grpc
 import tink
@@ -31,8 +33,12 @@ from tink.proto import ml_dsa_pb2
 from tink.proto import slh_dsa_pb2
 from tink.proto import tink_pb2
 from tink.testing import bytes_io
+from google.protobuf import message
 from protos import testing_api_pb2
 from protos import testing_api_pb2_grpc
+import generated_inputs
+import monitoring
+import shared_memory
 
 
 def _create_ml_dsa_key_template(ml_dsa_instance, output_prefix_type):
@@ -229,6 +235,38 @@ _KEY_TEMPLATE = {
     ),
 }
 
+# The primitives which CreateMany can create. The Python server does not
+# support PRIMITIVE_KEYSET_DERIVER.
+_PRIMITIVE_CLASS = {
+    testing_api_pb2.PRIMITIVE_AEAD: aead.Aead,
+    testing_api_pb2.PRIMITIVE_DETERMINISTIC_AEAD: daead.DeterministicAead,
+    testing_api_pb2.PRIMITIVE_STREAMING_AEAD: streaming_aead.StreamingAead,
+    testing_api_pb2.PRIMITIVE_MAC: mac.Mac,
+    testing_api_pb2.PRIMITIVE_HYBRID_ENCRYPT: hybrid.HybridEncrypt,
+    testing_api_pb2.PRIMITIVE_HYBRID_DECRYPT: hybrid.HybridDecrypt,
+    testing_api_pb2.PRIMITIVE_PUBLIC_KEY_SIGN: signature.PublicKeySign,
+    testing_api_pb2.PRIMITIVE_PUBLIC_KEY_VERIFY: signature.PublicKeyVerify,
+    testing_api_pb2.PRIMITIVE_PRF_SET: prf.PrfSet,
+    testing_api_pb2.PRIMITIVE_JWT_MAC: jwt.JwtMac,
+    testing_api_pb2.PRIMITIVE_JWT_PUBLIC_KEY_SIGN: jwt.JwtPublicKeySign,
+    testing_api_pb2.PRIMITIVE_JWT_PUBLIC_KEY_VERIFY: jwt.JwtPublicKeyVerify,
+}
+
+# The size of the chunks in which decrypted streams are written to shared
+# memory.
+_SHARED_MEMORY_CHUNK_SIZE = 1024 * 1024
+
+
+def _generate_keyset(template: bytes) -> bytes:
+  try:
+    key_template = tink_pb2.KeyTemplate.FromString(template)
+  except message.DecodeError as e:
+    raise tink.TinkError(e) from e
+  keyset_handle = tink.new_keyset_handle(key_template)
+  return tink.proto_keyset_format.serialize(
+      keyset_handle, secret_key_access.TOKEN
+  )
+
 
 class MetadataServicer(testing_api_pb2_grpc.MetadataServicer):
   """A service with metadata about the server."""
@@ -237,7 +275,8 @@ class MetadataServicer(testing_api_pb2_grpc.MetadataServicer):
       self, request: testing_api_pb2.ServerInfoRequest,
       context: grpc.ServicerContext) -> testing_api_pb2.ServerInfoResponse:
     """Returns information about the server."""
-    return testing_api_pb2.ServerInfoResponse(language='python')
+    return testing_api_pb2.ServerInfoResponse(
+        language='python', shared_memory_payloads=True, generated_inputs=True)
 
 
 class KeysetServicer(testing_api_pb2_grpc.KeysetServicer):
@@ -258,16 +297,45 @@ class KeysetServicer(testing_api_pb2_grpc.KeysetServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.KeysetGenerateResponse:
     """Generates a keyset."""
     try:
-      template = tink_pb2.KeyTemplate()
-      template.ParseFromString(request.template)
-      keyset_handle = tink.new_keyset_handle(template)
-      keyset = tink.proto_keyset_format.serialize(
-          keyset_handle, secret_key_access.TOKEN
-      )
+      keyset = _generate_keyset(request.template)
       return testing_api_pb2.KeysetGenerateResponse(keyset=keyset)
     except tink.TinkError as e:
       return testing_api_pb2.KeysetGenerateResponse(err=str(e))
 
+  def GenerateMany(
+      self, request: testing_api_pb2.KeysetGenerateManyRequest,
+      context: grpc.ServicerContext
+  ) -> testing_api_pb2.KeysetGenerateManyResponse:
+    """Generates a keyset for each template."""
+    return testing_api_pb2.KeysetGenerateManyResponse(results=[
+        self.Generate(
+            testing_api_pb2.KeysetGenerateRequest(template=template), context)
+        for template in request.templates
+    ])
+
+  def CreateMany(
+      self, request: testing_api_pb2.CreateManyRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.CreateManyResponse:
+    """Creates a primitive for each entry without using it."""
+    results = []
+    for entry in request.entries:
+      try:
+        if entry.primitive not in _PRIMITIVE_CLASS:
+          raise tink.TinkError(
+              'primitive %s is not supported' %
+              testing_api_pb2.PrimitiveType.Name(entry.primitive))
+        if entry.HasField('template'):
+          keyset_handle = tink.proto_keyset_format.parse(
+              _generate_keyset(entry.template), secret_key_access.TOKEN
+          )
+        else:
+          keyset_handle = monitoring.parse_keyset(entry.annotated_keyset)
+        keyset_handle.primitive(_PRIMITIVE_CLASS[entry.primitive])
+        results.append(testing_api_pb2.CreationResponse())
+      except tink.TinkError as e:
+        results.append(testing_api_pb2.CreationResponse(err=str(e)))
+    return testing_api_pb2.CreateManyResponse(results=results)
+
   def Public(
       self, request: testing_api_pb2.KeysetPublicRequest,
       context: grpc.ServicerContext) -> testing_api_pb2.KeysetPublicResponse:
@@ -391,9 +459,7 @@ class AeadServicer(testing_api_pb2_grpc.AeadServicer):
              context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates an AEAD without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(aead.Aead)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -403,28 +469,40 @@ class AeadServicer(testing_api_pb2_grpc.AeadServicer):
       self, request: testing_api_pb2.AeadEncryptRequest,
       context: grpc.ServicerContext) -> testing_api_pb2.AeadEncryptResponse:
     """Encrypts a message."""
-    keyset_handle = tink.proto_keyset_format.parse(
-        request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-    )
+    keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
     p = keyset_handle.primitive(aead.Aead)
     try:
-      ciphertext = p.encrypt(request.plaintext, request.associated_data)
+      if request.HasField('shared_plaintext'):
+        plaintext = shared_memory.read(request.shared_plaintext)
+      else:
+        plaintext = request.plaintext
+      ciphertext = p.encrypt(plaintext, request.associated_data)
+      if request.shared_output_path:
+        return testing_api_pb2.AeadEncryptResponse(
+            shared_ciphertext=shared_memory.write(request.shared_output_path,
+                                                  ciphertext))
       return testing_api_pb2.AeadEncryptResponse(ciphertext=ciphertext)
-    except tink.TinkError as e:
+    except (tink.TinkError, ValueError, OSError) as e:
       return testing_api_pb2.AeadEncryptResponse(err=str(e))
 
   def Decrypt(
       self, request: testing_api_pb2.AeadDecryptRequest,
       context: grpc.ServicerContext) -> testing_api_pb2.AeadDecryptResponse:
     """Decrypts a message."""
-    keyset_handle = tink.proto_keyset_format.parse(
-        request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-    )
+    keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
     p = keyset_handle.primitive(aead.Aead)
     try:
-      plaintext = p.decrypt(request.ciphertext, request.associated_data)
+      if request.HasField('shared_ciphertext'):
+        ciphertext = shared_memory.read(request.shared_ciphertext)
+      else:
+        ciphertext = request.ciphertext
+      plaintext = p.decrypt(ciphertext, request.associated_data)
+      if request.shared_output_path:
+        return testing_api_pb2.AeadDecryptResponse(
+            shared_plaintext=shared_memory.write(request.shared_output_path,
+                                                 plaintext))
       return testing_api_pb2.AeadDecryptResponse(plaintext=plaintext)
-    except tink.TinkError as e:
+    except (tink.TinkError, ValueError, OSError) as e:
       return testing_api_pb2.AeadDecryptResponse(err=str(e))
 
 
@@ -435,9 +513,7 @@ class StreamingAeadServicer(testing_api_pb2_grpc.StreamingAeadServicer):
              context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a Streaming Aead without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(streaming_aead.StreamingAead)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -449,17 +525,29 @@ class StreamingAeadServicer(testing_api_pb2_grpc.StreamingAeadServicer):
   ) -> testing_api_pb2.StreamingAeadEncryptResponse:
     """Encrypts a message."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       p = keyset_handle.primitive(streaming_aead.StreamingAead)
-      ciphertext_destination = bytes_io.BytesIOWithValueAfterClose()
-      with p.new_encrypting_stream(ciphertext_destination,
-                                   request.associated_data) as plaintext_stream:
-        plaintext_stream.write(request.plaintext)
+      with contextlib.ExitStack() as stack:
+        if request.shared_output_path:
+          ciphertext_destination = stack.enter_context(
+              shared_memory.create(request.shared_output_path))
+        else:
+          ciphertext_destination = bytes_io.BytesIOWithValueAfterClose()
+        if request.HasField('shared_plaintext'):
+          plaintext = stack.enter_context(
+              shared_memory.mapped(request.shared_plaintext))
+        else:
+          plaintext = request.plaintext
+        with p.new_encrypting_stream(
+            ciphertext_destination, request.associated_data
+        ) as plaintext_stream:
+          plaintext_stream.write(plaintext)
+      if request.shared_output_path:
+        return testing_api_pb2.StreamingAeadEncryptResponse(
+            shared_ciphertext=shared_memory.region(request.shared_output_path))
       return testing_api_pb2.StreamingAeadEncryptResponse(
           ciphertext=ciphertext_destination.value_after_close())
-    except tink.TinkError as e:
+    except (tink.TinkError, ValueError, OSError) as e:
       return testing_api_pb2.StreamingAeadEncryptResponse(err=str(e))
 
   def Decrypt(
@@ -468,15 +556,26 @@ class StreamingAeadServicer(testing_api_pb2_grpc.StreamingAeadServicer):
   ) -> testing_api_pb2.StreamingAeadDecryptResponse:
     """Decrypts a message."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       p = keyset_handle.primitive(streaming_aead.StreamingAead)
-      stream = io.BytesIO(request.ciphertext)
-      with p.new_decrypting_stream(stream, request.associated_data) as s:
-        plaintext = s.read()
+      with contextlib.ExitStack() as stack:
+        if request.HasField('shared_ciphertext'):
+          stream = shared_memory.MemoryViewReader(
+              stack.enter_context(
+                  shared_memory.mapped(request.shared_ciphertext)))
+        else:
+          stream = io.BytesIO(request.ciphertext)
+        with p.new_decrypting_stream(stream, request.associated_data) as s:
+          if not request.shared_output_path:
+            plaintext = s.read()
+          else:
+            with shared_memory.create(request.shared_output_path) as output:
+              shutil.copyfileobj(s, output, _SHARED_MEMORY_CHUNK_SIZE)
+            return testing_api_pb2.StreamingAeadDecryptResponse(
+                shared_plaintext=shared_memory.region(
+                    request.shared_output_path))
       return testing_api_pb2.StreamingAeadDecryptResponse(plaintext=plaintext)
-    except tink.TinkError as e:
+    except (tink.TinkError, ValueError, OSError) as e:
       return testing_api_pb2.StreamingAeadDecryptResponse(err=str(e))
 
 
@@ -487,9 +586,7 @@ class DeterministicAeadServicer(testing_api_pb2_grpc.DeterministicAeadServicer):
              context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a Deterministic AEAD without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(daead.DeterministicAead)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -500,11 +597,15 @@ class DeterministicAeadServicer(testing_api_pb2_grpc.DeterministicAeadServicer):
       context: grpc.ServicerContext
   ) -> testing_api_pb2.DeterministicAeadEncryptResponse:
     """Encrypts a message."""
-    keyset_handle = tink.proto_keyset_format.parse(
-        request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-    )
+    keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
     p = keyset_handle.primitive(daead.DeterministicAead)
     try:
+      if request.HasField('generated_plaintexts'):
+        return testing_api_pb2.DeterministicAeadEncryptResponse(
+            ciphertexts_digest=generated_inputs.digest(
+                p.encrypt_deterministically(plaintext, request.associated_data)
+                for plaintext in generated_inputs.generate(
+                    request.generated_plaintexts)))
       ciphertext = p.encrypt_deterministically(request.plaintext,
                                                request.associated_data)
       return testing_api_pb2.DeterministicAeadEncryptResponse(
@@ -517,9 +618,7 @@ class DeterministicAeadServicer(testing_api_pb2_grpc.DeterministicAeadServicer):
       context: grpc.ServicerContext
   ) -> testing_api_pb2.DeterministicAeadDecryptResponse:
     """Decrypts a message."""
-    keyset_handle = tink.proto_keyset_format.parse(
-        request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-    )
+    keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
     p = keyset_handle.primitive(daead.DeterministicAead)
     try:
       plaintext = p.decrypt_deterministically(request.ciphertext,
@@ -537,9 +636,7 @@ class MacServicer(testing_api_pb2_grpc.MacServicer):
              context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a MAC without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(mac.Mac)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -550,10 +647,13 @@ class MacServicer(testing_api_pb2_grpc.MacServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.ComputeMacResponse:
     """Computes a MAC."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       p = keyset_handle.primitive(mac.Mac)
+      if request.HasField('generated_data'):
+        return testing_api_pb2.ComputeMacResponse(
+            mac_values_digest=generated_inputs.digest(
+                p.compute_mac(data)
+                for data in generated_inputs.generate(request.generated_data)))
       mac_value = p.compute_mac(request.data)
       return testing_api_pb2.ComputeMacResponse(mac_value=mac_value)
     except tink.TinkError as e:
@@ -564,9 +664,7 @@ class MacServicer(testing_api_pb2_grpc.MacServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.VerifyMacResponse:
     """Verifies a MAC value."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       p = keyset_handle.primitive(mac.Mac)
       p.verify_mac(request.mac_value, request.data)
       return testing_api_pb2.VerifyMacResponse()
@@ -582,9 +680,7 @@ class HybridServicer(testing_api_pb2_grpc.HybridServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a HybridEncrypt without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(hybrid.HybridEncrypt)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -595,9 +691,7 @@ class HybridServicer(testing_api_pb2_grpc.HybridServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a HybridDecrypt without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(hybrid.HybridDecrypt)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -608,10 +702,8 @@ class HybridServicer(testing_api_pb2_grpc.HybridServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.HybridEncryptResponse:
     """Encrypts a message."""
     try:
-      public_keyset_handle = tink.proto_keyset_format.parse(
-          request.public_annotated_keyset.serialized_keyset,
-          secret_key_access.TOKEN,
-      )
+      public_keyset_handle = monitoring.parse_keyset(
+          request.public_annotated_keyset)
       p = public_keyset_handle.primitive(hybrid.HybridEncrypt)
       ciphertext = p.encrypt(request.plaintext, request.context_info)
       return testing_api_pb2.HybridEncryptResponse(ciphertext=ciphertext)
@@ -623,10 +715,8 @@ class HybridServicer(testing_api_pb2_grpc.HybridServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.HybridDecryptResponse:
     """Decrypts a message."""
     try:
-      private_keyset_handle = tink.proto_keyset_format.parse(
-          request.private_annotated_keyset.serialized_keyset,
-          secret_key_access.TOKEN,
-      )
+      private_keyset_handle = monitoring.parse_keyset(
+          request.private_annotated_keyset)
       p = private_keyset_handle.primitive(hybrid.HybridDecrypt)
       plaintext = p.decrypt(request.ciphertext, request.context_info)
       return testing_api_pb2.HybridDecryptResponse(plaintext=plaintext)
@@ -642,9 +732,7 @@ class SignatureServicer(testing_api_pb2_grpc.SignatureServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a PublicKeySign without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(signature.PublicKeySign)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -655,9 +743,7 @@ class SignatureServicer(testing_api_pb2_grpc.SignatureServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a PublicKeyVerify without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(signature.PublicKeyVerify)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -668,11 +754,14 @@ class SignatureServicer(testing_api_pb2_grpc.SignatureServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.SignatureSignResponse:
     """Signs a message."""
     try:
-      private_keyset_handle = tink.proto_keyset_format.parse(
-          request.private_annotated_keyset.serialized_keyset,
-          secret_key_access.TOKEN,
-      )
+      private_keyset_handle = monitoring.parse_keyset(
+          request.private_annotated_keyset)
       p = private_keyset_handle.primitive(signature.PublicKeySign)
+      if request.HasField('generated_data'):
+        return testing_api_pb2.SignatureSignResponse(
+            signatures_digest=generated_inputs.digest(
+                p.sign(data)
+                for data in generated_inputs.generate(request.generated_data)))
       signature_value = p.sign(request.data)
       return testing_api_pb2.SignatureSignResponse(signature=signature_value)
     except tink.TinkError as e:
@@ -683,10 +772,8 @@ class SignatureServicer(testing_api_pb2_grpc.SignatureServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.SignatureVerifyResponse:
     """Verifies a signature."""
     try:
-      public_keyset_handle = tink.proto_keyset_format.parse(
-          request.public_annotated_keyset.serialized_keyset,
-          secret_key_access.TOKEN,
-      )
+      public_keyset_handle = monitoring.parse_keyset(
+          request.public_annotated_keyset)
       p = public_keyset_handle.primitive(signature.PublicKeyVerify)
       p.verify(request.signature, request.data)
       return testing_api_pb2.SignatureVerifyResponse()
@@ -701,9 +788,7 @@ class PrfSetServicer(testing_api_pb2_grpc.PrfSetServicer):
              context: grpc.ServicerContext) -> testing_api_pb2.CreationResponse:
     """Creates a PrfSet without using it."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       keyset_handle.primitive(prf.PrfSet)
       return testing_api_pb2.CreationResponse()
     except tink.TinkError as e:
@@ -714,9 +799,7 @@ class PrfSetServicer(testing_api_pb2_grpc.PrfSetServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.PrfSetKeyIdsResponse:
     """Returns all key IDs and the primary key ID."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       p = keyset_handle.primitive(prf.PrfSet)
       prfs = p.all()
       response = testing_api_pb2.PrfSetKeyIdsResponse()
@@ -731,10 +814,14 @@ class PrfSetServicer(testing_api_pb2_grpc.PrfSetServicer):
       context: grpc.ServicerContext) -> testing_api_pb2.PrfSetComputeResponse:
     """Computes the output of one PRF."""
     try:
-      keyset_handle = tink.proto_keyset_format.parse(
-          request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN
-      )
+      keyset_handle = monitoring.parse_keyset(request.annotated_keyset)
       f = keyset_handle.primitive(prf.PrfSet).all()[request.key_id]
+      if request.HasField('generated_input_data'):
+        return testing_api_pb2.PrfSetComputeResponse(
+            outputs_digest=generated_inputs.digest(
+                f.compute(input_data, request.output_length)
+                for input_data in generated_inputs.generate(
+                    request.generated_input_data)))
       return testing_api_pb2.PrfSetComputeResponse(
           output=f.compute(request.input_data, request.output_length))
     except tink.TinkError as e:
@@ -13,6 +13,9 @@
 # limitations under the License.
 """Tests for tink.tools.testing.python.testing_server."""
 
+import hashlib
+import os
+
 from absl.testing import absltest
 import grpc
 
@@ -27,6 +30,7 @@ from tink import streaming_aead
 
 
 from protos import testing_api_pb2
+import generated_inputs
 import services
 
 
@@ -159,6 +163,43 @@ class ServicesTest(absltest.TestCase):
     self.assertEqual(response.WhichOneof('result'), 'err')
     self.assertNotEmpty(response.err)
 
+  def test_generate_many(self):
+    keyset_servicer = services.KeysetServicer()
+    request = testing_api_pb2.KeysetGenerateManyRequest(templates=[
+        aead.aead_key_templates.AES128_GCM.SerializeToString(),
+        b'bad template',
+        mac.mac_key_templates.HMAC_SHA256_128BITTAG.SerializeToString(),
+    ])
+    response = keyset_servicer.GenerateMany(request, self._ctx)
+    self.assertEqual(
+        [result.WhichOneof('result') for result in response.results],
+        ['keyset', 'err', 'keyset'])
+
+  def test_create_many(self):
+    keyset_servicer = services.KeysetServicer()
+    aead_template = aead.aead_key_templates.AES128_GCM.SerializeToString()
+    keyset = keyset_servicer.Generate(
+        testing_api_pb2.KeysetGenerateRequest(template=aead_template),
+        self._ctx).keyset
+    request = testing_api_pb2.CreateManyRequest(entries=[
+        testing_api_pb2.CreateManyEntry(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            primitive=testing_api_pb2.PRIMITIVE_AEAD),
+        testing_api_pb2.CreateManyEntry(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            primitive=testing_api_pb2.PRIMITIVE_MAC),
+        testing_api_pb2.CreateManyEntry(
+            template=aead_template, primitive=testing_api_pb2.PRIMITIVE_AEAD),
+        testing_api_pb2.CreateManyEntry(
+            template=aead_template,
+            primitive=testing_api_pb2.PRIMITIVE_KEYSET_DERIVER),
+    ])
+    response = keyset_servicer.CreateMany(request, self._ctx)
+    self.assertEqual([bool(result.err) for result in response.results],
+                     [False, True, False, True])
+
   def test_generate_keyset_write_read_encrypted(self):
     keyset_servicer = services.KeysetServicer()
 
@@ -417,6 +458,87 @@ class ServicesTest(absltest.TestCase):
     request = testing_api_pb2.ServerInfoRequest()
     response = metadata_servicer.GetServerInfo(request, self._ctx)
     self.assertEqual(response.language, 'python')
+    self.assertTrue(response.shared_memory_payloads)
+    self.assertTrue(response.generated_inputs)
+
+  def test_generated_inputs(self):
+    inputs = testing_api_pb2.GeneratedInputs(seed=b'seed', sizes=[0, 40])
+    self.assertEqual(
+        list(generated_inputs.generate(inputs)), [
+            b'',
+            (hashlib.sha256(b'seed' + bytes(7) + b'\x01' + bytes(8)).digest() +
+             hashlib.sha256(b'seed' + bytes(7) + b'\x01' + bytes(7) +
+                            b'\x01').digest())[:40]
+        ])
+    self.assertEqual(
+        generated_inputs.digest([b'', b'ab']),
+        hashlib.sha256(bytes(8) + bytes(7) + b'\x02' + b'ab').digest())
+
+  def _shared_region(self, data, offset=0):
+    path = os.path.join(self.create_tempdir().full_path, 'payload')
+    with open(path, 'wb') as f:
+      f.write(bytes(offset) + data)
+    return testing_api_pb2.SharedMemoryRegion(
+        path=path, offset=offset, length=len(data))
+
+  def _read_region(self, region):
+    with open(region.path, 'rb') as f:
+      f.seek(region.offset)
+      return f.read(region.length)
+
+  def test_encrypt_decrypt_shared_memory(self):
+    aead_servicer = services.AeadServicer()
+    keyset = tink.proto_keyset_format.serialize(
+        tink.new_keyset_handle(aead.aead_key_templates.AES128_GCM),
+        tink.secret_key_access.TOKEN)
+    output_dir = self.create_tempdir().full_path
+    plaintext = b'The quick brown fox jumps over the lazy dog'
+    associated_data = b'associated_data'
+
+    enc_response = aead_servicer.Encrypt(
+        testing_api_pb2.AeadEncryptRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            shared_plaintext=self._shared_region(plaintext, offset=10),
+            associated_data=associated_data,
+            shared_output_path=os.path.join(output_dir, 'ciphertext')),
+        self._ctx)
+    self.assertEqual(enc_response.WhichOneof('result'), 'shared_ciphertext')
+    # The ciphertext is returned in shared memory, and can be decrypted from
+    # a plain bytes field.
+    dec_response = aead_servicer.Decrypt(
+        testing_api_pb2.AeadDecryptRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            ciphertext=self._read_region(enc_response.shared_ciphertext),
+            associated_data=associated_data), self._ctx)
+    self.assertEqual(dec_response.plaintext, plaintext)
+
+    dec_response = aead_servicer.Decrypt(
+        testing_api_pb2.AeadDecryptRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            shared_ciphertext=enc_response.shared_ciphertext,
+            associated_data=associated_data,
+            shared_output_path=os.path.join(output_dir, 'plaintext')),
+        self._ctx)
+    self.assertEqual(dec_response.WhichOneof('result'), 'shared_plaintext')
+    self.assertEqual(self._read_region(dec_response.shared_plaintext),
+                     plaintext)
+
+  def test_encrypt_shared_memory_region_out_of_bounds_fails(self):
+    aead_servicer = services.AeadServicer()
+    keyset = tink.proto_keyset_format.serialize(
+        tink.new_keyset_handle(aead.aead_key_templates.AES128_GCM),
+        tink.secret_key_access.TOKEN)
+    region = self._shared_region(b'plaintext')
+    region.length += 1
+    enc_response = aead_servicer.Encrypt(
+        testing_api_pb2.AeadEncryptRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            shared_plaintext=region), self._ctx)
+    self.assertEqual(enc_response.WhichOneof('result'), 'err')
 
   def test_create_deterministic_aead(self):
     keyset_servicer = services.KeysetServicer()
@@ -501,6 +623,38 @@ class ServicesTest(absltest.TestCase):
     self.assertEqual(dec_response.WhichOneof('result'), 'plaintext')
     self.assertEqual(dec_response.plaintext, plaintext)
 
+  def test_encrypt_deterministically_generated_plaintexts(self):
+    keyset_servicer = services.KeysetServicer()
+    daead_servicer = services.DeterministicAeadServicer()
+
+    template = (
+        daead.deterministic_aead_key_templates.AES256_SIV.SerializeToString())
+    gen_request = testing_api_pb2.KeysetGenerateRequest(template=template)
+    gen_response = keyset_servicer.Generate(gen_request, self._ctx)
+    self.assertEqual(gen_response.WhichOneof('result'), 'keyset')
+    keyset = gen_response.keyset
+    inputs = testing_api_pb2.GeneratedInputs(seed=b'seed', sizes=[0, 1, 100])
+
+    ciphertexts = []
+    for plaintext in generated_inputs.generate(inputs):
+      enc_response = daead_servicer.EncryptDeterministically(
+          testing_api_pb2.DeterministicAeadEncryptRequest(
+              annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                  serialized_keyset=keyset),
+              plaintext=plaintext,
+              associated_data=b'associated_data'), self._ctx)
+      self.assertEqual(enc_response.WhichOneof('result'), 'ciphertext')
+      ciphertexts.append(enc_response.ciphertext)
+    enc_response = daead_servicer.EncryptDeterministically(
+        testing_api_pb2.DeterministicAeadEncryptRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            generated_plaintexts=inputs,
+            associated_data=b'associated_data'), self._ctx)
+    self.assertEqual(enc_response.WhichOneof('result'), 'ciphertexts_digest')
+    self.assertEqual(enc_response.ciphertexts_digest,
+                     generated_inputs.digest(ciphertexts))
+
   def test_generate_decrypt_deterministically_fail(self):
     keyset_servicer = services.KeysetServicer()
     daead_servicer = services.DeterministicAeadServicer()
@@ -574,6 +728,35 @@ class ServicesTest(absltest.TestCase):
     verify_response = mac_servicer.VerifyMac(verify_request, self._ctx)
     self.assertEmpty(verify_response.err)
 
+  def test_compute_mac_generated_data(self):
+    keyset_servicer = services.KeysetServicer()
+    mac_servicer = services.MacServicer()
+
+    template = mac.mac_key_templates.HMAC_SHA256_128BITTAG.SerializeToString()
+    gen_request = testing_api_pb2.KeysetGenerateRequest(template=template)
+    gen_response = keyset_servicer.Generate(gen_request, self._ctx)
+    self.assertEqual(gen_response.WhichOneof('result'), 'keyset')
+    keyset = gen_response.keyset
+    inputs = testing_api_pb2.GeneratedInputs(seed=b'seed', sizes=[0, 1, 100])
+
+    mac_values = []
+    for data in generated_inputs.generate(inputs):
+      comp_response = mac_servicer.ComputeMac(
+          testing_api_pb2.ComputeMacRequest(
+              annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                  serialized_keyset=keyset),
+              data=data), self._ctx)
+      self.assertEqual(comp_response.WhichOneof('result'), 'mac_value')
+      mac_values.append(comp_response.mac_value)
+    comp_response = mac_servicer.ComputeMac(
+        testing_api_pb2.ComputeMacRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            generated_data=inputs), self._ctx)
+    self.assertEqual(comp_response.WhichOneof('result'), 'mac_values_digest')
+    self.assertEqual(comp_response.mac_values_digest,
+                     generated_inputs.digest(mac_values))
+
   def test_generate_compute_verify_mac_fail(self):
     keyset_servicer = services.KeysetServicer()
     mac_servicer = services.MacServicer()
@@ -798,6 +981,36 @@ class ServicesTest(absltest.TestCase):
     verify_response = signature_servicer.Verify(verify_request, self._ctx)
     self.assertEmpty(verify_response.err)
 
+  def test_sign_generated_data(self):
+    keyset_servicer = services.KeysetServicer()
+    signature_servicer = services.SignatureServicer()
+
+    # ED25519 signatures are deterministic.
+    template = signature.signature_key_templates.ED25519.SerializeToString()
+    gen_request = testing_api_pb2.KeysetGenerateRequest(template=template)
+    gen_response = keyset_servicer.Generate(gen_request, self._ctx)
+    self.assertEqual(gen_response.WhichOneof('result'), 'keyset')
+    private_keyset = gen_response.keyset
+    inputs = testing_api_pb2.GeneratedInputs(seed=b'seed', sizes=[0, 1, 100])
+
+    signatures = []
+    for data in generated_inputs.generate(inputs):
+      sign_response = signature_servicer.Sign(
+          testing_api_pb2.SignatureSignRequest(
+              private_annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                  serialized_keyset=private_keyset),
+              data=data), self._ctx)
+      self.assertEqual(sign_response.WhichOneof('result'), 'signature')
+      signatures.append(sign_response.signature)
+    sign_response = signature_servicer.Sign(
+        testing_api_pb2.SignatureSignRequest(
+            private_annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=private_keyset),
+            generated_data=inputs), self._ctx)
+    self.assertEqual(sign_response.WhichOneof('result'), 'signatures_digest')
+    self.assertEqual(sign_response.signatures_digest,
+                     generated_inputs.digest(signatures))
+
   def test_sign_verify_fail(self):
     keyset_servicer = services.KeysetServicer()
     signature_servicer = services.SignatureServicer()
@@ -876,6 +1089,69 @@ class ServicesTest(absltest.TestCase):
     self.assertEqual(compute_response.WhichOneof('result'), 'output')
     self.assertLen(compute_response.output, output_length)
 
+  def test_compute_prf_generated_input_data(self):
+    keyset_servicer = services.KeysetServicer()
+    prf_set_servicer = services.PrfSetServicer()
+    template = prf.prf_key_templates.HMAC_SHA256.SerializeToString()
+    gen_request = testing_api_pb2.KeysetGenerateRequest(template=template)
+    gen_response = keyset_servicer.Generate(gen_request, self._ctx)
+    self.assertEqual(gen_response.WhichOneof('result'), 'keyset')
+    keyset = gen_response.keyset
+    key_ids_response = prf_set_servicer.KeyIds(
+        testing_api_pb2.PrfSetKeyIdsRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset)), self._ctx)
+    self.assertEqual(key_ids_response.WhichOneof('result'), 'output')
+    key_id = key_ids_response.output.primary_key_id
+    inputs = testing_api_pb2.GeneratedInputs(seed=b'seed', sizes=[0, 1, 100])
+
+    outputs = []
+    for input_data in generated_inputs.generate(inputs):
+      compute_response = prf_set_servicer.Compute(
+          testing_api_pb2.PrfSetComputeRequest(
+              annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                  serialized_keyset=keyset),
+              key_id=key_id,
+              input_data=input_data,
+              output_length=16), self._ctx)
+      self.assertEqual(compute_response.WhichOneof('result'), 'output')
+      outputs.append(compute_response.output)
+    compute_response = prf_set_servicer.Compute(
+        testing_api_pb2.PrfSetComputeRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            key_id=key_id,
+            generated_input_data=inputs,
+            output_length=16), self._ctx)
+    self.assertEqual(compute_response.WhichOneof('result'), 'outputs_digest')
+    self.assertEqual(compute_response.outputs_digest,
+                     generated_inputs.digest(outputs))
+
+  def test_compute_prf_generated_input_data_fail(self):
+    keyset_servicer = services.KeysetServicer()
+    prf_set_servicer = services.PrfSetServicer()
+    template = prf.prf_key_templates.HMAC_SHA256.SerializeToString()
+    gen_request = testing_api_pb2.KeysetGenerateRequest(template=template)
+    gen_response = keyset_servicer.Generate(gen_request, self._ctx)
+    self.assertEqual(gen_response.WhichOneof('result'), 'keyset')
+    keyset = gen_response.keyset
+    key_ids_response = prf_set_servicer.KeyIds(
+        testing_api_pb2.PrfSetKeyIdsRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset)), self._ctx)
+    self.assertEqual(key_ids_response.WhichOneof('result'), 'output')
+
+    compute_request = testing_api_pb2.PrfSetComputeRequest(
+        annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+            serialized_keyset=keyset),
+        key_id=key_ids_response.output.primary_key_id,
+        generated_input_data=testing_api_pb2.GeneratedInputs(
+            seed=b'seed', sizes=[10, 20]),
+        output_length=12345)
+    compute_response = prf_set_servicer.Compute(compute_request, self._ctx)
+    self.assertEqual(compute_response.WhichOneof('result'), 'err')
+    self.assertNotEmpty(compute_response.err)
+
   def test_key_ids_prf_fail(self):
     prf_set_servicer = services.PrfSetServicer()
     invalid_key_ids_response = prf_set_servicer.KeyIds(
@@ -970,6 +1246,38 @@ class ServicesTest(absltest.TestCase):
 
     self.assertEqual(dec_response.plaintext, plaintext)
 
+  def test_streaming_encrypt_decrypt_shared_memory(self):
+    streaming_aead_servicer = services.StreamingAeadServicer()
+    templates = streaming_aead.streaming_aead_key_templates
+    keyset = tink.proto_keyset_format.serialize(
+        tink.new_keyset_handle(templates.AES128_CTR_HMAC_SHA256_4KB),
+        tink.secret_key_access.TOKEN)
+    output_dir = self.create_tempdir().full_path
+    plaintext = os.urandom(100000)
+    associated_data = b'associated_data'
+
+    enc_response = streaming_aead_servicer.Encrypt(
+        testing_api_pb2.StreamingAeadEncryptRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            shared_plaintext=self._shared_region(plaintext),
+            associated_data=associated_data,
+            shared_output_path=os.path.join(output_dir, 'ciphertext')),
+        self._ctx)
+    self.assertEqual(enc_response.WhichOneof('result'), 'shared_ciphertext')
+
+    dec_response = streaming_aead_servicer.Decrypt(
+        testing_api_pb2.StreamingAeadDecryptRequest(
+            annotated_keyset=testing_api_pb2.AnnotatedKeyset(
+                serialized_keyset=keyset),
+            shared_ciphertext=enc_response.shared_ciphertext,
+            associated_data=associated_data,
+            shared_output_path=os.path.join(output_dir, 'plaintext')),
+        self._ctx)
+    self.assertEqual(dec_response.WhichOneof('result'), 'shared_plaintext')
+    self.assertEqual(self._read_region(dec_response.shared_plaintext),
+                     plaintext)
+
   def test_generate_streaming_decrypt_fail(self):
     keyset_servicer = services.KeysetServicer()
     streaming_aead_servicer = services.StreamingAeadServicer()
@@ -0,0 +1,91 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Reads and writes SharedMemoryRegion payloads.
+
+Regions are mapped into memory, and are exposed as memoryviews without
+copying them. The primitives of tink-py only accept bytes, so AEAD payloads
+are copied once, but streaming AEAD payloads are streamed from the mapping.
+"""
+
+import contextlib
+import io
+import mmap
+import os
+from typing import BinaryIO, Iterator
+
+from protos import testing_api_pb2
+
+
+@contextlib.contextmanager
+def mapped(region: testing_api_pb2.SharedMemoryRegion) -> Iterator[memoryview]:
+  """Maps a region into memory, and yields it as a read-only memoryview."""
+  if not region.length:
+    yield memoryview(b'')
+    return
+  with open(region.path, 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+      if region.offset + region.length > len(mapping):
+        raise ValueError('region [%d, %d) exceeds the size %d of %s' %
+                         (region.offset, region.offset + region.length,
+                          len(mapping), region.path))
+      view = memoryview(mapping)
+      payload = view[region.offset:region.offset + region.length]
+      try:
+        yield payload
+      finally:
+        # The mapping can only be closed once all views are released.
+        payload.release()
+        view.release()
+
+
+def read(region: testing_api_pb2.SharedMemoryRegion) -> bytes:
+  """Returns a copy of the payload in region."""
+  with mapped(region) as payload:
+    return payload.tobytes()
+
+
+class MemoryViewReader(io.RawIOBase):
+  """A readable stream over a memoryview which does not copy it."""
+
+  def __init__(self, view: memoryview):
+    super().__init__()
+    self._view = view
+    self._position = 0
+
+  def readable(self) -> bool:
+    return True
+
+  def readinto(self, buffer) -> int:
+    size = min(len(buffer), len(self._view) - self._position)
+    buffer[:size] = self._view[self._position:self._position + size]
+    self._position += size
+    return size
+
+
+def create(path: str) -> BinaryIO:
+  """Creates the file of an output region, which must not exist yet."""
+  return open(path, 'xb')
+
+
+def region(path: str) -> testing_api_pb2.SharedMemoryRegion:
+  """Returns the region of the whole file at path."""
+  return testing_api_pb2.SharedMemoryRegion(
+      path=path, offset=0, length=os.stat(path).st_size)
+
+
+def write(path: str, data: bytes) -> testing_api_pb2.SharedMemoryRegion:
+  """Writes data to a new file at path, and returns its region."""
+  with create(path) as f:
+    f.write(data)
+  return region(path)
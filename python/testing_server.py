@@ -14,6 +14,7 @@
 """Tink Primitive Testing Service in Python."""
 
 from concurrent import futures
+import signal
 import sys
 
 from absl import app
@@ -32,12 +33,23 @@ from tink.testing import fake_kms
 from protos import testing_api_pb2_grpc
 import jwt_service
 import kms
+import monitoring
+import profiling_service
 import services
+import timing_service
 
 
 FLAGS = flags.FLAGS
 
 flags.DEFINE_integer('port', 10000, 'The port of the server.')
+flags.DEFINE_string(
+    'unix_socket', '',
+    'If set, the server listens on this Unix domain socket instead of the '
+    'port.')
+flags.DEFINE_bool(
+    'cpu_profiling', False,
+    'If set, the CPU profiler of the Profiling service can be started. It '
+    'adds an interceptor to every RPC.')
 
 
 def init_tink() -> None:
@@ -58,8 +70,14 @@ def init_tink() -> None:
 def main(unused_argv):
   init_tink()
   kms.init()
+  monitoring.init()
 
-  server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+  cpu_profiler = profiling_service.CpuProfiler(enabled=FLAGS.cpu_profiling)
+  interceptors = []
+  if FLAGS.cpu_profiling:
+    interceptors.append(profiling_service.CpuProfilerInterceptor(cpu_profiler))
+  server = grpc.server(
+      futures.ThreadPoolExecutor(max_workers=2), interceptors=interceptors)
   testing_api_pb2_grpc.add_MetadataServicer_to_server(
       services.MetadataServicer(), server)
   testing_api_pb2_grpc.add_KeysetServicer_to_server(
@@ -80,12 +98,31 @@ def main(unused_argv):
       services.StreamingAeadServicer(), server)
   testing_api_pb2_grpc.add_JwtServicer_to_server(jwt_service.JwtServicer(),
                                                  server)
-  used_port = server.add_secure_port('[::]:%d' % FLAGS.port,
-                                     grpc.local_server_credentials())
+  testing_api_pb2_grpc.add_ProfilingServicer_to_server(
+      profiling_service.ProfilingServicer(cpu_profiler), server)
+  testing_api_pb2_grpc.add_TimingServicer_to_server(
+      timing_service.TimingServicer(), server)
+  if FLAGS.unix_socket:
+    address = 'unix:' + FLAGS.unix_socket
+    server.add_secure_port(
+        address, grpc.local_server_credentials(grpc.LocalConnectionType.UDS))
+  else:
+    used_port = server.add_secure_port('[::]:%d' % FLAGS.port,
+                                       grpc.local_server_credentials())
+    address = 'port ' + str(used_port)
   server.start()
-  print('Server started on port ' + str(used_port))
-  print(' (stderr) Server started on port ' + str(used_port), file=sys.stderr)
+  print('Server started on ' + address)
+  print(' (stderr) Server started on ' + address, file=sys.stderr)
+
+  def stop(unused_signum, unused_frame):
+    server.stop(grace=None)
+
+  # The test harness stops the servers with SIGTERM.
+  signal.signal(signal.SIGTERM, stop)
   server.wait_for_termination()
+  print('KMS remote calls: %s' % kms.remote_call_counts())
+  print('Monitored key uses: %s' % monitoring.key_use_counts())
+  print('Monitored failures: %s' % monitoring.failure_counts())
 
 
 if __name__ == '__main__':
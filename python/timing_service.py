@@ -0,0 +1,79 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Timing service for the Python testing server.
+
+Each operation is timed with time.perf_counter_ns around the call of the
+primitive only. The primitive is created once per request, so that the
+measurements do not include parsing the keyset.
+"""
+
+import time
+from typing import Any, Callable
+
+import grpc
+import tink
+from tink import aead
+from tink import mac
+from tink import secret_key_access
+from tink import signature
+
+from protos import testing_api_pb2
+from protos import testing_api_pb2_grpc
+
+
+def _operation(
+    request: testing_api_pb2.TimingRequest) -> Callable[[bytes], Any]:
+  """Returns the operation of request, as a function of the input."""
+  keyset_handle = tink.proto_keyset_format.parse(
+      request.annotated_keyset.serialized_keyset, secret_key_access.TOKEN)
+  data = request.data
+  if request.operation == testing_api_pb2.TimingRequest.AEAD_DECRYPT:
+    p = keyset_handle.primitive(aead.Aead)
+    return lambda ciphertext: p.decrypt(ciphertext, data)
+  if request.operation == testing_api_pb2.TimingRequest.MAC_VERIFY:
+    m = keyset_handle.primitive(mac.Mac)
+    return lambda mac_value: m.verify_mac(mac_value, data)
+  if request.operation == testing_api_pb2.TimingRequest.SIGNATURE_VERIFY:
+    v = keyset_handle.primitive(signature.PublicKeyVerify)
+    return lambda signature_value: v.verify(signature_value, data)
+  raise ValueError('unknown operation %d' % request.operation)
+
+
+class TimingServicer(testing_api_pb2_grpc.TimingServicer):
+  """A service which measures the duration of operations."""
+
+  def Measure(
+      self, request: testing_api_pb2.TimingRequest,
+      context: grpc.ServicerContext) -> testing_api_pb2.TimingResponse:
+    """Runs the operation once per class, and returns the durations."""
+    try:
+      operation = _operation(request)
+    except (tink.TinkError, ValueError) as e:
+      return testing_api_pb2.TimingResponse(err=str(e))
+    inputs = list(request.inputs)
+    classes = request.classes
+    if classes and max(classes) >= len(inputs):
+      return testing_api_pb2.TimingResponse(
+          err='class %d has no input' % max(classes))
+    clock = time.perf_counter_ns
+    durations = [0] * len(classes)
+    for i, c in enumerate(classes):
+      x = inputs[c]
+      start = clock()
+      try:
+        operation(x)
+      except tink.TinkError:
+        pass
+      durations[i] = clock() - start
+    return testing_api_pb2.TimingResponse(durations_ns=durations)
@@ -0,0 +1,94 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for timing_service."""
+
+from absl.testing import absltest
+
+import tink
+from tink import mac
+from tink import secret_key_access
+from tink import signature
+
+from protos import testing_api_pb2
+import timing_service
+
+
+def setUpModule():
+  mac.register()
+  signature.register()
+
+
+def _annotated_keyset(keyset_handle):
+  return testing_api_pb2.AnnotatedKeyset(
+      serialized_keyset=tink.proto_keyset_format.serialize(
+          keyset_handle, secret_key_access.TOKEN))
+
+
+class TimingServiceTest(absltest.TestCase):
+
+  def test_measure_mac_verify(self):
+    keyset_handle = tink.new_keyset_handle(
+        mac.mac_key_templates.HMAC_SHA256_128BITTAG)
+    valid_mac = keyset_handle.primitive(mac.Mac).compute_mac(b'data')
+    request = testing_api_pb2.TimingRequest(
+        operation=testing_api_pb2.TimingRequest.MAC_VERIFY,
+        annotated_keyset=_annotated_keyset(keyset_handle),
+        inputs=[valid_mac, bytes(len(valid_mac))],
+        data=b'data',
+        classes=bytes([0, 1, 1, 0, 1]))
+    response = timing_service.TimingServicer().Measure(request, None)
+    self.assertEmpty(response.err)
+    self.assertLen(response.durations_ns, 5)
+    self.assertTrue(all(d > 0 for d in response.durations_ns))
+
+  def test_measure_signature_verify(self):
+    private_handle = tink.new_keyset_handle(
+        signature.signature_key_templates.ED25519)
+    valid_signature = private_handle.primitive(
+        signature.PublicKeySign).sign(b'data')
+    request = testing_api_pb2.TimingRequest(
+        operation=testing_api_pb2.TimingRequest.SIGNATURE_VERIFY,
+        annotated_keyset=_annotated_keyset(
+            private_handle.public_keyset_handle()),
+        inputs=[valid_signature, b'invalid'],
+        data=b'data',
+        classes=bytes([1, 0]))
+    response = timing_service.TimingServicer().Measure(request, None)
+    self.assertEmpty(response.err)
+    self.assertLen(response.durations_ns, 2)
+
+  def test_measure_class_without_input_fails(self):
+    keyset_handle = tink.new_keyset_handle(
+        mac.mac_key_templates.HMAC_SHA256_128BITTAG)
+    request = testing_api_pb2.TimingRequest(
+        operation=testing_api_pb2.TimingRequest.MAC_VERIFY,
+        annotated_keyset=_annotated_keyset(keyset_handle),
+        inputs=[b'mac'],
+        classes=bytes([0, 1]))
+    response = timing_service.TimingServicer().Measure(request, None)
+    self.assertNotEmpty(response.err)
+
+  def test_measure_unknown_operation_fails(self):
+    keyset_handle = tink.new_keyset_handle(
+        mac.mac_key_templates.HMAC_SHA256_128BITTAG)
+    request = testing_api_pb2.TimingRequest(
+        annotated_keyset=_annotated_keyset(keyset_handle),
+        inputs=[b'mac'],
+        classes=bytes([0]))
+    response = timing_service.TimingServicer().Measure(request, None)
+    self.assertNotEmpty(response.err)
+
+
+if __name__ == '__main__':
+  absltest.main()